@@ -0,0 +1,6 @@
+"""Stdlib-only performance benchmarks for the ZenCube monitoring pipeline.
+
+Run ``python -m benchmarks`` from the repository root. Results are emitted as
+JSON and compared against ``benchmarks/baseline.json``; see
+:mod:`benchmarks.runner` for the available options.
+"""
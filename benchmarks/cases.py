@@ -0,0 +1,219 @@
+"""Benchmark cases.
+
+Each case receives a scratch directory and a :class:`Scale`, performs any
+untimed setup, and returns one per-operation latency (seconds) per repeat.
+Cases whose optional dependencies are missing raise :class:`BenchmarkSkipped`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+class BenchmarkSkipped(RuntimeError):
+    """Raised when a case cannot run in the current environment."""
+
+
+@dataclass(frozen=True)
+class Scale:
+    repeat: int = 5
+    quick: bool = False
+
+    def iterations(self, full: int, quick: int) -> int:
+        return quick if self.quick else full
+
+
+CaseFn = Callable[[Path, Scale], List[float]]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    description: str
+    run: CaseFn
+
+
+def _per_op(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def _inspector_sample(workdir: Path, scale: Scale, prefer_psutil: bool) -> List[float]:
+    from monitor.resource_monitor import ProcessInspector, psutil
+
+    if prefer_psutil and psutil is None:
+        raise BenchmarkSkipped("psutil is not installed")
+    if not prefer_psutil and not Path(f"/proc/{os.getpid()}/stat").exists():
+        raise BenchmarkSkipped("/proc is unavailable")
+    inspector = ProcessInspector(os.getpid(), prefer_psutil=prefer_psutil)
+    iterations = scale.iterations(200, 20)
+    return [_per_op(inspector.sample, iterations) for _ in range(scale.repeat)]
+
+
+def bench_inspector_psutil(workdir: Path, scale: Scale) -> List[float]:
+    return _inspector_sample(workdir, scale, prefer_psutil=True)
+
+
+def bench_inspector_proc(workdir: Path, scale: Scale) -> List[float]:
+    return _inspector_sample(workdir, scale, prefer_psutil=False)
+
+
+def bench_inspector_native(workdir: Path, scale: Scale) -> List[float]:
+    from monitor.native_inspector import NativeInspector, native_available
+
+    if not native_available():
+        raise BenchmarkSkipped("core_c/bin/libzencube_core.so is not built")
+    with NativeInspector(os.getpid()) as inspector:
+        iterations = scale.iterations(200, 20)
+        return [_per_op(inspector.sample, iterations) for _ in range(scale.repeat)]
+
+
+def bench_append_json_line(workdir: Path, scale: Scale) -> List[float]:
+    from monitor.resource_monitor import Sample, append_json_line, iso_timestamp
+
+    payload = Sample(iso_timestamp(), 12.5, 64 * 1024 * 1024, 256 * 1024 * 1024, 4, 12, 4096, 8192).to_dict()
+    path = workdir / "append.jsonl"
+    iterations = scale.iterations(2000, 100)
+    results = []
+    for _ in range(scale.repeat):
+        path.unlink(missing_ok=True)
+        results.append(_per_op(lambda: append_json_line(path, payload), iterations))
+    return results
+
+
+def bench_rotate_logs(workdir: Path, scale: Scale) -> List[float]:
+    from monitor.log_rotate import rotate_logs
+
+    file_count = scale.iterations(50, 10)
+    line = b'{"event": "sample", "cpu_percent": 1.0, "memory_rss": 1048576}\n' * 200
+    results = []
+    for trial in range(scale.repeat):
+        log_dir = workdir / f"rotate_{trial}"
+        log_dir.mkdir()
+        for index in range(file_count):
+            path = log_dir / f"monitor_run_{index:04d}.jsonl"
+            path.write_bytes(line)
+            os.utime(path, (1_700_000_000 + index, 1_700_000_000 + index))
+        start = time.perf_counter()
+        rotate_logs(log_dir, keep=5)
+        results.append((time.perf_counter() - start) / file_count)
+    return results
+
+
+def _collect_features(workdir: Path, scale: Scale, reader: str) -> List[float]:
+    from data.collector import build_feature_table, collect_runs
+    from data.sample_generator import generate_dataset
+
+    synthetic_dir = workdir / f"synthetic_{reader}"
+    log_dir = workdir / f"empty_logs_{reader}"
+    log_dir.mkdir()
+    run_count = len(generate_dataset(synthetic_dir, seed=2025))
+    results = []
+    for _ in range(scale.repeat):
+        start = time.perf_counter()
+        build_feature_table(collect_runs(log_dir, synthetic_dir, reader=reader))
+        results.append((time.perf_counter() - start) / run_count)
+    return results
+
+
+def bench_collect_features(workdir: Path, scale: Scale) -> List[float]:
+    return _collect_features(workdir, scale, reader="lines")
+
+
+def bench_collect_features_mmap(workdir: Path, scale: Scale) -> List[float]:
+    return _collect_features(workdir, scale, reader="mmap")
+
+
+def bench_collect_features_cached(workdir: Path, scale: Scale) -> List[float]:
+    from data.collector import build_feature_table, collect_runs
+    from data.feature_cache import FeatureCache
+    from data.sample_generator import generate_dataset
+
+    synthetic_dir = workdir / "synthetic_cached"
+    run_count = len(generate_dataset(synthetic_dir, seed=2025))
+    cache_path = workdir / "features.npz"
+    build_feature_table(collect_runs(workdir / "missing", synthetic_dir), cache=FeatureCache(cache_path))
+    results = []
+    for _ in range(scale.repeat):
+        start = time.perf_counter()
+        build_feature_table(collect_runs(workdir / "missing", synthetic_dir), cache=FeatureCache(cache_path))
+        results.append((time.perf_counter() - start) / run_count)
+    return results
+
+
+def bench_incremental_features(workdir: Path, scale: Scale) -> List[float]:
+    from data.collector import IncrementalFeatures
+    from monitor.resource_monitor import Sample, iso_timestamp
+
+    stream = [
+        Sample(iso_timestamp(), float(index % 100), 64 * 1024 * 1024 + index, 0, 4, 12, 4096 * index, 8192 * index).to_dict()
+        for index in range(480)
+    ]
+    iterations = scale.iterations(2000, 200)
+    results = []
+    for _ in range(scale.repeat):
+        features = IncrementalFeatures({"interval": 0.4}, window=240)
+        for sample in stream[:240]:
+            features.add(sample)
+
+        samples = itertools.cycle(stream)
+
+        def tick() -> None:
+            features.add(next(samples))
+            features.features()
+
+        results.append(_per_op(tick, iterations))
+    return results
+
+
+def bench_predict_run(workdir: Path, scale: Scale) -> List[float]:
+    try:
+        from inference.ml_inference import MLInferenceEngine
+    except ImportError as exc:
+        raise BenchmarkSkipped(f"inference dependencies missing: {exc}") from exc
+    from data.collector import collect_runs
+    from data.sample_generator import generate_dataset
+
+    synthetic_dir = workdir / "synthetic_predict"
+    generate_dataset(synthetic_dir, seed=2025)
+    runs = collect_runs(workdir / "missing", synthetic_dir)
+    if not runs:
+        raise BenchmarkSkipped("no synthetic runs generated")
+    engine = MLInferenceEngine()
+    if engine.model is None:
+        raise BenchmarkSkipped("no model artifacts")
+    iterations = scale.iterations(len(runs) * 5, len(runs))
+    results = []
+    for _ in range(scale.repeat):
+        start = time.perf_counter()
+        for index in range(iterations):
+            engine.predict_run(runs[index % len(runs)])
+        results.append((time.perf_counter() - start) / iterations)
+    return results
+
+
+CASES: Dict[str, Case] = {
+    case.name: case
+    for case in (
+        Case("inspector_sample_psutil", "ProcessInspector.sample() via psutil", bench_inspector_psutil),
+        Case("inspector_sample_proc", "ProcessInspector.sample() via /proc", bench_inspector_proc),
+        Case("inspector_sample_native", "NativeInspector.sample() via libzencube_core", bench_inspector_native),
+        Case("append_json_line", "append_json_line() per line", bench_append_json_line),
+        Case("rotate_logs", "rotate_logs() per file", bench_rotate_logs),
+        Case("collect_features", "collect_runs() + compute_features() per run", bench_collect_features),
+        Case("collect_features_mmap", "collect_runs(reader=\"mmap\") + compute_features() per run", bench_collect_features_mmap),
+        Case("collect_features_cached", "collect_runs() + build_feature_table() per run, warm FeatureCache", bench_collect_features_cached),
+        Case("incremental_features", "IncrementalFeatures.add() + features() per tick, 240-sample window", bench_incremental_features),
+        Case("predict_run", "MLInferenceEngine.predict_run() per run", bench_predict_run),
+    )
+}
+
+
+__all__ = ["BenchmarkSkipped", "CASES", "Case", "Scale"]
@@ -0,0 +1,189 @@
+"""Benchmark runner and baseline comparison.
+
+Usage::
+
+    python -m benchmarks                       # run all cases, compare to baseline
+    python -m benchmarks --only rotate_logs    # run a subset
+    python -m benchmarks --quick --repeat 1    # CI smoke run
+    python -m benchmarks --save-baseline       # refresh benchmarks/baseline.json
+
+Results are written to stdout (or ``--out``) as JSON; the comparison table goes
+to stderr. Latencies are per operation and the median across repeats is what
+gets compared. Baselines are machine specific, so refresh them on the host you
+compare against.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .cases import CASES, BenchmarkSkipped, Scale
+
+SCHEMA_VERSION = 1
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.25
+
+
+def summarise(samples: List[float]) -> Dict[str, object]:
+    median = statistics.median(samples)
+    return {
+        "unit": "seconds_per_op",
+        "repeat": len(samples),
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "ops_per_second": 1.0 / median if median > 0 else None,
+    }
+
+
+def run_cases(names: Iterable[str], scale: Scale) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    for name in names:
+        case = CASES[name]
+        with tempfile.TemporaryDirectory(prefix=f"zencube_bench_{name}_") as tmp:
+            try:
+                samples = case.run(Path(tmp), scale)
+            except BenchmarkSkipped as exc:
+                results[name] = {"skipped": str(exc)}
+                continue
+        results[name] = {"description": case.description, **summarise(samples)}
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, object]],
+    baseline: Dict[str, Dict[str, object]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Dict[str, Dict[str, object]]:
+    """Compare medians against a baseline.
+
+    A case regresses when its median exceeds the baseline by more than
+    ``tolerance`` (0.25 == 25%) and improves when it is faster by the same
+    margin. Cases missing on either side are reported as ``untracked``.
+    """
+
+    comparison: Dict[str, Dict[str, object]] = {}
+    for name, current in results.items():
+        reference = baseline.get(name, {})
+        current_median = current.get("median")
+        baseline_median = reference.get("median")
+        if not isinstance(current_median, (int, float)) or not isinstance(baseline_median, (int, float)) or baseline_median <= 0:
+            comparison[name] = {"status": "untracked"}
+            continue
+        ratio = float(current_median) / float(baseline_median)
+        if ratio > 1.0 + tolerance:
+            status = "regressed"
+        elif ratio < 1.0 / (1.0 + tolerance):
+            status = "improved"
+        else:
+            status = "ok"
+        comparison[name] = {"status": status, "ratio": ratio, "baseline_median": baseline_median}
+    return comparison
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, object]]:
+    try:
+        document = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    return document.get("results", {}) if isinstance(document, dict) else {}
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _format_table(results: Dict[str, Dict[str, object]], comparison: Dict[str, Dict[str, object]]) -> str:
+    lines = [f"{'case':<26} {'median':>12} {'baseline':>12} {'ratio':>7}  status"]
+    for name, result in results.items():
+        if "skipped" in result:
+            lines.append(f"{name:<26} {'-':>12} {'-':>12} {'-':>7}  skipped ({result['skipped']})")
+            continue
+        info = comparison.get(name, {"status": "untracked"})
+        baseline = info.get("baseline_median")
+        ratio = info.get("ratio")
+        lines.append(
+            f"{name:<26} {_format_seconds(result['median']):>12} "
+            f"{_format_seconds(baseline) if baseline is not None else '-':>12} "
+            f"{f'{ratio:.2f}x' if ratio is not None else '-':>7}  {info['status']}"
+        )
+    return "\n".join(lines)
+
+
+def _format_seconds(value: object) -> str:
+    seconds = float(value)  # type: ignore[arg-type]
+    if seconds >= 1.0:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the ZenCube monitoring pipeline")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Run only these cases")
+    parser.add_argument("--list", action="store_true", help="List available cases and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per case (default: 5)")
+    parser.add_argument("--quick", action="store_true", help="Use small iteration counts (smoke runs)")
+    parser.add_argument("--out", type=Path, default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown ratio before a case counts as regressed (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run's results")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if any case regressed")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = _build_parser().parse_args(list(argv) if argv is not None else None)
+    if args.list:
+        for name, case in CASES.items():
+            print(f"{name:<26} {case.description}")
+        return 0
+
+    names = args.only or list(CASES)
+    results = run_cases(names, Scale(repeat=max(args.repeat, 1), quick=args.quick))
+    comparison = compare(results, load_baseline(args.baseline), max(args.tolerance, 0.0))
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "quick": args.quick,
+        "environment": _environment(),
+        "baseline": str(args.baseline),
+        "results": results,
+        "comparison": comparison,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out is not None:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    print(_format_table(results, comparison), file=sys.stderr)
+
+    if args.save_baseline:
+        stored = {key: value for key, value in report.items() if key not in {"baseline", "comparison"}}
+        args.baseline.write_text(json.dumps(stored, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    regressed = [name for name, info in comparison.items() if info["status"] == "regressed"]
+    if regressed and args.fail_on_regression:
+        print(f"Regressed: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+__all__ = ["DEFAULT_BASELINE", "compare", "load_baseline", "main", "run_cases", "summarise"]
@@ -0,0 +1,216 @@
+#include "alert_engine.h"
+#include "cJSON.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <getopt.h>
+#include <time.h>
+#include <unistd.h>
+#include <sys/stat.h>
+
+// Throughput benchmark for alert evaluation. Generates (or reuses) a
+// synthetic sample log and reports MB/s and lines/s for the compiled
+// single-pass evaluator, optionally next to a reference evaluator that
+// parses each line into a cJSON tree and looks every rule's metric up in it.
+
+static const char *METRICS[] = {
+    "cpu_percent", "rss_bytes", "vms_bytes", "threads", "fds_open",
+    "read_bytes", "write_bytes", "cpu_max", "rss_max"
+};
+#define METRIC_COUNT (sizeof(METRICS) / sizeof(METRICS[0]))
+
+static void print_usage(const char *prog) {
+    printf("Usage: %s [--log PATH | --size-mb N] [--rules N] [--compare] [--keep]\n", prog);
+    printf("\nOptions:\n");
+    printf("  --log PATH      Evaluate an existing sample log instead of generating one\n");
+    printf("  --size-mb N     Synthetic log size in MB (default: 2048)\n");
+    printf("  --path PATH     Where to generate the log (default: /tmp/zencube_alert_bench.jsonl)\n");
+    printf("  --rules N       Rules to evaluate, cycling over the sample metrics (default: 9)\n");
+    printf("  --compare       Also time the cJSON-tree reference evaluator\n");
+    printf("  --keep          Keep the generated log\n");
+    printf("  --help          Show this help message\n");
+}
+
+static double now_sec(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static int generate_log(const char *path, long size_mb) {
+    FILE *fp = fopen(path, "w");
+    if (!fp) {
+        perror(path);
+        return -1;
+    }
+    setvbuf(fp, NULL, _IOFBF, 1 << 20);
+
+    long long target = (long long)size_mb * 1024 * 1024;
+    long long written = 0;
+    unsigned long i = 0;
+    while (written < target) {
+        int n = fprintf(fp,
+            "{\"event\":\"sample\",\"run_id\":\"bench_run\",\"timestamp\":\"2025-01-01T00:00:%02luZ\","
+            "\"pid\":4242,\"cpu_percent\":%.2f,\"rss_bytes\":%lu,\"vms_bytes\":%lu,\"threads\":%lu,"
+            "\"fds_open\":%lu,\"read_bytes\":%lu,\"write_bytes\":%lu,\"cpu_max\":99.5,\"rss_max\":%lu}\n",
+            i % 60, (double)(i % 10000) / 100.0, 100000000 + i % 65536, 300000000 + i % 4096,
+            1 + i % 16, 10 + i % 50, i * 4096, i * 2048, 200000000 + i % 65536);
+        if (n < 0) {
+            fclose(fp);
+            return -1;
+        }
+        written += n;
+        i++;
+    }
+    return fclose(fp);
+}
+
+static int write_rules(const char *path, int rule_count) {
+    FILE *fp = fopen(path, "w");
+    if (!fp) return -1;
+    // Thresholds no sample reaches: measure evaluation, not alert writing
+    fprintf(fp, "{\"rules\":[");
+    for (int i = 0; i < rule_count; i++) {
+        fprintf(fp, "%s{\"metric\":\"%s\",\"operator\":\">\",\"threshold\":1e18,\"duration_samples\":%d}",
+                i ? "," : "", METRICS[i % METRIC_COUNT], 1 + i / (int)METRIC_COUNT);
+    }
+    fprintf(fp, "]}\n");
+    return fclose(fp);
+}
+
+// What alert_engine_evaluate did before rules were compiled
+static long reference_evaluate(const AlertEngine *engine, const char *log_path) {
+    FILE *fp = fopen(log_path, "r");
+    if (!fp) return -1;
+
+    char *line = NULL;
+    size_t cap = 0;
+    long matched = 0;
+    while (getline(&line, &cap, fp) > 0) {
+        cJSON *sample = cJSON_Parse(line);
+        if (!sample) continue;
+        cJSON *event = cJSON_GetObjectItem(sample, "event");
+        if (event && cJSON_IsString(event) && strcmp(event->valuestring, "sample") == 0) {
+            for (int i = 0; i < engine->rule_count; i++) {
+                cJSON *value = cJSON_GetObjectItem(sample, engine->rules[i].metric);
+                if (value && cJSON_IsNumber(value) && value->valuedouble > engine->rules[i].threshold) {
+                    matched++;
+                }
+            }
+        }
+        cJSON_Delete(sample);
+    }
+    free(line);
+    fclose(fp);
+    return matched;
+}
+
+static long count_lines(const char *path) {
+    FILE *fp = fopen(path, "r");
+    if (!fp) return -1;
+    char buf[1 << 16];
+    long lines = 0;
+    size_t n;
+    while ((n = fread(buf, 1, sizeof(buf), fp)) > 0) {
+        for (char *p = buf; (p = memchr(p, '\n', (size_t)(buf + n - p))) != NULL; p++) lines++;
+    }
+    fclose(fp);
+    return lines;
+}
+
+int main(int argc, char *argv[]) {
+    const char *log_path = NULL;
+    const char *gen_path = "/tmp/zencube_alert_bench.jsonl";
+    long size_mb = 2048;
+    int rule_count = (int)METRIC_COUNT;
+    int compare = 0;
+    int keep = 0;
+
+    static struct option long_options[] = {
+        {"log",     required_argument, 0, 'l'},
+        {"size-mb", required_argument, 0, 's'},
+        {"path",    required_argument, 0, 'p'},
+        {"rules",   required_argument, 0, 'r'},
+        {"compare", no_argument,       0, 'c'},
+        {"keep",    no_argument,       0, 'k'},
+        {"help",    no_argument,       0, 'h'},
+        {0, 0, 0, 0}
+    };
+
+    int opt;
+    while ((opt = getopt_long(argc, argv, "l:s:p:r:ckh", long_options, NULL)) != -1) {
+        switch (opt) {
+            case 'l': log_path = optarg; break;
+            case 's': size_mb = atol(optarg); break;
+            case 'p': gen_path = optarg; break;
+            case 'r': rule_count = atoi(optarg); break;
+            case 'c': compare = 1; break;
+            case 'k': keep = 1; break;
+            case 'h':
+                print_usage(argv[0]);
+                return 0;
+            default:
+                print_usage(argv[0]);
+                return 1;
+        }
+    }
+    if (size_mb <= 0 || rule_count <= 0) {
+        print_usage(argv[0]);
+        return 1;
+    }
+
+    int generated = 0;
+    if (!log_path) {
+        fprintf(stderr, "Generating %ld MB synthetic log at %s...\n", size_mb, gen_path);
+        if (generate_log(gen_path, size_mb) != 0) return 1;
+        log_path = gen_path;
+        generated = 1;
+    }
+
+    char rules_path[] = "/tmp/zencube_alert_bench_rulesXXXXXX";
+    int rules_fd = mkstemp(rules_path);
+    if (rules_fd < 0 || write_rules(rules_path, rule_count) != 0) {
+        perror("rules");
+        return 1;
+    }
+    close(rules_fd);
+
+    JsonlFsyncPolicy policy = { JSONL_FSYNC_NEVER, 0.0, 0 };
+    AlertEngine engine;
+    int rc = alert_engine_init(&engine, rules_path, "/dev/null", &policy);
+    unlink(rules_path);
+    if (rc != 0) return 1;
+
+    struct stat st;
+    if (stat(log_path, &st) != 0) {
+        perror(log_path);
+        return 1;
+    }
+    long lines = count_lines(log_path);  // also warms the page cache
+    double mb = st.st_size / (1024.0 * 1024.0);
+
+    double start = now_sec();
+    if (alert_engine_evaluate(&engine, log_path, "bench_run") != 0) {
+        fprintf(stderr, "Evaluation failed\n");
+        return 1;
+    }
+    double compiled_sec = now_sec() - start;
+
+    printf("{\"bytes\":%lld,\"lines\":%ld,\"rules\":%d,"
+           "\"compiled_seconds\":%.3f,\"compiled_mb_per_sec\":%.1f,\"compiled_lines_per_sec\":%.0f",
+           (long long)st.st_size, lines, engine.rule_count,
+           compiled_sec, mb / compiled_sec, lines / compiled_sec);
+
+    if (compare) {
+        start = now_sec();
+        reference_evaluate(&engine, log_path);
+        double reference_sec = now_sec() - start;
+        printf(",\"reference_seconds\":%.3f,\"reference_mb_per_sec\":%.1f,\"speedup\":%.1f",
+               reference_sec, mb / reference_sec, reference_sec / compiled_sec);
+    }
+    printf("}\n");
+
+    alert_engine_cleanup(&engine);
+    if (generated && !keep) unlink(gen_path);
+    return 0;
+}
@@ -1,19 +1,50 @@
 #include "alert_engine.h"
 #include "logutil.h"
+#include "telemetry_schema.h"
 #include "cJSON.h"
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <time.h>
+#include <unistd.h>
+#include <sys/epoll.h>
+#include <sys/inotify.h>
+#include <sys/signalfd.h>
+#include <sys/stat.h>
+#include <sys/timerfd.h>
+
+#define READ_BUF_SIZE (64 * 1024)
+
+static uint64_t rules_hash(const AlertEngine *engine);
+static void load_emitted_ids(AlertEngine *engine);
+static void stream_close(AlertStream *stream);
 
 // Initialize alert engine
-int alert_engine_init(AlertEngine *engine, const char *config_path, const char *alert_log_path) {
+int alert_engine_init(AlertEngine *engine, const char *config_path, const char *alert_log_path,
+                      const JsonlFsyncPolicy *fsync_policy) {
     if (!engine) return -1;
     
     memset(engine, 0, sizeof(AlertEngine));
+    engine->alert_log.fd = -1;
     strncpy(engine->alert_log_path, alert_log_path, sizeof(engine->alert_log_path) - 1);
     
-    return alert_engine_load_rules(engine, config_path);
+    if (alert_engine_load_rules(engine, config_path) != 0) {
+        return -1;
+    }
+    engine->rules_hash = rules_hash(engine);
+
+    engine->read_buf = malloc(READ_BUF_SIZE);
+    if (!engine->read_buf ||
+        jsonl_writer_open(&engine->alert_log, engine->alert_log_path, fsync_policy) != 0) {
+        fprintf(stderr, "Failed to open alert log: %s\n", engine->alert_log_path);
+        alert_engine_cleanup(engine);
+        return -1;
+    }
+    load_emitted_ids(engine);
+    return 0;
 }
 
 // Parse operator string
@@ -77,6 +108,20 @@ int alert_engine_load_rules(AlertEngine *engine, const char *config_path) {
     }
     
     cJSON_Delete(root);
+
+    // Compile: every distinct metric gets one slot, filled by a single scan per
+    // line. Known telemetry fields also match under their other names, so
+    // memory_rss rules fire on sampler logs (rss_bytes) and vice versa.
+    json_scan_schema_init(&engine->schema);
+    engine->event_slot = json_scan_schema_add(&engine->schema, "event", JSON_SCAN_STRING);
+    for (int i = 0; i < count; i++) {
+        engine->rules[i].slot = telemetry_schema_add(&engine->schema, engine->rules[i].metric,
+                                                     JSON_SCAN_NUMBER);
+        if (engine->rules[i].slot < 0) {
+            fprintf(stderr, "Too many distinct rule metrics (max %d)\n", JSON_SCAN_MAX_FIELDS - 1);
+            return -1;
+        }
+    }
     return 0;
 }
 
@@ -92,74 +137,589 @@ static int evaluate_condition(double value, AlertOperator op, double threshold)
     }
 }
 
+// ---------------------------------------------------------------------------
+// Stable alert IDs
+//
+// An alert is identified by what triggered it: run, rule and the position of
+// the triggering sample (log inode + byte offset). Re-evaluating the same
+// bytes therefore always yields the same ID, which is what makes replay after
+// a restart, or repeated whole-file evaluation, idempotent.
+// ---------------------------------------------------------------------------
+
+#define FNV_OFFSET 1469598103934665603ULL
+#define FNV_PRIME 1099511628211ULL
+
+static uint64_t fnv1a(uint64_t hash, const void *data, size_t len) {
+    const unsigned char *bytes = data;
+    for (size_t i = 0; i < len; i++) {
+        hash ^= bytes[i];
+        hash *= FNV_PRIME;
+    }
+    return hash;
+}
+
+static uint64_t alert_id_hash(const char *run_id, int rule_index, const AlertRule *rule,
+                              ino_t ino, off_t line_offset) {
+    uint64_t hash = fnv1a(FNV_OFFSET, run_id, strlen(run_id) + 1);
+    hash = fnv1a(hash, &rule_index, sizeof(rule_index));
+    hash = fnv1a(hash, rule->metric, strlen(rule->metric) + 1);
+    hash = fnv1a(hash, &rule->operator, sizeof(rule->operator));
+    hash = fnv1a(hash, &rule->threshold, sizeof(rule->threshold));
+    uint64_t position[2] = { (uint64_t)ino, (uint64_t)line_offset };
+    hash = fnv1a(hash, position, sizeof(position));
+    return hash ? hash : 1;  // 0 marks an empty set slot
+}
+
+static uint64_t rules_hash(const AlertEngine *engine) {
+    uint64_t hash = FNV_OFFSET;
+    for (int i = 0; i < engine->rule_count; i++) {
+        const AlertRule *rule = &engine->rules[i];
+        hash = fnv1a(hash, rule->metric, strlen(rule->metric) + 1);
+        hash = fnv1a(hash, &rule->operator, sizeof(rule->operator));
+        hash = fnv1a(hash, &rule->threshold, sizeof(rule->threshold));
+        hash = fnv1a(hash, &rule->duration_samples, sizeof(rule->duration_samples));
+    }
+    return hash;
+}
+
+static int id_set_contains(const AlertIdSet *set, uint64_t id) {
+    if (set->capacity == 0) return 0;
+    for (size_t i = id & (set->capacity - 1);; i = (i + 1) & (set->capacity - 1)) {
+        if (set->slots[i] == 0) return 0;
+        if (set->slots[i] == id) return 1;
+    }
+}
+
+static int id_set_insert(AlertIdSet *set, uint64_t id) {
+    if ((set->count + 1) * 10 > set->capacity * 7) {
+        size_t capacity = set->capacity ? set->capacity * 2 : 1024;
+        uint64_t *slots = calloc(capacity, sizeof(uint64_t));
+        if (!slots) return -1;
+        for (size_t i = 0; i < set->capacity; i++) {
+            uint64_t old = set->slots[i];
+            if (!old) continue;
+            size_t j = old & (capacity - 1);
+            while (slots[j]) j = (j + 1) & (capacity - 1);
+            slots[j] = old;
+        }
+        free(set->slots);
+        set->slots = slots;
+        set->capacity = capacity;
+    }
+
+    size_t i = id & (set->capacity - 1);
+    while (set->slots[i]) {
+        if (set->slots[i] == id) return 0;
+        i = (i + 1) & (set->capacity - 1);
+    }
+    set->slots[i] = id;
+    set->count++;
+    return 0;
+}
+
+// Remember the IDs already written so restarts never duplicate an alert
+static void load_emitted_ids(AlertEngine *engine) {
+    static const char key[] = "\"alert_id\":\"alert_";
+
+    FILE *fp = fopen(engine->alert_log_path, "r");
+    if (!fp) return;
+
+    char *line = NULL;
+    size_t cap = 0;
+    while (getline(&line, &cap, fp) > 0) {
+        const char *hex = strstr(line, key);
+        if (!hex) continue;
+        hex += sizeof(key) - 1;
+
+        char *end;
+        uint64_t id = strtoull(hex, &end, 16);
+        if (end - hex == 16 && *end == '"' && id) id_set_insert(&engine->emitted, id);
+    }
+    free(line);
+    fclose(fp);
+}
+
+// ---------------------------------------------------------------------------
+// Evaluation
+// ---------------------------------------------------------------------------
+
+// Evaluate one sample line; returns the number of alerts written
+static int evaluate_line(AlertEngine *engine, const char *line, size_t len,
+                         int *violation_counts, const char *run_id,
+                         ino_t ino, off_t line_offset) {
+    JsonScanValue values[JSON_SCAN_MAX_FIELDS];
+    uint64_t present;
+    if (json_scan_line(&engine->schema, line, len, values, &present) != 0) return 0;
+
+    const JsonScanValue *event = &values[engine->event_slot];
+    if (!(present & (1ULL << engine->event_slot)) ||
+        event->str_len != 6 || memcmp(event->str, "sample", 6) != 0) {
+        return 0;
+    }
+
+    int written = 0;
+    for (int i = 0; i < engine->rule_count; i++) {
+        AlertRule *rule = &engine->rules[i];
+        if (!(present & (1ULL << rule->slot))) continue;
+
+        double value = values[rule->slot].number;
+        if (!evaluate_condition(value, rule->operator, rule->threshold)) {
+            // Reset count if condition not met
+            violation_counts[i] = 0;
+            continue;
+        }
+
+        // Trigger alert if duration threshold met
+        if (++violation_counts[i] < rule->duration_samples) continue;
+        violation_counts[i] = 0;  // re-arm
+
+        uint64_t id = alert_id_hash(run_id, i, rule, ino, line_offset);
+        if (id_set_contains(&engine->emitted, id)) continue;  // already written
+
+        AlertRecord alert = {0};
+        snprintf(alert.alert_id, sizeof(alert.alert_id), "alert_%016llx", (unsigned long long)id);
+        strncpy(alert.metric, rule->metric, sizeof(alert.metric) - 1);
+        alert.metric[sizeof(alert.metric) - 1] = '\0';  // Ensure null termination
+        strncpy(alert.run_id, run_id, sizeof(alert.run_id) - 1);
+        alert.run_id[sizeof(alert.run_id) - 1] = '\0';  // Ensure null termination
+        get_iso_timestamp(alert.triggered_at, sizeof(alert.triggered_at));
+        alert.value = value;
+        alert.threshold = rule->threshold;
+        alert.duration_sec = rule->duration_samples * 1.0;  // Approximate
+        alert.acknowledged = 0;
+
+        if (alert_engine_write_alert(engine, &alert) == 0) {
+            id_set_insert(&engine->emitted, id);
+            engine->alerts_written++;
+            written++;
+        }
+    }
+    return written;
+}
+
+// Evaluate complete lines from *offset to EOF. An unterminated tail is left
+// for the next call, so *offset ends on a line boundary, unless the tail is
+// longer than the read buffer: such a line is never evaluated, and
+// *discarding stays set until its newline has been read.
+static int evaluate_fd(AlertEngine *engine, int fd, off_t *offset, int *discarding,
+                       int *violation_counts, const char *run_id, ino_t ino, unsigned long *lines) {
+    char *buf = engine->read_buf;
+    int written = 0;
+
+    for (;;) {
+        ssize_t n = pread(fd, buf, READ_BUF_SIZE, *offset);
+        if (n < 0 && errno == EINTR) continue;
+        if (n < 0) return -1;
+        if (n == 0) break;
+
+        const char *p = buf;
+        const char *end = buf + n;
+        const char *nl;
+        if (*discarding) {
+            nl = memchr(p, '\n', (size_t)n);
+            if (!nl) {
+                *offset += (off_t)n;
+                if (n < READ_BUF_SIZE) break;
+                continue;
+            }
+            p = nl + 1;
+            *discarding = 0;
+        }
+        while ((nl = memchr(p, '\n', (size_t)(end - p))) != NULL) {
+            written += evaluate_line(engine, p, (size_t)(nl - p), violation_counts,
+                                     run_id, ino, *offset + (p - buf));
+            if (lines) (*lines)++;
+            p = nl + 1;
+        }
+
+        size_t used = (size_t)(p - buf);
+        if (used == 0 && n == READ_BUF_SIZE) {
+            used = (size_t)n;  // line longer than the buffer: skip to its newline
+            *discarding = 1;
+        }
+        *offset += (off_t)used;
+        if (n < READ_BUF_SIZE) break;  // short read: at EOF
+    }
+    return written;
+}
+
 // Evaluate samples against rules
 int alert_engine_evaluate(AlertEngine *engine, const char *log_path, const char *run_id) {
     if (!engine || !log_path) return -1;
-    
-    FILE *fp = fopen(log_path, "r");
-    if (!fp) return -1;
-    
-    char line[2048];
-    int *violation_counts = calloc(engine->rule_count, sizeof(int));
-    
-    while (fgets(line, sizeof(line), fp)) {
-        cJSON *sample = cJSON_Parse(line);
-        if (!sample) continue;
-        
-        cJSON *event = cJSON_GetObjectItem(sample, "event");
-        if (!event || strcmp(event->valuestring, "sample") != 0) {
-            cJSON_Delete(sample);
+
+    int fd = open(log_path, O_RDONLY | O_CLOEXEC);
+    if (fd < 0) return -1;
+
+    struct stat st;
+    int *violation_counts = calloc(engine->rule_count ? engine->rule_count : 1, sizeof(int));
+    if (fstat(fd, &st) != 0 || !violation_counts) {
+        free(violation_counts);
+        close(fd);
+        return -1;
+    }
+
+    off_t offset = 0;
+    int discarding = 0;
+    int result = evaluate_fd(engine, fd, &offset, &discarding, violation_counts, run_id, st.st_ino, NULL);
+
+    close(fd);
+    free(violation_counts);
+    return result < 0 ? -1 : 0;
+}
+
+// ---------------------------------------------------------------------------
+// Followed streams
+// ---------------------------------------------------------------------------
+
+static int stream_open(AlertStream *stream) {
+    int fd = open(stream->path, O_RDONLY | O_CLOEXEC);
+    if (fd < 0) return -1;
+
+    struct stat st;
+    if (fstat(fd, &st) != 0) {
+        close(fd);
+        return -1;
+    }
+    stream->fd = fd;
+    stream->dev = st.st_dev;
+    stream->ino = st.st_ino;
+    return 0;
+}
+
+static void stream_close(AlertStream *stream) {
+    if (stream->fd >= 0) close(stream->fd);
+    stream->fd = -1;
+}
+
+int alert_engine_add_stream(AlertEngine *engine, const char *log_path, const char *run_id) {
+    if (!engine || !log_path) return -1;
+    if (engine->stream_count >= ALERT_MAX_STREAMS) {
+        fprintf(stderr, "Too many logs to follow (max %d)\n", ALERT_MAX_STREAMS);
+        return -1;
+    }
+
+    AlertStream *stream = &engine->streams[engine->stream_count];
+    memset(stream, 0, sizeof(*stream));
+    stream->fd = -1;
+    strncpy(stream->path, log_path, sizeof(stream->path) - 1);
+
+    if (run_id) {
+        strncpy(stream->run_id, run_id, sizeof(stream->run_id) - 1);
+    } else {
+        const char *base = strrchr(log_path, '/');
+        base = base ? base + 1 : log_path;
+        size_t len = strlen(base);
+        if (len > 6 && strcmp(base + len - 6, ".jsonl") == 0) len -= 6;
+        if (len >= sizeof(stream->run_id)) len = sizeof(stream->run_id) - 1;
+        memcpy(stream->run_id, base, len);
+    }
+
+    stream->violation_counts = calloc(engine->rule_count ? engine->rule_count : 1, sizeof(int));
+    if (!stream->violation_counts) return -1;
+
+    stream_open(stream);  // may not exist yet; retried on every poll
+    engine->stream_count++;
+    return 0;
+}
+
+static int stream_poll(AlertEngine *engine, AlertStream *stream) {
+    int written = 0;
+
+    if (stream->fd >= 0) {
+        struct stat path_st;
+        if (stat(stream->path, &path_st) == 0 &&
+            (path_st.st_dev != stream->dev || path_st.st_ino != stream->ino)) {
+            // Rotated: finish the old file, then continue with the new one.
+            // Counters carry over; consecutive samples span the rotation.
+            int rc = evaluate_fd(engine, stream->fd, &stream->offset, &stream->discarding,
+                                 stream->violation_counts, stream->run_id, stream->ino, &stream->samples);
+            if (rc > 0) written += rc;
+            stream_close(stream);
+            stream->offset = 0;
+            stream->discarding = 0;
+            engine->checkpoint_dirty = 1;
+        }
+    }
+
+    if (stream->fd < 0 && stream_open(stream) != 0) return written;
+
+    struct stat st;
+    if (fstat(stream->fd, &st) == 0 && st.st_size < stream->offset) {
+        stream->offset = 0;  // truncated in place
+        stream->discarding = 0;
+        engine->checkpoint_dirty = 1;
+    }
+
+    off_t before = stream->offset;
+    int rc = evaluate_fd(engine, stream->fd, &stream->offset, &stream->discarding,
+                         stream->violation_counts, stream->run_id, stream->ino, &stream->samples);
+    if (stream->offset != before) engine->checkpoint_dirty = 1;
+    if (rc < 0) return -1;
+    return written + rc;
+}
+
+int alert_engine_poll(AlertEngine *engine) {
+    if (!engine) return -1;
+
+    int written = 0;
+    int failed = 0;
+    for (int i = 0; i < engine->stream_count; i++) {
+        int rc = stream_poll(engine, &engine->streams[i]);
+        if (rc < 0) failed = 1;
+        else written += rc;
+    }
+    return failed ? -1 : written;
+}
+
+// ---------------------------------------------------------------------------
+// Checkpoints
+//
+// {"version":1,"rules_hash":"<hex>","streams":[{"path","run_id","dev","ino",
+//  "offset","discarding","samples","violation_counts":[...]}]}
+// ---------------------------------------------------------------------------
+
+int alert_engine_load_checkpoint(AlertEngine *engine, const char *checkpoint_path) {
+    if (!engine || !checkpoint_path) return -1;
+    strncpy(engine->checkpoint_path, checkpoint_path, sizeof(engine->checkpoint_path) - 1);
+
+    FILE *fp = fopen(checkpoint_path, "r");
+    if (!fp) return errno == ENOENT ? 0 : -1;
+
+    char *content = NULL;
+    size_t cap = 0;
+    ssize_t len = getdelim(&content, &cap, '\0', fp);
+    fclose(fp);
+    cJSON *root = len > 0 ? cJSON_ParseWithLength(content, (size_t)len) : NULL;
+    free(content);
+    if (!root) {
+        fprintf(stderr, "Warning: ignoring unreadable checkpoint %s\n", checkpoint_path);
+        return 0;
+    }
+
+    char expected_hash[17];
+    snprintf(expected_hash, sizeof(expected_hash), "%016llx", (unsigned long long)engine->rules_hash);
+    const cJSON *hash = cJSON_GetObjectItem(root, "rules_hash");
+    int same_rules = cJSON_IsString(hash) && strcmp(hash->valuestring, expected_hash) == 0;
+    if (!same_rules) {
+        fprintf(stderr, "Warning: rules changed since checkpoint, violation counters reset\n");
+    }
+
+    const cJSON *entry;
+    cJSON_ArrayForEach(entry, cJSON_GetObjectItem(root, "streams")) {
+        const cJSON *path = cJSON_GetObjectItem(entry, "path");
+        if (!cJSON_IsString(path)) continue;
+
+        AlertStream *stream = NULL;
+        for (int i = 0; i < engine->stream_count; i++) {
+            if (strcmp(engine->streams[i].path, path->valuestring) == 0) stream = &engine->streams[i];
+        }
+        if (!stream || stream->fd < 0) continue;
+
+        const cJSON *dev = cJSON_GetObjectItem(entry, "dev");
+        const cJSON *ino = cJSON_GetObjectItem(entry, "ino");
+        const cJSON *offset = cJSON_GetObjectItem(entry, "offset");
+        struct stat st;
+        if (!cJSON_IsNumber(dev) || !cJSON_IsNumber(ino) || !cJSON_IsNumber(offset) ||
+            fstat(stream->fd, &st) != 0 ||
+            (dev_t)dev->valuedouble != stream->dev || (ino_t)ino->valuedouble != stream->ino ||
+            (off_t)offset->valuedouble > st.st_size) {
+            fprintf(stderr, "Warning: %s was replaced since checkpoint, evaluating from start\n",
+                    stream->path);
             continue;
         }
-        
-        // Check each rule
-        for (int i = 0; i < engine->rule_count; i++) {
-            AlertRule *rule = &engine->rules[i];
-            cJSON *metric_val = cJSON_GetObjectItem(sample, rule->metric);
-            
-            if (metric_val && cJSON_IsNumber(metric_val)) {
-                double value = metric_val->valuedouble;
-                
-                if (evaluate_condition(value, rule->operator, rule->threshold)) {
-                    violation_counts[i]++;
-                    
-                    // Trigger alert if duration threshold met
-                    if (violation_counts[i] >= rule->duration_samples) {
-                        AlertRecord alert = {0};
-                        snprintf(alert.alert_id, sizeof(alert.alert_id), 
-                                "alert_%ld_%s", time(NULL), rule->metric);
-                        strncpy(alert.metric, rule->metric, sizeof(alert.metric) - 1);
-                        alert.metric[sizeof(alert.metric) - 1] = '\0';  // Ensure null termination
-                        strncpy(alert.run_id, run_id, sizeof(alert.run_id) - 1);
-                        alert.run_id[sizeof(alert.run_id) - 1] = '\0';  // Ensure null termination
-                        get_iso_timestamp(alert.triggered_at, sizeof(alert.triggered_at));
-                        alert.value = value;
-                        alert.threshold = rule->threshold;
-                        alert.duration_sec = rule->duration_samples * 1.0;  // Approximate
-                        alert.acknowledged = 0;
-                        
-                        alert_engine_write_alert(engine->alert_log_path, &alert);
-                        
-                        // Reset counter to avoid duplicate alerts
-                        violation_counts[i] = 0;
-                    }
-                } else {
-                    // Reset count if condition not met
-                    violation_counts[i] = 0;
-                }
+
+        stream->offset = (off_t)offset->valuedouble;
+        stream->discarding = cJSON_IsTrue(cJSON_GetObjectItem(entry, "discarding"));
+        const cJSON *samples = cJSON_GetObjectItem(entry, "samples");
+        if (cJSON_IsNumber(samples)) stream->samples = (unsigned long)samples->valuedouble;
+
+        const cJSON *counts = cJSON_GetObjectItem(entry, "violation_counts");
+        if (same_rules && cJSON_GetArraySize(counts) == engine->rule_count) {
+            for (int i = 0; i < engine->rule_count; i++) {
+                stream->violation_counts[i] = cJSON_GetArrayItem(counts, i)->valueint;
             }
         }
-        
-        cJSON_Delete(sample);
     }
-    
-    fclose(fp);
-    free(violation_counts);
+
+    cJSON_Delete(root);
     return 0;
 }
 
+int alert_engine_save_checkpoint(AlertEngine *engine) {
+    if (!engine || !engine->checkpoint_path[0]) return -1;
+
+    // Alerts first: a checkpoint must never cover lines whose alerts could be lost
+    if (jsonl_writer_sync(&engine->alert_log) != 0) return -1;
+
+    cJSON *root = cJSON_CreateObject();
+    if (!root) return -1;
+
+    char hash[17];
+    snprintf(hash, sizeof(hash), "%016llx", (unsigned long long)engine->rules_hash);
+    cJSON_AddNumberToObject(root, "version", 1);
+    cJSON_AddStringToObject(root, "rules_hash", hash);
+
+    cJSON *streams = cJSON_AddArrayToObject(root, "streams");
+    for (int i = 0; i < engine->stream_count; i++) {
+        const AlertStream *stream = &engine->streams[i];
+        if (stream->fd < 0) continue;
+
+        cJSON *entry = cJSON_CreateObject();
+        cJSON_AddStringToObject(entry, "path", stream->path);
+        cJSON_AddStringToObject(entry, "run_id", stream->run_id);
+        cJSON_AddNumberToObject(entry, "dev", (double)stream->dev);
+        cJSON_AddNumberToObject(entry, "ino", (double)stream->ino);
+        cJSON_AddNumberToObject(entry, "offset", (double)stream->offset);
+        cJSON_AddBoolToObject(entry, "discarding", stream->discarding);
+        cJSON_AddNumberToObject(entry, "samples", (double)stream->samples);
+        cJSON_AddItemToObject(entry, "violation_counts",
+                              cJSON_CreateIntArray(stream->violation_counts, engine->rule_count));
+        cJSON_AddItemToArray(streams, entry);
+    }
+
+    char *json_str = cJSON_PrintUnformatted(root);
+    cJSON_Delete(root);
+    if (!json_str) return -1;
+
+    // Write to a temp file, sync, then rename over the old checkpoint
+    char tmp_path[sizeof(engine->checkpoint_path) + 8];
+    snprintf(tmp_path, sizeof(tmp_path), "%s.tmp", engine->checkpoint_path);
+    int fd = open(tmp_path, O_WRONLY | O_CREAT | O_TRUNC | O_CLOEXEC, 0644);
+    int result = -1;
+    if (fd >= 0) {
+        size_t len = strlen(json_str);
+        if (write(fd, json_str, len) == (ssize_t)len && fdatasync(fd) == 0 &&
+            rename(tmp_path, engine->checkpoint_path) == 0) {
+            result = 0;
+        }
+        close(fd);
+        if (result != 0) unlink(tmp_path);
+    }
+    free(json_str);
+
+    if (result == 0) engine->checkpoint_dirty = 0;
+    return result;
+}
+
+// ---------------------------------------------------------------------------
+// Follow loop: inotify on each log's directory wakes the loop on appends,
+// creations and renames; a 1 s timer re-polls in case events are missed
+// (e.g. network filesystems) and flushes the checkpoint.
+// ---------------------------------------------------------------------------
+
+enum { FOLLOW_INOTIFY = 1, FOLLOW_TIMER, FOLLOW_SIGNAL };
+
+static int watch_directories(AlertEngine *engine, int inotify_fd) {
+    int watches = 0;
+    for (int i = 0; i < engine->stream_count; i++) {
+        char dir[sizeof(engine->streams[i].path)];
+        strncpy(dir, engine->streams[i].path, sizeof(dir) - 1);
+        dir[sizeof(dir) - 1] = '\0';
+        char *slash = strrchr(dir, '/');
+        if (!slash) strcpy(dir, ".");
+        else if (slash == dir) slash[1] = '\0';
+        else *slash = '\0';
+
+        // Re-adding a directory returns the existing watch
+        if (inotify_add_watch(inotify_fd, dir,
+                              IN_MODIFY | IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE) >= 0) {
+            watches++;
+        } else {
+            fprintf(stderr, "Warning: cannot watch %s, relying on periodic polling\n", dir);
+        }
+    }
+    return watches;
+}
+
+static int add_follow_fd(int epoll_fd, int fd, uint64_t tag) {
+    struct epoll_event ev = { .events = EPOLLIN, .data.u64 = tag };
+    return epoll_ctl(epoll_fd, EPOLL_CTL_ADD, fd, &ev);
+}
+
+int alert_engine_follow(AlertEngine *engine) {
+    if (!engine) return -1;
+
+    sigset_t mask;
+    sigemptyset(&mask);
+    sigaddset(&mask, SIGINT);
+    sigaddset(&mask, SIGTERM);
+    sigprocmask(SIG_BLOCK, &mask, NULL);
+
+    int epoll_fd = epoll_create1(EPOLL_CLOEXEC);
+    int inotify_fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+    int timer_fd = timerfd_create(CLOCK_MONOTONIC, TFD_NONBLOCK | TFD_CLOEXEC);
+    int signal_fd = signalfd(-1, &mask, SFD_NONBLOCK | SFD_CLOEXEC);
+    int result = -1;
+
+    struct itimerspec its = { .it_interval = { 1, 0 }, .it_value = { 1, 0 } };
+    if (epoll_fd < 0 || inotify_fd < 0 || timer_fd < 0 || signal_fd < 0 ||
+        timerfd_settime(timer_fd, 0, &its, NULL) != 0 ||
+        add_follow_fd(epoll_fd, inotify_fd, FOLLOW_INOTIFY) != 0 ||
+        add_follow_fd(epoll_fd, timer_fd, FOLLOW_TIMER) != 0 ||
+        add_follow_fd(epoll_fd, signal_fd, FOLLOW_SIGNAL) != 0) {
+        perror("alert_engine_follow");
+        goto out;
+    }
+    watch_directories(engine, inotify_fd);
+
+    // Catch up on everything written since the checkpoint
+    if (alert_engine_poll(engine) < 0) fprintf(stderr, "Warning: Evaluation cycle failed\n");
+
+    int running = 1;
+    while (running) {
+        struct epoll_event events[4];
+        int n = epoll_wait(epoll_fd, events, 4, -1);
+        if (n < 0) {
+            if (errno == EINTR) continue;
+            perror("epoll_wait");
+            goto out;
+        }
+
+        int poll_needed = 0;
+        for (int i = 0; i < n; i++) {
+            _Alignas(struct inotify_event) char drain[4096];
+            uint64_t expirations;
+            switch (events[i].data.u64) {
+                case FOLLOW_INOTIFY:
+                    while (read(inotify_fd, drain, sizeof(drain)) > 0) {}
+                    poll_needed = 1;
+                    break;
+                case FOLLOW_TIMER:
+                    if (read(timer_fd, &expirations, sizeof(expirations)) > 0) {
+                        poll_needed = 1;
+                        if (engine->checkpoint_dirty && engine->checkpoint_path[0] &&
+                            alert_engine_save_checkpoint(engine) != 0) {
+                            fprintf(stderr, "Warning: failed to write checkpoint %s\n",
+                                    engine->checkpoint_path);
+                        }
+                    }
+                    break;
+                case FOLLOW_SIGNAL:
+                    running = 0;
+                    break;
+            }
+        }
+        if (poll_needed && alert_engine_poll(engine) < 0) {
+            fprintf(stderr, "Warning: Evaluation cycle failed\n");
+        }
+    }
+
+    result = 0;
+    if (engine->checkpoint_path[0] && alert_engine_save_checkpoint(engine) != 0) {
+        fprintf(stderr, "Warning: failed to write checkpoint %s\n", engine->checkpoint_path);
+        result = -1;
+    }
+
+out:
+    if (signal_fd >= 0) close(signal_fd);
+    if (timer_fd >= 0) close(timer_fd);
+    if (inotify_fd >= 0) close(inotify_fd);
+    if (epoll_fd >= 0) close(epoll_fd);
+    return result;
+}
+
 // Write alert to JSONL
-int alert_engine_write_alert(const char *path, const AlertRecord *alert) {
+int alert_engine_write_alert(AlertEngine *engine, const AlertRecord *alert) {
     cJSON *root = cJSON_CreateObject();
     if (!root) return -1;
     
@@ -179,7 +739,7 @@ int alert_engine_write_alert(const char *path, const AlertRecord *alert) {
     }
     
     char *json_str = cJSON_PrintUnformatted(root);
-    int result = append_jsonl(path, json_str);
+    int result = json_str ? jsonl_writer_append(&engine->alert_log, json_str) : -1;
     
     free(json_str);
     cJSON_Delete(root);
@@ -189,9 +749,21 @@ int alert_engine_write_alert(const char *path, const AlertRecord *alert) {
 
 // Cleanup
 void alert_engine_cleanup(AlertEngine *engine) {
-    if (engine && engine->rules) {
+    if (!engine) return;
+    if (engine->rules) {
         free(engine->rules);
         engine->rules = NULL;
         engine->rule_count = 0;
     }
+    for (int i = 0; i < engine->stream_count; i++) {
+        stream_close(&engine->streams[i]);
+        free(engine->streams[i].violation_counts);
+        engine->streams[i].violation_counts = NULL;
+    }
+    engine->stream_count = 0;
+    free(engine->emitted.slots);
+    memset(&engine->emitted, 0, sizeof(engine->emitted));
+    free(engine->read_buf);
+    engine->read_buf = NULL;
+    jsonl_writer_close(&engine->alert_log);
 }
@@ -2,6 +2,9 @@
 #define ZENCUBE_ALERT_ENGINE_H
 
 #include <stdint.h>
+#include <sys/types.h>
+#include "logutil.h"
+#include "json_scan.h"
 
 // Alert rule operators
 typedef enum {
@@ -18,6 +21,7 @@ typedef struct {
     AlertOperator operator;
     double threshold;
     int duration_samples;      // consecutive samples required
+    int slot;                  // compiled: metric's JsonScanSchema slot
 } AlertRule;
 
 // Alert record
@@ -33,25 +37,80 @@ typedef struct {
     char acknowledged_at[32];
 } AlertRecord;
 
+#define ALERT_MAX_STREAMS 64
+
+// A followed sample log. `offset` sits on a line boundary unless `discarding`
+// is set, so it, the flag and the violation counters together describe
+// exactly how far evaluation got.
+typedef struct {
+    char path[512];
+    char run_id[128];
+    int fd;
+    dev_t dev;
+    ino_t ino;
+    off_t offset;              // next unread byte
+    int discarding;            // inside a line longer than the read buffer
+    int *violation_counts;     // per rule, carried across reads
+    unsigned long samples;
+} AlertStream;
+
+// Set of alert IDs already in the alert log (open addressing, 0 = empty)
+typedef struct {
+    uint64_t *slots;
+    size_t capacity;
+    size_t count;
+} AlertIdSet;
+
 // Alert engine state
 typedef struct {
     AlertRule *rules;
     int rule_count;
+    uint64_t rules_hash;
+    JsonScanSchema schema;     // fields the rules read, resolved once
+    int event_slot;
     char alert_log_path[512];
     char log_dir[512];
+    JsonlWriter alert_log;
+    AlertIdSet emitted;
+    char *read_buf;
+
+    AlertStream streams[ALERT_MAX_STREAMS];
+    int stream_count;
+    char checkpoint_path[512];
+    int checkpoint_dirty;      // streams advanced since the last save
+    unsigned long alerts_written;
 } AlertEngine;
 
-// Initialize alert engine from JSON config
-int alert_engine_init(AlertEngine *engine, const char *config_path, const char *alert_log_path);
+// Initialize alert engine from JSON config; a NULL policy uses the default
+int alert_engine_init(AlertEngine *engine, const char *config_path, const char *alert_log_path,
+                      const JsonlFsyncPolicy *fsync_policy);
 
-// Load alert rules from JSON
+// Load alert rules from JSON and compile their metrics into scan slots
 int alert_engine_load_rules(AlertEngine *engine, const char *config_path);
 
-// Evaluate samples against rules
+// Evaluate every complete line of a log from the start. Alerts already in
+// the alert log (same stable ID) are not written again.
 int alert_engine_evaluate(AlertEngine *engine, const char *log_path, const char *run_id);
 
+// Register a log to follow; a NULL run_id uses the file name stem
+int alert_engine_add_stream(AlertEngine *engine, const char *log_path, const char *run_id);
+
+// Evaluate lines appended to every stream since the last call; returns the
+// number of alerts written or -1 on error
+int alert_engine_poll(AlertEngine *engine);
+
+// Restore stream offsets and counters saved by alert_engine_save_checkpoint.
+// Streams must be added first; a missing checkpoint file is not an error.
+int alert_engine_load_checkpoint(AlertEngine *engine, const char *checkpoint_path);
+
+// Atomically persist stream offsets and counters (alerts are synced first)
+int alert_engine_save_checkpoint(AlertEngine *engine);
+
+// Follow all streams with inotify until SIGINT/SIGTERM, checkpointing as it goes
+int alert_engine_follow(AlertEngine *engine);
+
 // Write alert to JSONL
-int alert_engine_write_alert(const char *path, const AlertRecord *alert);
+int alert_engine_write_alert(AlertEngine *engine, const AlertRecord *alert);
 
 // Cleanup
 void alert_engine_cleanup(AlertEngine *engine);
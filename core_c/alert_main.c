@@ -15,40 +15,65 @@ static void handle_signal(int sig) {
 
 static void print_usage(const char *prog) {
     fprintf(stderr, "Usage: %s --config <config.json> --log <samples.jsonl> --out <alerts.jsonl> --run-id <id> [--interval <sec>]\n", prog);
+    fprintf(stderr, "       %s --follow --config <config.json> --log <samples.jsonl> [--log ...] --out <alerts.jsonl>\n", prog);
     fprintf(stderr, "Options:\n");
     fprintf(stderr, "  --config PATH      Alert rules JSON config\n");
-    fprintf(stderr, "  --log PATH         Sample JSONL log to monitor\n");
+    fprintf(stderr, "  --log PATH         Sample JSONL log to monitor (repeatable with --follow)\n");
     fprintf(stderr, "  --out PATH         Output alerts JSONL path\n");
-    fprintf(stderr, "  --run-id ID        Run identifier\n");
+    fprintf(stderr, "  --run-id ID        Run identifier (--follow default: log file name)\n");
     fprintf(stderr, "  --interval SEC     Evaluation interval (default: 5)\n");
+    fprintf(stderr, "  --follow           Tail logs with inotify, evaluating each line once\n");
+    fprintf(stderr, "  --checkpoint PATH  Resume state for --follow (default: <out>.checkpoint)\n");
+    fprintf(stderr, "  --fsync POLICY     never | interval:SECS | every:N (default: interval:1)\n");
     fprintf(stderr, "  --help             Show this help\n");
 }
 
 int main(int argc, char **argv) {
     char *config_path = NULL;
-    char *log_path = NULL;
+    char *log_paths[ALERT_MAX_STREAMS];
+    int log_count = 0;
     char *out_path = NULL;
     char *run_id = NULL;
+    char *checkpoint_path = NULL;
     int interval = 5;
+    int follow = 0;
+    JsonlFsyncPolicy fsync_policy = JSONL_FSYNC_DEFAULT;
     
     static struct option long_options[] = {
-        {"config",   required_argument, 0, 'c'},
-        {"log",      required_argument, 0, 'l'},
-        {"out",      required_argument, 0, 'o'},
-        {"run-id",   required_argument, 0, 'r'},
-        {"interval", required_argument, 0, 'i'},
-        {"help",     no_argument,       0, 'h'},
+        {"config",     required_argument, 0, 'c'},
+        {"log",        required_argument, 0, 'l'},
+        {"out",        required_argument, 0, 'o'},
+        {"run-id",     required_argument, 0, 'r'},
+        {"interval",   required_argument, 0, 'i'},
+        {"follow",     no_argument,       0, 'F'},
+        {"checkpoint", required_argument, 0, 'k'},
+        {"fsync",      required_argument, 0, 'f'},
+        {"help",       no_argument,       0, 'h'},
         {0, 0, 0, 0}
     };
     
     int opt;
-    while ((opt = getopt_long(argc, argv, "c:l:o:r:i:h", long_options, NULL)) != -1) {
+    while ((opt = getopt_long(argc, argv, "c:l:o:r:i:Fk:f:h", long_options, NULL)) != -1) {
         switch (opt) {
             case 'c': config_path = optarg; break;
-            case 'l': log_path = optarg; break;
+            case 'l':
+                if (log_count >= ALERT_MAX_STREAMS) {
+                    fprintf(stderr, "Error: At most %d --log arguments\n", ALERT_MAX_STREAMS);
+                    return 1;
+                }
+                log_paths[log_count++] = optarg;
+                break;
             case 'o': out_path = optarg; break;
             case 'r': run_id = optarg; break;
             case 'i': interval = atoi(optarg); break;
+            case 'F': follow = 1; break;
+            case 'k': checkpoint_path = optarg; break;
+            case 'f':
+                if (jsonl_parse_fsync_policy(optarg, &fsync_policy) != 0) {
+                    fprintf(stderr, "Error: invalid --fsync policy '%s'\n", optarg);
+                    return 1;
+                }
+                break;
             case 'h':
             default:
                 print_usage(argv[0]);
@@ -56,22 +81,62 @@ int main(int argc, char **argv) {
         }
     }
     
-    if (!config_path || !log_path || !out_path || !run_id) {
+    if (!config_path || log_count == 0 || !out_path || (!follow && !run_id)) {
         fprintf(stderr, "Error: Missing required arguments\n");
         print_usage(argv[0]);
         return 1;
     }
+    if (!follow && log_count > 1) {
+        fprintf(stderr, "Error: Multiple --log arguments require --follow\n");
+        return 1;
+    }
     
     // Initialize alert engine
     AlertEngine engine;
-    if (alert_engine_init(&engine, config_path, out_path) != 0) {
+    if (alert_engine_init(&engine, config_path, out_path, &fsync_policy) != 0) {
         fprintf(stderr, "Failed to initialize alert engine\n");
         return 1;
     }
     
+    if (follow) {
+        for (int i = 0; i < log_count; i++) {
+            if (alert_engine_add_stream(&engine, log_paths[i], run_id) != 0) {
+                alert_engine_cleanup(&engine);
+                return 1;
+            }
+        }
+
+        char default_checkpoint[sizeof(engine.checkpoint_path)];
+        if (!checkpoint_path) {
+            snprintf(default_checkpoint, sizeof(default_checkpoint), "%.500s.checkpoint", out_path);
+            checkpoint_path = default_checkpoint;
+        }
+        if (alert_engine_load_checkpoint(&engine, checkpoint_path) != 0) {
+            fprintf(stderr, "Failed to read checkpoint: %s\n", checkpoint_path);
+            alert_engine_cleanup(&engine);
+            return 1;
+        }
+
+        printf("Alert engine following %d log(s)\n", log_count);
+        printf("Config: %s\n", config_path);
+        for (int i = 0; i < engine.stream_count; i++) {
+            printf("Monitoring: %s (run-id=%s, resume offset %lld)\n", engine.streams[i].path,
+                   engine.streams[i].run_id, (long long)engine.streams[i].offset);
+        }
+        printf("Alerts: %s\n", out_path);
+        printf("Checkpoint: %s\n", checkpoint_path);
+        printf("Loaded %d rules\n", engine.rule_count);
+        fflush(stdout);
+
+        int result = alert_engine_follow(&engine);
+        printf("\nShutdown signal received, %lu alerts written\n", engine.alerts_written);
+        alert_engine_cleanup(&engine);
+        return result == 0 ? 0 : 1;
+    }
+
     printf("Alert engine started (run-id=%s, interval=%ds)\n", run_id, interval);
     printf("Config: %s\n", config_path);
-    printf("Monitoring: %s\n", log_path);
+    printf("Monitoring: %s\n", log_paths[0]);
     printf("Alerts: %s\n", out_path);
     printf("Loaded %d rules\n", engine.rule_count);
     
@@ -79,9 +144,9 @@ int main(int argc, char **argv) {
     signal(SIGINT, handle_signal);
     signal(SIGTERM, handle_signal);
     
-    // Main evaluation loop
+    // Main evaluation loop (alerts already written are skipped by ID)
     while (running) {
-        if (alert_engine_evaluate(&engine, log_path, run_id) != 0) {
+        if (alert_engine_evaluate(&engine, log_paths[0], run_id) != 0) {
             fprintf(stderr, "Warning: Evaluation cycle failed\n");
         }
         sleep(interval);
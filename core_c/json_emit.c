@@ -0,0 +1,137 @@
+#include "json_emit.h"
+#include <math.h>
+#include <stdio.h>
+#include <string.h>
+
+#define MAX_DECIMALS 6
+// Beyond this magnitude fixed-point scaling would overflow uint64_t
+#define FIXED_POINT_LIMIT 1e15
+
+static const double POW10[MAX_DECIMALS + 1] = { 1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6 };
+
+static void put_bytes(JsonEmitter *emitter, const char *bytes, size_t len) {
+    if (emitter->overflow || emitter->len + len > emitter->cap) {
+        emitter->overflow = 1;
+        return;
+    }
+    memcpy(emitter->data + emitter->len, bytes, len);
+    emitter->len += len;
+}
+
+static void put_char(JsonEmitter *emitter, char c) {
+    put_bytes(emitter, &c, 1);
+}
+
+static void put_u64(JsonEmitter *emitter, uint64_t value) {
+    char digits[20];
+    int n = 0;
+    do {
+        digits[n++] = (char)('0' + value % 10);
+        value /= 10;
+    } while (value);
+
+    char out[20];
+    for (int i = 0; i < n; i++) out[i] = digits[n - 1 - i];
+    put_bytes(emitter, out, (size_t)n);
+}
+
+static void put_key(JsonEmitter *emitter, const char *key) {
+    if (emitter->fields++ > 0) put_char(emitter, ',');
+    put_char(emitter, '"');
+    put_bytes(emitter, key, strlen(key));
+    put_bytes(emitter, "\":", 2);
+}
+
+void json_emit_begin(JsonEmitter *emitter, char *storage, size_t cap) {
+    emitter->data = storage;
+    emitter->len = 0;
+    emitter->cap = cap;
+    emitter->fields = 0;
+    emitter->overflow = 0;
+    put_char(emitter, '{');
+}
+
+void json_emit_string(JsonEmitter *emitter, const char *key, const char *value) {
+    static const char hex[] = "0123456789abcdef";
+
+    put_key(emitter, key);
+    put_char(emitter, '"');
+    const char *run = value;
+    for (const char *p = value; *p; p++) {
+        unsigned char c = (unsigned char)*p;
+        if (c >= 0x20 && c != '"' && c != '\\') continue;
+
+        put_bytes(emitter, run, (size_t)(p - run));
+        run = p + 1;
+        switch (c) {
+            case '"':  put_bytes(emitter, "\\\"", 2); break;
+            case '\\': put_bytes(emitter, "\\\\", 2); break;
+            case '\n': put_bytes(emitter, "\\n", 2); break;
+            case '\r': put_bytes(emitter, "\\r", 2); break;
+            case '\t': put_bytes(emitter, "\\t", 2); break;
+            default: {
+                char escaped[6] = { '\\', 'u', '0', '0', hex[c >> 4], hex[c & 0xf] };
+                put_bytes(emitter, escaped, sizeof(escaped));
+            }
+        }
+    }
+    put_bytes(emitter, run, strlen(run));
+    put_char(emitter, '"');
+}
+
+void json_emit_int(JsonEmitter *emitter, const char *key, int64_t value) {
+    put_key(emitter, key);
+    if (value < 0) {
+        put_char(emitter, '-');
+        put_u64(emitter, (uint64_t)(-(value + 1)) + 1);
+    } else {
+        put_u64(emitter, (uint64_t)value);
+    }
+}
+
+void json_emit_uint(JsonEmitter *emitter, const char *key, uint64_t value) {
+    put_key(emitter, key);
+    put_u64(emitter, value);
+}
+
+// Fixed-point formatting with trailing zeros trimmed: 45.50 -> 45.5, 3.00 -> 3
+void json_emit_double(JsonEmitter *emitter, const char *key, double value, int decimals) {
+    put_key(emitter, key);
+    if (!isfinite(value)) {
+        put_bytes(emitter, "null", 4);  // JSON has no NaN/Infinity
+        return;
+    }
+    if (decimals < 0) decimals = 0;
+    if (decimals > MAX_DECIMALS) decimals = MAX_DECIMALS;
+
+    if (fabs(value) >= FIXED_POINT_LIMIT) {
+        // Rare: fall back to printf rather than lose precision
+        char text[32];
+        int n = snprintf(text, sizeof(text), "%.17g", value);
+        put_bytes(emitter, text, (size_t)n);
+        return;
+    }
+
+    uint64_t scale = (uint64_t)POW10[decimals];
+    uint64_t scaled = (uint64_t)llround(fabs(value) * (double)scale);
+    if (value < 0 && scaled != 0) put_char(emitter, '-');
+
+    put_u64(emitter, scaled / scale);
+    uint64_t fraction = scaled % scale;
+    if (fraction == 0) return;
+
+    char digits[MAX_DECIMALS];
+    for (int i = decimals - 1; i >= 0; i--) {
+        digits[i] = (char)('0' + fraction % 10);
+        fraction /= 10;
+    }
+    int used = decimals;
+    while (used > 0 && digits[used - 1] == '0') used--;
+    put_char(emitter, '.');
+    put_bytes(emitter, digits, (size_t)used);
+}
+
+long json_emit_end_line(JsonEmitter *emitter) {
+    put_bytes(emitter, "}\n", 2);
+    return emitter->overflow ? -1 : (long)emitter->len;
+}
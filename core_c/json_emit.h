@@ -0,0 +1,30 @@
+#ifndef ZENCUBE_JSON_EMIT_H
+#define ZENCUBE_JSON_EMIT_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+// Flat JSON object emitter writing straight into a caller-owned buffer.
+// No allocation and no printf-family formatting on the hot path; a record
+// that does not fit sets `overflow` instead of truncating silently.
+typedef struct {
+    char *data;
+    size_t len;
+    size_t cap;
+    int fields;
+    int overflow;
+} JsonEmitter;
+
+// Start an object in `storage`
+void json_emit_begin(JsonEmitter *emitter, char *storage, size_t cap);
+
+// Append fields; keys are written verbatim and must not need escaping
+void json_emit_string(JsonEmitter *emitter, const char *key, const char *value);
+void json_emit_int(JsonEmitter *emitter, const char *key, int64_t value);
+void json_emit_uint(JsonEmitter *emitter, const char *key, uint64_t value);
+void json_emit_double(JsonEmitter *emitter, const char *key, double value, int decimals);
+
+// Close the object and append '\n'; returns the record length or -1 on overflow
+long json_emit_end_line(JsonEmitter *emitter);
+
+#endif // ZENCUBE_JSON_EMIT_H
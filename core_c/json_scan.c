@@ -0,0 +1,261 @@
+#include "json_scan.h"
+#include <stdlib.h>
+#include <string.h>
+
+#define FNV_OFFSET 1469598103934665603ULL
+#define FNV_PRIME 1099511628211ULL
+#define TABLE_MASK (JSON_SCAN_TABLE_SIZE - 1)
+
+// Exact powers of ten: mantissa / 10^k is correctly rounded for k <= 22
+static const double POW10[] = {
+    1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11,
+    1e12, 1e13, 1e14, 1e15, 1e16, 1e17, 1e18, 1e19, 1e20, 1e21, 1e22
+};
+
+static uint64_t hash_bytes(const char *bytes, size_t len) {
+    uint64_t hash = FNV_OFFSET;
+    for (size_t i = 0; i < len; i++) {
+        hash ^= (unsigned char)bytes[i];
+        hash *= FNV_PRIME;
+    }
+    return hash;
+}
+
+// Returns the slot registered for the key, or -1
+static int lookup(const JsonScanSchema *schema, const char *name, size_t len, uint64_t hash) {
+    for (size_t i = hash & TABLE_MASK; schema->table[i] >= 0; i = (i + 1) & TABLE_MASK) {
+        const JsonScanKey *key = &schema->keys[schema->table[i]];
+        if (key->hash == hash && key->len == len && memcmp(key->name, name, len) == 0) {
+            return key->slot;
+        }
+    }
+    return -1;
+}
+
+void json_scan_schema_init(JsonScanSchema *schema) {
+    memset(schema, 0, sizeof(*schema));
+    memset(schema->table, -1, sizeof(schema->table));
+}
+
+static int add_key(JsonScanSchema *schema, const char *name, size_t len, uint64_t hash, int slot) {
+    if (schema->key_count >= JSON_SCAN_MAX_KEYS) return -1;
+
+    int index = schema->key_count++;
+    JsonScanKey *key = &schema->keys[index];
+    memcpy(key->name, name, len + 1);
+    key->len = len;
+    key->hash = hash;
+    key->slot = slot;
+
+    size_t i = hash & TABLE_MASK;
+    while (schema->table[i] >= 0) i = (i + 1) & TABLE_MASK;
+    schema->table[i] = (int8_t)index;
+    return slot;
+}
+
+int json_scan_schema_add(JsonScanSchema *schema, const char *name, JsonScanType type) {
+    size_t len = strlen(name);
+    if (len >= sizeof(schema->keys[0].name)) return -1;
+
+    uint64_t hash = hash_bytes(name, len);
+    int slot = lookup(schema, name, len, hash);
+    if (slot >= 0) return schema->types[slot] == type ? slot : -1;
+    if (schema->count >= JSON_SCAN_MAX_FIELDS || schema->key_count >= JSON_SCAN_MAX_KEYS) return -1;
+
+    slot = schema->count++;
+    schema->types[slot] = type;
+    return add_key(schema, name, len, hash, slot);
+}
+
+int json_scan_schema_alias(JsonScanSchema *schema, const char *name, int slot) {
+    size_t len = strlen(name);
+    if (slot < 0 || slot >= schema->count || len >= sizeof(schema->keys[0].name)) return -1;
+
+    uint64_t hash = hash_bytes(name, len);
+    int existing = lookup(schema, name, len, hash);
+    if (existing >= 0) return existing == slot ? slot : -1;
+    return add_key(schema, name, len, hash, slot);
+}
+
+static const char *skip_ws(const char *p, const char *end) {
+    while (p < end && (*p == ' ' || *p == '\t' || *p == '\r' || *p == '\n')) p++;
+    return p;
+}
+
+static int is_digit(char c) {
+    return c >= '0' && c <= '9';
+}
+
+// p at the opening quote; returns the position after the closing quote
+static const char *scan_string(const char *p, const char *end) {
+    for (p++; p < end; p++) {
+        if (*p == '"') return p + 1;
+        if (*p == '\\') p++;
+        else if ((unsigned char)*p < 0x20) return NULL;
+    }
+    return NULL;
+}
+
+// Decimal fast path (mantissa / 10^k); exponents and long mantissas go to strtod
+static const char *scan_number(const char *p, const char *end, double *out) {
+    const char *start = p;
+    int negative = 0;
+    if (p < end && *p == '-') {
+        negative = 1;
+        p++;
+    }
+    if (p >= end || !is_digit(*p)) return NULL;
+
+    uint64_t mantissa = 0;
+    int digits = 0;
+    int decimals = 0;
+    int slow = 0;
+    for (; p < end && is_digit(*p); p++) {
+        if (digits < 19) mantissa = mantissa * 10 + (uint64_t)(*p - '0');
+        else slow = 1;
+        if (mantissa) digits++;
+    }
+    if (p < end && *p == '.') {
+        p++;
+        if (p >= end || !is_digit(*p)) return NULL;
+        for (; p < end && is_digit(*p); p++) {
+            if (digits < 19) {
+                mantissa = mantissa * 10 + (uint64_t)(*p - '0');
+                decimals++;
+                if (mantissa) digits++;
+            } else {
+                slow = 1;
+            }
+        }
+    }
+    if (p < end && (*p == 'e' || *p == 'E')) {
+        slow = 1;
+        p++;
+        if (p < end && (*p == '+' || *p == '-')) p++;
+        if (p >= end || !is_digit(*p)) return NULL;
+        while (p < end && is_digit(*p)) p++;
+    }
+
+    if (!slow && mantissa < (1ULL << 53) && decimals <= 22) {
+        double value = (double)mantissa / POW10[decimals];
+        *out = negative ? -value : value;
+        return p;
+    }
+
+    char text[64];
+    size_t len = (size_t)(p - start);
+    if (len >= sizeof(text)) return NULL;
+    memcpy(text, start, len);
+    text[len] = '\0';
+    *out = strtod(text, NULL);
+    return p;
+}
+
+static const char *skip_literal(const char *p, const char *end, const char *literal, size_t len) {
+    return (size_t)(end - p) >= len && memcmp(p, literal, len) == 0 ? p + len : NULL;
+}
+
+static const char *skip_value(const char *p, const char *end) {
+    switch (*p) {
+        case '"':
+            return scan_string(p, end);
+        case '{':
+        case '[': {
+            int depth = 0;
+            while (p < end) {
+                char c = *p;
+                if (c == '"') {
+                    p = scan_string(p, end);
+                    if (!p) return NULL;
+                    continue;
+                }
+                if (c == '{' || c == '[') depth++;
+                else if ((c == '}' || c == ']') && --depth == 0) return p + 1;
+                p++;
+            }
+            return NULL;
+        }
+        case 't': return skip_literal(p, end, "true", 4);
+        case 'f': return skip_literal(p, end, "false", 5);
+        case 'n': return skip_literal(p, end, "null", 4);
+        default: {
+            double ignored;
+            return scan_number(p, end, &ignored);
+        }
+    }
+}
+
+int json_scan_line(const JsonScanSchema *schema, const char *line, size_t len,
+                   JsonScanValue *values, uint64_t *present) {
+    const char *p = line;
+    const char *end = line + len;
+    *present = 0;
+
+    p = skip_ws(p, end);
+    if (p >= end || *p != '{') return -1;
+    p = skip_ws(p + 1, end);
+    if (p < end && *p == '}') return 0;
+
+    for (;;) {
+        // Key: hash while scanning; escaped keys never match a field
+        if (p >= end || *p != '"') return -1;
+        const char *key = ++p;
+        uint64_t hash = FNV_OFFSET;
+        int escaped = 0;
+        for (; p < end && *p != '"'; p++) {
+            if (*p == '\\') {
+                escaped = 1;
+                if (++p >= end) return -1;
+            }
+            hash ^= (unsigned char)*p;
+            hash *= FNV_PRIME;
+        }
+        if (p >= end) return -1;
+        size_t key_len = (size_t)(p - key);
+
+        p = skip_ws(p + 1, end);
+        if (p >= end || *p != ':') return -1;
+        p = skip_ws(p + 1, end);
+        if (p >= end) return -1;
+
+        int slot = escaped ? -1 : lookup(schema, key, key_len, hash);
+        uint64_t bit = slot >= 0 ? 1ULL << slot : 0;
+        const char *next = NULL;
+        if (bit && !(*present & bit)) {
+            JsonScanValue *value = &values[slot];
+            if (schema->types[slot] == JSON_SCAN_NUMBER && (*p == '-' || is_digit(*p))) {
+                next = scan_number(p, end, &value->number);
+                if (next) *present |= bit;
+            } else if (schema->types[slot] == JSON_SCAN_STRING && *p == '"') {
+                next = scan_string(p, end);
+                if (next) {
+                    value->str = p + 1;
+                    value->str_len = (size_t)(next - p - 2);
+                    *present |= bit;
+                }
+            } else {
+                next = skip_value(p, end);
+            }
+        } else {
+            next = skip_value(p, end);
+        }
+        if (!next) return -1;
+
+        // Every registered field seen: the rest of the line is irrelevant
+        if (schema->count < 64 ? *present == (1ULL << schema->count) - 1 : *present == ~0ULL) {
+            return 0;
+        }
+
+        p = skip_ws(next, end);
+        if (p >= end) return -1;
+        if (*p == ',') {
+            p = skip_ws(p + 1, end);
+            continue;
+        }
+        if (*p != '}') return -1;
+        break;
+    }
+
+    p = skip_ws(p + 1, end);
+    return p == end ? 0 : -1;
+}
@@ -0,0 +1,56 @@
+#ifndef ZENCUBE_JSON_SCAN_H
+#define ZENCUBE_JSON_SCAN_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#define JSON_SCAN_MAX_FIELDS 64
+#define JSON_SCAN_MAX_KEYS 64        // field names plus aliases
+#define JSON_SCAN_TABLE_SIZE 128     // power of two, > 2 * JSON_SCAN_MAX_KEYS
+
+typedef enum {
+    JSON_SCAN_NUMBER,
+    JSON_SCAN_STRING
+} JsonScanType;
+
+typedef struct {
+    char name[64];
+    size_t len;
+    uint64_t hash;
+    int slot;
+} JsonScanKey;
+
+// Field names resolved once into slot indices. Scanning a line hashes each
+// key as it is read and looks it up here, so the cost per line does not
+// depend on how many rules reference the fields. Several keys (aliases) may
+// share one slot.
+typedef struct {
+    JsonScanKey keys[JSON_SCAN_MAX_KEYS];
+    int key_count;
+    JsonScanType types[JSON_SCAN_MAX_FIELDS];
+    int count;                            // slots
+    int8_t table[JSON_SCAN_TABLE_SIZE];   // key index, -1 when empty
+} JsonScanSchema;
+
+typedef struct {
+    double number;
+    const char *str;                      // raw (still escaped) slice of the line
+    size_t str_len;
+} JsonScanValue;
+
+void json_scan_schema_init(JsonScanSchema *schema);
+
+// Register a field; returns its slot (the existing one if already added) or -1
+int json_scan_schema_add(JsonScanSchema *schema, const char *name, JsonScanType type);
+
+// Make `name` another key for an existing slot; returns the slot or -1
+int json_scan_schema_alias(JsonScanSchema *schema, const char *name, int slot);
+
+// Single pass over one flat JSON object. Values of registered fields land in
+// values[slot] and set bit `slot` in *present (first occurrence of any of the
+// slot's keys wins; a value of the wrong type is treated as absent). Nested values are skipped.
+// Returns 0, or -1 if the line is not a well-formed object.
+int json_scan_line(const JsonScanSchema *schema, const char *line, size_t len,
+                   JsonScanValue *values, uint64_t *present);
+
+#endif // ZENCUBE_JSON_SCAN_H
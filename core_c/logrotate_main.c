@@ -1,61 +1,153 @@
 #include "logutil.h"
+#include "cJSON.h"
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <getopt.h>
 
+#define MAX_EXCLUDES 64
+
 static void print_usage(const char *prog) {
-    fprintf(stderr, "Usage: %s --dir <log_directory> [--keep <N>] [--compress]\n", prog);
+    fprintf(stderr, "Usage: %s --dir <log_directory> [--keep <N>] [--compress] [options]\n", prog);
     fprintf(stderr, "Options:\n");
-    fprintf(stderr, "  --dir PATH      Directory containing .jsonl logs\n");
-    fprintf(stderr, "  --keep N        Keep N most recent files (default: 10)\n");
-    fprintf(stderr, "  --compress      Compress old logs with gzip\n");
-    fprintf(stderr, "  --help          Show this help\n");
+    fprintf(stderr, "  --dir PATH          Directory containing .jsonl logs\n");
+    fprintf(stderr, "  --keep N            Keep N most recent files (default: 10)\n");
+    fprintf(stderr, "  --compress          Compress old logs with gzip\n");
+    fprintf(stderr, "  --max-age AGE       Also rotate logs older than AGE (e.g. 3600, 90m, 12h, 7d)\n");
+    fprintf(stderr, "  --max-bytes SIZE    Rotate the oldest logs until the rest fit in SIZE (e.g. 500M, 2G)\n");
+    fprintf(stderr, "  --archive-dir PATH  Write archives here (default: next to the log)\n");
+    fprintf(stderr, "  --exclude PATH      Never rotate this log (repeatable)\n");
+    fprintf(stderr, "  --threads N         Worker threads (default: online CPUs)\n");
+    fprintf(stderr, "  --split-mb N        Deflate files of at least N MB in parallel chunks (default: 32)\n");
+    fprintf(stderr, "  --dry-run           Report what would be rotated without touching files\n");
+    fprintf(stderr, "  --json              Print a {kept, archived, skipped} summary as JSON\n");
+    fprintf(stderr, "  --help              Show this help\n");
+}
+
+// Number with an optional unit suffix; returns -1 on a malformed value
+static double parse_scaled(const char *text, const char *units, const double *scales) {
+    char *end = NULL;
+    double value = strtod(text, &end);
+    if (end == text || value < 0) return -1;
+    if (*end == '\0') return value;
+    const char *unit = end[1] == '\0' ? strchr(units, *end) : NULL;
+    return unit ? value * scales[unit - units] : -1;
+}
+
+static void print_json(const RotateResult *result) {
+    cJSON *root = cJSON_CreateObject();
+    cJSON_AddNumberToObject(root, "kept", result->kept);
+    cJSON_AddNumberToObject(root, "archived", result->archived);
+    cJSON *skipped = cJSON_AddArrayToObject(root, "skipped");
+    for (int i = 0; i < result->skipped_count; i++) {
+        cJSON_AddItemToArray(skipped, cJSON_CreateString(result->skipped[i]));
+    }
+    cJSON_AddNumberToObject(root, "bytes_in", (double)result->bytes_in);
+    cJSON_AddNumberToObject(root, "bytes_out", (double)result->bytes_out);
+
+    char *text = cJSON_PrintUnformatted(root);
+    if (text) {
+        printf("%s\n", text);
+        free(text);
+    }
+    cJSON_Delete(root);
 }
 
 int main(int argc, char **argv) {
+    static const double AGE_SCALES[] = { 1, 60, 3600, 86400 };
+    static const double SIZE_SCALES[] = { 1024.0, 1024.0 * 1024, 1024.0 * 1024 * 1024 };
+
     char *log_dir = NULL;
-    int keep = 10;
-    int compress = 0;
-    
+    const char *excludes[MAX_EXCLUDES];
+    int json = 0;
+    RotatePolicy policy = ROTATE_POLICY_DEFAULT;
+    policy.compress = 0;
+    policy.exclude = excludes;
+
     static struct option long_options[] = {
-        {"dir",      required_argument, 0, 'd'},
-        {"keep",     required_argument, 0, 'k'},
-        {"compress", no_argument,       0, 'c'},
-        {"help",     no_argument,       0, 'h'},
+        {"dir",         required_argument, 0, 'd'},
+        {"keep",        required_argument, 0, 'k'},
+        {"compress",    no_argument,       0, 'c'},
+        {"max-age",     required_argument, 0, 'a'},
+        {"max-bytes",   required_argument, 0, 'b'},
+        {"archive-dir", required_argument, 0, 'o'},
+        {"exclude",     required_argument, 0, 'x'},
+        {"threads",     required_argument, 0, 't'},
+        {"split-mb",    required_argument, 0, 's'},
+        {"dry-run",     no_argument,       0, 'n'},
+        {"json",        no_argument,       0, 'j'},
+        {"help",        no_argument,       0, 'h'},
         {0, 0, 0, 0}
     };
-    
+
     int opt;
-    while ((opt = getopt_long(argc, argv, "d:k:ch", long_options, NULL)) != -1) {
+    double value;
+    while ((opt = getopt_long(argc, argv, "d:k:ca:b:o:x:t:s:njh", long_options, NULL)) != -1) {
         switch (opt) {
             case 'd': log_dir = optarg; break;
-            case 'k': keep = atoi(optarg); break;
-            case 'c': compress = 1; break;
+            case 'k': policy.keep_count = atoi(optarg); break;
+            case 'c': policy.compress = 1; break;
+            case 'a':
+                if ((value = parse_scaled(optarg, "smhd", AGE_SCALES)) < 0) {
+                    fprintf(stderr, "Error: Invalid --max-age '%s'\n", optarg);
+                    return 1;
+                }
+                policy.max_age_sec = value;
+                break;
+            case 'b':
+                if ((value = parse_scaled(optarg, "KMG", SIZE_SCALES)) < 0) {
+                    fprintf(stderr, "Error: Invalid --max-bytes '%s'\n", optarg);
+                    return 1;
+                }
+                policy.max_bytes = (long long)value;
+                break;
+            case 'o': policy.archive_dir = optarg; break;
+            case 'x':
+                if (policy.exclude_count >= MAX_EXCLUDES) {
+                    fprintf(stderr, "Error: Too many --exclude paths (max %d)\n", MAX_EXCLUDES);
+                    return 1;
+                }
+                excludes[policy.exclude_count++] = optarg;
+                break;
+            case 't': policy.threads = atoi(optarg); break;
+            case 's': policy.split_bytes = atoll(optarg) << 20; break;
+            case 'n': policy.dry_run = 1; break;
+            case 'j': json = 1; break;
             case 'h':
             default:
                 print_usage(argv[0]);
                 return opt == 'h' ? 0 : 1;
         }
     }
-    
+
     if (!log_dir) {
         fprintf(stderr, "Error: Missing required --dir argument\n");
         print_usage(argv[0]);
         return 1;
     }
-    
-    printf("Log rotation starting\n");
-    printf("Directory: %s\n", log_dir);
-    printf("Keep: %d files\n", keep);
-    printf("Compress: %s\n", compress ? "yes" : "no");
-    
-    // Perform rotation
-    if (rotate_logs(log_dir, ".jsonl", keep, compress) != 0) {
+    if (policy.keep_count < 0) policy.keep_count = 0;
+
+    if (!json) {
+        printf("Log rotation starting\n");
+        printf("Directory: %s\n", log_dir);
+        printf("Keep: %d files\n", policy.keep_count);
+        printf("Compress: %s\n", policy.compress ? "yes" : "no");
+    }
+
+    RotateResult result;
+    if (rotate_logs_policy(log_dir, &policy, &result) != 0) {
         fprintf(stderr, "Log rotation failed\n");
         return 1;
     }
-    
-    printf("Log rotation completed successfully\n");
+
+    if (json) {
+        print_json(&result);
+    } else {
+        printf("Kept %d logs; %s %d; skipped %d\n", result.kept,
+               policy.dry_run ? "would archive" : "archived", result.archived, result.skipped_count);
+        for (int i = 0; i < result.skipped_count; i++) printf(" - %s\n", result.skipped[i]);
+        printf("Log rotation completed successfully\n");
+    }
+    rotate_result_free(&result);
     return 0;
 }
@@ -1,4 +1,7 @@
 #include "logutil.h"
+#include <errno.h>
+#include <fcntl.h>
+#include <limits.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
@@ -6,9 +9,9 @@
 #include <sys/stat.h>
 #include <unistd.h>
 #include <dirent.h>
+#include <pthread.h>
 #include <zlib.h>
 
-#define TEMP_SUFFIX ".tmp"
 #define GZ_SUFFIX ".gz"
 
 // Get ISO 8601 UTC timestamp
@@ -18,141 +21,723 @@ void get_iso_timestamp(char *buffer, size_t size) {
     strftime(buffer, size, "%Y-%m-%dT%H:%M:%SZ", tm_utc);
 }
 
-// Append JSON line to file atomically
-int append_jsonl(const char *path, const char *json_string) {
-    char temp_path[1024];
-    snprintf(temp_path, sizeof(temp_path), "%s%s", path, TEMP_SUFFIX);
-    
-    // Read existing content if file exists
-    FILE *existing = fopen(path, "r");
-    FILE *temp = fopen(temp_path, "w");
-    if (!temp) {
-        perror("fopen temp");
-        if (existing) fclose(existing);
+// ---------------------------------------------------------------------------
+// Append-only JSONL writer
+// ---------------------------------------------------------------------------
+
+#define ROTATE_CHECK_INTERVAL_SEC 1.0
+#define RECOVER_CHUNK 4096
+
+static double elapsed_sec(const struct timespec *since, const struct timespec *now) {
+    return (double)(now->tv_sec - since->tv_sec) + (now->tv_nsec - since->tv_nsec) / 1e9;
+}
+
+static int write_all(int fd, const char *buf, size_t len) {
+    while (len > 0) {
+        ssize_t n = write(fd, buf, len);
+        if (n < 0) {
+            if (errno == EINTR) continue;
+            return -1;
+        }
+        buf += n;
+        len -= (size_t)n;
+    }
+    return 0;
+}
+
+int jsonl_parse_fsync_policy(const char *spec, JsonlFsyncPolicy *policy) {
+    if (!spec || !policy) return -1;
+
+    if (strcmp(spec, "never") == 0) {
+        policy->mode = JSONL_FSYNC_NEVER;
+        return 0;
+    }
+    if (strcmp(spec, "always") == 0) {
+        policy->mode = JSONL_FSYNC_EVERY_N;
+        policy->every_n = 1;
+        return 0;
+    }
+    if (strncmp(spec, "interval:", 9) == 0) {
+        char *end = NULL;
+        double seconds = strtod(spec + 9, &end);
+        if (end == spec + 9 || *end != '\0' || seconds <= 0) return -1;
+        policy->mode = JSONL_FSYNC_INTERVAL;
+        policy->interval_sec = seconds;
+        return 0;
+    }
+    if (strncmp(spec, "every:", 6) == 0) {
+        char *end = NULL;
+        long count = strtol(spec + 6, &end, 10);
+        if (end == spec + 6 || *end != '\0' || count <= 0 || count > INT_MAX) return -1;
+        policy->mode = JSONL_FSYNC_EVERY_N;
+        policy->every_n = (int)count;
+        return 0;
+    }
+    return -1;
+}
+
+// Length of the complete-line prefix of the first `size` bytes: scan
+// backwards for the last newline; everything after it is torn.
+static off_t complete_lines_end(int fd, off_t size) {
+    char chunk[RECOVER_CHUNK];
+    off_t end = size;
+    while (end > 0) {
+        off_t start = end > RECOVER_CHUNK ? end - RECOVER_CHUNK : 0;
+        ssize_t n = pread(fd, chunk, (size_t)(end - start), start);
+        if (n <= 0) return -1;
+        for (ssize_t i = n - 1; i >= 0; i--) {
+            if (chunk[i] == '\n') return start + i + 1;
+        }
+        end = start;
+    }
+    return 0;
+}
+
+long jsonl_recover(const char *path) {
+    int fd = open(path, O_RDWR | O_CLOEXEC);
+    if (fd < 0) {
+        return errno == ENOENT ? 0 : -1;
+    }
+
+    struct stat st;
+    off_t keep;
+    if (fstat(fd, &st) != 0 || (keep = complete_lines_end(fd, st.st_size)) < 0) {
+        close(fd);
         return -1;
     }
-    
-    // Copy existing lines
-    if (existing) {
-        char line[4096];
-        while (fgets(line, sizeof(line), existing)) {
-            fputs(line, temp);
-        }
-        fclose(existing);
-    }
-    
-    // Append new line
-    fprintf(temp, "%s\n", json_string);
-    fflush(temp);
-    fsync(fileno(temp));
-    fclose(temp);
-    
-    // Atomic rename
-    if (rename(temp_path, path) != 0) {
-        perror("rename");
+
+    long removed = (long)(st.st_size - keep);
+    if (removed > 0) {
+        if (ftruncate(fd, keep) != 0 || fsync(fd) != 0) {
+            close(fd);
+            return -1;
+        }
+    }
+    close(fd);
+    return removed;
+}
+
+static int writer_open_fd(JsonlWriter *writer) {
+    int fd = open(writer->path, O_WRONLY | O_APPEND | O_CREAT | O_CLOEXEC, 0644);
+    if (fd < 0) return -1;
+
+    struct stat st;
+    if (fstat(fd, &st) != 0) {
+        close(fd);
         return -1;
     }
-    
+    writer->fd = fd;
+    writer->dev = st.st_dev;
+    writer->ino = st.st_ino;
     return 0;
 }
 
+// Reopen the path if log rotation moved or removed the file under us
+static void writer_follow_rotation(JsonlWriter *writer, const struct timespec *now) {
+    if (elapsed_sec(&writer->last_rotate_check, now) < ROTATE_CHECK_INTERVAL_SEC) return;
+    writer->last_rotate_check = *now;
+
+    struct stat st;
+    if (stat(writer->path, &st) == 0 && st.st_dev == writer->dev && st.st_ino == writer->ino) return;
+
+    int old_fd = writer->fd;
+    if (writer->policy.mode != JSONL_FSYNC_NEVER && writer->unsynced > 0) {
+        fdatasync(old_fd);
+    }
+    if (writer_open_fd(writer) == 0) {
+        close(old_fd);
+        writer->unsynced = 0;
+    } else {
+        writer->fd = old_fd;  // keep writing to the old inode rather than dropping records
+    }
+}
+
+int jsonl_writer_open(JsonlWriter *writer, const char *path, const JsonlFsyncPolicy *policy) {
+    static const JsonlFsyncPolicy default_policy = JSONL_FSYNC_DEFAULT;
+    if (!writer || !path) return -1;
+
+    memset(writer, 0, sizeof(*writer));
+    writer->fd = -1;
+    writer->policy = policy ? *policy : default_policy;
+    if (snprintf(writer->path, sizeof(writer->path), "%s", path) >= (int)sizeof(writer->path)) {
+        errno = ENAMETOOLONG;
+        return -1;
+    }
+
+    long removed = jsonl_recover(path);
+    if (removed < 0) {
+        perror("jsonl_recover");
+        return -1;
+    }
+    if (removed > 0) {
+        fprintf(stderr, "Recovered %s: truncated %ld byte torn line\n", path, removed);
+    }
+
+    if (writer_open_fd(writer) != 0) {
+        perror("open jsonl");
+        return -1;
+    }
+    clock_gettime(CLOCK_MONOTONIC, &writer->last_sync);
+    writer->last_rotate_check = writer->last_sync;
+    return 0;
+}
+
+int jsonl_writer_write_line(JsonlWriter *writer, const char *line, size_t len) {
+    if (!writer || writer->fd < 0 || !line || len == 0 || line[len - 1] != '\n') return -1;
+
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    writer_follow_rotation(writer, &now);
+
+    if (write_all(writer->fd, line, len) != 0) {
+        perror("write jsonl");
+        return -1;
+    }
+
+    writer->records++;
+    writer->unsynced++;
+
+    switch (writer->policy.mode) {
+        case JSONL_FSYNC_EVERY_N:
+            if (writer->unsynced >= (unsigned long)writer->policy.every_n) {
+                return jsonl_writer_sync(writer);
+            }
+            break;
+        case JSONL_FSYNC_INTERVAL:
+            if (elapsed_sec(&writer->last_sync, &now) >= writer->policy.interval_sec) {
+                return jsonl_writer_sync(writer);
+            }
+            break;
+        case JSONL_FSYNC_NEVER:
+        default:
+            break;
+    }
+    return 0;
+}
+
+int jsonl_writer_append(JsonlWriter *writer, const char *json_string) {
+    if (!json_string) return -1;
+
+    size_t len = strlen(json_string);
+    char stack_buf[4096];
+    char *buf = len + 1 <= sizeof(stack_buf) ? stack_buf : malloc(len + 1);
+    if (!buf) return -1;
+    memcpy(buf, json_string, len);
+    buf[len] = '\n';
+
+    int result = jsonl_writer_write_line(writer, buf, len + 1);
+    if (buf != stack_buf) free(buf);
+    return result;
+}
+
+int jsonl_writer_sync(JsonlWriter *writer) {
+    if (!writer || writer->fd < 0) return -1;
+    if (writer->unsynced == 0) return 0;
+
+    if (fdatasync(writer->fd) != 0) {
+        perror("fdatasync");
+        return -1;
+    }
+    writer->unsynced = 0;
+    clock_gettime(CLOCK_MONOTONIC, &writer->last_sync);
+    return 0;
+}
+
+void jsonl_writer_close(JsonlWriter *writer) {
+    if (!writer || writer->fd < 0) return;
+
+    if (writer->policy.mode != JSONL_FSYNC_NEVER) {
+        jsonl_writer_sync(writer);
+    }
+    close(writer->fd);
+    writer->fd = -1;
+}
+
+// Append a single JSON line with an immediate fsync. Convenience for
+// one-off records; long-lived producers should keep a JsonlWriter open.
+int append_jsonl(const char *path, const char *json_string) {
+    JsonlFsyncPolicy policy = { JSONL_FSYNC_EVERY_N, 0.0, 1 };
+    JsonlWriter writer;
+    if (jsonl_writer_open(&writer, path, &policy) != 0) {
+        return -1;
+    }
+    int result = jsonl_writer_append(&writer, json_string);
+    jsonl_writer_close(&writer);
+    return result;
+}
+
 // Build log path from run_id
 void build_log_path(char *buffer, size_t size, const char *log_dir, const char *run_id) {
     snprintf(buffer, size, "%s/%s.jsonl", log_dir, run_id);
 }
 
+// ---------------------------------------------------------------------------
+// Compression and rotation
+// ---------------------------------------------------------------------------
+
+#define IO_BUF_SIZE (1 << 20)
+#define DEFLATE_CHUNK (1 << 20)
+#define DEFLATE_DICT 32768
+#define GZIP_OS_UNIX 3
+
+// Gzip the first `length` bytes of `in` (all of it when negative)
+static int compress_fd(int in, off_t length, const char *output_path) {
+    posix_fadvise(in, 0, 0, POSIX_FADV_SEQUENTIAL);
+
+    gzFile out = gzopen(output_path, "wb");
+    char *buffer = malloc(IO_BUF_SIZE);
+    if (!out || !buffer) {
+        if (out) gzclose(out);
+        free(buffer);
+        return -1;
+    }
+    gzbuffer(out, IO_BUF_SIZE);
+
+    int result = 0;
+    off_t offset = 0;
+    for (;;) {
+        size_t want = IO_BUF_SIZE;
+        if (length >= 0 && length - offset < (off_t)want) want = (size_t)(length - offset);
+        if (want == 0) break;
+        ssize_t bytes = pread(in, buffer, want, offset);
+        if (bytes == 0) break;
+        if (bytes < 0) {
+            if (errno == EINTR) continue;
+            result = -1;
+            break;
+        }
+        if (gzwrite(out, buffer, (unsigned)bytes) != (int)bytes) {
+            result = -1;
+            break;
+        }
+        offset += bytes;
+    }
+
+    free(buffer);
+    if (gzclose(out) != Z_OK) result = -1;
+    return result;
+}
+
 // Compress file to .gz
 int compress_file(const char *input_path, const char *output_path) {
-    FILE *in = fopen(input_path, "rb");
-    if (!in) {
+    int in = open(input_path, O_RDONLY | O_CLOEXEC);
+    if (in < 0) {
         return -1;
     }
-    
-    gzFile out = gzopen(output_path, "wb");
-    if (!out) {
-        fclose(in);
-        return -1;
+    int result = compress_fd(in, -1, output_path);
+    close(in);
+    return result;
+}
+
+typedef struct {
+    int fd;
+    off_t offset;
+    size_t len;
+    int last;
+    unsigned char *out;
+    size_t out_len;
+    uLong crc;
+    int status;
+} DeflateChunk;
+
+static ssize_t pread_full(int fd, unsigned char *buf, size_t len, off_t offset) {
+    size_t done = 0;
+    while (done < len) {
+        ssize_t n = pread(fd, buf + done, len - done, offset + (off_t)done);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) return -1;
+        done += (size_t)n;
     }
-    
-    char buffer[8192];
-    size_t bytes;
-    while ((bytes = fread(buffer, 1, sizeof(buffer), in)) > 0) {
-        if (gzwrite(out, buffer, bytes) != (int)bytes) {
-            fclose(in);
-            gzclose(out);
-            return -1;
+    return (ssize_t)done;
+}
+
+// Raw-deflate one chunk, primed with the preceding 32 KiB so the ratio stays
+// close to a sequential stream. Non-final chunks end with a sync flush, which
+// byte-aligns them so the chunks can simply be concatenated.
+static void *deflate_chunk(void *arg) {
+    DeflateChunk *chunk = arg;
+    chunk->status = -1;
+
+    size_t dict_len = chunk->offset >= DEFLATE_DICT ? DEFLATE_DICT : (size_t)chunk->offset;
+    unsigned char *in = malloc(dict_len + chunk->len);
+    if (!in) return NULL;
+    if (pread_full(chunk->fd, in, dict_len + chunk->len, chunk->offset - (off_t)dict_len) < 0) {
+        free(in);
+        return NULL;
+    }
+
+    z_stream zs;
+    memset(&zs, 0, sizeof(zs));
+    if (deflateInit2(&zs, Z_DEFAULT_COMPRESSION, Z_DEFLATED, -15, 8, Z_DEFAULT_STRATEGY) != Z_OK) {
+        free(in);
+        return NULL;
+    }
+    if (dict_len) deflateSetDictionary(&zs, in, (uInt)dict_len);
+
+    size_t bound = deflateBound(&zs, chunk->len) + 16;
+    chunk->out = malloc(bound);
+    if (chunk->out) {
+        zs.next_in = in + dict_len;
+        zs.avail_in = (uInt)chunk->len;
+        zs.next_out = chunk->out;
+        zs.avail_out = (uInt)bound;
+        int rc = deflate(&zs, chunk->last ? Z_FINISH : Z_SYNC_FLUSH);
+        if ((chunk->last ? rc == Z_STREAM_END : rc == Z_OK) && zs.avail_in == 0) {
+            chunk->out_len = bound - zs.avail_out;
+            chunk->crc = crc32(0L, in + dict_len, (uInt)chunk->len);
+            chunk->status = 0;
+        }
+    }
+
+    deflateEnd(&zs);
+    free(in);
+    return NULL;
+}
+
+static void put_le32(unsigned char *p, uLong value) {
+    for (int i = 0; i < 4; i++) p[i] = (unsigned char)(value >> (8 * i));
+}
+
+// Gzip the first `size` bytes of `in` in DEFLATE_CHUNK pieces, `threads` at a time
+static int compress_fd_parallel(int in, off_t size, const char *output_path, int threads) {
+    if (threads <= 1 || size <= DEFLATE_CHUNK) {
+        return compress_fd(in, size, output_path);
+    }
+
+    int out = open(output_path, O_WRONLY | O_CREAT | O_TRUNC | O_CLOEXEC, 0644);
+    DeflateChunk *batch = calloc((size_t)threads, sizeof(DeflateChunk));
+    pthread_t *tids = calloc((size_t)threads, sizeof(pthread_t));
+    int *started = calloc((size_t)threads, sizeof(int));
+    int result = (out < 0 || !batch || !tids || !started) ? -1 : 0;
+
+    static const unsigned char header[10] = { 0x1f, 0x8b, Z_DEFLATED, 0, 0, 0, 0, 0, 0, GZIP_OS_UNIX };
+    if (result == 0) result = write_all(out, (const char *)header, sizeof(header));
+
+    uLong crc = crc32(0L, Z_NULL, 0);
+    for (off_t offset = 0; result == 0 && offset < size;) {
+        int n = 0;
+        for (; n < threads && offset < size; n++) {
+            DeflateChunk *chunk = &batch[n];
+            memset(chunk, 0, sizeof(*chunk));
+            chunk->fd = in;
+            chunk->offset = offset;
+            chunk->len = (size_t)(size - offset < DEFLATE_CHUNK ? size - offset : DEFLATE_CHUNK);
+            offset += (off_t)chunk->len;
+            chunk->last = offset >= size;
+        }
+
+        for (int i = 0; i < n; i++) {
+            started[i] = pthread_create(&tids[i], NULL, deflate_chunk, &batch[i]) == 0;
+            if (!started[i]) deflate_chunk(&batch[i]);  // no thread available: run inline
+        }
+        for (int i = 0; i < n; i++) {
+            if (started[i]) pthread_join(tids[i], NULL);
+        }
+
+        // Write in order even after an error so every buffer is released
+        for (int i = 0; i < n; i++) {
+            DeflateChunk *chunk = &batch[i];
+            if (result == 0 && chunk->status == 0 &&
+                write_all(out, (const char *)chunk->out, chunk->out_len) == 0) {
+                crc = crc32_combine(crc, chunk->crc, (z_off_t)chunk->len);
+            } else {
+                result = -1;
+            }
+            free(chunk->out);
         }
     }
-    
-    fclose(in);
-    gzclose(out);
+
+    if (result == 0) {
+        unsigned char trailer[8];
+        put_le32(trailer, crc);
+        put_le32(trailer + 4, (uLong)(size & 0xffffffffUL));
+        result = write_all(out, (const char *)trailer, sizeof(trailer));
+    }
+
+    free(batch);
+    free(tids);
+    free(started);
+    if (out >= 0 && close(out) != 0) result = -1;
+    return result;
+}
+
+int compress_file_parallel(const char *input_path, const char *output_path, int threads) {
+    int in = open(input_path, O_RDONLY | O_CLOEXEC);
+    if (in < 0) return -1;
+
+    struct stat st;
+    int result = fstat(in, &st) == 0 ? compress_fd_parallel(in, st.st_size, output_path, threads) : -1;
+    close(in);
+    return result;
+}
+
+typedef struct {
+    char path[PATH_MAX];
+    char name[NAME_MAX + 1];
+    time_t mtime;
+    long long size;
+    int excluded;
+    int rotate;
+    int ok;
+    long long bytes_out;
+} RotateFile;
+
+typedef struct {
+    RotateFile **jobs;
+    int count;
+    int next;
+    pthread_mutex_t lock;
+    const RotatePolicy *policy;
+    char archive_dir[PATH_MAX];
+    int threads;                   // for chunked files
+} RotateQueue;
+
+static int by_mtime_desc(const void *a, const void *b) {
+    const RotateFile *fa = a;
+    const RotateFile *fb = b;
+    if (fa->mtime != fb->mtime) return fa->mtime < fb->mtime ? 1 : -1;
+    return strcmp(fb->name, fa->name);
+}
+
+// Compress the whole file to a temp name, sync, rename into place, then drop
+// the original, so an archive is either complete or absent. A final line
+// without a newline is archived as is, like monitor.log_rotate does; the
+// original is only removed once every byte of it is in the archive.
+static int archive_file(RotateFile *file, const char *archive_dir, int compress, int threads) {
+    if (!compress) return unlink(file->path);
+
+    char gz_path[PATH_MAX + 8];
+    char tmp_path[PATH_MAX + 16];
+    snprintf(gz_path, sizeof(gz_path), "%s/%s%s", archive_dir, file->name, GZ_SUFFIX);
+    snprintf(tmp_path, sizeof(tmp_path), "%s.tmp", gz_path);
+
+    int in = open(file->path, O_RDONLY | O_CLOEXEC);
+    if (in < 0) return -1;
+    struct stat st;
+    int rc = fstat(in, &st) == 0 ? compress_fd_parallel(in, st.st_size, tmp_path, threads) : -1;
+    close(in);
+    if (rc == 0) {
+        int fd = open(tmp_path, O_RDONLY | O_CLOEXEC);
+        struct stat st;
+        rc = (fd >= 0 && fsync(fd) == 0 && fstat(fd, &st) == 0) ? 0 : -1;
+        if (rc == 0) file->bytes_out = st.st_size;
+        if (fd >= 0) close(fd);
+    }
+    if (rc == 0) rc = rename(tmp_path, gz_path);
+    if (rc != 0) {
+        unlink(tmp_path);
+        return -1;
+    }
+    return unlink(file->path);
+}
+
+static void *rotate_worker(void *arg) {
+    RotateQueue *queue = arg;
+    for (;;) {
+        pthread_mutex_lock(&queue->lock);
+        int index = queue->next++;
+        pthread_mutex_unlock(&queue->lock);
+        if (index >= queue->count) return NULL;
+
+        RotateFile *file = queue->jobs[index];
+        file->ok = archive_file(file, queue->archive_dir, queue->policy->compress, 1) == 0;
+    }
+}
+
+static int online_cpus(void) {
+    long n = sysconf(_SC_NPROCESSORS_ONLN);
+    return n > 0 ? (int)n : 1;
+}
+
+static int add_skipped(RotateResult *result, const char *path) {
+    char **grown = realloc(result->skipped, sizeof(char *) * (size_t)(result->skipped_count + 1));
+    if (!grown) return -1;
+    result->skipped = grown;
+    result->skipped[result->skipped_count] = strdup(path);
+    if (!result->skipped[result->skipped_count]) return -1;
+    result->skipped_count++;
+    return 0;
+}
+
+void rotate_result_free(RotateResult *result) {
+    if (!result) return;
+    for (int i = 0; i < result->skipped_count; i++) free(result->skipped[i]);
+    free(result->skipped);
+    result->skipped = NULL;
+    result->skipped_count = 0;
+}
+
+static int is_excluded(const RotatePolicy *policy, const char *path) {
+    char resolved[PATH_MAX];
+    if (!realpath(path, resolved)) return 0;
+    for (int i = 0; i < policy->exclude_count; i++) {
+        char other[PATH_MAX];
+        if (realpath(policy->exclude[i], other) && strcmp(resolved, other) == 0) return 1;
+    }
     return 0;
 }
 
-// Rotate logs keeping last N files
-int rotate_logs(const char *log_dir, const char *pattern, int keep_count, int compress_old) {
+int rotate_logs_policy(const char *log_dir, const RotatePolicy *policy, RotateResult *result) {
+    if (!log_dir || !policy || !result) return -1;
+    memset(result, 0, sizeof(*result));
+
     DIR *dir = opendir(log_dir);
     if (!dir) {
         return -1;
     }
-    
-    // Count matching files
-    struct dirent *entry;
-    char **files = NULL;
+
+    RotateFile *files = NULL;
     int file_count = 0;
-    
+    struct dirent *entry;
     while ((entry = readdir(dir)) != NULL) {
-        if (strstr(entry->d_name, pattern) && strstr(entry->d_name, ".jsonl")) {
-            files = realloc(files, sizeof(char*) * (file_count + 1));
-            files[file_count] = strdup(entry->d_name);
-            file_count++;
+        size_t len = strlen(entry->d_name);
+        if (len < 6 || strcmp(entry->d_name + len - 6, ".jsonl") != 0) continue;
+        if (policy->pattern && !strstr(entry->d_name, policy->pattern)) continue;
+
+        RotateFile file;
+        memset(&file, 0, sizeof(file));
+        int n = snprintf(file.path, sizeof(file.path), "%s/%s", log_dir, entry->d_name);
+        if (n < 0 || (size_t)n >= sizeof(file.path)) continue;
+        struct stat st;
+        if (stat(file.path, &st) != 0 || !S_ISREG(st.st_mode)) continue;
+        memcpy(file.name, entry->d_name, len + 1);
+        file.mtime = st.st_mtime;
+        file.size = st.st_size;
+        file.excluded = is_excluded(policy, file.path);
+
+        RotateFile *grown = realloc(files, sizeof(RotateFile) * (size_t)(file_count + 1));
+        if (!grown) {
+            closedir(dir);
+            free(files);
+            return -1;
         }
+        files = grown;
+        files[file_count++] = file;
     }
     closedir(dir);
-    
-    if (file_count <= keep_count) {
-        // No rotation needed
-        for (int i = 0; i < file_count; i++) {
-            free(files[i]);
+
+    // Newest first, as monitor.log_rotate orders them
+    if (file_count > 1) qsort(files, (size_t)file_count, sizeof(RotateFile), by_mtime_desc);
+
+    time_t now = time(NULL);
+    long long kept_bytes = 0;
+    for (int i = 0; i < file_count; i++) {
+        RotateFile *file = &files[i];
+        if (file->excluded) continue;
+        int too_many = i >= policy->keep_count;  // excluded files still hold a place
+        int too_old = policy->max_age_sec > 0 && difftime(now, file->mtime) > policy->max_age_sec;
+        file->rotate = too_many || too_old;
+        if (!file->rotate) kept_bytes += file->size;
+    }
+    // Size budget: rotate the oldest remaining files, never the newest one
+    if (policy->max_bytes > 0) {
+        for (int i = file_count - 1; i > 0 && kept_bytes > policy->max_bytes; i--) {
+            if (files[i].excluded || files[i].rotate) continue;
+            files[i].rotate = 1;
+            kept_bytes -= files[i].size;
         }
+    }
+
+    RotateQueue queue;
+    memset(&queue, 0, sizeof(queue));
+    queue.policy = policy;
+    queue.threads = policy->threads > 0 ? policy->threads : online_cpus();
+    snprintf(queue.archive_dir, sizeof(queue.archive_dir), "%s",
+             policy->archive_dir ? policy->archive_dir : log_dir);
+    if (policy->compress && !policy->dry_run && policy->archive_dir &&
+        mkdir(queue.archive_dir, 0755) != 0 && errno != EEXIST) {
         free(files);
-        return 0;
+        return -1;
     }
-    
-    // Sort by name (oldest first for typical timestamp naming)
-    for (int i = 0; i < file_count - 1; i++) {
-        for (int j = i + 1; j < file_count; j++) {
-            if (strcmp(files[i], files[j]) > 0) {
-                char *temp = files[i];
-                files[i] = files[j];
-                files[j] = temp;
-            }
-        }
+
+    RotateFile **small = calloc((size_t)(file_count ? file_count : 1), sizeof(RotateFile *));
+    RotateFile **large = calloc((size_t)(file_count ? file_count : 1), sizeof(RotateFile *));
+    if (!small || !large) {
+        free(small);
+        free(large);
+        free(files);
+        return -1;
     }
-    
-    // Delete or compress old files
-    int to_remove = file_count - keep_count;
-    for (int i = 0; i < to_remove; i++) {
-        char full_path[2048];  // Increased buffer to avoid truncation warnings
-        snprintf(full_path, sizeof(full_path), "%s/%s", log_dir, files[i]);
-        
-        if (compress_old) {
-            char gz_path[2560];  // Extra space for .gz suffix to avoid truncation
-            snprintf(gz_path, sizeof(gz_path), "%s%s", full_path, GZ_SUFFIX);
-            
-            if (compress_file(full_path, gz_path) == 0) {
-                unlink(full_path);
-            }
+
+    int small_count = 0;
+    int large_count = 0;
+    for (int i = 0; i < file_count; i++) {
+        RotateFile *file = &files[i];
+        if (!file->rotate) {
+            result->kept++;
+            continue;
+        }
+        // Same pre-check as the Python rotator: unreadable files are skipped
+        if (access(file->path, R_OK) != 0) {
+            add_skipped(result, file->path);
+            file->rotate = 0;
+            continue;
+        }
+        if (policy->dry_run) {
+            result->archived++;
+            continue;
+        }
+        if (policy->compress && policy->split_bytes > 0 && file->size >= policy->split_bytes) {
+            large[large_count++] = file;
         } else {
-            unlink(full_path);
+            small[small_count++] = file;
         }
     }
-    
-    // Cleanup
-    for (int i = 0; i < file_count; i++) {
-        free(files[i]);
+
+    // One file per worker for the common case...
+    if (small_count > 0) {
+        queue.jobs = small;
+        queue.count = small_count;
+        pthread_mutex_init(&queue.lock, NULL);
+
+        int workers = queue.threads < small_count ? queue.threads : small_count;
+        pthread_t *tids = calloc((size_t)workers, sizeof(pthread_t));
+        int started = 0;
+        for (int i = 0; tids && i < workers; i++) {
+            if (pthread_create(&tids[i], NULL, rotate_worker, &queue) != 0) break;
+            started++;
+        }
+        if (started == 0) rotate_worker(&queue);  // no threads: do it here
+        for (int i = 0; i < started; i++) pthread_join(tids[i], NULL);
+        free(tids);
+        pthread_mutex_destroy(&queue.lock);
     }
+
+    // ...then every worker on one very large file at a time
+    for (int i = 0; i < large_count; i++) {
+        large[i]->ok = archive_file(large[i], queue.archive_dir, 1, queue.threads) == 0;
+    }
+
+    RotateFile **batches[2] = { small, large };
+    int counts[2] = { small_count, large_count };
+    for (int b = 0; b < 2; b++) {
+        for (int i = 0; i < counts[b]; i++) {
+            RotateFile *file = batches[b][i];
+            if (file->ok) {
+                result->archived++;
+                result->bytes_in += file->size;
+                result->bytes_out += file->bytes_out;
+            } else {
+                add_skipped(result, file->path);
+            }
+        }
+    }
+
+    free(small);
+    free(large);
     free(files);
-    
     return 0;
 }
+
+// Rotate logs keeping last N files
+int rotate_logs(const char *log_dir, const char *pattern, int keep_count, int compress_old) {
+    RotatePolicy policy = ROTATE_POLICY_DEFAULT;
+    policy.pattern = pattern;
+    policy.keep_count = keep_count;
+    policy.compress = compress_old;
+
+    RotateResult result;
+    int rc = rotate_logs_policy(log_dir, &policy, &result);
+    rotate_result_free(&result);
+    return rc;
+}
@@ -2,16 +2,114 @@
 #define ZENCUBE_LOGUTIL_H
 
 #include <stdio.h>
+#include <sys/types.h>
+#include <time.h>
 
-// Append JSON line to file (atomic)
+// When buffered records are flushed to stable storage
+typedef enum {
+    JSONL_FSYNC_NEVER,       // leave it to the kernel
+    JSONL_FSYNC_INTERVAL,    // at most once per interval_sec
+    JSONL_FSYNC_EVERY_N      // after every every_n records
+} JsonlFsyncMode;
+
+typedef struct {
+    JsonlFsyncMode mode;
+    double interval_sec;
+    int every_n;
+} JsonlFsyncPolicy;
+
+// Append-only JSONL writer. Keeps one O_APPEND fd open and writes each
+// record (line + '\n') with a single write(), so appends are O(1) and
+// concurrent readers never observe half a line from a successful write.
+typedef struct {
+    int fd;
+    char path[1024];
+    dev_t dev;
+    ino_t ino;
+    JsonlFsyncPolicy policy;
+    unsigned long records;           // written since open
+    unsigned long unsynced;          // written since last fsync
+    struct timespec last_sync;
+    struct timespec last_rotate_check;
+} JsonlWriter;
+
+// Default policy: fsync at most once per second
+#define JSONL_FSYNC_DEFAULT { JSONL_FSYNC_INTERVAL, 1.0, 0 }
+
+// Parse "never", "interval:<sec>" or "every:<n>"; returns 0 on success
+int jsonl_parse_fsync_policy(const char *spec, JsonlFsyncPolicy *policy);
+
+// Recover the file from a torn tail, then open it for appending.
+// A NULL policy selects JSONL_FSYNC_DEFAULT.
+int jsonl_writer_open(JsonlWriter *writer, const char *path, const JsonlFsyncPolicy *policy);
+
+// Append one JSON document as a line (no trailing newline expected)
+int jsonl_writer_append(JsonlWriter *writer, const char *json_string);
+
+// Write a pre-formatted record that already ends in '\n' (no copy)
+int jsonl_writer_write_line(JsonlWriter *writer, const char *line, size_t len);
+
+// Force an fdatasync of pending records
+int jsonl_writer_sync(JsonlWriter *writer);
+
+// Sync pending records (unless policy is NEVER) and close the fd
+void jsonl_writer_close(JsonlWriter *writer);
+
+// Truncate an incomplete final line left by a crash. Returns the number of
+// bytes removed, 0 if the file was intact or missing, -1 on error.
+long jsonl_recover(const char *path);
+
+// Append JSON line to file (one-shot open/append/fsync/close)
 int append_jsonl(const char *path, const char *json_string);
 
+// Which logs rotate_logs_policy rotates and how. A file is rotated when it
+// falls outside the `keep_count` newest (by mtime), is older than
+// `max_age_sec`, or is among the oldest files that push the total size of
+// the remaining logs above `max_bytes`. Zero disables a limit.
+typedef struct {
+    const char *pattern;           // file names must contain this and end in .jsonl
+    int keep_count;
+    double max_age_sec;
+    long long max_bytes;
+    int compress;                  // gzip rotated files, otherwise delete them
+    const char *archive_dir;       // NULL: next to the original
+    const char **exclude;          // never rotated (counted as kept)
+    int exclude_count;
+    int threads;                   // worker threads, 0 = online CPUs
+    long long split_bytes;         // files at least this big use chunked parallel deflate
+    int dry_run;
+} RotatePolicy;
+
+// Mirrors monitor.log_rotate.RotationResult
+typedef struct {
+    int kept;
+    int archived;                  // rotated (compressed, or deleted without compress)
+    char **skipped;                // paths that could not be rotated
+    int skipped_count;
+    long long bytes_in;
+    long long bytes_out;
+} RotateResult;
+
+// Default policy: keep 10, compress, one worker per CPU
+#define ROTATE_POLICY_DEFAULT { ".jsonl", 10, 0.0, 0, 1, NULL, NULL, 0, 0, 32LL << 20, 0 }
+
+// Rotate logs per policy with a pthread pool (one file per worker; files of
+// split_bytes or more are split into chunks deflated by all workers)
+int rotate_logs_policy(const char *log_dir, const RotatePolicy *policy, RotateResult *result);
+
+// Free the skipped path list
+void rotate_result_free(RotateResult *result);
+
 // Rotate logs keeping last N files
 int rotate_logs(const char *log_dir, const char *pattern, int keep_count, int compress);
 
 // Compress file to .gz
 int compress_file(const char *input_path, const char *output_path);
 
+// Compress file to .gz as one gzip member built from independently deflated
+// chunks, using up to `threads` threads
+int compress_file_parallel(const char *input_path, const char *output_path, int threads);
+
 // Get ISO 8601 UTC timestamp
 void get_iso_timestamp(char *buffer, size_t size);
 
@@ -1,240 +1,856 @@
 #include "prom_exporter.h"
 #include "cJSON.h"
+#include "telemetry_schema.h"
+#include <stdarg.h>
+#include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <strings.h>
 #include <unistd.h>
-#include <sys/socket.h>
-#include <netinet/in.h>
-#include <arpa/inet.h>
+#include <dirent.h>
 #include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <time.h>
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <sys/epoll.h>
+#include <sys/signalfd.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/timerfd.h>
 
-#define BUFFER_SIZE 8192
+#define READ_BUF_SIZE (64 * 1024)
+#define TAIL_WINDOW (64 * 1024)          // bytes read from an existing log on open
+#define OUT_MAX (4 * 1024 * 1024)        // pending response bytes per connection
+#define DIR_SCAN_INTERVAL 1.0
+#define MAX_EVENTS 64
 
-// Initialize exporter
-int prom_exporter_init(PromExporter *exporter, int port, const char *sample_log_path) {
-    if (!exporter) return -1;
-    
-    memset(exporter, 0, sizeof(PromExporter));
-    exporter->port = port;
-    strncpy(exporter->sample_log_path, sample_log_path, sizeof(exporter->sample_log_path) - 1);
-    
-    // Create socket
-    exporter->socket_fd = socket(AF_INET, SOCK_STREAM, 0);
+// epoll user data tags; clients are TAG_CLIENT_BASE + slot
+enum { TAG_LISTEN = 1, TAG_TIMER, TAG_SIGNAL, TAG_CLIENT_BASE = 16 };
+
+static double now_sec(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+// ---------------------------------------------------------------------------
+// Sample log tailing
+// ---------------------------------------------------------------------------
+
+static void source_init(PromSource *src, const char *path) {
+    memset(src, 0, sizeof(*src));
+    src->fd = -1;
+    strncpy(src->path, path, sizeof(src->path) - 1);
+
+    // Label defaults to the file stem until a sample provides its run_id
+    const char *base = strrchr(path, '/');
+    base = base ? base + 1 : path;
+    size_t len = strlen(base);
+    if (len > 6 && strcmp(base + len - 6, ".jsonl") == 0) len -= 6;
+    if (len >= sizeof(src->run_id)) len = sizeof(src->run_id) - 1;
+    memcpy(src->run_id, base, len);
+    src->run_id[len] = '\0';
+}
+
+static void source_close(PromSource *src) {
+    if (src->fd >= 0) close(src->fd);
+    src->fd = -1;
+    src->partial_len = 0;
+}
+
+static int source_open(PromSource *src) {
+    int fd = open(src->path, O_RDONLY | O_CLOEXEC);
+    if (fd < 0) return -1;
+
+    struct stat st;
+    if (fstat(fd, &st) != 0) {
+        close(fd);
+        return -1;
+    }
+    src->fd = fd;
+    src->dev = st.st_dev;
+    src->ino = st.st_ino;
+    src->partial_len = 0;
+    src->skip_partial = 0;
+    src->offset = 0;
+
+    // Only the tail matters: start near the end and drop the first fragment
+    // unless the window happens to begin on a line boundary.
+    if (st.st_size > TAIL_WINDOW) {
+        src->offset = st.st_size - TAIL_WINDOW;
+        char prev = '\n';
+        if (pread(fd, &prev, 1, src->offset - 1) == 1 && prev != '\n') {
+            src->skip_partial = 1;
+        }
+    }
+    return 0;
+}
+
+static void source_append_partial(PromSource *src, const char *data, size_t len) {
+    size_t room = sizeof(src->partial) - src->partial_len;
+    if (len > room) len = room;  // oversized line: keep a prefix, it will fail to parse
+    memcpy(src->partial + src->partial_len, data, len);
+    src->partial_len += len;
+}
+
+// First numeric value under the field's canonical name or any alias
+static double number_field(const cJSON *root, const char *name) {
+    const TelemetryField *field = telemetry_field_find(name);
+    const cJSON *item = cJSON_GetObjectItemCaseSensitive(root, name);
+    for (const char *const *alias = field ? field->aliases : NULL;
+         !cJSON_IsNumber(item) && alias && *alias; alias++) {
+        item = cJSON_GetObjectItemCaseSensitive(root, *alias);
+    }
+    return cJSON_IsNumber(item) ? item->valuedouble : 0.0;
+}
+
+// Parse one sample record. Field names resolve through telemetry_schema, so
+// core_c (rss_bytes, fds_open, ...) and Python monitor logs both work.
+static int source_parse(PromSource *src, const char *line, size_t len) {
+    cJSON *root = cJSON_ParseWithLength(line, len);
+    if (!root) return -1;
+
+    const cJSON *event = cJSON_GetObjectItemCaseSensitive(root, "event");
+    if (!cJSON_IsString(event) || strcmp(event->valuestring, "sample") != 0) {
+        cJSON_Delete(root);
+        return -1;
+    }
+
+    PromMetrics *m = &src->metrics;
+    m->cpu_percent = number_field(root, "cpu_percent");
+    m->rss_bytes = number_field(root, "memory_rss");
+    m->vms_bytes = number_field(root, "memory_vms");
+    m->threads = number_field(root, "threads");
+    m->fds_open = number_field(root, "open_files");
+    m->read_bytes = number_field(root, "read_bytes");
+    m->write_bytes = number_field(root, "write_bytes");
+    m->cpu_max = number_field(root, "cpu_max");
+    m->rss_max = number_field(root, "memory_rss_max");
+
+    const cJSON *run_id = cJSON_GetObjectItemCaseSensitive(root, "run_id");
+    if (cJSON_IsString(run_id) && run_id->valuestring[0]) {
+        strncpy(src->run_id, run_id->valuestring, sizeof(src->run_id) - 1);
+        src->run_id[sizeof(src->run_id) - 1] = '\0';
+    }
+
+    src->has_sample = 1;
+    cJSON_Delete(root);
+    return 0;
+}
+
+// Read everything appended since the last call. Only the newest sample line
+// is parsed; returns 1 if the source's metrics changed.
+static int source_drain(PromSource *src, char *buf) {
+    char last[PROM_LINE_MAX];
+    size_t last_len = 0;
+
+    for (;;) {
+        ssize_t n = pread(src->fd, buf, READ_BUF_SIZE, src->offset);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) break;
+        src->offset += n;
+
+        const char *chunk = buf;
+        const char *end = buf + n;
+        while (chunk < end) {
+            const char *nl = memchr(chunk, '\n', (size_t)(end - chunk));
+            if (!nl) {
+                source_append_partial(src, chunk, (size_t)(end - chunk));
+                break;
+            }
+
+            const char *line = chunk;
+            size_t len = (size_t)(nl - chunk);
+            if (src->partial_len > 0) {
+                source_append_partial(src, chunk, len);
+                line = src->partial;
+                len = src->partial_len;
+            }
+
+            if (src->skip_partial) {
+                src->skip_partial = 0;
+            } else if (len < sizeof(last) && memmem(line, len, "\"sample\"", 8)) {
+                memcpy(last, line, len);
+                last_len = len;
+            }
+            src->partial_len = 0;
+            chunk = nl + 1;
+        }
+    }
+
+    return last_len > 0 && source_parse(src, last, last_len) == 0;
+}
+
+static int source_refresh(PromSource *src, char *buf) {
+    int changed = 0;
+
+    if (src->fd >= 0) {
+        struct stat path_st;
+        if (stat(src->path, &path_st) == 0 &&
+            (path_st.st_dev != src->dev || path_st.st_ino != src->ino)) {
+            // Rotated: finish the old file, then follow the path
+            changed |= source_drain(src, buf);
+            source_close(src);
+        }
+    }
+
+    if (src->fd < 0) {
+        if (source_open(src) != 0) return changed;
+    } else {
+        struct stat st;
+        if (fstat(src->fd, &st) == 0 && st.st_size < src->offset) {
+            // Truncated in place
+            src->offset = 0;
+            src->partial_len = 0;
+            src->skip_partial = 0;
+        }
+    }
+
+    return changed | source_drain(src, buf);
+}
+
+static PromSource *find_source(PromExporter *exporter, const char *path) {
+    for (size_t i = 0; i < exporter->source_count; i++) {
+        if (strcmp(exporter->sources[i].path, path) == 0) return &exporter->sources[i];
+    }
+    return NULL;
+}
+
+// Track *.jsonl in --log-dir (alert logs excluded); drop logs that vanished
+static void scan_log_dir(PromExporter *exporter) {
+    for (size_t i = 0; i < exporter->source_count;) {
+        if (access(exporter->sources[i].path, F_OK) != 0 && errno == ENOENT) {
+            source_close(&exporter->sources[i]);
+            exporter->sources[i] = exporter->sources[--exporter->source_count];
+            exporter->cache_valid = 0;
+        } else {
+            i++;
+        }
+    }
+
+    DIR *dir = opendir(exporter->log_dir);
+    if (!dir) return;
+
+    struct dirent *entry;
+    while ((entry = readdir(dir)) != NULL) {
+        const char *name = entry->d_name;
+        size_t len = strlen(name);
+        if (len <= 6 || strcmp(name + len - 6, ".jsonl") != 0) continue;
+        if (strncmp(name, "alerts", 6) == 0) continue;
+
+        char path[sizeof(exporter->sources[0].path)];
+        int n = snprintf(path, sizeof(path), "%s/%s", exporter->log_dir, name);
+        if (n < 0 || (size_t)n >= sizeof(path)) continue;
+        if (find_source(exporter, path)) continue;
+
+        if (exporter->source_count >= PROM_MAX_SOURCES) {
+            fprintf(stderr, "Warning: more than %d logs in %s, ignoring the rest\n",
+                    PROM_MAX_SOURCES, exporter->log_dir);
+            break;
+        }
+        source_init(&exporter->sources[exporter->source_count++], path);
+    }
+    closedir(dir);
+}
+
+static void refresh_sources(PromExporter *exporter) {
+    if (exporter->log_dir[0]) {
+        double now = now_sec();
+        if (now - exporter->last_scan >= DIR_SCAN_INTERVAL) {
+            scan_log_dir(exporter);
+            exporter->last_scan = now;
+        }
+    }
+    for (size_t i = 0; i < exporter->source_count; i++) {
+        if (source_refresh(&exporter->sources[i], exporter->read_buf)) {
+            exporter->cache_valid = 0;
+        }
+    }
+}
+
+// ---------------------------------------------------------------------------
+// Metrics text (rendered once per change, served from cache)
+// ---------------------------------------------------------------------------
+
+typedef struct {
+    const char *name;
+    const char *help;
+    const char *type;
+    const char *format;
+    size_t offset;
+} MetricFamily;
+
+static const MetricFamily FAMILIES[] = {
+    { "zencube_cpu_percent", "CPU usage percentage", "gauge", "%.2f",
+      offsetof(PromMetrics, cpu_percent) },
+    { "zencube_memory_rss_bytes", "RSS memory in bytes", "gauge", "%.0f",
+      offsetof(PromMetrics, rss_bytes) },
+    { "zencube_memory_vms_bytes", "VMS memory in bytes", "gauge", "%.0f",
+      offsetof(PromMetrics, vms_bytes) },
+    { "zencube_threads", "Thread count", "gauge", "%.0f",
+      offsetof(PromMetrics, threads) },
+    { "zencube_fds_open", "Open file descriptors", "gauge", "%.0f",
+      offsetof(PromMetrics, fds_open) },
+    { "zencube_io_read_bytes_total", "Cumulative read bytes", "counter", "%.0f",
+      offsetof(PromMetrics, read_bytes) },
+    { "zencube_io_write_bytes_total", "Cumulative write bytes", "counter", "%.0f",
+      offsetof(PromMetrics, write_bytes) },
+    { "zencube_cpu_max_percent", "Maximum CPU percentage observed", "gauge", "%.2f",
+      offsetof(PromMetrics, cpu_max) },
+    { "zencube_memory_rss_max_bytes", "Maximum RSS observed", "gauge", "%.0f",
+      offsetof(PromMetrics, rss_max) },
+};
+
+static int cache_append(PromExporter *exporter, const char *fmt, ...) {
+    for (;;) {
+        size_t room = exporter->cache_cap - exporter->cache_len;
+        va_list args;
+        va_start(args, fmt);
+        int n = vsnprintf(exporter->cache + exporter->cache_len, room, fmt, args);
+        va_end(args);
+        if (n < 0) return -1;
+        if ((size_t)n < room) {
+            exporter->cache_len += (size_t)n;
+            return 0;
+        }
+
+        size_t cap = exporter->cache_cap * 2;
+        while (cap - exporter->cache_len <= (size_t)n) cap *= 2;
+        char *grown = realloc(exporter->cache, cap);
+        if (!grown) return -1;
+        exporter->cache = grown;
+        exporter->cache_cap = cap;
+    }
+}
+
+// Escape a label value per the exposition format (\\, \", \n)
+static void escape_label(char *out, size_t size, const char *value) {
+    size_t j = 0;
+    for (const char *p = value; *p && j + 2 < size; p++) {
+        if (*p == '\\' || *p == '"') {
+            out[j++] = '\\';
+            out[j++] = *p;
+        } else if (*p == '\n') {
+            out[j++] = '\\';
+            out[j++] = 'n';
+        } else {
+            out[j++] = *p;
+        }
+    }
+    out[j] = '\0';
+}
+
+static int render_metrics(PromExporter *exporter) {
+    exporter->cache_len = 0;
+    exporter->sampled_sources = 0;
+    for (size_t i = 0; i < exporter->source_count; i++) {
+        if (exporter->sources[i].has_sample) exporter->sampled_sources++;
+    }
+
+    for (size_t f = 0; f < sizeof(FAMILIES) / sizeof(FAMILIES[0]); f++) {
+        const MetricFamily *family = &FAMILIES[f];
+        if (cache_append(exporter, "# HELP %s %s\n# TYPE %s %s\n",
+                         family->name, family->help, family->name, family->type) != 0) {
+            return -1;
+        }
+
+        for (size_t i = 0; i < exporter->source_count; i++) {
+            const PromSource *src = &exporter->sources[i];
+            if (!src->has_sample) continue;
+
+            double value = *(const double *)((const char *)&src->metrics + family->offset);
+            char number[64];
+            snprintf(number, sizeof(number), family->format, value);
+
+            int rc;
+            if (exporter->labelled) {
+                char label[2 * sizeof(src->run_id)];
+                escape_label(label, sizeof(label), src->run_id);
+                rc = cache_append(exporter, "%s{run_id=\"%s\"} %s\n", family->name, label, number);
+            } else {
+                rc = cache_append(exporter, "%s %s\n", family->name, number);
+            }
+            if (rc != 0) return -1;
+        }
+    }
+
+    exporter->cache_valid = 1;
+    return 0;
+}
+
+// ---------------------------------------------------------------------------
+// HTTP connections
+// ---------------------------------------------------------------------------
+
+static void set_listen_events(PromExporter *exporter, uint32_t events) {
+    struct epoll_event ev = { .events = events, .data.u64 = TAG_LISTEN };
+    epoll_ctl(exporter->epoll_fd, EPOLL_CTL_MOD, exporter->socket_fd, &ev);
+}
+
+static void client_close(PromExporter *exporter, int slot) {
+    PromClient *client = &exporter->clients[slot];
+    if (client->fd < 0) return;
+
+    close(client->fd);  // also removes it from the epoll set
+    free(client->out);
+    memset(client, 0, sizeof(*client));
+    client->fd = -1;
+    exporter->client_count--;
+
+    if (exporter->accept_paused) {
+        exporter->accept_paused = 0;
+        set_listen_events(exporter, EPOLLIN);
+    }
+}
+
+static int client_queue(PromClient *client, const char *data, size_t len) {
+    if (client->out_sent == client->out_len) {
+        client->out_sent = client->out_len = 0;
+    }
+    if (client->out_len - client->out_sent + len > OUT_MAX) return -1;
+
+    if (client->out_len + len > client->out_cap) {
+        size_t cap = client->out_cap ? client->out_cap : 4096;
+        while (cap < client->out_len + len) cap *= 2;
+        char *grown = realloc(client->out, cap);
+        if (!grown) return -1;
+        client->out = grown;
+        client->out_cap = cap;
+    }
+    memcpy(client->out + client->out_len, data, len);
+    client->out_len += len;
+    return 0;
+}
+
+static int client_respond(PromClient *client, const char *status, const char *content_type,
+                          const char *body, size_t body_len,
+                          const char *tail, size_t tail_len, int head_only) {
+    char header[256];
+    int n = snprintf(header, sizeof(header),
+                     "HTTP/1.1 %s\r\n"
+                     "Content-Type: %s\r\n"
+                     "Content-Length: %zu\r\n"
+                     "%s"
+                     "Connection: %s\r\n"
+                     "\r\n",
+                     status, content_type, body_len + tail_len,
+                     strncmp(status, "405", 3) == 0 ? "Allow: GET, HEAD\r\n" : "",
+                     client->close_after_write ? "close" : "keep-alive");
+    if (client_queue(client, header, (size_t)n) != 0) return -1;
+    if (head_only) return 0;
+    if (body_len && client_queue(client, body, body_len) != 0) return -1;
+    if (tail_len && client_queue(client, tail, tail_len) != 0) return -1;
+    return 0;
+}
+
+// Case-insensitive token search within a header value
+static int header_has_token(const char *value, size_t len, const char *token) {
+    size_t token_len = strlen(token);
+    for (size_t i = 0; i + token_len <= len; i++) {
+        if (strncasecmp(value + i, token, token_len) == 0) return 1;
+    }
+    return 0;
+}
+
+static int serve_metrics(PromExporter *exporter, PromClient *client, int head_only) {
+    if (!exporter->cache_valid && render_metrics(exporter) != 0) {
+        static const char body[] = "Server Error\n";
+        return client_respond(client, "500 Internal Server Error", "text/plain",
+                              body, sizeof(body) - 1, NULL, 0, head_only);
+    }
+    if (exporter->sampled_sources == 0) {
+        static const char body[] = "No metrics found\n";
+        return client_respond(client, "503 Service Unavailable", "text/plain",
+                              body, sizeof(body) - 1, NULL, 0, head_only);
+    }
+
+    exporter->scrapes++;
+    char self[512];
+    int n = snprintf(self, sizeof(self),
+                     "# HELP zencube_exporter_scrapes_total Metrics requests served\n"
+                     "# TYPE zencube_exporter_scrapes_total counter\n"
+                     "zencube_exporter_scrapes_total %lu\n"
+                     "# HELP zencube_exporter_sources Sample logs being tailed\n"
+                     "# TYPE zencube_exporter_sources gauge\n"
+                     "zencube_exporter_sources %zu\n"
+                     "# HELP zencube_exporter_connections Open HTTP connections\n"
+                     "# TYPE zencube_exporter_connections gauge\n"
+                     "zencube_exporter_connections %d\n",
+                     exporter->scrapes, exporter->source_count, exporter->client_count);
+    return client_respond(client, "200 OK", "text/plain; version=0.0.4",
+                          exporter->cache, exporter->cache_len, self, (size_t)n, head_only);
+}
+
+// Answer every complete request in the input buffer (pipelining allowed)
+static int client_handle_requests(PromExporter *exporter, PromClient *client) {
+    while (!client->close_after_write) {
+        char *end = memmem(client->in, client->in_len, "\r\n\r\n", 4);
+        if (!end) {
+            if (client->in_len == sizeof(client->in)) {
+                static const char body[] = "Request Header Fields Too Large\n";
+                client->close_after_write = 1;
+                client->in_len = 0;
+                return client_respond(client, "431 Request Header Fields Too Large", "text/plain",
+                                      body, sizeof(body) - 1, NULL, 0, 0);
+            }
+            return 0;
+        }
+        size_t head_len = (size_t)(end - client->in) + 4;
+
+        // Request line: METHOD SP TARGET SP VERSION
+        const char *line_end = memchr(client->in, '\r', head_len);
+        const char *method = client->in;
+        const char *sp1 = memchr(method, ' ', (size_t)(line_end - method));
+        const char *target = sp1 ? sp1 + 1 : NULL;
+        const char *sp2 = target ? memchr(target, ' ', (size_t)(line_end - target)) : NULL;
+        if (!sp2) {
+            static const char body[] = "Bad Request\n";
+            client->close_after_write = 1;
+            return client_respond(client, "400 Bad Request", "text/plain",
+                                  body, sizeof(body) - 1, NULL, 0, 0);
+        }
+        size_t method_len = (size_t)(sp1 - method);
+        size_t target_len = (size_t)(sp2 - target);
+        const char *version = sp2 + 1;
+
+        int keep_alive = (size_t)(line_end - version) == 8 && strncmp(version, "HTTP/1.1", 8) == 0;
+        int has_body = 0;
+        for (const char *h = line_end + 2; h < end;) {
+            const char *h_end = memchr(h, '\r', (size_t)(end + 2 - h));
+            const char *colon = memchr(h, ':', (size_t)(h_end - h));
+            if (colon) {
+                size_t name_len = (size_t)(colon - h);
+                const char *value = colon + 1;
+                size_t value_len = (size_t)(h_end - value);
+                if (name_len == 10 && strncasecmp(h, "Connection", 10) == 0) {
+                    if (header_has_token(value, value_len, "close")) keep_alive = 0;
+                    if (header_has_token(value, value_len, "keep-alive")) keep_alive = 1;
+                } else if ((name_len == 14 && strncasecmp(h, "Content-Length", 14) == 0 &&
+                            strtol(value, NULL, 10) > 0) ||
+                           (name_len == 17 && strncasecmp(h, "Transfer-Encoding", 17) == 0)) {
+                    has_body = 1;  // bodies are never read; close instead of desyncing
+                }
+            }
+            h = h_end + 2;
+        }
+        client->close_after_write = !keep_alive || has_body;
+
+        int is_get = method_len == 3 && strncmp(method, "GET", 3) == 0;
+        int is_head = method_len == 4 && strncmp(method, "HEAD", 4) == 0;
+        int is_metrics = target_len >= 8 && strncmp(target, "/metrics", 8) == 0 &&
+                         (target_len == 8 || target[8] == '?');
+
+        int rc;
+        if (!is_get && !is_head) {
+            static const char body[] = "Method Not Allowed\n";
+            rc = client_respond(client, "405 Method Not Allowed", "text/plain",
+                                body, sizeof(body) - 1, NULL, 0, 0);
+        } else if (!is_metrics) {
+            static const char body[] = "Not Found";
+            rc = client_respond(client, "404 Not Found", "text/plain",
+                                body, sizeof(body) - 1, NULL, 0, is_head);
+        } else {
+            rc = serve_metrics(exporter, client, is_head);
+        }
+        if (rc != 0) return -1;
+
+        memmove(client->in, client->in + head_len, client->in_len - head_len);
+        client->in_len -= head_len;
+    }
+    return 0;
+}
+
+// Write as much pending output as the socket takes; -1 closes the client
+static int client_flush(PromExporter *exporter, int slot) {
+    PromClient *client = &exporter->clients[slot];
+    while (client->out_sent < client->out_len) {
+        ssize_t n = send(client->fd, client->out + client->out_sent,
+                         client->out_len - client->out_sent, MSG_NOSIGNAL);
+        if (n < 0) {
+            if (errno == EINTR) continue;
+            if (errno == EAGAIN || errno == EWOULDBLOCK) break;
+            return -1;
+        }
+        client->out_sent += (size_t)n;
+    }
+
+    int pending = client->out_sent < client->out_len;
+    if (!pending && client->close_after_write) return -1;
+
+    // Once the last response is queued, stop reading and wait for writability
+    uint32_t events = (client->close_after_write ? 0 : EPOLLIN | EPOLLRDHUP) |
+                      (pending ? EPOLLOUT : 0);
+    if (events != client->events) {
+        struct epoll_event ev = { .events = events, .data.u64 = TAG_CLIENT_BASE + (uint64_t)slot };
+        epoll_ctl(exporter->epoll_fd, EPOLL_CTL_MOD, client->fd, &ev);
+        client->events = events;
+    }
+    return 0;
+}
+
+static int client_read(PromExporter *exporter, int slot) {
+    PromClient *client = &exporter->clients[slot];
+    int eof = 0;
+    while (client->in_len < sizeof(client->in)) {
+        ssize_t n = recv(client->fd, client->in + client->in_len,
+                         sizeof(client->in) - client->in_len, 0);
+        if (n > 0) {
+            client->in_len += (size_t)n;
+            continue;
+        }
+        if (n == 0) {
+            eof = 1;  // half-close: still answer what was sent
+            break;
+        }
+        if (errno == EINTR) continue;
+        if (errno == EAGAIN || errno == EWOULDBLOCK) break;
+        return -1;
+    }
+    client->last_active = now_sec();
+
+    if (client_handle_requests(exporter, client) != 0) return -1;
+    if (eof) client->close_after_write = 1;
+    return client_flush(exporter, slot);
+}
+
+static void accept_clients(PromExporter *exporter) {
+    for (;;) {
+        if (exporter->client_count >= exporter->max_clients) {
+            // Bounded: leave further connections in the kernel backlog
+            exporter->accept_paused = 1;
+            set_listen_events(exporter, 0);
+            return;
+        }
+
+        int fd = accept4(exporter->socket_fd, NULL, NULL, SOCK_NONBLOCK | SOCK_CLOEXEC);
+        if (fd < 0) {
+            if (errno == EINTR || errno == ECONNABORTED) continue;
+            if (errno != EAGAIN && errno != EWOULDBLOCK) perror("accept");
+            return;
+        }
+
+        int slot = 0;
+        while (exporter->clients[slot].fd >= 0) slot++;
+
+        int one = 1;
+        setsockopt(fd, IPPROTO_TCP, TCP_NODELAY, &one, sizeof(one));
+
+        struct epoll_event ev = {
+            .events = EPOLLIN | EPOLLRDHUP,
+            .data.u64 = TAG_CLIENT_BASE + (uint64_t)slot
+        };
+        if (epoll_ctl(exporter->epoll_fd, EPOLL_CTL_ADD, fd, &ev) != 0) {
+            close(fd);
+            continue;
+        }
+
+        PromClient *client = &exporter->clients[slot];
+        client->fd = fd;
+        client->events = ev.events;
+        client->last_active = now_sec();
+        exporter->client_count++;
+    }
+}
+
+static void close_idle_clients(PromExporter *exporter) {
+    double now = now_sec();
+    for (int i = 0; i < exporter->max_clients; i++) {
+        PromClient *client = &exporter->clients[i];
+        if (client->fd >= 0 && client->out_sent == client->out_len &&
+            now - client->last_active > exporter->idle_timeout) {
+            client_close(exporter, i);
+        }
+    }
+}
+
+// ---------------------------------------------------------------------------
+// Lifecycle
+// ---------------------------------------------------------------------------
+
+static int open_listener(PromExporter *exporter) {
+    struct sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_port = htons(exporter->port);
+    if (inet_pton(AF_INET, exporter->bind_addr, &addr.sin_addr) != 1) {
+        fprintf(stderr, "Invalid bind address: %s\n", exporter->bind_addr);
+        return -1;
+    }
+
+    exporter->socket_fd = socket(AF_INET, SOCK_STREAM | SOCK_NONBLOCK | SOCK_CLOEXEC, 0);
     if (exporter->socket_fd < 0) {
         perror("socket");
         return -1;
     }
-    
-    // Allow port reuse
+
     int opt = 1;
     setsockopt(exporter->socket_fd, SOL_SOCKET, SO_REUSEADDR, &opt, sizeof(opt));
-    
-    // Bind to port
-    struct sockaddr_in addr;
-    memset(&addr, 0, sizeof(addr));
-    addr.sin_family = AF_INET;
-    addr.sin_addr.s_addr = INADDR_ANY;
-    addr.sin_port = htons(port);
-    
+
     if (bind(exporter->socket_fd, (struct sockaddr*)&addr, sizeof(addr)) < 0) {
         perror("bind");
-        close(exporter->socket_fd);
         return -1;
     }
-    
-    // Listen
-    if (listen(exporter->socket_fd, 5) < 0) {
+    if (listen(exporter->socket_fd, SOMAXCONN) < 0) {
         perror("listen");
-        close(exporter->socket_fd);
         return -1;
     }
-    
     return 0;
 }
 
-// Read latest metrics from JSONL
-static int read_latest_metrics(const char *log_path, PromMetrics *metrics) {
-    FILE *fp = fopen(log_path, "r");
-    if (!fp) return -1;
-    
-    memset(metrics, 0, sizeof(PromMetrics));
-    
-    char line[2048];
-    char last_line[2048] = {0};
-    
-    // Read to last line
-    while (fgets(line, sizeof(line), fp)) {
-        strncpy(last_line, line, sizeof(last_line) - 1);
-        last_line[sizeof(last_line) - 1] = '\0';  // Ensure null termination
-    }
-    fclose(fp);
-    
-    if (last_line[0] == '\0') return -1;
-    
-    // Parse last sample
-    cJSON *sample = cJSON_Parse(last_line);
-    if (!sample) return -1;
-    
-    cJSON *event = cJSON_GetObjectItem(sample, "event");
-    if (!event || strcmp(event->valuestring, "sample") != 0) {
-        cJSON_Delete(sample);
+static int add_watch(PromExporter *exporter, int fd, uint64_t tag) {
+    struct epoll_event ev = { .events = EPOLLIN, .data.u64 = tag };
+    return epoll_ctl(exporter->epoll_fd, EPOLL_CTL_ADD, fd, &ev);
+}
+
+int prom_exporter_init(PromExporter *exporter, const PromExporterConfig *config) {
+    if (!exporter || !config) return -1;
+
+    memset(exporter, 0, sizeof(PromExporter));
+    exporter->socket_fd = exporter->epoll_fd = exporter->timer_fd = exporter->signal_fd = -1;
+    exporter->port = config->port;
+    strncpy(exporter->bind_addr, config->bind_addr ? config->bind_addr : "0.0.0.0",
+            sizeof(exporter->bind_addr) - 1);
+    if (config->log_dir) {
+        strncpy(exporter->log_dir, config->log_dir, sizeof(exporter->log_dir) - 1);
+    }
+    exporter->labelled = config->log_dir != NULL || config->log_count > 1;
+    exporter->refresh_interval = config->refresh_interval > 0 ? config->refresh_interval : 0.5;
+    exporter->idle_timeout = config->idle_timeout > 0 ? config->idle_timeout : 30.0;
+    exporter->max_clients = config->max_clients > 0 ? config->max_clients : 256;
+
+    if (config->log_count > PROM_MAX_SOURCES) {
+        fprintf(stderr, "Too many logs (max %d)\n", PROM_MAX_SOURCES);
         return -1;
     }
-    
-    // Extract metrics
-    cJSON *item;
-    if ((item = cJSON_GetObjectItem(sample, "cpu_percent"))) 
-        metrics->cpu_percent = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "rss_bytes"))) 
-        metrics->rss_bytes = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "vms_bytes"))) 
-        metrics->vms_bytes = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "threads"))) 
-        metrics->threads = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "fds_open"))) 
-        metrics->fds_open = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "read_bytes"))) 
-        metrics->read_bytes = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "write_bytes"))) 
-        metrics->write_bytes = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "cpu_max"))) 
-        metrics->cpu_max = item->valuedouble;
-    if ((item = cJSON_GetObjectItem(sample, "rss_max"))) 
-        metrics->rss_max = item->valuedouble;
-    
-    cJSON_Delete(sample);
+
+    exporter->sources = calloc(PROM_MAX_SOURCES, sizeof(PromSource));
+    exporter->clients = calloc((size_t)exporter->max_clients, sizeof(PromClient));
+    exporter->read_buf = malloc(READ_BUF_SIZE);
+    exporter->cache_cap = 8192;
+    exporter->cache = malloc(exporter->cache_cap);
+    for (int i = 0; exporter->clients && i < exporter->max_clients; i++) exporter->clients[i].fd = -1;
+    if (!exporter->sources || !exporter->clients || !exporter->read_buf || !exporter->cache) {
+        perror("malloc");
+        prom_exporter_cleanup(exporter);
+        return -1;
+    }
+    for (int i = 0; i < config->log_count; i++) {
+        source_init(&exporter->sources[exporter->source_count++], config->log_paths[i]);
+    }
+
+    if (open_listener(exporter) != 0) {
+        prom_exporter_cleanup(exporter);
+        return -1;
+    }
+
+    sigset_t mask;
+    sigemptyset(&mask);
+    sigaddset(&mask, SIGINT);
+    sigaddset(&mask, SIGTERM);
+    sigprocmask(SIG_BLOCK, &mask, NULL);
+
+    exporter->epoll_fd = epoll_create1(EPOLL_CLOEXEC);
+    exporter->timer_fd = timerfd_create(CLOCK_MONOTONIC, TFD_NONBLOCK | TFD_CLOEXEC);
+    exporter->signal_fd = signalfd(-1, &mask, SFD_NONBLOCK | SFD_CLOEXEC);
+    if (exporter->epoll_fd < 0 || exporter->timer_fd < 0 || exporter->signal_fd < 0) {
+        perror("epoll/timerfd/signalfd");
+        prom_exporter_cleanup(exporter);
+        return -1;
+    }
+
+    struct itimerspec its;
+    its.it_interval.tv_sec = (time_t)exporter->refresh_interval;
+    its.it_interval.tv_nsec = (long)((exporter->refresh_interval - (double)its.it_interval.tv_sec) * 1e9);
+    its.it_value = its.it_interval;
+    if (timerfd_settime(exporter->timer_fd, 0, &its, NULL) != 0 ||
+        add_watch(exporter, exporter->socket_fd, TAG_LISTEN) != 0 ||
+        add_watch(exporter, exporter->timer_fd, TAG_TIMER) != 0 ||
+        add_watch(exporter, exporter->signal_fd, TAG_SIGNAL) != 0) {
+        perror("epoll_ctl");
+        prom_exporter_cleanup(exporter);
+        return -1;
+    }
+
+    // Prime sources so the first scrape is already answerable
+    refresh_sources(exporter);
     return 0;
 }
 
-// Generate Prometheus metrics text
-static char* generate_metrics_text(const PromMetrics *metrics) {
-    char *buffer = malloc(BUFFER_SIZE);
-    if (!buffer) return NULL;
-    
-    int offset = 0;
-    
-    // Helper macro - avoid variadic macro warnings by using separate macros
-    #define APPEND_STR(str) offset += snprintf(buffer + offset, BUFFER_SIZE - offset, "%s", str)
-    #define APPEND_FMT(fmt, ...) offset += snprintf(buffer + offset, BUFFER_SIZE - offset, fmt, __VA_ARGS__)
-    
-    APPEND_STR("# HELP zencube_cpu_percent CPU usage percentage\n");
-    APPEND_STR("# TYPE zencube_cpu_percent gauge\n");
-    APPEND_FMT("zencube_cpu_percent %.2f\n", metrics->cpu_percent);
-    
-    APPEND_STR("# HELP zencube_memory_rss_bytes RSS memory in bytes\n");
-    APPEND_STR("# TYPE zencube_memory_rss_bytes gauge\n");
-    APPEND_FMT("zencube_memory_rss_bytes %.0f\n", metrics->rss_bytes);
-    
-    APPEND_STR("# HELP zencube_memory_vms_bytes VMS memory in bytes\n");
-    APPEND_STR("# TYPE zencube_memory_vms_bytes gauge\n");
-    APPEND_FMT("zencube_memory_vms_bytes %.0f\n", metrics->vms_bytes);
-    
-    APPEND_STR("# HELP zencube_threads Thread count\n");
-    APPEND_STR("# TYPE zencube_threads gauge\n");
-    APPEND_FMT("zencube_threads %.0f\n", metrics->threads);
-    
-    APPEND_STR("# HELP zencube_fds_open Open file descriptors\n");
-    APPEND_STR("# TYPE zencube_fds_open gauge\n");
-    APPEND_FMT("zencube_fds_open %.0f\n", metrics->fds_open);
-    
-    APPEND_STR("# HELP zencube_io_read_bytes_total Cumulative read bytes\n");
-    APPEND_STR("# TYPE zencube_io_read_bytes_total counter\n");
-    APPEND_FMT("zencube_io_read_bytes_total %.0f\n", metrics->read_bytes);
-    
-    APPEND_STR("# HELP zencube_io_write_bytes_total Cumulative write bytes\n");
-    APPEND_STR("# TYPE zencube_io_write_bytes_total counter\n");
-    APPEND_FMT("zencube_io_write_bytes_total %.0f\n", metrics->write_bytes);
-    
-    APPEND_STR("# HELP zencube_cpu_max_percent Maximum CPU percentage observed\n");
-    APPEND_STR("# TYPE zencube_cpu_max_percent gauge\n");
-    APPEND_FMT("zencube_cpu_max_percent %.2f\n", metrics->cpu_max);
-    
-    APPEND_STR("# HELP zencube_memory_rss_max_bytes Maximum RSS observed\n");
-    APPEND_STR("# TYPE zencube_memory_rss_max_bytes gauge\n");
-    APPEND_FMT("zencube_memory_rss_max_bytes %.0f\n", metrics->rss_max);
-    
-    #undef APPEND_STR
-    #undef APPEND_FMT
-    
-    return buffer;
-}
-
-// Handle HTTP request
-static void handle_request(int client_fd, const char *log_path) {
-    char request[1024];
-    ssize_t n = recv(client_fd, request, sizeof(request) - 1, 0);
-    if (n <= 0) return;
-    request[n] = '\0';
-    
-    // Check for GET /metrics
-    if (strstr(request, "GET /metrics") == NULL) {
-        const char *response = "HTTP/1.1 404 Not Found\r\nContent-Length: 9\r\n\r\nNot Found";
-        send(client_fd, response, strlen(response), 0);
-        return;
-    }
-    
-    // Read metrics
-    PromMetrics metrics;
-    if (read_latest_metrics(log_path, &metrics) != 0) {
-        const char *response = "HTTP/1.1 503 Service Unavailable\r\nContent-Length: 17\r\n\r\nNo metrics found\n";
-        send(client_fd, response, strlen(response), 0);
-        return;
-    }
-    
-    // Generate metrics text
-    char *metrics_text = generate_metrics_text(&metrics);
-    if (!metrics_text) {
-        const char *response = "HTTP/1.1 500 Internal Server Error\r\nContent-Length: 14\r\n\r\nServer Error\n";
-        send(client_fd, response, strlen(response), 0);
-        return;
-    }
-    
-    // Send HTTP response
-    char header[512];
-    snprintf(header, sizeof(header),
-             "HTTP/1.1 200 OK\r\n"
-             "Content-Type: text/plain; version=0.0.4\r\n"
-             "Content-Length: %zu\r\n"
-             "Connection: close\r\n"
-             "\r\n",
-             strlen(metrics_text));
-    
-    send(client_fd, header, strlen(header), 0);
-    send(client_fd, metrics_text, strlen(metrics_text), 0);
-    
-    free(metrics_text);
-}
-
-// Run exporter server
 int prom_exporter_run(PromExporter *exporter) {
-    if (!exporter || exporter->socket_fd < 0) return -1;
-    
-    printf("Prometheus exporter running on port %d\n", exporter->port);
+    if (!exporter || exporter->socket_fd < 0 || exporter->epoll_fd < 0) return -1;
+
+    printf("Prometheus exporter running on %s:%d\n", exporter->bind_addr, exporter->port);
     printf("Metrics available at: http://localhost:%d/metrics\n", exporter->port);
-    
-    while (1) {
-        struct sockaddr_in client_addr;
-        socklen_t client_len = sizeof(client_addr);
-        
-        int client_fd = accept(exporter->socket_fd, (struct sockaddr*)&client_addr, &client_len);
-        if (client_fd < 0) {
-            if (errno == EINTR) continue;  // Interrupted by signal
-            perror("accept");
-            break;
+    fflush(stdout);
+
+    struct epoll_event events[MAX_EVENTS];
+    int running = 1;
+    while (running) {
+        int n = epoll_wait(exporter->epoll_fd, events, MAX_EVENTS, -1);
+        if (n < 0) {
+            if (errno == EINTR) continue;
+            perror("epoll_wait");
+            return -1;
+        }
+
+        for (int i = 0; i < n; i++) {
+            uint64_t tag = events[i].data.u64;
+            if (tag == TAG_LISTEN) {
+                accept_clients(exporter);
+            } else if (tag == TAG_TIMER) {
+                uint64_t expirations;
+                if (read(exporter->timer_fd, &expirations, sizeof(expirations)) < 0) continue;
+                refresh_sources(exporter);
+                close_idle_clients(exporter);
+            } else if (tag == TAG_SIGNAL) {
+                struct signalfd_siginfo info;
+                if (read(exporter->signal_fd, &info, sizeof(info)) == sizeof(info)) running = 0;
+            } else {
+                int slot = (int)(tag - TAG_CLIENT_BASE);
+                if (exporter->clients[slot].fd < 0) continue;  // closed earlier in this batch
+
+                uint32_t ev = events[i].events;
+                int rc = 0;
+                if (ev & EPOLLIN) rc = client_read(exporter, slot);
+                if (rc == 0 && (ev & EPOLLOUT)) rc = client_flush(exporter, slot);
+                if (rc != 0 || (ev & (EPOLLERR | EPOLLHUP))) {
+                    client_close(exporter, slot);
+                }
+            }
         }
-        
-        handle_request(client_fd, exporter->sample_log_path);
-        close(client_fd);
     }
-    
+
+    printf("Prometheus exporter stopped (%lu scrapes served)\n", exporter->scrapes);
     return 0;
 }
 
-// Cleanup
 void prom_exporter_cleanup(PromExporter *exporter) {
-    if (exporter && exporter->socket_fd >= 0) {
-        close(exporter->socket_fd);
-        exporter->socket_fd = -1;
+    if (!exporter) return;
+
+    if (exporter->clients) {
+        for (int i = 0; i < exporter->max_clients; i++) client_close(exporter, i);
+        free(exporter->clients);
+        exporter->clients = NULL;
+    }
+    if (exporter->sources) {
+        for (size_t i = 0; i < exporter->source_count; i++) source_close(&exporter->sources[i]);
+        free(exporter->sources);
+        exporter->sources = NULL;
+        exporter->source_count = 0;
     }
+
+    int *fds[] = { &exporter->socket_fd, &exporter->epoll_fd, &exporter->timer_fd, &exporter->signal_fd };
+    for (size_t i = 0; i < sizeof(fds) / sizeof(fds[0]); i++) {
+        if (*fds[i] >= 0) close(*fds[i]);
+        *fds[i] = -1;
+    }
+
+    free(exporter->read_buf);
+    free(exporter->cache);
+    exporter->read_buf = NULL;
+    exporter->cache = NULL;
 }
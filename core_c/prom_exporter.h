@@ -1,6 +1,13 @@
 #ifndef ZENCUBE_PROM_EXPORTER_H
 #define ZENCUBE_PROM_EXPORTER_H
 
+#include <stddef.h>
+#include <sys/types.h>
+
+#define PROM_MAX_SOURCES 256
+#define PROM_LINE_MAX 4096
+#define PROM_REQUEST_MAX 8192
+
 // Prometheus metrics structure
 typedef struct {
     double cpu_percent;
@@ -14,17 +21,84 @@ typedef struct {
     double rss_max;
 } PromMetrics;
 
+// One tailed sample log. The fd stays open and only bytes appended since the
+// last refresh are read, so a refresh costs O(new data), not O(file).
+typedef struct {
+    char path[1024];
+    char run_id[128];
+    int fd;
+    dev_t dev;
+    ino_t ino;
+    off_t offset;
+    char partial[PROM_LINE_MAX];   // incomplete trailing line
+    size_t partial_len;
+    int skip_partial;              // started mid-file: drop the first fragment
+    PromMetrics metrics;
+    int has_sample;
+} PromSource;
+
+// One keep-alive HTTP connection
+typedef struct {
+    int fd;
+    char in[PROM_REQUEST_MAX];
+    size_t in_len;
+    char *out;
+    size_t out_len;
+    size_t out_sent;
+    size_t out_cap;
+    int close_after_write;
+    unsigned int events;           // epoll events currently armed
+    double last_active;
+} PromClient;
+
+// Exporter configuration
+typedef struct {
+    int port;
+    const char *bind_addr;         // default 0.0.0.0
+    const char **log_paths;        // explicit sample logs
+    int log_count;
+    const char *log_dir;           // tail every *.jsonl in this directory
+    double refresh_interval;       // seconds between tail reads
+    int max_clients;               // concurrent connections served
+    double idle_timeout;           // seconds before an idle connection closes
+} PromExporterConfig;
+
 // Prometheus exporter state
 typedef struct {
     int socket_fd;
+    int epoll_fd;
+    int timer_fd;
+    int signal_fd;
     int port;
-    char sample_log_path[1024];
+    char bind_addr[64];
+    char log_dir[1024];
+    int labelled;                  // emit run_id labels (more than one source possible)
+    int accept_paused;             // all client slots busy
+    double refresh_interval;
+    double idle_timeout;
+    double last_scan;
+
+    PromSource *sources;
+    size_t source_count;
+
+    PromClient *clients;
+    int max_clients;
+    int client_count;
+
+    char *read_buf;                // shared tail read buffer
+    char *cache;                   // rendered metrics text
+    size_t cache_len;
+    size_t cache_cap;
+    int cache_valid;
+    size_t sampled_sources;        // sources with at least one sample
+    unsigned long scrapes;
 } PromExporter;
 
-// Initialize Prometheus exporter
-int prom_exporter_init(PromExporter *exporter, int port, const char *sample_log_path);
+// Initialize Prometheus exporter. Blocks SIGINT/SIGTERM in the calling
+// thread; they are delivered to the event loop through a signalfd.
+int prom_exporter_init(PromExporter *exporter, const PromExporterConfig *config);
 
-// Run exporter HTTP server (blocking)
+// Run the event loop until SIGINT/SIGTERM (blocking)
 int prom_exporter_run(PromExporter *exporter);
 
 // Cleanup exporter resources
@@ -3,75 +3,90 @@
 #include <stdlib.h>
 #include <string.h>
 #include <getopt.h>
-#include <signal.h>
-
-static PromExporter *global_exporter = NULL;
-
-static void handle_signal(int sig) {
-    (void)sig;
-    if (global_exporter) {
-        prom_exporter_cleanup(global_exporter);
-    }
-    exit(0);
-}
 
 static void print_usage(const char *prog) {
-    fprintf(stderr, "Usage: %s --log <samples.jsonl> [--port <port>]\n", prog);
+    fprintf(stderr, "Usage: %s (--log <samples.jsonl> ... | --log-dir <dir>) [options]\n", prog);
     fprintf(stderr, "Options:\n");
-    fprintf(stderr, "  --log PATH    Sample JSONL log to export\n");
-    fprintf(stderr, "  --port PORT   HTTP server port (default: 9090)\n");
-    fprintf(stderr, "  --help        Show this help\n");
+    fprintf(stderr, "  --log PATH          Sample JSONL log to export (repeatable)\n");
+    fprintf(stderr, "  --log-dir DIR       Export every *.jsonl run log in DIR (alerts* skipped)\n");
+    fprintf(stderr, "  --port PORT         HTTP server port (default: 9090)\n");
+    fprintf(stderr, "  --bind ADDR         IPv4 address to listen on (default: 0.0.0.0)\n");
+    fprintf(stderr, "  --refresh SEC       Log tail interval in seconds (default: 0.5)\n");
+    fprintf(stderr, "  --max-clients N     Concurrent connections served (default: 256)\n");
+    fprintf(stderr, "  --help              Show this help\n");
 }
 
 int main(int argc, char **argv) {
-    char *log_path = NULL;
-    int port = 9090;
-    
+    const char *log_paths[PROM_MAX_SOURCES];
+    PromExporterConfig config;
+    memset(&config, 0, sizeof(config));
+    config.port = 9090;
+    config.bind_addr = "0.0.0.0";
+    config.log_paths = log_paths;
+    config.refresh_interval = 0.5;
+    config.max_clients = 256;
+
     static struct option long_options[] = {
-        {"log",  required_argument, 0, 'l'},
-        {"port", required_argument, 0, 'p'},
-        {"help", no_argument,       0, 'h'},
+        {"log",         required_argument, 0, 'l'},
+        {"log-dir",     required_argument, 0, 'd'},
+        {"port",        required_argument, 0, 'p'},
+        {"bind",        required_argument, 0, 'b'},
+        {"refresh",     required_argument, 0, 'r'},
+        {"max-clients", required_argument, 0, 'm'},
+        {"help",        no_argument,       0, 'h'},
         {0, 0, 0, 0}
     };
-    
+
     int opt;
-    while ((opt = getopt_long(argc, argv, "l:p:h", long_options, NULL)) != -1) {
+    while ((opt = getopt_long(argc, argv, "l:d:p:b:r:m:h", long_options, NULL)) != -1) {
         switch (opt) {
-            case 'l': log_path = optarg; break;
-            case 'p': port = atoi(optarg); break;
+            case 'l':
+                if (config.log_count >= PROM_MAX_SOURCES) {
+                    fprintf(stderr, "Error: At most %d --log arguments\n", PROM_MAX_SOURCES);
+                    return 1;
+                }
+                log_paths[config.log_count++] = optarg;
+                break;
+            case 'd': config.log_dir = optarg; break;
+            case 'p': config.port = atoi(optarg); break;
+            case 'b': config.bind_addr = optarg; break;
+            case 'r': config.refresh_interval = atof(optarg); break;
+            case 'm': config.max_clients = atoi(optarg); break;
             case 'h':
             default:
                 print_usage(argv[0]);
                 return opt == 'h' ? 0 : 1;
         }
     }
-    
-    if (!log_path) {
-        fprintf(stderr, "Error: Missing required --log argument\n");
+
+    if (config.log_count == 0 && !config.log_dir) {
+        fprintf(stderr, "Error: Missing required --log or --log-dir argument\n");
         print_usage(argv[0]);
         return 1;
     }
-    
-    // Initialize exporter
+    if (config.port <= 0 || config.port > 65535 || config.refresh_interval <= 0 ||
+        config.max_clients <= 0) {
+        fprintf(stderr, "Error: --port, --refresh and --max-clients must be positive\n");
+        return 1;
+    }
+
+    // Initialize exporter (SIGINT/SIGTERM are handled by its event loop)
     PromExporter exporter;
-    if (prom_exporter_init(&exporter, port, log_path) != 0) {
+    if (prom_exporter_init(&exporter, &config) != 0) {
         fprintf(stderr, "Failed to initialize Prometheus exporter\n");
         return 1;
     }
-    
-    global_exporter = &exporter;
-    
-    // Setup signal handlers
-    signal(SIGINT, handle_signal);
-    signal(SIGTERM, handle_signal);
-    
+
     printf("Starting Prometheus exporter\n");
-    printf("Sample log: %s\n", log_path);
-    printf("Listening on port: %d\n", port);
-    
+    for (int i = 0; i < config.log_count; i++) {
+        printf("Sample log: %s\n", log_paths[i]);
+    }
+    if (config.log_dir) printf("Log directory: %s\n", config.log_dir);
+    printf("Listening on port: %d\n", config.port);
+
     // Run server (blocking)
     int result = prom_exporter_run(&exporter);
-    
+
     prom_exporter_cleanup(&exporter);
-    return result;
+    return result == 0 ? 0 : 1;
 }
@@ -1,312 +1,640 @@
 #include "sampler.h"
 #include "logutil.h"
-#include "cJSON.h"
+#include "json_emit.h"
+#include <errno.h>
+#include <limits.h>
+#include <fcntl.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <unistd.h>
 #include <dirent.h>
 #include <signal.h>
+#include <sys/epoll.h>
+#include <sys/signalfd.h>
 #include <sys/stat.h>
+#include <sys/syscall.h>
+#include <sys/timerfd.h>
 
-// Parse /proc/<pid>/stat for CPU times
-static int read_proc_stat(int pid, unsigned long *utime, unsigned long *stime) {
-    char path[256];
-    snprintf(path, sizeof(path), "/proc/%d/stat", pid);
-    
-    FILE *fp = fopen(path, "r");
-    if (!fp) return -1;
-    
-    // Skip to fields 14 and 15 (utime, stime)
-    for (int i = 0; i < 13; i++) {
-        if (fscanf(fp, "%*s") != 0) {}
-    }
-    
-    if (fscanf(fp, "%lu %lu", utime, stime) != 2) {
-        fclose(fp);
+// ---------------------------------------------------------------------------
+// /proc readers
+//
+// Every file is opened once per target and re-read with pread() into a stack
+// buffer, so a sample performs no allocation and no open()/close(). Reads on
+// a kept fd fail with ESRCH once the process is gone, which doubles as the
+// liveness check and is immune to PID reuse.
+// ---------------------------------------------------------------------------
+
+#define PROC_BUF_SIZE 1024
+#define DIRENT_BUF_SIZE 4096
+
+struct linux_dirent64 {
+    uint64_t d_ino;
+    int64_t d_off;
+    unsigned short d_reclen;
+    unsigned char d_type;
+    char d_name[];
+};
+
+static int open_proc_file(int pid, const char *name, int flags) {
+    char path[64];
+    snprintf(path, sizeof(path), "/proc/%d/%s", pid, name);
+    return open(path, flags | O_CLOEXEC);
+}
+
+int proc_files_open(ProcFiles *files, int pid) {
+    files->stat_fd = open_proc_file(pid, "stat", O_RDONLY);
+    files->statm_fd = open_proc_file(pid, "statm", O_RDONLY);
+    files->io_fd = open_proc_file(pid, "io", O_RDONLY);          // may be EACCES
+    files->fd_dir_fd = open_proc_file(pid, "fd", O_RDONLY | O_DIRECTORY);
+    if (files->stat_fd < 0 || files->statm_fd < 0) {
+        proc_files_close(files);
         return -1;
     }
-    
-    fclose(fp);
     return 0;
 }
 
-// Parse /proc/<pid>/status for RSS
-static int read_proc_status(int pid, uint64_t *rss, uint64_t *vms, int *threads) {
-    char path[256];
-    snprintf(path, sizeof(path), "/proc/%d/status", pid);
-    
-    FILE *fp = fopen(path, "r");
-    if (!fp) return -1;
-    
-    char line[256];
-    *rss = 0;
-    *vms = 0;
-    *threads = 1;
-    
-    while (fgets(line, sizeof(line), fp)) {
-        if (strncmp(line, "VmRSS:", 6) == 0) {
-            unsigned long kb;
-            sscanf(line + 6, "%lu", &kb);
-            *rss = kb * 1024;  // Convert to bytes
-        } else if (strncmp(line, "VmSize:", 7) == 0) {
-            unsigned long kb;
-            sscanf(line + 7, "%lu", &kb);
-            *vms = kb * 1024;
-        } else if (strncmp(line, "Threads:", 8) == 0) {
-            sscanf(line + 8, "%d", threads);
-        }
+void proc_files_close(ProcFiles *files) {
+    int *fds[] = { &files->stat_fd, &files->statm_fd, &files->io_fd, &files->fd_dir_fd };
+    for (size_t i = 0; i < sizeof(fds) / sizeof(fds[0]); i++) {
+        if (*fds[i] >= 0) close(*fds[i]);
+        *fds[i] = -1;
     }
-    
-    fclose(fp);
-    return 0;
 }
 
-// Count open file descriptors
-static int count_open_fds(int pid) {
-    char path[256];
-    snprintf(path, sizeof(path), "/proc/%d/fd", pid);
-    
-    DIR *dir = opendir(path);
-    if (!dir) return 0;
-    
-    int count = 0;
-    struct dirent *entry;
-    while ((entry = readdir(dir)) != NULL) {
-        if (entry->d_name[0] != '.') {
-            count++;
-        }
+// pread the whole file into buf and NUL-terminate; returns length or -1
+static ssize_t read_proc_buf(int fd, char *buf, size_t size) {
+    if (fd < 0) return -1;
+    ssize_t n;
+    do {
+        n = pread(fd, buf, size - 1, 0);
+    } while (n < 0 && errno == EINTR);
+    if (n < 0) return -1;
+    buf[n] = '\0';
+    return n;
+}
+
+static const char *skip_fields(const char *p, int count) {
+    for (int i = 0; i < count && *p; i++) {
+        while (*p == ' ') p++;
+        while (*p && *p != ' ') p++;
     }
-    
-    closedir(dir);
-    return count;
+    while (*p == ' ') p++;
+    return p;
 }
 
-// Read I/O stats
-static int read_proc_io(int pid, uint64_t *read_bytes, uint64_t *write_bytes) {
-    char path[256];
-    snprintf(path, sizeof(path), "/proc/%d/io", pid);
-    
-    FILE *fp = fopen(path, "r");
-    if (!fp) {
-        *read_bytes = 0;
-        *write_bytes = 0;
-        return -1;
+static uint64_t parse_u64(const char **cursor) {
+    const char *p = *cursor;
+    uint64_t value = 0;
+    while (*p == ' ') p++;
+    while (*p >= '0' && *p <= '9') {
+        value = value * 10 + (uint64_t)(*p - '0');
+        p++;
     }
-    
-    char line[256];
+    *cursor = p;
+    return value;
+}
+
+// Fields after the comm: the comm may contain spaces and ')' so anchor on
+// the last ')' (field 3, state, follows it).
+static const char *stat_after_comm(const char *buf, size_t len) {
+    const char *close_paren = memrchr(buf, ')', len);
+    return close_paren ? close_paren + 1 : NULL;
+}
+
+int proc_read_stat(const ProcFiles *files, ProcStat *stat) {
+    char buf[PROC_BUF_SIZE];
+    ssize_t len = read_proc_buf(files->stat_fd, buf, sizeof(buf));
+    if (len <= 0) return -1;
+
+    const char *p = stat_after_comm(buf, (size_t)len);
+    if (!p) return -1;
+
+    p = skip_fields(p, 1);               // field 3: state
+    stat->ppid = (int)parse_u64(&p);      // field 4
+    p = skip_fields(p, 9);               // fields 5-13
+    stat->utime = parse_u64(&p);          // field 14
+    stat->stime = parse_u64(&p);          // field 15
+    p = skip_fields(p, 4);               // fields 16-19
+    stat->threads = (int)parse_u64(&p);   // field 20
+    return 0;
+}
+
+int proc_read_statm(const ProcFiles *files, uint64_t page_size, uint64_t *rss, uint64_t *vms) {
+    char buf[128];
+    if (read_proc_buf(files->statm_fd, buf, sizeof(buf)) <= 0) return -1;
+
+    const char *p = buf;
+    *vms = parse_u64(&p) * page_size;     // size
+    *rss = parse_u64(&p) * page_size;     // resident
+    return 0;
+}
+
+int proc_read_io(const ProcFiles *files, uint64_t *read_bytes, uint64_t *write_bytes) {
+    char buf[PROC_BUF_SIZE];
     *read_bytes = 0;
     *write_bytes = 0;
-    
-    while (fgets(line, sizeof(line), fp)) {
+    if (read_proc_buf(files->io_fd, buf, sizeof(buf)) <= 0) return -1;
+
+    for (const char *line = buf; *line; ) {
         if (strncmp(line, "read_bytes:", 11) == 0) {
-            sscanf(line + 11, "%lu", read_bytes);
+            const char *p = line + 11;
+            *read_bytes = parse_u64(&p);
         } else if (strncmp(line, "write_bytes:", 12) == 0) {
-            sscanf(line + 12, "%lu", write_bytes);
+            const char *p = line + 12;
+            *write_bytes = parse_u64(&p);
         }
+        const char *next = strchr(line, '\n');
+        if (!next) break;
+        line = next + 1;
     }
-    
-    fclose(fp);
     return 0;
 }
 
-// Static vars for CPU calculation
-static unsigned long prev_utime = 0;
-static unsigned long prev_stime = 0;
-static struct timespec prev_time = {0, 0};
-static long clock_ticks = 0;
+// Count descriptors that resolve to a regular file, as psutil's
+// Process.open_files() does: sockets, pipes, anon inodes, devices and
+// deleted files are skipped.
+int proc_count_open_files(const ProcFiles *files) {
+    if (files->fd_dir_fd < 0) return 0;
+    if (lseek(files->fd_dir_fd, 0, SEEK_SET) < 0) return 0;
+
+    char buf[DIRENT_BUF_SIZE] __attribute__((aligned(8)));
+    char target[PATH_MAX];
+    struct stat st;
+    int count = 0;
+    for (;;) {
+        long n = syscall(SYS_getdents64, files->fd_dir_fd, buf, sizeof(buf));
+        if (n <= 0) break;
+        for (long offset = 0; offset < n; ) {
+            const struct linux_dirent64 *entry = (const struct linux_dirent64 *)(buf + offset);
+            offset += entry->d_reclen;
+            if (entry->d_name[0] == '.') continue;
+            ssize_t len = readlinkat(files->fd_dir_fd, entry->d_name, target, sizeof(target) - 1);
+            if (len <= 0 || target[0] != '/') continue;
+            target[len] = '\0';
+            if (stat(target, &st) == 0 && S_ISREG(st.st_mode)) count++;
+        }
+    }
+    return count;
+}
 
 // Initialize sampler
 int sampler_init(SamplerConfig *config) {
     if (!config) return -1;
     
     config->running = 1;
-    clock_ticks = sysconf(_SC_CLK_TCK);
-    if (clock_ticks <= 0) clock_ticks = 100;  // Fallback
-    
-    // Reset CPU tracking
-    prev_utime = 0;
-    prev_stime = 0;
-    prev_time.tv_sec = 0;
-    prev_time.tv_nsec = 0;
+    return 0;
+}
+
+// Prepare per-target state
+int sampler_context_init(SamplerContext *ctx, int pid, const char *run_id,
+                         const char *output_path, const JsonlFsyncPolicy *fsync_policy) {
+    if (!ctx || pid <= 0 || !run_id || !output_path) return -1;
+    
+    memset(ctx, 0, sizeof(*ctx));
+    ctx->pid = pid;
+    ctx->writer.fd = -1;
+    snprintf(ctx->run_id, sizeof(ctx->run_id), "%s", run_id);
+    ctx->clock_ticks = sysconf(_SC_CLK_TCK);
+    if (ctx->clock_ticks <= 0) ctx->clock_ticks = 100;  // Fallback
+    long page_size = sysconf(_SC_PAGESIZE);
+    ctx->page_size = page_size > 0 ? (uint64_t)page_size : 4096;
+    
+    if (proc_files_open(&ctx->proc, pid) != 0) {
+        return -1;  // Target not running
+    }
+    if (jsonl_writer_open(&ctx->writer, output_path, fsync_policy) != 0) {
+        proc_files_close(&ctx->proc);
+        return -1;
+    }
     
+    clock_gettime(CLOCK_MONOTONIC, &ctx->start_time);
+    ctx->active = 1;
     return 0;
 }
 
+SamplerContext *sampler_context_new(int pid) {
+    if (pid <= 0) return NULL;
+    SamplerContext *ctx = calloc(1, sizeof(*ctx));
+    if (!ctx) return NULL;
+
+    ctx->pid = pid;
+    ctx->writer.fd = -1;
+    ctx->clock_ticks = sysconf(_SC_CLK_TCK);
+    if (ctx->clock_ticks <= 0) ctx->clock_ticks = 100;
+    long page_size = sysconf(_SC_PAGESIZE);
+    ctx->page_size = page_size > 0 ? (uint64_t)page_size : 4096;
+    if (proc_files_open(&ctx->proc, pid) != 0) {
+        free(ctx);
+        return NULL;
+    }
+    clock_gettime(CLOCK_MONOTONIC, &ctx->start_time);
+    ctx->active = 1;
+    return ctx;
+}
+
+void sampler_context_free(SamplerContext *ctx) {
+    if (!ctx) return;
+    proc_files_close(&ctx->proc);
+    free(ctx);
+}
+
+size_t sampler_sample_size(void) {
+    return sizeof(ProcessSample);
+}
+
 // Collect single sample
-int sampler_collect(int pid, ProcessSample *sample) {
-    if (!sample) return -1;
+int sampler_collect(SamplerContext *ctx, ProcessSample *sample) {
+    if (!ctx || !sample) return -1;
+    
+    int pid = ctx->pid;
     
     // Get timestamp
     get_iso_timestamp(sample->timestamp, sizeof(sample->timestamp));
+    snprintf(sample->run_id, sizeof(sample->run_id), "%s", ctx->run_id);
     sample->pid = pid;
     
     // Read /proc data
-    unsigned long utime, stime;
-    if (read_proc_stat(pid, &utime, &stime) != 0) {
+    ProcStat stat;
+    if (proc_read_stat(&ctx->proc, &stat) != 0) {
         return -1;  // Process gone
     }
     
-    // Calculate CPU percent
+    // Calculate CPU percent against this target's previous sample
     struct timespec now;
     clock_gettime(CLOCK_MONOTONIC, &now);
     
-    if (prev_time.tv_sec > 0) {
-        double time_delta = (now.tv_sec - prev_time.tv_sec) + 
-                           (now.tv_nsec - prev_time.tv_nsec) / 1e9;
-        unsigned long cpu_delta = (utime + stime) - (prev_utime + prev_stime);
-        sample->cpu_percent = (cpu_delta / (double)clock_ticks / time_delta) * 100.0;
+    unsigned long cpu_ticks = (unsigned long)(stat.utime + stat.stime);
+    if (ctx->primed) {
+        double time_delta = (now.tv_sec - ctx->prev_time.tv_sec) + 
+                           (now.tv_nsec - ctx->prev_time.tv_nsec) / 1e9;
+        unsigned long cpu_delta = cpu_ticks - ctx->prev_cpu_ticks;
+        sample->cpu_percent = time_delta > 0
+            ? (cpu_delta / (double)ctx->clock_ticks / time_delta) * 100.0
+            : 0.0;
         
-        // Clamp to reasonable values
+        // Percent of one core, like psutil: a multi-threaded target can exceed 100
         if (sample->cpu_percent < 0) sample->cpu_percent = 0;
-        if (sample->cpu_percent > 100) sample->cpu_percent = 100;
     } else {
         sample->cpu_percent = 0.0;
     }
     
-    prev_utime = utime;
-    prev_stime = stime;
-    prev_time = now;
-    
-    // Read memory info
-    uint64_t rss, vms;
-    int threads;
-    if (read_proc_status(pid, &rss, &vms, &threads) == 0) {
-        sample->memory_rss = rss;
-        sample->memory_vms = vms;
-        sample->threads = threads;
-    } else {
+    ctx->prev_cpu_ticks = cpu_ticks;
+    ctx->prev_time = now;
+    ctx->primed = 1;
+    
+    // Memory from statm (pages), threads from stat
+    if (proc_read_statm(&ctx->proc, ctx->page_size, &sample->memory_rss, &sample->memory_vms) != 0) {
         sample->memory_rss = 0;
         sample->memory_vms = 0;
-        sample->threads = 1;
     }
+    sample->threads = stat.threads > 0 ? stat.threads : 1;
     
-    // Count FDs
-    sample->open_files = count_open_fds(pid);
+    // Count open regular files
+    sample->open_files = proc_count_open_files(&ctx->proc);
     
     // Read I/O
-    read_proc_io(pid, &sample->read_bytes, &sample->write_bytes);
+    proc_read_io(&ctx->proc, &sample->read_bytes, &sample->write_bytes);
     
     return 0;
 }
 
-// Write sample to JSONL
-int sampler_write_jsonl(const char *path, const ProcessSample *sample) {
-    cJSON *root = cJSON_CreateObject();
-    if (!root) return -1;
-    
-    cJSON_AddStringToObject(root, "event", "sample");
-    cJSON_AddStringToObject(root, "run_id", sample->run_id);
-    cJSON_AddStringToObject(root, "timestamp", sample->timestamp);
-    cJSON_AddNumberToObject(root, "pid", sample->pid);
-    cJSON_AddNumberToObject(root, "cpu_percent", sample->cpu_percent);
-    cJSON_AddNumberToObject(root, "rss_bytes", sample->memory_rss);
-    cJSON_AddNumberToObject(root, "vms_bytes", sample->memory_vms);
-    cJSON_AddNumberToObject(root, "threads", sample->threads);
-    cJSON_AddNumberToObject(root, "fds_open", sample->open_files);
-    cJSON_AddNumberToObject(root, "read_bytes", sample->read_bytes);
-    cJSON_AddNumberToObject(root, "write_bytes", sample->write_bytes);
-    cJSON_AddNumberToObject(root, "cpu_max", sample->cpu_max);
-    cJSON_AddNumberToObject(root, "rss_max", sample->memory_rss_max);
-    
-    char *json_str = cJSON_PrintUnformatted(root);
-    int result = append_jsonl(path, json_str);
-    
-    free(json_str);
-    cJSON_Delete(root);
+// Collect and record one sample for the context
+int sampler_context_sample(SamplerContext *ctx) {
+    if (!ctx || !ctx->active) return -1;
     
-    return result;
+    ProcessSample sample;
+    memset(&sample, 0, sizeof(sample));
+    if (sampler_collect(ctx, &sample) != 0) {
+        return -1;  // Process terminated
+    }
+    
+    // Track maximums
+    if (sample.cpu_percent > ctx->max_cpu) ctx->max_cpu = sample.cpu_percent;
+    if (sample.memory_rss > ctx->max_rss) ctx->max_rss = sample.memory_rss;
+    if (sample.open_files > ctx->peak_files) ctx->peak_files = sample.open_files;
+    
+    // Update sample with current maximums
+    sample.cpu_max = ctx->max_cpu;
+    sample.memory_rss_max = ctx->max_rss;
+    
+    sampler_write_jsonl(&ctx->writer, &sample);
+    ctx->sample_count++;
+    return 0;
+}
+
+// Write summary and release the context's writer
+void sampler_context_finish(SamplerContext *ctx, int exit_code) {
+    if (!ctx || !ctx->active) return;
+    
+    struct timespec end_time;
+    clock_gettime(CLOCK_MONOTONIC, &end_time);
+    double duration = (end_time.tv_sec - ctx->start_time.tv_sec) + 
+                     (end_time.tv_nsec - ctx->start_time.tv_nsec) / 1e9;
+    
+    sampler_write_summary(&ctx->writer, ctx->sample_count, duration,
+                         ctx->max_cpu, ctx->max_rss, ctx->peak_files, exit_code);
+    jsonl_writer_close(&ctx->writer);
+    proc_files_close(&ctx->proc);
+    ctx->active = 0;
+}
+
+// Record sizes are bounded: run_id is at most 127 bytes (762 escaped)
+#define RECORD_BUF_SIZE 2048
+
+// Write sample to JSONL. Field names and order are the sampler's established
+// schema (rss_bytes, fds_open, ...) that alertd rules and prom_exporter read.
+int sampler_write_jsonl(JsonlWriter *writer, const ProcessSample *sample) {
+    char buf[RECORD_BUF_SIZE];
+    JsonEmitter json;
+    
+    json_emit_begin(&json, buf, sizeof(buf));
+    json_emit_string(&json, "event", "sample");
+    json_emit_string(&json, "run_id", sample->run_id);
+    json_emit_string(&json, "timestamp", sample->timestamp);
+    json_emit_int(&json, "pid", sample->pid);
+    json_emit_double(&json, "cpu_percent", sample->cpu_percent, 2);
+    json_emit_uint(&json, "rss_bytes", sample->memory_rss);
+    json_emit_uint(&json, "vms_bytes", sample->memory_vms);
+    json_emit_int(&json, "threads", sample->threads);
+    json_emit_int(&json, "fds_open", sample->open_files);
+    json_emit_uint(&json, "read_bytes", sample->read_bytes);
+    json_emit_uint(&json, "write_bytes", sample->write_bytes);
+    json_emit_double(&json, "cpu_max", sample->cpu_max, 2);
+    json_emit_uint(&json, "rss_max", sample->memory_rss_max);
+    
+    long len = json_emit_end_line(&json);
+    return len < 0 ? -1 : jsonl_writer_write_line(writer, buf, (size_t)len);
 }
 
 // Write summary to JSONL
-int sampler_write_summary(const char *path, int samples, double duration,
+int sampler_write_summary(JsonlWriter *writer, int samples, double duration,
                          double max_cpu, uint64_t max_rss, int peak_files, int exit_code) {
-    cJSON *root = cJSON_CreateObject();
-    if (!root) return -1;
-    
+    char buf[RECORD_BUF_SIZE];
     char timestamp[32];
-    get_iso_timestamp(timestamp, sizeof(timestamp));
+    JsonEmitter json;
     
-    cJSON_AddStringToObject(root, "event", "stop");
-    cJSON_AddStringToObject(root, "timestamp", timestamp);
-    cJSON_AddNumberToObject(root, "samples", samples);
-    cJSON_AddNumberToObject(root, "duration_seconds", duration);
-    cJSON_AddNumberToObject(root, "max_cpu_percent", max_cpu);
-    cJSON_AddNumberToObject(root, "max_memory_rss", max_rss);
-    cJSON_AddNumberToObject(root, "peak_open_files", peak_files);
-    cJSON_AddNumberToObject(root, "exit_code", exit_code);
+    get_iso_timestamp(timestamp, sizeof(timestamp));
     
-    char *json_str = cJSON_PrintUnformatted(root);
-    int result = append_jsonl(path, json_str);
+    json_emit_begin(&json, buf, sizeof(buf));
+    json_emit_string(&json, "event", "stop");
+    json_emit_string(&json, "timestamp", timestamp);
+    json_emit_int(&json, "samples", samples);
+    json_emit_double(&json, "duration_seconds", duration, 3);
+    json_emit_double(&json, "max_cpu_percent", max_cpu, 2);
+    json_emit_uint(&json, "max_memory_rss", max_rss);
+    json_emit_int(&json, "peak_open_files", peak_files);
+    if (exit_code != SAMPLER_EXIT_UNKNOWN) json_emit_int(&json, "exit_code", exit_code);
+    
+    long len = json_emit_end_line(&json);
+    return len < 0 ? -1 : jsonl_writer_write_line(writer, buf, (size_t)len);
+}
+
+// ---------------------------------------------------------------------------
+// Multi-target loop
+// ---------------------------------------------------------------------------
+
+#define DISCOVERY_INTERVAL_SEC 1.0
+#define MAX_TREE_DEPTH 64
+
+// Live targets only, sorted by PID. A context is removed once its target
+// exits, so a new descendant that reuses the PID is picked up again.
+typedef struct {
+    SamplerContext *items;
+    size_t count;
+    size_t capacity;
+} ContextSet;
+
+typedef struct {
+    int pid;
+    int ppid;
+} ProcLink;
+
+// Index of the first context whose PID is not below pid
+static size_t context_slot(const ContextSet *set, int pid) {
+    size_t low = 0, high = set->count;
+    while (low < high) {
+        size_t mid = low + (high - low) / 2;
+        if (set->items[mid].pid < pid) low = mid + 1;
+        else high = mid;
+    }
+    return low;
+}
+
+static int context_add(ContextSet *set, const SamplerConfig *config, int pid) {
+    size_t slot = context_slot(set, pid);
+    if (slot < set->count && set->items[slot].pid == pid) return 0;
+    
+    if (set->count == set->capacity) {
+        size_t capacity = set->capacity ? set->capacity * 2 : 8;
+        SamplerContext *items = realloc(set->items, capacity * sizeof(*items));
+        if (!items) return -1;
+        set->items = items;
+        set->capacity = capacity;
+    }
     
-    free(json_str);
-    cJSON_Delete(root);
+    char run_id[sizeof(config->run_id) + 16];
+    char output_path[1024];
+    if (config->output_dir[0]) {
+        snprintf(run_id, sizeof(run_id), "%s_%d", config->run_id, pid);
+        build_log_path(output_path, sizeof(output_path), config->output_dir, run_id);
+    } else {
+        snprintf(run_id, sizeof(run_id), "%s", config->run_id);
+        snprintf(output_path, sizeof(output_path), "%s", config->output_path);
+    }
     
-    return result;
+    SamplerContext ctx;
+    if (sampler_context_init(&ctx, pid, run_id, output_path, &config->fsync_policy) != 0) {
+        return -1;
+    }
+    memmove(&set->items[slot + 1], &set->items[slot], (set->count - slot) * sizeof(*set->items));
+    set->items[slot] = ctx;
+    set->count++;
+    printf("Sampling PID %d -> %s\n", pid, output_path);
+    return 0;
+}
+
+// Parent PID from /proc/<pid>/stat
+static int read_ppid(int pid, int *ppid) {
+    ProcFiles files = { open_proc_file(pid, "stat", O_RDONLY), -1, -1, -1 };
+    ProcStat stat;
+    int result = proc_read_stat(&files, &stat);
+    proc_files_close(&files);
+    if (result != 0) return -1;
+    *ppid = stat.ppid;
+    return 0;
 }
 
-// Signal handler
-static volatile int g_running = 1;
-static void signal_handler(int sig) {
-    (void)sig;
-    g_running = 0;
+static int compare_links(const void *a, const void *b) {
+    const ProcLink *left = a;
+    const ProcLink *right = b;
+    return (left->pid > right->pid) - (left->pid < right->pid);
 }
 
-// Run sampling loop
-int sampler_run(SamplerConfig *config) {
-    if (!config) return -1;
+// Add every live descendant of config->parent_pid as a target
+static void discover_descendants(ContextSet *set, const SamplerConfig *config) {
+    DIR *dir = opendir("/proc");
+    if (!dir) return;
     
-    signal(SIGINT, signal_handler);
-    signal(SIGTERM, signal_handler);
+    ProcLink *links = NULL;
+    size_t count = 0, capacity = 0;
+    struct dirent *entry;
+    while ((entry = readdir(dir)) != NULL) {
+        char *end = NULL;
+        long pid = strtol(entry->d_name, &end, 10);
+        if (*end != '\0' || pid <= 0) continue;
+        
+        int ppid;
+        if (read_ppid((int)pid, &ppid) != 0) continue;
+        if (count == capacity) {
+            capacity = capacity ? capacity * 2 : 256;
+            ProcLink *grown = realloc(links, capacity * sizeof(*links));
+            if (!grown) break;
+            links = grown;
+        }
+        links[count].pid = (int)pid;
+        links[count].ppid = ppid;
+        count++;
+    }
+    closedir(dir);
     
-    struct timespec start_time;
-    clock_gettime(CLOCK_MONOTONIC, &start_time);
+    qsort(links, count, sizeof(*links), compare_links);
+    for (size_t i = 0; i < count; i++) {
+        int ancestor = links[i].ppid;
+        for (int depth = 0; ancestor > 1 && depth < MAX_TREE_DEPTH; depth++) {
+            if (ancestor == config->parent_pid) {
+                context_add(set, config, links[i].pid);
+                break;
+            }
+            ProcLink key = { ancestor, 0 };
+            ProcLink *parent = bsearch(&key, links, count, sizeof(*links), compare_links);
+            if (!parent) break;
+            ancestor = parent->ppid;
+        }
+    }
+    free(links);
+}
+
+// Sample every target; finished targets get their summary and are dropped
+static size_t sample_all(ContextSet *set) {
+    size_t kept = 0;
+    for (size_t i = 0; i < set->count; i++) {
+        SamplerContext *ctx = &set->items[i];
+        if (sampler_context_sample(ctx) != 0) {
+            // Targets are not our children, so their exit status is unknown
+            sampler_context_finish(ctx, SAMPLER_EXIT_UNKNOWN);
+            continue;
+        }
+        if (kept != i) set->items[kept] = *ctx;
+        kept++;
+    }
+    set->count = kept;
+    return kept;
+}
+
+static int epoll_watch(int epoll_fd, int fd) {
+    struct epoll_event ev = { .events = EPOLLIN, .data.fd = fd };
+    return epoll_ctl(epoll_fd, EPOLL_CTL_ADD, fd, &ev);
+}
+
+static double elapsed_since(const struct timespec *since) {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (now.tv_sec - since->tv_sec) + (now.tv_nsec - since->tv_nsec) / 1e9;
+}
+
+// Run sampling loop: one timerfd drives every target, signals arrive via
+// signalfd so shutdown is handled in the same epoll wait.
+int sampler_run(SamplerConfig *config) {
+    if (!config || config->interval <= 0) return -1;
     
-    int sample_count = 0;
-    double max_cpu = 0.0;
-    uint64_t max_rss = 0;
-    int peak_files = 0;
+    ContextSet set = {0};
+    for (int i = 0; i < config->pid_count; i++) {
+        if (context_add(&set, config, config->pids[i]) != 0) {
+            fprintf(stderr, "Skipping PID %d: not running or output unavailable\n", config->pids[i]);
+        }
+    }
+    if (config->parent_pid > 0) {
+        if (context_add(&set, config, config->parent_pid) != 0) {
+            fprintf(stderr, "Parent PID %d is not running\n", config->parent_pid);
+        }
+        discover_descendants(&set, config);
+    }
+    if (set.count == 0) {
+        free(set.items);
+        return -1;
+    }
     
-    ProcessSample sample;
-    memset(&sample, 0, sizeof(sample));
+    sigset_t mask, old_mask;
+    sigemptyset(&mask);
+    sigaddset(&mask, SIGINT);
+    sigaddset(&mask, SIGTERM);
+    sigprocmask(SIG_BLOCK, &mask, &old_mask);
+    
+    int signal_fd = signalfd(-1, &mask, SFD_CLOEXEC);
+    int timer_fd = timerfd_create(CLOCK_MONOTONIC, TFD_CLOEXEC);
+    int epoll_fd = epoll_create1(EPOLL_CLOEXEC);
+    int result = 0;
+    
+    struct itimerspec period = {0};
+    period.it_interval.tv_sec = (time_t)config->interval;
+    period.it_interval.tv_nsec = (long)((config->interval - (double)(time_t)config->interval) * 1e9);
+    period.it_value = period.it_interval;
+    
+    if (signal_fd < 0 || timer_fd < 0 || epoll_fd < 0 ||
+        timerfd_settime(timer_fd, 0, &period, NULL) != 0 ||
+        epoll_watch(epoll_fd, signal_fd) != 0 || epoll_watch(epoll_fd, timer_fd) != 0) {
+        perror("sampler event loop");
+        result = -1;
+        config->running = 0;
+    }
     
-    while (g_running && config->running) {
-        if (sampler_collect(config->pid, &sample) != 0) {
-            // Process terminated
+    struct timespec last_discovery;
+    clock_gettime(CLOCK_MONOTONIC, &last_discovery);
+    size_t active = config->running ? sample_all(&set) : 0;
+    
+    while (config->running && active > 0) {
+        struct epoll_event events[2];
+        int ready = epoll_wait(epoll_fd, events, 2, -1);
+        if (ready < 0) {
+            if (errno == EINTR) continue;
+            perror("epoll_wait");
+            result = -1;
             break;
         }
         
-        // Set run_id
-        strncpy(sample.run_id, config->run_id, sizeof(sample.run_id) - 1);
-        sample.run_id[sizeof(sample.run_id) - 1] = '\0';  // Ensure null termination
-        
-        // Track maximums
-        if (sample.cpu_percent > max_cpu) max_cpu = sample.cpu_percent;
-        if (sample.memory_rss > max_rss) max_rss = sample.memory_rss;
-        if (sample.open_files > peak_files) peak_files = sample.open_files;
-        
-        // Update sample with current maximums
-        sample.cpu_max = max_cpu;
-        sample.memory_rss_max = max_rss;
-        
-        // Write sample
-        sampler_write_jsonl(config->output_path, &sample);
-        sample_count++;
+        int tick = 0;
+        for (int i = 0; i < ready; i++) {
+            if (events[i].data.fd == signal_fd) {
+                struct signalfd_siginfo info;
+                if (read(signal_fd, &info, sizeof(info)) > 0) config->running = 0;
+            } else if (events[i].data.fd == timer_fd) {
+                uint64_t expirations;
+                // Missed ticks collapse into one sample; never burst to catch up
+                if (read(timer_fd, &expirations, sizeof(expirations)) > 0) tick = 1;
+            }
+        }
+        if (!config->running || !tick) continue;
         
-        // Sleep for interval
-        usleep((useconds_t)(config->interval * 1000000));
+        if (config->parent_pid > 0 && elapsed_since(&last_discovery) >= DISCOVERY_INTERVAL_SEC) {
+            // New descendants take their baseline sample on this tick
+            discover_descendants(&set, config);
+            clock_gettime(CLOCK_MONOTONIC, &last_discovery);
+        }
+        active = sample_all(&set);
     }
     
-    // Write summary
-    struct timespec end_time;
-    clock_gettime(CLOCK_MONOTONIC, &end_time);
-    double duration = (end_time.tv_sec - start_time.tv_sec) + 
-                     (end_time.tv_nsec - start_time.tv_nsec) / 1e9;
-    
-    sampler_write_summary(config->output_path, sample_count, duration,
-                         max_cpu, max_rss, peak_files, 0);
+    // Write summaries for targets still running at shutdown
+    for (size_t i = 0; i < set.count; i++) {
+        sampler_context_finish(&set.items[i], SAMPLER_EXIT_UNKNOWN);
+    }
     
-    return 0;
+    if (epoll_fd >= 0) close(epoll_fd);
+    if (timer_fd >= 0) close(timer_fd);
+    if (signal_fd >= 0) close(signal_fd);
+    sigprocmask(SIG_SETMASK, &old_mask, NULL);
+    free(set.items);
+    return result;
 }
 
 // Stop sampler
@@ -3,6 +3,9 @@
 
 #include <time.h>
 #include <stdint.h>
+#include "logutil.h"
+
+#define SAMPLER_MAX_PIDS 256
 
 // Sample data structure matching Python Schema
 typedef struct {
@@ -11,7 +14,7 @@ typedef struct {
     int pid;
     double cpu_percent;
     uint64_t memory_rss;     // bytes
-    uint64_t memory_vms;     // bytes  
+    uint64_t memory_vms;     // bytes
     int threads;
     int open_files;
     uint64_t read_bytes;
@@ -20,20 +23,93 @@ typedef struct {
     uint64_t memory_rss_max; // Maximum RSS observed
 } ProcessSample;
 
-// Sampler configuration
+// Kept-open /proc/<pid> descriptors; -1 when unavailable
+typedef struct {
+    int stat_fd;
+    int statm_fd;
+    int io_fd;
+    int fd_dir_fd;
+} ProcFiles;
+
+// Fields parsed from /proc/<pid>/stat
+typedef struct {
+    int ppid;
+    uint64_t utime;          // clock ticks
+    uint64_t stime;          // clock ticks
+    int threads;
+} ProcStat;
+
+// Per-target sampling state. Each context owns its CPU delta baseline,
+// running maxima and output writer, so any number of targets can be
+// sampled from one thread.
 typedef struct {
     int pid;
+    char run_id[128];
+    JsonlWriter writer;
+    ProcFiles proc;
+    long clock_ticks;
+    uint64_t page_size;
+    unsigned long prev_cpu_ticks;
+    struct timespec prev_time;
+    int primed;              // prev_* hold a valid baseline
+    int active;              // target alive and writer open
+    struct timespec start_time;
+    int sample_count;
+    double max_cpu;
+    uint64_t max_rss;
+    int peak_files;
+} SamplerContext;
+
+// Sampler configuration
+typedef struct {
+    int pids[SAMPLER_MAX_PIDS];
+    int pid_count;
+    int parent_pid;          // also sample all descendants of this PID
     double interval;         // seconds
     char run_id[128];
-    char output_path[512];
+    char output_path[512];   // single target
+    char output_dir[512];    // one <run_id>_<pid>.jsonl per target
+    JsonlFsyncPolicy fsync_policy;
     int running;             // atomic flag
 } SamplerConfig;
 
+// Open/close the /proc files sampled for one PID
+int proc_files_open(ProcFiles *files, int pid);
+void proc_files_close(ProcFiles *files);
+
+// Allocation-free readers over kept-open descriptors
+int proc_read_stat(const ProcFiles *files, ProcStat *stat);
+int proc_read_statm(const ProcFiles *files, uint64_t page_size, uint64_t *rss, uint64_t *vms);
+int proc_read_io(const ProcFiles *files, uint64_t *read_bytes, uint64_t *write_bytes);
+int proc_count_open_files(const ProcFiles *files);
+
 // Initialize sampler
 int sampler_init(SamplerConfig *config);
 
-// Collect single sample
-int sampler_collect(int pid, ProcessSample *sample);
+// Prepare a context for one target and open its output log
+int sampler_context_init(SamplerContext *ctx, int pid, const char *run_id,
+                         const char *output_path, const JsonlFsyncPolicy *fsync_policy);
+
+// Collect single sample for the context's target
+int sampler_collect(SamplerContext *ctx, ProcessSample *sample);
+
+// Heap-allocated, writer-less context for callers that only collect
+// (libzencube_core.so / monitor.native_inspector). NULL if pid is not running.
+SamplerContext *sampler_context_new(int pid);
+void sampler_context_free(SamplerContext *ctx);
+
+// sizeof(ProcessSample), so FFI callers can check their struct layout
+size_t sampler_sample_size(void);
+
+// Collect, update maxima and append one sample record; -1 once the target is gone
+int sampler_context_sample(SamplerContext *ctx);
+
+// Passed as exit_code when the target's status is unknown; the summary
+// record then omits the field
+#define SAMPLER_EXIT_UNKNOWN (-1)
+
+// Write the summary record and close the context's writer
+void sampler_context_finish(SamplerContext *ctx, int exit_code);
 
 // Start sampling loop (blocking)
 int sampler_run(SamplerConfig *config);
@@ -42,10 +118,10 @@ int sampler_run(SamplerConfig *config);
 void sampler_stop(SamplerConfig *config);
 
 // Write sample to JSONL
-int sampler_write_jsonl(const char *path, const ProcessSample *sample);
+int sampler_write_jsonl(JsonlWriter *writer, const ProcessSample *sample);
 
 // Write summary to JSONL
-int sampler_write_summary(const char *path, int samples, double duration, 
+int sampler_write_summary(JsonlWriter *writer, int samples, double duration,
                           double max_cpu, uint64_t max_rss, int peak_files, int exit_code);
 
 // Get ISO timestamp
@@ -0,0 +1,91 @@
+#include "sampler.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <getopt.h>
+#include <unistd.h>
+
+// Microbenchmark for the sampling hot path. Reports nanoseconds per sample
+// for /proc collection alone and for collect + JSONL emit (to /dev/null).
+
+static void print_usage(const char *prog) {
+    printf("Usage: %s [--pid PID] [--iterations N]\n", prog);
+    printf("\nOptions:\n");
+    printf("  --pid PID          Process to sample (default: self)\n");
+    printf("  --iterations N     Samples per measurement (default: 100000)\n");
+    printf("  --help             Show this help message\n");
+}
+
+static double now_ns(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1e9 + ts.tv_nsec;
+}
+
+int main(int argc, char *argv[]) {
+    int pid = getpid();
+    long iterations = 100000;
+
+    static struct option long_options[] = {
+        {"pid",        required_argument, 0, 'p'},
+        {"iterations", required_argument, 0, 'n'},
+        {"help",       no_argument,       0, 'h'},
+        {0, 0, 0, 0}
+    };
+
+    int opt;
+    while ((opt = getopt_long(argc, argv, "p:n:h", long_options, NULL)) != -1) {
+        switch (opt) {
+            case 'p': pid = atoi(optarg); break;
+            case 'n': iterations = atol(optarg); break;
+            case 'h':
+                print_usage(argv[0]);
+                return 0;
+            default:
+                print_usage(argv[0]);
+                return 1;
+        }
+    }
+    if (pid <= 0 || iterations <= 0) {
+        print_usage(argv[0]);
+        return 1;
+    }
+
+    JsonlFsyncPolicy policy = { JSONL_FSYNC_NEVER, 0.0, 0 };
+    SamplerContext ctx;
+    if (sampler_context_init(&ctx, pid, "bench", "/dev/null", &policy) != 0) {
+        fprintf(stderr, "Cannot sample PID %d\n", pid);
+        return 1;
+    }
+
+    ProcessSample sample;
+    memset(&sample, 0, sizeof(sample));
+
+    // Warm up caches and the CPU baseline
+    for (int i = 0; i < 100; i++) sampler_collect(&ctx, &sample);
+
+    double start = now_ns();
+    for (long i = 0; i < iterations; i++) {
+        if (sampler_collect(&ctx, &sample) != 0) {
+            fprintf(stderr, "PID %d exited during benchmark\n", pid);
+            return 1;
+        }
+    }
+    double collect_ns = (now_ns() - start) / iterations;
+
+    start = now_ns();
+    for (long i = 0; i < iterations; i++) {
+        if (sampler_context_sample(&ctx) != 0) {
+            fprintf(stderr, "PID %d exited during benchmark\n", pid);
+            return 1;
+        }
+    }
+    double sample_ns = (now_ns() - start) / iterations;
+
+    jsonl_writer_close(&ctx.writer);
+    proc_files_close(&ctx.proc);
+
+    printf("{\"pid\":%d,\"iterations\":%ld,\"collect_ns_per_sample\":%.1f,\"collect_emit_ns_per_sample\":%.1f}\n",
+           pid, iterations, collect_ns, sample_ns);
+    return 0;
+}
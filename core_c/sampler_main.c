@@ -5,36 +5,52 @@
 #include <getopt.h>
 
 static void print_usage(const char *prog) {
-    printf("Usage: %s --pid PID --interval SECONDS --run-id ID --out PATH\n", prog);
+    printf("Usage: %s --pid PID [--pid PID ...] --interval SECONDS --run-id ID (--out PATH | --out-dir DIR)\n", prog);
+    printf("       %s --parent PID --interval SECONDS --run-id ID --out-dir DIR\n", prog);
     printf("\nOptions:\n");
-    printf("  --pid PID          Process ID to monitor\n");
+    printf("  --pid PID          Process ID to monitor (repeatable, up to %d)\n", SAMPLER_MAX_PIDS);
+    printf("  --parent PID       Monitor PID and every descendant it spawns\n");
     printf("  --interval SECS    Sampling interval in seconds (default: 1.0)\n");
     printf("  --run-id ID        Unique run identifier\n");
-    printf("  --out PATH         Output JSONL file path\n");
+    printf("  --out PATH         Output JSONL file path (single --pid only)\n");
+    printf("  --out-dir DIR      Write <run-id>_<pid>.jsonl per target\n");
+    printf("  --fsync POLICY     never | interval:SECS | every:N (default: interval:1)\n");
     printf("  --help             Show this help message\n");
     printf("\nExample:\n");
     printf("  %s --pid 12345 --interval 1.0 --run-id monitor_run_123 --out log.jsonl\n", prog);
+    printf("  %s --parent 12345 --interval 0.5 --run-id build --out-dir logs/\n", prog);
 }
 
 int main(int argc, char *argv[]) {
     SamplerConfig config = {0};
+    JsonlFsyncPolicy default_policy = JSONL_FSYNC_DEFAULT;
     config.interval = 1.0;
-    config.pid = 0;
-    
+    config.fsync_policy = default_policy;
+
     static struct option long_options[] = {
         {"pid",      required_argument, 0, 'p'},
+        {"parent",   required_argument, 0, 'P'},
         {"interval", required_argument, 0, 'i'},
         {"run-id",   required_argument, 0, 'r'},
         {"out",      required_argument, 0, 'o'},
+        {"out-dir",  required_argument, 0, 'd'},
+        {"fsync",    required_argument, 0, 'f'},
         {"help",     no_argument,       0, 'h'},
         {0, 0, 0, 0}
     };
-    
+
     int opt, option_index = 0;
-    while ((opt = getopt_long(argc, argv, "p:i:r:o:h", long_options, &option_index)) != -1) {
+    while ((opt = getopt_long(argc, argv, "p:P:i:r:o:d:f:h", long_options, &option_index)) != -1) {
         switch (opt) {
             case 'p':
-                config.pid = atoi(optarg);
+                if (config.pid_count >= SAMPLER_MAX_PIDS) {
+                    fprintf(stderr, "Error: at most %d --pid options\n", SAMPLER_MAX_PIDS);
+                    return 1;
+                }
+                config.pids[config.pid_count++] = atoi(optarg);
+                break;
+            case 'P':
+                config.parent_pid = atoi(optarg);
                 break;
             case 'i':
                 config.interval = atof(optarg);
@@ -45,6 +61,15 @@ int main(int argc, char *argv[]) {
             case 'o':
                 strncpy(config.output_path, optarg, sizeof(config.output_path) - 1);
                 break;
+            case 'd':
+                strncpy(config.output_dir, optarg, sizeof(config.output_dir) - 1);
+                break;
+            case 'f':
+                if (jsonl_parse_fsync_policy(optarg, &config.fsync_policy) != 0) {
+                    fprintf(stderr, "Error: invalid --fsync policy '%s'\n", optarg);
+                    return 1;
+                }
+                break;
             case 'h':
                 print_usage(argv[0]);
                 return 0;
@@ -53,23 +78,48 @@ int main(int argc, char *argv[]) {
                 return 1;
         }
     }
-    
-    if (config.pid <= 0 || config.run_id[0] == '\0' || config.output_path[0] == '\0') {
-        fprintf(stderr, "Error: --pid, --run-id, and --out are required\n");
+
+    for (int i = 0; i < config.pid_count; i++) {
+        if (config.pids[i] <= 0) {
+            fprintf(stderr, "Error: invalid --pid\n");
+            return 1;
+        }
+    }
+    if ((config.pid_count == 0 && config.parent_pid <= 0) || config.run_id[0] == '\0') {
+        fprintf(stderr, "Error: --run-id and at least one --pid or --parent are required\n");
+        print_usage(argv[0]);
+        return 1;
+    }
+    if ((config.output_path[0] != '\0') == (config.output_dir[0] != '\0')) {
+        fprintf(stderr, "Error: exactly one of --out or --out-dir is required\n");
         print_usage(argv[0]);
         return 1;
     }
-    
-    printf("Starting sampler for PID %d (interval: %.2fs)\n", config.pid, config.interval);
-    printf("Writing to: %s\n", config.output_path);
-    
+    if (config.output_path[0] && (config.pid_count != 1 || config.parent_pid > 0)) {
+        fprintf(stderr, "Error: --out takes a single --pid; use --out-dir for multiple targets\n");
+        return 1;
+    }
+    if (config.interval <= 0) {
+        fprintf(stderr, "Error: --interval must be positive\n");
+        return 1;
+    }
+
+    if (config.output_path[0]) {
+        printf("Starting sampler for PID %d (interval: %.2fs)\n", config.pids[0], config.interval);
+        printf("Writing to: %s\n", config.output_path);
+    } else {
+        printf("Starting sampler for %d PID(s)%s (interval: %.2fs)\n", config.pid_count,
+               config.parent_pid > 0 ? " plus a process tree" : "", config.interval);
+        printf("Writing to: %s/\n", config.output_dir);
+    }
+
     if (sampler_init(&config) != 0) {
         fprintf(stderr, "Failed to initialize sampler\n");
         return 1;
     }
-    
+
     int result = sampler_run(&config);
-    
+
     printf("Sampling completed\n");
-    return result;
+    return result == 0 ? 0 : 1;
 }
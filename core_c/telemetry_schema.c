@@ -0,0 +1,39 @@
+#include "telemetry_schema.h"
+#include <string.h>
+
+// Keep in sync with FIELD_ALIASES in data/schema.py
+const TelemetryField TELEMETRY_FIELDS[] = {
+    { "cpu_percent",    { NULL } },
+    { "memory_rss",     { "rss_bytes", NULL } },
+    { "memory_vms",     { "vms_bytes", NULL } },
+    { "threads",        { NULL } },
+    { "open_files",     { "fds_open", NULL } },
+    { "socket_count",   { NULL } },
+    { "read_bytes",     { NULL } },
+    { "write_bytes",    { NULL } },
+    { "cpu_max",        { NULL } },
+    { "memory_rss_max", { "rss_max", NULL } },
+};
+const size_t TELEMETRY_FIELD_COUNT = sizeof(TELEMETRY_FIELDS) / sizeof(TELEMETRY_FIELDS[0]);
+
+const TelemetryField *telemetry_field_find(const char *name) {
+    for (size_t i = 0; i < TELEMETRY_FIELD_COUNT; i++) {
+        const TelemetryField *field = &TELEMETRY_FIELDS[i];
+        if (strcmp(field->name, name) == 0) return field;
+        for (const char *const *alias = field->aliases; *alias; alias++) {
+            if (strcmp(*alias, name) == 0) return field;
+        }
+    }
+    return NULL;
+}
+
+int telemetry_schema_add(JsonScanSchema *schema, const char *name, JsonScanType type) {
+    const TelemetryField *field = telemetry_field_find(name);
+    if (!field) return json_scan_schema_add(schema, name, type);
+
+    int slot = json_scan_schema_add(schema, field->name, type);
+    for (const char *const *alias = field->aliases; slot >= 0 && *alias; alias++) {
+        slot = json_scan_schema_alias(schema, *alias, slot);
+    }
+    return slot;
+}
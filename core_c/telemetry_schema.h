@@ -0,0 +1,30 @@
+#ifndef ZENCUBE_TELEMETRY_SCHEMA_H
+#define ZENCUBE_TELEMETRY_SCHEMA_H
+
+#include <stddef.h>
+#include "json_scan.h"
+
+// Version of the sample field map below; mirrors data/schema.py
+#define TELEMETRY_SCHEMA_VERSION 1
+#define TELEMETRY_MAX_ALIASES 3
+
+// One sample field under its canonical (Python monitor) name, plus the other
+// names writers have used for it. The core_c sampler writes rss_bytes,
+// vms_bytes, fds_open and rss_max.
+typedef struct {
+    const char *name;
+    const char *aliases[TELEMETRY_MAX_ALIASES];   // NULL-terminated
+} TelemetryField;
+
+extern const TelemetryField TELEMETRY_FIELDS[];
+extern const size_t TELEMETRY_FIELD_COUNT;
+
+// Field whose canonical name or alias is `name`, or NULL
+const TelemetryField *telemetry_field_find(const char *name);
+
+// Register `name` and every other name of the same field on one slot, so a
+// rule written against either dialect matches logs from both writers.
+// Unknown names are registered alone. Returns the slot or -1.
+int telemetry_schema_add(JsonScanSchema *schema, const char *name, JsonScanType type);
+
+#endif // ZENCUBE_TELEMETRY_SCHEMA_H
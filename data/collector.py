@@ -2,41 +2,215 @@
 
 This module loads JSONL telemetry captured by the sandbox monitor (both real and
 synthetic runs) and computes feature vectors that downstream models can
-consume. The implementation favours readability and defensive handling over raw
-performance because datasets are relatively small (hundreds to thousands of
-runs).
+consume. Per-run parsing favours readability and defensive handling;
+large corpora are handled by streaming (:func:`iter_runs`,
+:func:`iter_features`) and by parsing files in a process pool.
 """
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
 import datetime as dt
+import functools
+import gzip
+import itertools
 import json
+import re
 import statistics
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, MutableMapping, Optional, Sequence
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 
+from .columns import RunColumns
+from .jsonl_scan import scan_log
+from .schema import get_decoder, schema_version_of
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle at runtime
+    from .feature_cache import FeatureCache
+
 REAL_SOURCE = "real"
 SYNTH_SOURCE = "synthetic"
 UNKNOWN_LABEL = "unknown"
 BENIGN_LABEL = "benign"
 MALICIOUS_LABEL = "malicious"
+DEFAULT_PATTERN = "monitor_run_*.jsonl"
+READERS = ("lines", "mmap")
+ARCHIVE_DIR_NAME = "archive"
+# Default cap on the decompressed size of the logs parsed concurrently
+MAX_RESIDENT_BYTES = 512 * 1024 * 1024
+
+FEATURE_COLUMNS = (
+    "cpu_mean",
+    "cpu_max",
+    "cpu_std",
+    "cpu_slope",
+    "rss_mean",
+    "rss_max",
+    "rss_std",
+    "rss_slope",
+    "io_read_rate",
+    "io_write_rate",
+    "open_files_mean",
+    "socket_count_mean",
+    "time_above_cpu_50",
+    "violation_count",
+    "duration_seconds",
+    "threads_mean",
+)
+# Bump whenever compute_features would return different numbers for the same
+# log; cached feature vectors from other versions are discarded.
+FEATURE_VERSION = 2
+
+_RUN_STAMP = re.compile(r"(\d{8}T\d{6}Z)")
+# How far from the end load_run_header looks for the stop event
+_TAIL_BYTES = 64 * 1024
+_T = TypeVar("_T")
+
+
+@dataclass(slots=True, init=False)
+class TelemetryRun:
+    """Normalized representation of a single sandbox run.
 
+    Runs loaded from disk keep their samples in a :class:`~data.columns.RunColumns`
+    store and build the ``samples`` dicts from it on first access. Handing
+    out that list drops the columns, so from then on the dicts are the only
+    copy of the data and edits to them (or to the list) are seen by feature
+    extraction like on any dict-backed run.
 
-@dataclass(slots=True)
-class TelemetryRun:
-    """Normalized representation of a single sandbox run."""
+    Runs from :func:`load_run_header` start with only their start/stop events
+    and read the samples from disk, with the reader they were created with,
+    the first time anything needs them.
+    """
 
     run_id: str
     path: Path
     source: str
     start_event: Dict[str, object]
-    samples: List[MutableMapping[str, object]]
-    stop_event: Optional[Dict[str, object]] = None
-    label: Optional[str] = None
-    summary: Optional[str] = None
+    stop_event: Optional[Dict[str, object]]
+    label: Optional[str]
+    summary: Optional[str]
+    epochs: Optional[np.ndarray] = field(repr=False, compare=False)
+    _columns: Optional[RunColumns] = field(repr=False, compare=False)
+    _samples: Optional[List[MutableMapping[str, object]]] = field(repr=False)
+    _lazy: bool = field(repr=False, compare=False)
+    _reader: str = field(repr=False, compare=False)
+
+    def __init__(
+        self,
+        run_id: str,
+        path: Path,
+        source: str,
+        start_event: Dict[str, object],
+        samples: Optional[List[MutableMapping[str, object]]] = None,
+        stop_event: Optional[Dict[str, object]] = None,
+        label: Optional[str] = None,
+        summary: Optional[str] = None,
+        *,
+        columns: Optional[RunColumns] = None,
+        lazy: bool = False,
+        reader: str = "lines",
+    ) -> None:
+        self.run_id = run_id
+        self.path = path
+        self.source = source
+        self.start_event = start_event
+        self.stop_event = stop_event
+        self.label = label
+        self.summary = summary
+        self.epochs = None
+        self._columns = columns
+        self._lazy = lazy
+        self._reader = reader
+        self._samples = samples if samples is not None or columns is not None or lazy else []
+
+    @property
+    def loaded(self) -> bool:
+        """False until a header-only run (see :func:`load_run_header`) has read its samples."""
+
+        return not self._lazy
+
+    @property
+    def columns(self) -> Optional[RunColumns]:
+        self._ensure_loaded()
+        return self._columns
+
+    @property
+    def samples(self) -> List[MutableMapping[str, object]]:
+        self._ensure_loaded()
+        if self._samples is None:
+            columns = self._columns
+            self._samples = columns.to_samples() if columns is not None else []  # type: ignore[assignment]
+            if columns is not None:
+                # The dicts may now be edited; keep only one copy of the data
+                self._columns = None
+                self.epochs = columns.epochs
+        return self._samples  # type: ignore[return-value]
+
+    @samples.setter
+    def samples(self, samples: List[MutableMapping[str, object]]) -> None:
+        self._samples = samples
+        self._columns = None
+        self._lazy = False
+        self.epochs = None
+
+    @property
+    def sample_count(self) -> int:
+        self._ensure_loaded()
+        if self._samples is None and self._columns is not None:
+            return len(self._columns)
+        return len(self.samples)
+
+    def series(self, key: str) -> np.ndarray:
+        """One sample field as float64, from the columns when the run has them."""
+
+        if self.columns is not None:
+            values = self.columns.column(key)
+            if values is not None:
+                return values
+        return _extract_series(self.samples, key)
+
+    def timestamp_array(self) -> np.ndarray:
+        """Sample timestamps as float64 epoch seconds, parsed once and cached.
+
+        Samples without a string timestamp get their index instead.
+        """
+
+        if self.columns is not None:
+            return self.columns.epochs
+        if self.epochs is None or len(self.epochs) != len(self.samples):
+            self.epochs = parse_timestamps([sample.get("timestamp") for sample in self.samples])
+        return self.epochs
+
+    def _ensure_loaded(self) -> None:
+        if not self._lazy:
+            return
+        self._lazy = False
+        full = _load_run(self.path, self.source, reader=self._reader)
+        if full is None:
+            self._samples = []
+            return
+        self._columns = full._columns
+        self._samples = full._samples
 
     def duration_seconds(self) -> float:
         if self.stop_event and "duration_seconds" in self.stop_event:
@@ -46,8 +220,29 @@ class TelemetryRun:
                 pass
         interval = _extract_interval(self.start_event)
         if interval <= 0:
-            interval = _infer_interval(self.samples)
-        return interval * max(len(self.samples), 1)
+            interval = _infer_interval(self._head_timestamps(), self.timestamp_array())
+        return interval * max(self.sample_count, 1)
+
+    def time_range(self) -> Tuple[float, float]:
+        """First and last sample time in epoch seconds.
+
+        Runs whose samples carry no string timestamps fall back to the stamp
+        in the file name (see :func:`run_timestamp`), else ``(nan, nan)``.
+        """
+
+        if self.sample_count and isinstance(self._head_timestamps()[0], str):
+            epochs = self.timestamp_array()
+            return float(epochs.min()), float(epochs.max())
+        stamp = run_timestamp(self.path)
+        if stamp is None:
+            return float("nan"), float("nan")
+        return stamp, stamp
+
+    def _head_timestamps(self) -> List[object]:
+        self._ensure_loaded()
+        if self._samples is None and self._columns is not None and self._columns.timestamps is not None:
+            return self.columns.timestamp_strings(5)
+        return [sample.get("timestamp") for sample in self.samples[:5]]
 
     def violation_count(self) -> int:
         if self.stop_event and "violation_count" in self.stop_event:
@@ -71,9 +266,177 @@ class FeatureVector:
     label: str
 
 
+RunTime = Union[dt.datetime, float, None]
+
+
+def run_paths(
+    log_dir: Path,
+    synthetic_dir: Optional[Path] = None,
+    *,
+    pattern: str = DEFAULT_PATTERN,
+    synthetic_pattern: str = "*.jsonl",
+    since: RunTime = None,
+    until: RunTime = None,
+    include_archives: bool = False,
+) -> List[Tuple[Path, str]]:
+    """List ``(path, source)`` pairs :func:`iter_runs` would load, in load order.
+
+    ``since``/``until`` (datetimes or epoch seconds, inclusive) prune by the
+    ``YYYYmmddTHHMMSSZ`` stamp in the file name before anything is opened.
+    Files without a stamp, such as synthetic runs, are never pruned.
+
+    ``include_archives`` adds the ``<pattern>.gz`` files that
+    :mod:`monitor.log_rotate` moved to ``log_dir/archive``. They are ordered
+    by name together with the live logs. A run present in both places (rotation
+    interrupted half way) is read from the live file.
+    """
+
+    lower = _as_epoch(since)
+    upper = _as_epoch(until)
+    selected: List[Tuple[Path, str]] = []
+    sources = [(log_dir, pattern, REAL_SOURCE)]
+    if synthetic_dir is not None:
+        sources.append((synthetic_dir, synthetic_pattern, SYNTH_SOURCE))
+    for directory, glob, source in sources:
+        directory = directory.expanduser().resolve()
+        paths = sorted(directory.glob(glob))
+        if include_archives and source == REAL_SOURCE:
+            live = {path.name for path in paths}
+            archived = [
+                path for path in (directory / ARCHIVE_DIR_NAME).glob(glob + ".gz") if path.name[: -len(".gz")] not in live
+            ]
+            paths = sorted(paths + archived, key=run_id_of)
+        for path in paths:
+            if lower is not None or upper is not None:
+                stamp = run_timestamp(path)
+                if stamp is not None and ((lower is not None and stamp < lower) or (upper is not None and stamp > upper)):
+                    continue
+            selected.append((path, source))
+    return selected
+
+
+def iter_runs(
+    log_dir: Path,
+    synthetic_dir: Optional[Path] = None,
+    *,
+    pattern: str = DEFAULT_PATTERN,
+    synthetic_pattern: str = "*.jsonl",
+    since: RunTime = None,
+    until: RunTime = None,
+    workers: int = 0,
+    batch_size: int = 32,
+    lazy: bool = False,
+    reader: str = "lines",
+    include_archives: bool = False,
+    max_resident_bytes: Optional[int] = MAX_RESIDENT_BYTES,
+) -> Iterator[TelemetryRun]:
+    """Stream runs one at a time instead of materialising the whole corpus.
+
+    With ``workers > 1`` files are parsed in a process pool, ``batch_size``
+    files per task, with at most ``2 * workers`` batches in flight so memory
+    stays bounded however large the corpus is. Runs are yielded in the same
+    order as the serial path. New batches are also held back while the
+    decompressed size of the files in flight would exceed
+    ``max_resident_bytes`` (None for no cap), so a pool working through large
+    ``.gz`` archives stays within a memory budget. At least one batch is
+    always in flight.
+
+    ``lazy`` yields header-only runs from :func:`load_run_header` instead.
+    ``reader`` picks how sample lines are parsed and ``include_archives``
+    adds rotated logs; see :func:`collect_runs`.
+    """
+
+    paths = run_paths(
+        log_dir,
+        synthetic_dir,
+        pattern=pattern,
+        synthetic_pattern=synthetic_pattern,
+        since=since,
+        until=until,
+        include_archives=include_archives,
+    )
+    yield from iter_run_paths(
+        paths,
+        workers=workers,
+        batch_size=batch_size,
+        lazy=lazy,
+        reader=reader,
+        max_resident_bytes=max_resident_bytes,
+    )
+
+
+def iter_run_paths(
+    paths: Sequence[Tuple[Path, str]],
+    *,
+    workers: int = 0,
+    batch_size: int = 32,
+    lazy: bool = False,
+    reader: str = "lines",
+    max_resident_bytes: Optional[int] = MAX_RESIDENT_BYTES,
+) -> Iterator[TelemetryRun]:
+    """:func:`iter_runs` over an explicit list of ``(path, source)`` pairs.
+
+    Used to load a subset picked from a :class:`data.manifest.DatasetManifest`
+    without globbing the log directories again.
+    """
+
+    _check_reader(reader)
+    loader = functools.partial(_load_batch, lazy=lazy, reader=reader)
+    for batch in _iter_batches(paths, loader, workers, batch_size, max_resident_bytes):
+        yield from batch
+
+
+def iter_features(
+    log_dir: Path,
+    synthetic_dir: Optional[Path] = None,
+    *,
+    pattern: str = DEFAULT_PATTERN,
+    synthetic_pattern: str = "*.jsonl",
+    since: RunTime = None,
+    until: RunTime = None,
+    workers: int = 0,
+    batch_size: int = 32,
+    keep_samples: bool = False,
+    reader: str = "lines",
+    include_archives: bool = False,
+    max_resident_bytes: Optional[int] = MAX_RESIDENT_BYTES,
+) -> Iterator[FeatureVector]:
+    """Like :func:`iter_runs` but yields feature vectors computed in the workers.
+
+    Unless ``keep_samples`` is set, each vector's run keeps its start/stop
+    events but drops its samples, so only features cross the process boundary
+    and stay resident.
+    """
+
+    _check_reader(reader)
+
+    paths = run_paths(
+        log_dir,
+        synthetic_dir,
+        pattern=pattern,
+        synthetic_pattern=synthetic_pattern,
+        since=since,
+        until=until,
+        include_archives=include_archives,
+    )
+    loader = functools.partial(_feature_batch, keep_samples=keep_samples, reader=reader)
+    for batch in _iter_batches(paths, loader, workers, batch_size, max_resident_bytes):
+        yield from batch
+
+
 def collect_runs(
     log_dir: Path,
     synthetic_dir: Optional[Path] = None,
+    *,
+    pattern: str = DEFAULT_PATTERN,
+    synthetic_pattern: str = "*.jsonl",
+    since: RunTime = None,
+    until: RunTime = None,
+    workers: int = 0,
+    lazy: bool = False,
+    reader: str = "lines",
+    include_archives: bool = False,
+    max_resident_bytes: Optional[int] = MAX_RESIDENT_BYTES,
 ) -> List[TelemetryRun]:
     """Load telemetry runs from disk.
 
@@ -81,114 +444,540 @@ def collect_runs(
     ----------
     log_dir:
         Directory containing `monitor_run_*.jsonl` files captured by the live
-        monitor.
+        monitor (or whatever ``pattern`` matches).
     synthetic_dir:
         Optional directory containing synthetic JSONL telemetry generated by
         `data.sample_generator`.
+    since, until:
+        Optional time window matched against the timestamp in each file name.
+    workers:
+        Parse files in this many processes; see :func:`iter_runs`.
+    lazy:
+        Read only each run's start/stop events now and its samples on first
+        access, using ``reader``; see :func:`load_run_header`.
+    reader:
+        ``"lines"`` (default) JSON-decodes every line. ``"mmap"`` scans each
+        file with :func:`data.jsonl_scan.scan_log`: sample lines are
+        recognised by their byte prefix and only the schema fields and
+        timestamp are extracted, which is faster on large corpora. Keys
+        outside the schema are then not kept on the samples. Both readers
+        produce the same features and accept ``.jsonl.gz`` files.
+    include_archives:
+        Also load the gzip archives :mod:`monitor.log_rotate` keeps in
+        ``log_dir/archive``; see :func:`run_paths`.
+    max_resident_bytes:
+        With ``workers``, cap on the decompressed size of files being parsed
+        at once; see :func:`iter_runs`.
     """
 
-    runs: List[TelemetryRun] = []
-    log_dir = log_dir.expanduser().resolve()
-    synthetic_paths: List[Path] = []
+    return list(
+        iter_runs(
+            log_dir,
+            synthetic_dir,
+            pattern=pattern,
+            synthetic_pattern=synthetic_pattern,
+            since=since,
+            until=until,
+            workers=workers,
+            lazy=lazy,
+            reader=reader,
+            include_archives=include_archives,
+            max_resident_bytes=max_resident_bytes,
+        )
+    )
 
-    for path in sorted(log_dir.glob("monitor_run_*.jsonl")):
-        run = _load_run(path, source=REAL_SOURCE)
+
+def log_size(path: Path) -> int:
+    """Decompressed size of a log in bytes, without decompressing it.
+
+    For ``.gz`` files this is the larger of the file size and the gzip
+    trailer's ISIZE (the uncompressed length modulo 2**32). Unreadable files
+    count as 0.
+    """
+
+    try:
+        size = path.stat().st_size
+        if path.suffix != ".gz" or size < 4:
+            return size
+        with path.open("rb") as handle:
+            handle.seek(-4, 2)
+            return max(size, int.from_bytes(handle.read(4), "little"))
+    except OSError:
+        return 0
+
+
+def run_id_of(path: Path) -> str:
+    """Run id for a log file: its stem, ignoring a trailing ``.gz``."""
+
+    if path.suffix == ".gz":
+        path = path.with_suffix("")
+    return path.stem
+
+
+def run_timestamp(path: Path) -> Optional[float]:
+    """Epoch seconds from a ``..._YYYYmmddTHHMMSSZ_...`` file name, if present."""
+
+    match = _RUN_STAMP.search(path.name)
+    if not match:
+        return None
+    try:
+        stamp = dt.datetime.strptime(match.group(1), "%Y%m%dT%H%M%SZ")
+    except ValueError:
+        return None
+    return stamp.replace(tzinfo=dt.timezone.utc).timestamp()
+
+
+def _as_epoch(value: RunTime) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=dt.timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _check_reader(reader: str) -> None:
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader {reader!r}; expected one of {', '.join(READERS)}")
+
+
+def _load_batch(batch: Sequence[Tuple[Path, str]], lazy: bool = False, reader: str = "lines") -> List[TelemetryRun]:
+    load = functools.partial(load_run_header if lazy else _load_run, reader=reader)
+    runs = []
+    for path, source in batch:
+        run = load(path, source=source)
         if run:
             runs.append(run)
+    return runs
 
-    if synthetic_dir is not None:
-        synthetic_dir = synthetic_dir.expanduser().resolve()
-        for path in sorted(synthetic_dir.glob("*.jsonl")):
-            synthetic_paths.append(path)
-        for path in synthetic_paths:
-            run = _load_run(path, source=SYNTH_SOURCE)
-            if run:
-                runs.append(run)
 
-    return runs
+def _feature_batch(batch: Sequence[Tuple[Path, str]], keep_samples: bool, reader: str = "lines") -> List[FeatureVector]:
+    vectors = []
+    for run in _load_batch(batch, reader=reader):
+        vector = compute_features(run)
+        if not keep_samples:
+            run.samples = []
+        vectors.append(vector)
+    return vectors
+
+
+def _iter_batches(
+    paths: Sequence[Tuple[Path, str]],
+    loader: Callable[[Sequence[Tuple[Path, str]]], List[_T]],
+    workers: int,
+    batch_size: int,
+    max_resident_bytes: Optional[int] = None,
+) -> Iterator[List[_T]]:
+    batch_size = max(batch_size, 1)
+    batches = (paths[start : start + batch_size] for start in range(0, len(paths), batch_size))
+    if workers <= 1 or len(paths) <= batch_size:
+        for batch in batches:
+            yield loader(batch)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[concurrent.futures.Future, int]] = collections.deque()
+        resident = 0
+        for batch in batches:
+            size = sum(log_size(path) for path, _ in batch) if max_resident_bytes is not None else 0
+            while pending and (
+                len(pending) >= 2 * workers
+                or (max_resident_bytes is not None and resident + size > max_resident_bytes)
+            ):
+                future, done = pending.popleft()
+                resident -= done
+                yield future.result()
+            pending.append((pool.submit(loader, batch), size))
+            resident += size
+        while pending:
+            yield pending.popleft()[0].result()
 
 
 def compute_features(run: TelemetryRun) -> FeatureVector:
-    samples = run.samples
-    if not samples:
-        features = _empty_feature_vector()
-        return FeatureVector(run=run, features=features, label=run.label or UNKNOWN_LABEL)
+    matrix, _ = compute_feature_matrix([run])
+    features = dict(zip(FEATURE_COLUMNS, matrix[0].tolist()))
+    return FeatureVector(run=run, features=features, label=_run_label(run))
+
 
-    timestamps, cpu_vals = _extract_series(samples, "cpu_percent")
-    _, rss_vals = _extract_series(samples, "memory_rss")
+def compute_feature_matrix(runs: Sequence[TelemetryRun]) -> Tuple[np.ndarray, List[str]]:
+    """Features for many runs at once: a ``len(runs) x FEATURE_COLUMNS`` matrix and the run ids.
 
-    _, read_bytes = _extract_series(samples, "read_bytes")
-    _, write_bytes = _extract_series(samples, "write_bytes")
-    _, open_files = _extract_series(samples, "open_files")
-    _, socket_counts = _extract_series(samples, "socket_count")
+    Every run's columns are concatenated and each feature is one segment-wise
+    reduction (``np.add.reduceat`` and friends) over the whole batch.
+    :func:`compute_features` is this function applied to a single run, so the
+    per-run and batched paths give identical numbers.
+    """
 
-    interval = _extract_interval(run.start_event)
-    if interval <= 0:
-        interval = _infer_interval(samples)
-    duration = run.duration_seconds() or interval * len(samples)
+    runs = list(runs)
+    matrix = np.zeros((len(runs), len(FEATURE_COLUMNS)), dtype=np.float64)
+    rows = [index for index, run in enumerate(runs) if run.sample_count]
+    if rows:
+        matrix[rows] = _feature_rows([runs[index] for index in rows])
+    return matrix, [run.run_id for run in runs]
 
-    cpu_mean = float(np.mean(cpu_vals)) if cpu_vals.size > 0 else 0.0
-    cpu_max = float(np.max(cpu_vals)) if cpu_vals.size > 0 else 0.0
-    cpu_std = float(np.std(cpu_vals)) if cpu_vals.size > 1 else 0.0
-    cpu_slope = _compute_slope(timestamps, cpu_vals)
 
-    rss_mean = float(np.mean(rss_vals)) if rss_vals.size > 0 else 0.0
-    rss_max = float(np.max(rss_vals)) if rss_vals.size > 0 else 0.0
-    rss_std = float(np.std(rss_vals)) if rss_vals.size > 1 else 0.0
-    rss_slope = _compute_slope(timestamps, rss_vals)
+def _feature_rows(runs: Sequence[TelemetryRun]) -> np.ndarray:
+    counts = np.array([run.sample_count for run in runs], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
 
-    read_rate = _compute_rate(read_bytes, duration)
-    write_rate = _compute_rate(write_bytes, duration)
+    def gather(key: str) -> np.ndarray:
+        return np.concatenate([run.series(key) for run in runs])
 
-    open_files_mean = float(np.mean(open_files)) if open_files.size > 0 else 0.0
-    socket_count_mean = float(np.mean(socket_counts)) if socket_counts.size > 0 else 0.0
+    timestamps = np.concatenate([run.timestamp_array() for run in runs])
+    cpu_vals = gather("cpu_percent")
+    rss_vals = gather("memory_rss")
 
-    time_above_cpu_50 = _time_above_threshold(cpu_vals, interval, threshold=50.0)
+    intervals = np.empty(len(runs), dtype=np.float64)
+    durations = np.empty(len(runs), dtype=np.float64)
+    for index, run in enumerate(runs):
+        interval = _extract_interval(run.start_event)
+        if interval <= 0:
+            interval = _infer_interval(run._head_timestamps(), run.timestamp_array())
+        intervals[index] = interval
+        durations[index] = run.duration_seconds() or interval * run.sample_count
 
-    violation_count = float(run.violation_count())
+    cpu_mean = _segment_mean(cpu_vals, starts, counts)
+    rss_mean = _segment_mean(rss_vals, starts, counts)
+    above = np.add.reduceat((cpu_vals > 50.0).astype(np.int64), starts)
 
-    features = {
+    columns = {
         "cpu_mean": cpu_mean,
-        "cpu_max": cpu_max,
-        "cpu_std": cpu_std,
-        "cpu_slope": cpu_slope,
+        "cpu_max": np.maximum.reduceat(cpu_vals, starts),
+        "cpu_std": _segment_std(cpu_vals, cpu_mean, starts, counts),
+        "cpu_slope": _segment_slope(timestamps, cpu_vals, starts, counts),
         "rss_mean": rss_mean,
-        "rss_max": rss_max,
-        "rss_std": rss_std,
-        "rss_slope": rss_slope,
-        "io_read_rate": read_rate,
-        "io_write_rate": write_rate,
-        "open_files_mean": open_files_mean,
-        "socket_count_mean": socket_count_mean,
-        "time_above_cpu_50": time_above_cpu_50,
-        "violation_count": violation_count,
-        "duration_seconds": float(duration),
-        "threads_mean": float(np.mean(_extract_numeric(samples, "threads"))) if samples else 0.0,
+        "rss_max": np.maximum.reduceat(rss_vals, starts),
+        "rss_std": _segment_std(rss_vals, rss_mean, starts, counts),
+        "rss_slope": _segment_slope(timestamps, rss_vals, starts, counts),
+        "io_read_rate": _segment_rate(gather("read_bytes"), starts, counts, durations),
+        "io_write_rate": _segment_rate(gather("write_bytes"), starts, counts, durations),
+        "open_files_mean": _segment_mean(gather("open_files"), starts, counts),
+        "socket_count_mean": _segment_mean(gather("socket_count"), starts, counts),
+        "time_above_cpu_50": above * np.where(intervals > 0, intervals, 0.2),
+        "violation_count": np.array([run.violation_count() for run in runs], dtype=np.float64),
+        "duration_seconds": durations,
+        "threads_mean": _threads_mean(runs),
     }
+    return np.column_stack([columns[name] for name in FEATURE_COLUMNS])
 
-    label = run.label or (run.stop_event or {}).get("label") or UNKNOWN_LABEL
-    if isinstance(label, str):
-        label = label.lower()
-    else:
-        label = UNKNOWN_LABEL
 
-    return FeatureVector(run=run, features=features, label=str(label))
+def build_feature_table(runs: Iterable[TelemetryRun], cache: Optional["FeatureCache"] = None) -> List[FeatureVector]:
+    """Feature vectors for ``runs``, computed in one :func:`compute_feature_matrix` batch.
 
+    With a :class:`~data.feature_cache.FeatureCache` only new or changed logs
+    are recomputed and the cache is saved afterwards.
+    """
 
-def build_feature_table(runs: Iterable[TelemetryRun]) -> List[FeatureVector]:
-    return [compute_features(run) for run in runs]
+    runs = list(runs)
+    table: List[Optional[Dict[str, float]]] = [cache.get(run) if cache is not None else None for run in runs]
+    missing = [index for index, features in enumerate(table) if features is None]
+    if missing:
+        matrix, _ = compute_feature_matrix([runs[index] for index in missing])
+        for index, row in zip(missing, matrix.tolist()):
+            table[index] = dict(zip(FEATURE_COLUMNS, row))
+            if cache is not None:
+                cache.put(runs[index], table[index])  # type: ignore[arg-type]
+    if cache is not None:
+        cache.save()
+    return [
+        FeatureVector(run=run, features=features, label=_run_label(run))  # type: ignore[arg-type]
+        for run, features in zip(runs, table)
+    ]
+
+
+def stack_features(vectors: Sequence[FeatureVector]) -> np.ndarray:
+    """``len(vectors) x FEATURE_COLUMNS`` matrix of already computed feature vectors."""
+
+    matrix = np.empty((len(vectors), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for row, vector in enumerate(vectors):
+        matrix[row] = [vector.features[column] for column in FEATURE_COLUMNS]
+    return matrix
+
+
+class _Moments:
+    """Running mean/variance of ``v`` and its covariance with ``t`` (Welford), with removal."""
+
+    __slots__ = ("n", "mean_t", "mean_v", "m2_t", "m2_v", "c_tv")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean_t = self.mean_v = self.m2_t = self.m2_v = self.c_tv = 0.0
+
+    def add(self, t: float, v: float) -> None:
+        self.n += 1
+        dt_ = t - self.mean_t
+        dv = v - self.mean_v
+        self.mean_t += dt_ / self.n
+        self.mean_v += dv / self.n
+        self.m2_t += dt_ * (t - self.mean_t)
+        self.m2_v += dv * (v - self.mean_v)
+        self.c_tv += dt_ * (v - self.mean_v)
+
+    def remove(self, t: float, v: float) -> None:
+        if self.n <= 1:
+            self.__init__()  # type: ignore[misc]
+            return
+        self.n -= 1
+        mean_t = self.mean_t - (t - self.mean_t) / self.n
+        mean_v = self.mean_v - (v - self.mean_v) / self.n
+        self.m2_t -= (t - mean_t) * (t - self.mean_t)
+        self.m2_v -= (v - mean_v) * (v - self.mean_v)
+        self.c_tv -= (t - mean_t) * (v - self.mean_v)
+        self.mean_t, self.mean_v = mean_t, mean_v
+
+    def std(self) -> float:
+        return float(np.sqrt(max(self.m2_v, 0.0) / self.n)) if self.n > 1 else 0.0
+
+    def slope(self) -> float:
+        return self.c_tv / self.m2_t if self.n > 1 and self.m2_t > 0 else 0.0
+
+
+class _Extremes:
+    """Running min and max; monotonic deques when values can leave a window."""
+
+    __slots__ = ("_windowed", "_max", "_min")
+
+    def __init__(self, windowed: bool) -> None:
+        self._windowed = windowed
+        self._max: Deque[Tuple[int, float]] = collections.deque()
+        self._min: Deque[Tuple[int, float]] = collections.deque()
+
+    def add(self, seq: int, value: float) -> None:
+        for queue, beats in ((self._max, value.__ge__), (self._min, value.__le__)):
+            if self._windowed:
+                while queue and beats(queue[-1][1]):
+                    queue.pop()
+                queue.append((seq, value))
+            elif not queue:
+                queue.append((seq, value))
+            elif beats(queue[0][1]):
+                queue[0] = (seq, value)
+
+    def evict(self, seq: int) -> None:
+        for queue in (self._max, self._min):
+            if queue and queue[0][0] == seq:
+                queue.popleft()
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1]
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1]
+
+
+class _Point(NamedTuple):
+    seq: int
+    timestamp: Optional[str]
+    epoch: float
+    cpu: float
+    rss: float
+    read_bytes: float
+    write_bytes: float
+    open_files: float
+    socket_count: float
+    threads: Optional[float]
+
+
+class IncrementalFeatures:
+    """``FEATURE_COLUMNS`` for a live run, updated in O(1) per sample.
+
+    Means and standard deviations use Welford's algorithm, slopes a streaming
+    least-squares co-moment, maxima running (or monotonic-deque) extremes, and
+    I/O rates the first and last cumulative counters. With ``window`` set only
+    the newest ``window`` samples count, as if :func:`compute_features` ran on
+    that slice; each sample then also leaves in O(1) (amortised).
+
+    :meth:`features` matches :func:`compute_features` on the same samples up
+    to floating-point rounding (about 1e-9 relative to each feature's scale).
+    """
 
+    def __init__(
+        self,
+        start_event: Optional[Dict[str, object]] = None,
+        *,
+        window: Optional[int] = None,
+        violation_count: int = 0,
+    ) -> None:
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+        self._interval = _extract_interval(start_event or {})
+        self._window = window
+        self.violation_count = violation_count
+        self._seq = 0
+        self._origin: Optional[float] = None
+        self._points: Deque[_Point] = collections.deque()
+        self._head: List[_Point] = []
+        self._last: Optional[_Point] = None
+        self._cpu = _Moments()
+        self._rss = _Moments()
+        self._cpu_range = _Extremes(window is not None)
+        self._rss_range = _Extremes(window is not None)
+        self._open_files = 0.0
+        self._sockets = 0.0
+        self._threads = 0.0
+        self._thread_count = 0
+        self._above = 0
+
+    @property
+    def sample_count(self) -> int:
+        return self._cpu.n
+
+    def add(self, sample: Mapping[str, object]) -> None:
+        """Fold one telemetry sample (a ``sample`` event dict) into the features."""
+
+        raw_ts = sample.get("timestamp")
+        timestamp = raw_ts if isinstance(raw_ts, str) else None
+        threads = _float_or_none(sample.get("threads"))
+        point = _Point(
+            seq=self._seq,
+            timestamp=timestamp,
+            epoch=_to_epoch(timestamp) if timestamp is not None else float(self._seq),
+            cpu=_float_or_zero(sample.get("cpu_percent")),
+            rss=_float_or_zero(sample.get("memory_rss")),
+            read_bytes=_float_or_zero(sample.get("read_bytes")),
+            write_bytes=_float_or_zero(sample.get("write_bytes")),
+            open_files=_float_or_zero(sample.get("open_files")),
+            socket_count=_float_or_zero(sample.get("socket_count")),
+            threads=threads,
+        )
+        self._seq += 1
+        if self._origin is None:
+            # Regress on time since the first sample: slopes are shift-invariant and
+            # raw epochs (~1.7e9) would cost the running means most of their precision
+            self._origin = point.epoch
+        self._apply(point, 1)
+        self._cpu.add(point.epoch - self._origin, point.cpu)
+        self._rss.add(point.epoch - self._origin, point.rss)
+        self._cpu_range.add(point.seq, point.cpu)
+        self._rss_range.add(point.seq, point.rss)
+        self._last = point
+        if self._window is None:
+            if len(self._head) < 5:
+                self._head.append(point)
+            return
+        self._points.append(point)
+        if len(self._points) > self._window:
+            oldest = self._points.popleft()
+            self._cpu_range.evict(oldest.seq)
+            self._rss_range.evict(oldest.seq)
+            if oldest.seq % self._window == self._window - 1:
+                self._resync()
+            else:
+                self._apply(oldest, -1)
+                self._cpu.remove(oldest.epoch - self._origin, oldest.cpu)
+                self._rss.remove(oldest.epoch - self._origin, oldest.rss)
+
+    def _resync(self) -> None:
+        """Rebuild the running sums from the window once per ``window`` evictions.
+
+        Removal slowly accumulates rounding error; recomputing costs O(window)
+        every ``window`` samples, so updates stay O(1) amortised.
+        """
+
+        self._origin = self._points[0].epoch
+        self._cpu, self._rss = _Moments(), _Moments()
+        self._open_files = self._sockets = self._threads = 0.0
+        self._thread_count = self._above = 0
+        for point in self._points:
+            self._apply(point, 1)
+            self._cpu.add(point.epoch - self._origin, point.cpu)
+            self._rss.add(point.epoch - self._origin, point.rss)
+
+    def features(self) -> Dict[str, float]:
+        n = self.sample_count
+        if not n:
+            return _empty_feature_vector()
+        head = list(itertools.islice(self._points, 5)) if self._window is not None else self._head
+        first, last = head[0], self._last
+        assert last is not None
+        interval = self._interval
+        if interval <= 0:
+            interval = _infer_interval(
+                [point.timestamp for point in head], np.array([point.epoch for point in head])
+            )
+        duration = interval * n
+
+        def rate(start: float, end: float) -> float:
+            return (end - start) / duration if n > 1 and duration > 0 else 0.0
+
+        return {
+            "cpu_mean": self._cpu.mean_v,
+            "cpu_max": self._cpu_range.max,
+            "cpu_std": _window_std(self._cpu, self._cpu_range),
+            "cpu_slope": 0.0 if _is_flat(self._cpu_range, first.cpu) else self._cpu.slope(),
+            "rss_mean": self._rss.mean_v,
+            "rss_max": self._rss_range.max,
+            "rss_std": _window_std(self._rss, self._rss_range),
+            "rss_slope": 0.0 if _is_flat(self._rss_range, first.rss) else self._rss.slope(),
+            "io_read_rate": rate(first.read_bytes, last.read_bytes),
+            "io_write_rate": rate(first.write_bytes, last.write_bytes),
+            "open_files_mean": self._open_files / n,
+            "socket_count_mean": self._sockets / n,
+            "time_above_cpu_50": self._above * (interval if interval > 0 else 0.2),
+            "violation_count": float(self.violation_count),
+            "duration_seconds": float(duration),
+            "threads_mean": self._threads / self._thread_count if self._thread_count else 0.0,
+        }
+
+    def _apply(self, point: _Point, sign: int) -> None:
+        self._open_files += sign * point.open_files
+        self._sockets += sign * point.socket_count
+        self._above += sign * (point.cpu > 50.0)
+        if point.threads is not None:
+            self._threads += sign * point.threads
+            self._thread_count += sign
+
+
+def _window_std(moments: _Moments, extremes: _Extremes) -> float:
+    # Removal can leave rounding residue in m2; a constant window is exactly 0
+    return 0.0 if extremes.max == extremes.min else moments.std()
+
+
+def _is_flat(extremes: _Extremes, first: float) -> bool:
+    tolerance = 1e-8 + 1e-5 * abs(first)
+    return extremes.max - first <= tolerance and first - extremes.min <= tolerance
+
+
+def _float_or_none(value: object) -> Optional[float]:
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_or_zero(value: object) -> float:
+    result = _float_or_none(value)
+    return 0.0 if result is None else result
+
+
+def _run_label(run: TelemetryRun) -> str:
+    if not run.sample_count:
+        return run.label or UNKNOWN_LABEL
+    label = run.label or (run.stop_event or {}).get("label") or UNKNOWN_LABEL
+    if isinstance(label, str):
+        return label.lower()
+    return UNKNOWN_LABEL
 
-def _load_run(path: Path, source: str) -> Optional[TelemetryRun]:
+
+def _load_run(path: Path, source: str, reader: str = "lines") -> Optional[TelemetryRun]:
+    scanned = None
     try:
-        events = list(_read_jsonl(path))
+        if reader == "mmap":
+            scanned = scan_log(path)
+            events = scanned.events
+            samples = scanned.samples or []
+        else:
+            events = list(_read_jsonl(path))
+            samples = [event for event in events if event.get("event") == "sample"]
     except OSError:
         return None
-    if not events:
+    if not events and not (scanned is not None and scanned.sample_count):
         return None
 
     start_event = next((event for event in events if event.get("event") == "start"), None)
-    samples = [event for event in events if event.get("event") == "sample"]
     stop_event = next((event for event in reversed(events) if event.get("event") == "stop"), None)
 
     if start_event is None:
@@ -200,21 +989,102 @@ def _load_run(path: Path, source: str) -> Optional[TelemetryRun]:
         label = stop_event.get("label") if isinstance(stop_event.get("label"), str) else None
         summary = stop_event.get("summary") if isinstance(stop_event.get("summary"), str) else None
 
-    run_id = path.stem
+    run_id = run_id_of(path)
+    decoder = get_decoder(schema_version_of(start_event))
+    decoded = [decoder.decode(sample) for sample in samples]
+    columns = None
+    if scanned is not None and scanned.fields is not None:
+        epochs = parse_timestamps(scanned.timestamps)  # type: ignore[arg-type]
+        columns = RunColumns.from_arrays(scanned.fields, scanned.timestamps, epochs, {"event": "sample"})  # type: ignore[arg-type]
+    elif decoded:
+        epochs = parse_timestamps([sample.get("timestamp") for sample in decoded])
+        columns = RunColumns.from_samples(decoded, epochs, decoder)
     return TelemetryRun(
         run_id=run_id,
         path=path,
         source=source,
         start_event=start_event,
-        samples=[_normalise_sample(sample) for sample in samples],
+        samples=None if columns is not None else decoded,
+        stop_event=stop_event,
+        label=label,
+        summary=summary,
+        columns=columns,
+    )
+
+
+def load_run_header(path: Path, source: str = REAL_SOURCE, reader: str = "lines") -> Optional[TelemetryRun]:
+    """A lazy run carrying only the start/stop events, label and summary.
+
+    The start event comes from the first line and the stop event from a
+    reverse scan of the last ``_TAIL_BYTES`` of the file, so the cost does not
+    grow with the number of samples. Logs that do not open with a ``start``
+    event are loaded in full instead, as are ``.gz`` archives, which
+    cannot be read from the end. Samples are read on first access, with
+    ``reader`` (see :func:`collect_runs`).
+    """
+
+    _check_reader(reader)
+    if path.suffix == ".gz":
+        return _load_run(path, source=source, reader=reader)
+    try:
+        with path.open("rb") as handle:
+            start_event = _decode_event(handle.readline())
+            if start_event is None or start_event.get("event") != "start":
+                return _load_run(path, source=source, reader=reader)
+            stop_event = _find_tail_event(handle, b"stop")
+    except OSError:
+        return None
+
+    label = None
+    summary = None
+    if stop_event:
+        label = stop_event.get("label") if isinstance(stop_event.get("label"), str) else None
+        summary = stop_event.get("summary") if isinstance(stop_event.get("summary"), str) else None
+    return TelemetryRun(
+        run_id=run_id_of(path),
+        path=path,
+        source=source,
+        start_event=start_event,
         stop_event=stop_event,
         label=label,
         summary=summary,
+        lazy=True,
+        reader=reader,
     )
 
 
+def _decode_event(line: bytes) -> Optional[Dict[str, object]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _find_tail_event(handle: BinaryIO, name: bytes) -> Optional[Dict[str, object]]:
+    """Last event called ``name`` within the final ``_TAIL_BYTES`` of ``handle``."""
+
+    end = handle.seek(0, 2)
+    start = max(end - _TAIL_BYTES, 0)
+    handle.seek(start)
+    lines = handle.read(end - start).split(b"\n")
+    if start > 0:
+        lines = lines[1:]  # first line is probably cut off
+    needle = b'"' + name + b'"'
+    for line in reversed(lines):
+        if needle in line:
+            event = _decode_event(line)
+            if event is not None and event.get("event") == name.decode():
+                return event
+    return None
+
+
 def _read_jsonl(path: Path) -> Iterator[Dict[str, object]]:
-    with path.open("r", encoding="utf-8") as handle:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
         for line in handle:
             line = line.strip()
             if not line:
@@ -226,43 +1096,23 @@ def _read_jsonl(path: Path) -> Iterator[Dict[str, object]]:
 
 
 def _normalise_sample(sample: MutableMapping[str, object]) -> MutableMapping[str, object]:
-    defaults = {
-        "cpu_percent": 0.0,
-        "memory_rss": 0.0,
-        "memory_vms": 0.0,
-        "threads": 0,
-        "open_files": 0,
-        "socket_count": 0,
-        "read_bytes": 0,
-        "write_bytes": 0,
-    }
-    for key, default in defaults.items():
-        value = sample.get(key, default)
-        if value is None:
-            sample[key] = default
-        else:
-            try:
-                sample[key] = float(value) if isinstance(default, float) else int(value)
-            except (TypeError, ValueError):
-                sample[key] = default
-    return sample
+    return get_decoder().decode(sample)
 
 
-def _extract_series(samples: List[MutableMapping[str, object]], key: str) -> tuple[np.ndarray, np.ndarray]:
-    timestamps: List[float] = []
+def _extract_series(samples: List[MutableMapping[str, object]], key: str) -> np.ndarray:
+    raw = [sample.get(key) for sample in samples]
+    if None not in raw:
+        try:
+            return np.array(raw, dtype=float)
+        except (TypeError, ValueError):
+            pass
     values: List[float] = []
-    for sample in samples:
-        ts_raw = sample.get("timestamp")
-        if isinstance(ts_raw, str):
-            timestamps.append(_to_epoch(ts_raw))
-        else:
-            timestamps.append(float(len(timestamps)))
-        raw_value = sample.get(key)
+    for raw_value in raw:
         try:
-            values.append(float(raw_value))
+            values.append(float(raw_value))  # type: ignore[arg-type]
         except (TypeError, ValueError):
             values.append(0.0)
-    return np.array(timestamps, dtype=float), np.array(values, dtype=float)
+    return np.array(values, dtype=float)
 
 
 def _extract_interval(start_event: Dict[str, object]) -> float:
@@ -275,14 +1125,15 @@ def _extract_interval(start_event: Dict[str, object]) -> float:
         return 0.0
 
 
-def _infer_interval(samples: List[MutableMapping[str, object]]) -> float:
-    if len(samples) < 2:
+def _infer_interval(head: Sequence[object], epochs: Optional[np.ndarray] = None) -> float:
+    """Mean spacing of the first five string timestamps in ``head``."""
+
+    if len(head) < 2:
         return 0.2
     timestamps = []
-    for sample in samples[:5]:
-        ts = sample.get("timestamp")
+    for index, ts in enumerate(head[:5]):
         if isinstance(ts, str):
-            timestamps.append(_to_epoch(ts))
+            timestamps.append(float(epochs[index]) if epochs is not None else _to_epoch(ts))
     if len(timestamps) < 2:
         return 0.2
     diffs = [max(timestamps[i + 1] - timestamps[i], 1e-6) for i in range(len(timestamps) - 1)]
@@ -292,30 +1143,53 @@ def _infer_interval(samples: List[MutableMapping[str, object]]) -> float:
         return 0.2
 
 
-def _compute_slope(timestamps: np.ndarray, values: np.ndarray) -> float:
-    if len(values) < 2:
-        return 0.0
-    if np.allclose(values, values[0]):
-        return 0.0
-    try:
-        coeffs = np.polyfit(timestamps, values, 1)
-    except np.linalg.LinAlgError:
-        return 0.0
-    return float(coeffs[0])
+def _segment_mean(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    return np.add.reduceat(values, starts) / counts
 
 
-def _compute_rate(series: np.ndarray, duration: float) -> float:
-    if len(series) < 2 or duration <= 0:
-        return 0.0
-    total = float(series[-1] - series[0])
-    return total / duration
+def _segment_std(values: np.ndarray, mean: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    deviation = values - np.repeat(mean, counts)
+    std = np.sqrt(np.add.reduceat(deviation * deviation, starts) / counts)
+    return np.where(counts > 1, std, 0.0)
 
 
-def _time_above_threshold(values: np.ndarray, interval: float, threshold: float) -> float:
-    if interval <= 0:
-        interval = 0.2
-    count = float(np.sum(values > threshold))
-    return count * interval
+def _segment_slope(timestamps: np.ndarray, values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Least-squares slope of ``values`` over ``timestamps`` per segment.
+
+    Flat segments (``np.allclose`` to their first value), single samples and
+    segments with no time spread get 0.0.
+    """
+
+    first = np.repeat(values[starts], counts)
+    flat = np.logical_and.reduceat(np.abs(values - first) <= 1e-8 + 1e-5 * np.abs(first), starts)
+    dt_ = timestamps - np.repeat(_segment_mean(timestamps, starts, counts), counts)
+    dv = values - np.repeat(_segment_mean(values, starts, counts), counts)
+    sxy = np.add.reduceat(dt_ * dv, starts)
+    sxx = np.add.reduceat(dt_ * dt_, starts)
+    valid = (counts > 1) & ~flat & (sxx > 0)
+    return np.divide(sxy, sxx, out=np.zeros_like(sxy), where=valid)
+
+
+def _segment_rate(series: np.ndarray, starts: np.ndarray, counts: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    total = series[starts + counts - 1] - series[starts]
+    valid = (counts > 1) & (durations > 0)
+    return np.divide(total, durations, out=np.zeros_like(total), where=valid)
+
+
+def _threads_mean(runs: Sequence[TelemetryRun]) -> np.ndarray:
+    # Dict-backed runs skip unparseable values, so counts can differ from sample_count
+    series = [
+        run.series("threads") if run.columns is not None else np.array(_extract_numeric(run.samples, "threads"))
+        for run in runs
+    ]
+    counts = np.array([len(values) for values in series], dtype=np.int64)
+    means = np.zeros(len(runs), dtype=np.float64)
+    present = counts > 0
+    if present.any():
+        kept = counts[present]
+        starts = np.concatenate(([0], np.cumsum(kept)[:-1]))
+        means[present] = _segment_mean(np.concatenate([values for values in series if len(values)]), starts, kept)
+    return means
 
 
 def _extract_numeric(samples: List[MutableMapping[str, object]], key: str) -> List[float]:
@@ -330,24 +1204,7 @@ def _extract_numeric(samples: List[MutableMapping[str, object]], key: str) -> Li
 
 
 def _empty_feature_vector() -> Dict[str, float]:
-    return {
-        "cpu_mean": 0.0,
-        "cpu_max": 0.0,
-        "cpu_std": 0.0,
-        "cpu_slope": 0.0,
-        "rss_mean": 0.0,
-        "rss_max": 0.0,
-        "rss_std": 0.0,
-        "rss_slope": 0.0,
-        "io_read_rate": 0.0,
-        "io_write_rate": 0.0,
-        "open_files_mean": 0.0,
-        "socket_count_mean": 0.0,
-        "time_above_cpu_50": 0.0,
-        "violation_count": 0.0,
-        "duration_seconds": 0.0,
-        "threads_mean": 0.0,
-    }
+    return dict.fromkeys(FEATURE_COLUMNS, 0.0)
 
 
 def _to_epoch(ts: str) -> float:
@@ -355,4 +1212,44 @@ def _to_epoch(ts: str) -> float:
     try:
         return dt.datetime.fromisoformat(ts).timestamp()
     except ValueError:
-        return float(len(ts))
\ No newline at end of file
+        return float(len(ts))
+
+
+def parse_timestamps(values: Sequence[object]) -> np.ndarray:
+    """Epoch seconds for a run's sample timestamps as one float64 array.
+
+    UTC ISO-8601 strings (``...Z`` or ``...+00:00``, as every writer in the
+    repo produces) are parsed in one ``datetime64`` conversion; anything else
+    falls back to :func:`_to_epoch` per value. Non-string entries get their
+    index, matching what the per-sample path always did.
+    """
+
+    epochs = np.arange(len(values), dtype=np.float64)
+    positions = [index for index, value in enumerate(values) if isinstance(value, str)]
+    if not positions:
+        return epochs
+    strings: List[str] = [values[index] for index in positions]  # type: ignore[misc]
+    parsed = _parse_utc_iso(strings)
+    if parsed is None:
+        parsed = np.array([_to_epoch(ts) for ts in strings], dtype=np.float64)
+    epochs[positions] = parsed
+    return epochs
+
+
+def _parse_utc_iso(strings: List[str]) -> Optional[np.ndarray]:
+    stripped: List[str] = []
+    for ts in strings:
+        if ts.endswith("Z"):
+            stripped.append(ts[:-1])
+        elif ts.endswith("+00:00"):
+            stripped.append(ts[:-6])
+        else:
+            return None  # naive or offset timestamps need fromisoformat's semantics
+    try:
+        micros = np.array(stripped, dtype="datetime64[us]")
+    except ValueError:
+        return None
+    if np.isnat(micros).any():
+        return None
+    # Same division timedelta.total_seconds() does, so results match _to_epoch bit for bit
+    return micros.astype(np.int64) / 1e6
@@ -0,0 +1,152 @@
+"""Column store for a run's telemetry samples.
+
+A decoded sample is a dict of a dozen boxed values; a long run holds
+thousands of them. :class:`RunColumns` keeps the same data as one NumPy
+array per schema field, the parsed epoch timestamps, and the raw timestamp
+strings as bytes. Keys outside the schema are kept once when every sample
+shares the value (``"event": "sample"``) and per sample otherwise, so
+:meth:`RunColumns.to_samples` rebuilds dicts equal to the decoded input.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .schema import SampleDecoder
+
+_TIMESTAMP = "timestamp"
+
+
+@dataclass(slots=True)
+class RunColumns:
+    """Samples of one run, column-wise.
+
+    ``fields`` holds every canonical schema field (float64 or int64 by the
+    field's dtype). ``timestamps`` is None when some sample has no string
+    timestamp; the raw values then live in ``extras``.
+    """
+
+    epochs: np.ndarray
+    fields: Dict[str, np.ndarray]
+    timestamps: Optional[np.ndarray]
+    constants: Dict[str, object]
+    extras: Optional[List[Dict[str, object]]]
+
+    @classmethod
+    def from_samples(
+        cls,
+        samples: Sequence[Mapping[str, object]],
+        epochs: np.ndarray,
+        decoder: SampleDecoder,
+    ) -> Optional["RunColumns"]:
+        """Pack decoded ``samples``; None if a value does not fit its column dtype."""
+
+        fields: Dict[str, np.ndarray] = {}
+        try:
+            for name, _, kind in decoder.sources:
+                fields[name] = np.array(
+                    [sample[name] for sample in samples], dtype=np.float64 if kind is float else np.int64
+                )
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+
+        raw = [sample.get(_TIMESTAMP) for sample in samples]
+        timestamps: Optional[np.ndarray] = None
+        if all(isinstance(value, str) for value in raw):
+            timestamps = _timestamp_column(raw)  # type: ignore[arg-type]
+
+        skip = set(fields)
+        if timestamps is not None:
+            skip.add(_TIMESTAMP)
+        rest = [{key: value for key, value in sample.items() if key not in skip} for sample in samples]
+        constants: Dict[str, object] = dict(rest[0]) if rest else {}
+        for other in rest[1:]:
+            for key in [key for key, value in constants.items() if key not in other or other[key] != value]:
+                del constants[key]
+        extras: Optional[List[Dict[str, object]]] = None
+        if any(len(other) != len(constants) for other in rest):
+            extras = [{key: value for key, value in other.items() if key not in constants} for other in rest]
+
+        return cls(epochs=epochs, fields=fields, timestamps=timestamps, constants=constants, extras=extras)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        fields: Dict[str, np.ndarray],
+        timestamps: Sequence[str],
+        epochs: np.ndarray,
+        constants: Optional[Dict[str, object]] = None,
+    ) -> "RunColumns":
+        """Wrap already-typed schema columns (see :mod:`data.jsonl_scan`)."""
+
+        return cls(
+            epochs=epochs,
+            fields=fields,
+            timestamps=_timestamp_column(timestamps),
+            constants=dict(constants or {}),
+            extras=None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (excluding ``constants``/``extras``)."""
+
+        total = self.epochs.nbytes + sum(column.nbytes for column in self.fields.values())
+        if self.timestamps is not None:
+            total += self.timestamps.nbytes
+        return total
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """``name`` as float64, or None if it is not a schema field."""
+
+        values = self.fields.get(name)
+        if values is None:
+            return None
+        return values if values.dtype == np.float64 else values.astype(np.float64)
+
+    def timestamp_strings(self, stop: Optional[int] = None) -> List[object]:
+        """Raw ``timestamp`` value per sample (``""`` where absent), up to ``stop``."""
+
+        if self.timestamps is not None:
+            stamps = self.timestamps[:stop].tolist()
+            if self.timestamps.dtype.kind == "S":
+                return [value.decode("ascii") for value in stamps]
+            return stamps
+        default = self.constants.get(_TIMESTAMP, "")
+        if self.extras is None:
+            return [default] * len(self.epochs[:stop])
+        return [other.get(_TIMESTAMP, default) for other in self.extras[:stop]]
+
+    def to_samples(self) -> List[Dict[str, object]]:
+        """Rebuild the per-sample dicts."""
+
+        names = list(self.fields)
+        values = [self.fields[name].tolist() for name in names]
+        stamps = self.timestamp_strings() if self.timestamps is not None else None
+        samples: List[Dict[str, object]] = []
+        for index in range(len(self)):
+            sample = dict(self.constants)
+            if stamps is not None:
+                sample[_TIMESTAMP] = stamps[index]
+            if self.extras is not None:
+                sample.update(self.extras[index])
+            for name, column in zip(names, values):
+                sample[name] = column[index]
+            samples.append(sample)
+        return samples
+
+
+def _timestamp_column(raw: Sequence[str]) -> np.ndarray:
+    try:
+        return np.array(raw, dtype=np.bytes_)
+    except UnicodeEncodeError:
+        return np.array(raw, dtype=np.str_)
+
+
+__all__ = ["RunColumns"]
@@ -0,0 +1,127 @@
+"""Persistent cache of per-run feature vectors.
+
+Entries are keyed by the log's resolved path plus its size and mtime, the
+telemetry schema version the run was decoded with, and
+:data:`data.collector.FEATURE_VERSION`. A change to any of them makes the
+entry stale, so editing, regenerating or rotating a log (or changing
+``compute_features``) recomputes just that run.
+
+The cache is one ``.npz`` file of parallel columns (paths, keys, and a
+``runs x FEATURE_COLUMNS`` float64 matrix) replaced atomically on save.
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .collector import FEATURE_COLUMNS, FEATURE_VERSION, TelemetryRun
+from .schema import schema_version_of
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "features.npz"
+
+# (size, mtime_ns, schema_version, feature_version)
+CacheKey = Tuple[int, int, int, int]
+
+
+def cache_key(run: TelemetryRun) -> Optional[CacheKey]:
+    """Key for ``run``'s log as it is on disk now, or None if it cannot be stat'ed."""
+
+    try:
+        stat = run.path.stat()
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns, schema_version_of(run.start_event), FEATURE_VERSION)
+
+
+class FeatureCache:
+    """Feature vectors for previously seen logs, loaded once and saved on demand."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH) -> None:
+        self._path = Path(path)
+        self._entries: Dict[str, Tuple[CacheKey, np.ndarray]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, run: TelemetryRun) -> Optional[Dict[str, float]]:
+        key = cache_key(run)
+        entry = self._entries.get(str(run.path.resolve())) if key is not None else None
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(zip(FEATURE_COLUMNS, entry[1].tolist()))
+
+    def put(self, run: TelemetryRun, features: Dict[str, float]) -> None:
+        key = cache_key(run)
+        if key is None:
+            return
+        row = np.array([features[column] for column in FEATURE_COLUMNS], dtype=np.float64)
+        self._entries[str(run.path.resolve())] = (key, row)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache if anything changed, dropping entries for deleted logs."""
+
+        for path in [path for path in self._entries if not os.path.exists(path)]:
+            del self._entries[path]
+            self._dirty = True
+        if not self._dirty:
+            return
+
+        paths = list(self._entries)
+        keys = np.array([self._entries[path][0] for path in paths], dtype=np.int64).reshape(len(paths), 4)
+        matrix = np.array([self._entries[path][1] for path in paths], dtype=np.float64).reshape(
+            len(paths), len(FEATURE_COLUMNS)
+        )
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                columns=np.array(FEATURE_COLUMNS),
+                paths=np.array(paths, dtype=np.str_),
+                keys=keys,
+                features=matrix,
+            )
+        os.replace(tmp_path, self._path)
+        self._dirty = False
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dirty = True
+
+    def _load(self) -> None:
+        try:
+            with np.load(self._path, allow_pickle=False) as data:
+                columns = tuple(data["columns"].tolist())
+                paths = data["paths"].tolist()
+                keys = data["keys"]
+                matrix = data["features"]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return  # missing or unreadable: start empty, rewritten on save
+        if columns != tuple(FEATURE_COLUMNS):
+            self._dirty = True
+            return
+        for index, path in enumerate(paths):
+            key = tuple(int(value) for value in keys[index])
+            if key[3] == FEATURE_VERSION:
+                self._entries[path] = (key, matrix[index])  # type: ignore[assignment]
+            else:
+                self._dirty = True
+
+
+__all__ = ["DEFAULT_CACHE_PATH", "FeatureCache", "cache_key"]
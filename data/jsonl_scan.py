@@ -0,0 +1,261 @@
+"""Bulk scanner for telemetry JSONL logs.
+
+:func:`scan_log` reads a plain log through ``mmap`` (or streams a
+``.jsonl.gz`` archive) in whole-line chunks and never JSON-decodes a
+``sample`` line. Lines
+are told apart by a byte prefix (``{"event": "sample"``); the few other
+events are decoded normally. Sample lines share their key order within a log,
+so the first one is turned into a regex template that captures only the
+schema fields and the timestamp. One ``findall`` over each chunk's sample
+lines then yields the columns directly, so only the captured values are held
+for the whole log.
+
+Any log the template does not describe exactly falls back to decoding every
+line, so results never depend on which path ran.
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import json
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .schema import SAMPLE_FIELDS, get_decoder, schema_version_of
+
+# Patterns run over the log with a newline prepended, so a leading "\n"
+# anchors them to line starts while keeping a literal prefix to search for.
+_OTHER_EVENT_LINE = re.compile(rb'\n\{"event": ?"(?!sample")[^\n]*')
+_BLANK_LINES = re.compile(rb"\n{2,}")
+
+# Logs are scanned in whole-line chunks of about this size, so peak memory
+# beyond the captured columns does not grow with the log
+_CHUNK_BYTES = 8 << 20
+
+_NUMBER = rb"(-?[0-9][0-9.eE+-]*)"
+_STRING = rb'"([^"\\\n]*)"'
+_SKIP_VALUE = {
+    "number": rb"-?[0-9][0-9.eE+-]*",
+    "string": rb'"(?:[^"\\\n]|\\.)*"',
+    "literal": rb"(?:true|false|null)",
+}
+
+
+class _Layout(NamedTuple):
+    pattern: "re.Pattern[bytes]"
+    captured: Tuple[str, ...]
+    version: int
+
+
+@dataclass(slots=True)
+class ScannedLog:
+    """What :func:`scan_log` found in one log.
+
+    ``events`` holds every non-sample event in file order. Samples come back
+    either as ``fields`` (canonical schema columns) plus raw ``timestamps``,
+    or, when the fast path did not apply, as ``samples`` dicts still to be
+    decoded.
+    """
+
+    events: List[Dict[str, object]]
+    samples: Optional[List[Dict[str, object]]]
+    fields: Optional[Dict[str, np.ndarray]] = None
+    timestamps: Optional[List[str]] = None
+
+    @property
+    def sample_count(self) -> int:
+        if self.fields is not None:
+            return len(next(iter(self.fields.values())))
+        return len(self.samples or [])
+
+
+def scan_log(path: Path) -> ScannedLog:
+    """Scan ``path`` (``.jsonl`` or ``.jsonl.gz``); raises :class:`OSError` if unreadable."""
+
+    events: List[Dict[str, object]] = []
+    parts: List[Tuple[Dict[str, np.ndarray], List[str]]] = []
+    layout: Optional[_Layout] = None
+    for chunk in _iter_chunks(path):
+        others = list(_OTHER_EVENT_LINE.finditer(chunk))
+        events.extend(event for event in (_decode(match.group(0)) for match in others) if event is not None)
+        pieces = []
+        previous = 0
+        for match in others:
+            pieces.append(chunk[previous : match.start()])
+            previous = match.end()
+        pieces.append(chunk[previous:])
+        del chunk, others
+        blob = b"".join(pieces).rstrip()
+        del pieces
+        if b"\n\n" in blob:
+            blob = _BLANK_LINES.sub(b"\n", blob)
+
+        # Every remaining line should now be a sample; each starts after a "\n"
+        line_count = blob.count(b"\n")
+        if line_count == 0:
+            continue
+        if layout is None:
+            start = next((event for event in events if event.get("event") == "start"), None)
+            layout = _layout_of(blob, schema_version_of(start))
+        columns = _scan_columns(blob, line_count, layout) if layout is not None else None
+        if columns is None:
+            return _decode_all(path)
+        parts.append(columns)
+
+    if not parts:
+        return ScannedLog(events=events, samples=[])
+    fields = {name: np.concatenate([part[0][name] for part in parts]) for name in SAMPLE_FIELDS}
+    timestamps = [timestamp for part in parts for timestamp in part[1]]
+    return ScannedLog(events=events, samples=None, fields=fields, timestamps=timestamps)
+
+
+def _iter_chunks(path: Path) -> Iterator[bytes]:
+    """Yield ``path`` in whole-line chunks of about ``_CHUNK_BYTES``, each prefixed with ``"\\n"``.
+
+    Plain logs are read through ``mmap`` and archives are decompressed as a
+    stream, so at most one chunk is held as bytes at a time.
+    """
+
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as handle:
+            tail = b""
+            while True:
+                block = handle.read(_CHUNK_BYTES)
+                if not block:
+                    break
+                block = tail + block
+                cut = block.rfind(b"\n") + 1
+                tail = block[cut:]
+                if cut:
+                    yield b"\n" + block[:cut]
+            if tail:
+                yield b"\n" + tail
+        return
+    with path.open("rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mapped:
+            size = len(mapped)
+            position = 0
+            while position < size:
+                end = mapped.find(b"\n", min(position + _CHUNK_BYTES, size) - 1) + 1
+                end = end or size
+                yield b"\n" + mapped[position:end]
+                position = end
+
+
+def _decode(line: bytes) -> Optional[Dict[str, object]]:
+    try:
+        event = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _decode_all(path: Path) -> ScannedLog:
+    """Slow path: JSON-decode every line, as the line reader does."""
+
+    events: List[Dict[str, object]] = []
+    samples: List[Dict[str, object]] = []
+    for chunk in _iter_chunks(path):
+        for line in chunk.split(b"\n"):
+            event = _decode(line) if line.strip() else None
+            if event is not None:
+                (samples if event.get("event") == "sample" else events).append(event)
+    return ScannedLog(events=events, samples=samples)
+
+
+def _layout_of(blob: bytes, version: int) -> Optional[_Layout]:
+    """Template for the sample lines in ``blob``, built from its first line."""
+
+    end = blob.find(b"\n", 1)
+    first = blob[1 : end if end > 0 else len(blob)]
+    template = _decode(first)
+    if template is None:
+        return None
+    compact = first.startswith(b'{"event":"sample"')
+    pattern, captured = _template(tuple((key, _kind(value)) for key, value in template.items()), compact, version)
+    if pattern is None:
+        return None
+    return _Layout(pattern, captured, version)
+
+
+def _scan_columns(blob: bytes, line_count: int, layout: _Layout) -> Optional[Tuple[Dict[str, np.ndarray], List[str]]]:
+    rows = layout.pattern.findall(blob)
+    if len(rows) != line_count:
+        return None  # some line is not a sample laid out like the first one
+    captured = layout.captured
+    values = list(zip(*rows)) if len(captured) > 1 else [rows]
+    del rows
+
+    decoder = get_decoder(layout.version)
+    fields: Dict[str, np.ndarray] = {}
+    try:
+        for name, kind in SAMPLE_FIELDS.items():
+            source = next((key for key in (name, *decoder.aliases(name)) if key in captured), None)
+            dtype = np.float64 if kind is float else np.int64
+            if source is None:
+                fields[name] = np.zeros(line_count, dtype=dtype)
+            else:
+                fields[name] = np.fromiter(map(kind, values[captured.index(source)]), dtype=dtype, count=line_count)
+    except (ValueError, OverflowError):
+        return None  # e.g. a float in an integer field: leave the coercion to the decoder
+    timestamps = [value.decode("utf-8") for value in values[captured.index("timestamp")]]
+    return fields, timestamps
+
+
+def _kind(value: object) -> str:
+    if isinstance(value, bool) or value is None:
+        return "literal"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "nested"
+
+
+@functools.lru_cache(maxsize=64)
+def _template(
+    layout: Tuple[Tuple[str, str], ...], compact: bool, version: int
+) -> Tuple[Optional["re.Pattern[bytes]"], Tuple[str, ...]]:
+    """Regex matching a sample line with ``layout``'s keys and value kinds, in order.
+
+    Captures numeric schema fields (under their canonical name or an alias)
+    and the timestamp; everything else is matched and skipped.
+    """
+
+    decoder = get_decoder(version)
+    wanted = {alias for name in SAMPLE_FIELDS for alias in (name, *decoder.aliases(name))}
+    keys = [key for key, _ in layout]
+    if keys[0] != "event" or "timestamp" not in keys or dict(layout)["timestamp"] != "string":
+        return None, ()
+
+    key_sep, item_sep = (b":", b",") if compact else (b": ", b", ")
+    parts = [b'\\n\\{"event"' + key_sep + b'"sample"']
+    captured: List[str] = []
+    for key, kind in layout[1:]:
+        if kind == "nested":
+            return None, ()
+        if key == "timestamp":
+            value = _STRING
+        elif key in wanted:
+            if kind != "number":
+                return None, ()
+            value = _NUMBER
+        else:
+            value = _SKIP_VALUE[kind]
+        if value in (_STRING, _NUMBER):
+            captured.append(key)
+        parts.append(re.escape(json.dumps(key).encode()) + key_sep + value)
+    return re.compile(item_sep.join(parts) + b"\\}\r?(?=\n|\\Z)"), tuple(captured)
+
+
+__all__ = ["ScannedLog", "scan_log"]
@@ -0,0 +1,314 @@
+"""Dataset manifest: one row of metadata per telemetry log.
+
+Each entry records a run's id, path, source, assigned label, duration,
+sample count, feature-cache key and sample time range. Training and
+evaluation query the manifest to pick a subset (by label, source, time
+window, or a stratified sample) and then load only the selected logs.
+
+:meth:`DatasetManifest.refresh` rebuilds only the entries whose log is new or
+changed since the last refresh: its size, mtime or
+:data:`data.collector.FEATURE_VERSION` differ, or it has gained alerts. Like
+:class:`data.feature_cache.FeatureCache`, the manifest is one ``.npz`` file of
+parallel columns, replaced atomically on save.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .collector import FEATURE_VERSION, RunTime, TelemetryRun, _as_epoch, build_feature_table, iter_run_paths
+from .feature_cache import CacheKey, FeatureCache, cache_key
+from .labeler import AlertSignal, assign_labels
+
+DEFAULT_MANIFEST_PATH = Path(__file__).resolve().parent / "cache" / "manifest.npz"
+MANIFEST_VERSION = 1
+
+# Runs loaded per refresh step; bounds memory while new logs are indexed
+_REFRESH_CHUNK = 256
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    run_id: str
+    path: Path
+    source: str
+    label: str
+    duration: float
+    sample_count: int
+    cache_key: CacheKey
+    start: float
+    end: float
+    alert_count: int = 0
+
+
+class _Index(NamedTuple):
+    labels: np.ndarray
+    sources: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+
+
+class DatasetManifest:
+    """Run metadata for previously seen logs, loaded once and saved on demand."""
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST_PATH) -> None:
+        self._path = Path(path)
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._index: Optional[_Index] = None
+        self._dirty = False
+        self._load()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[ManifestEntry]:
+        return iter(self._entries.values())
+
+    def get(self, path: Path) -> Optional[ManifestEntry]:
+        return self._entries.get(str(path.resolve()))
+
+    def refresh(
+        self,
+        paths: Sequence[Tuple[Path, str]],
+        *,
+        alerts: Optional[Mapping[str, List[AlertSignal]]] = None,
+        cache: Optional[FeatureCache] = None,
+        workers: int = 0,
+        reader: str = "lines",
+    ) -> int:
+        """Index new or changed logs among ``paths`` (as from :func:`~data.collector.run_paths`).
+
+        Entries whose log no longer exists are dropped. Stale logs are loaded
+        ``_REFRESH_CHUNK`` at a time and labelled with :func:`assign_labels`
+        using ``alerts``. Returns how many entries were rebuilt.
+        """
+
+        alerts = alerts or {}
+        for key in [key for key in self._entries if not os.path.exists(key)]:
+            del self._entries[key]
+            self._changed()
+
+        stale = []
+        for path, source in paths:
+            entry = self.get(path)
+            if entry is None or entry.source != source or not _is_current(entry, path, alerts):
+                stale.append((path, source))
+
+        rebuilt = 0
+        runs = iter_run_paths(stale, workers=workers, reader=reader)
+        for chunk in _chunks(runs, _REFRESH_CHUNK):
+            for vector in assign_labels(build_feature_table(chunk, cache=cache), dict(alerts)):
+                entry = _entry_for(vector.run, vector.label, vector.features["duration_seconds"], alerts)
+                if entry is not None:
+                    self._entries[str(entry.path)] = entry
+                    rebuilt += 1
+        if rebuilt:
+            self._changed()
+        return rebuilt
+
+    def select(
+        self,
+        *,
+        labels: Optional[Iterable[str]] = None,
+        sources: Optional[Iterable[str]] = None,
+        since: RunTime = None,
+        until: RunTime = None,
+        paths: Optional[Iterable[Path]] = None,
+    ) -> List[ManifestEntry]:
+        """Entries matching every given filter.
+
+        ``since``/``until`` keep runs whose sample time range overlaps the
+        window; runs with an unknown range are never pruned. ``paths``
+        restricts the result to those logs, in that order; otherwise entries
+        are ordered by run id.
+        """
+
+        index = self._build_index()
+        mask = np.ones(len(index.labels), dtype=bool)
+        if labels is not None:
+            mask &= np.isin(index.labels, list(labels))
+        if sources is not None:
+            mask &= np.isin(index.sources, list(sources))
+        lower = _as_epoch(since)
+        if lower is not None:
+            mask &= ~(index.ends < lower)
+        upper = _as_epoch(until)
+        if upper is not None:
+            mask &= ~(index.starts > upper)
+        entries = list(self._entries.values())
+        selected = [entries[position] for position in np.flatnonzero(mask)]
+        if paths is None:
+            return sorted(selected, key=lambda entry: (entry.run_id, str(entry.path)))
+        order = {str(path.resolve()): position for position, path in enumerate(paths)}
+        selected = [entry for entry in selected if str(entry.path) in order]
+        return sorted(selected, key=lambda entry: order[str(entry.path)])
+
+    def sample(self, per_label: int, *, seed: int = 0, **filters: object) -> List[ManifestEntry]:
+        """Stratified sample: at most ``per_label`` entries of each label among :meth:`select` ``(**filters)``."""
+
+        selected = self.select(**filters)  # type: ignore[arg-type]
+        by_label: Dict[str, List[int]] = {}
+        for position, entry in enumerate(selected):
+            by_label.setdefault(entry.label, []).append(position)
+        rng = np.random.default_rng(seed)
+        keep: List[int] = []
+        for label in sorted(by_label):
+            positions = by_label[label]
+            if len(positions) > per_label:
+                positions = rng.choice(positions, size=per_label, replace=False).tolist()
+            keep.extend(positions)
+        return [selected[position] for position in sorted(keep)]
+
+    def label_counts(self, **filters: object) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.select(**filters):  # type: ignore[arg-type]
+            counts[entry.label] = counts.get(entry.label, 0) + 1
+        return counts
+
+    def save(self) -> None:
+        """Write the manifest if anything changed."""
+
+        if not self._dirty:
+            return
+        entries = list(self._entries.values())
+        count = len(entries)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                version=np.array(MANIFEST_VERSION),
+                run_ids=np.array([entry.run_id for entry in entries], dtype=np.str_),
+                paths=np.array([str(entry.path) for entry in entries], dtype=np.str_),
+                sources=np.array([entry.source for entry in entries], dtype=np.str_),
+                labels=np.array([entry.label for entry in entries], dtype=np.str_),
+                durations=np.array([entry.duration for entry in entries], dtype=np.float64),
+                sample_counts=np.array([entry.sample_count for entry in entries], dtype=np.int64),
+                keys=np.array([entry.cache_key for entry in entries], dtype=np.int64).reshape(count, 4),
+                time_ranges=np.array([(entry.start, entry.end) for entry in entries], dtype=np.float64).reshape(count, 2),
+                alert_counts=np.array([entry.alert_count for entry in entries], dtype=np.int64),
+            )
+        os.replace(tmp_path, self._path)
+        self._dirty = False
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._changed()
+
+    def _changed(self) -> None:
+        self._dirty = True
+        self._index = None
+
+    def _build_index(self) -> _Index:
+        if self._index is None:
+            entries = list(self._entries.values())
+            self._index = _Index(
+                labels=np.array([entry.label for entry in entries], dtype=np.str_),
+                sources=np.array([entry.source for entry in entries], dtype=np.str_),
+                starts=np.array([entry.start for entry in entries], dtype=np.float64),
+                ends=np.array([entry.end for entry in entries], dtype=np.float64),
+            )
+        return self._index
+
+    def _load(self) -> None:
+        try:
+            with np.load(self._path, allow_pickle=False) as data:
+                if int(data["version"]) != MANIFEST_VERSION:
+                    self._dirty = True
+                    return
+                columns = zip(
+                    data["run_ids"].tolist(),
+                    data["paths"].tolist(),
+                    data["sources"].tolist(),
+                    data["labels"].tolist(),
+                    data["durations"].tolist(),
+                    data["sample_counts"].tolist(),
+                    data["keys"].tolist(),
+                    data["time_ranges"].tolist(),
+                    data["alert_counts"].tolist(),
+                )
+                for run_id, path, source, label, duration, samples, key, (start, end), alert_count in columns:
+                    self._entries[path] = ManifestEntry(
+                        run_id=run_id,
+                        path=Path(path),
+                        source=source,
+                        label=label,
+                        duration=duration,
+                        sample_count=samples,
+                        cache_key=tuple(key),  # type: ignore[arg-type]
+                        start=start,
+                        end=end,
+                        alert_count=alert_count,
+                    )
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            self._entries.clear()  # missing or unreadable: start empty, rewritten on save
+
+
+def load_runs(
+    entries: Sequence[ManifestEntry],
+    *,
+    workers: int = 0,
+    reader: str = "lines",
+) -> List[TelemetryRun]:
+    """Load the logs behind ``entries`` (and nothing else), in order."""
+
+    return list(iter_run_paths([(entry.path, entry.source) for entry in entries], workers=workers, reader=reader))
+
+
+def _is_current(entry: ManifestEntry, path: Path, alerts: Mapping[str, List[AlertSignal]]) -> bool:
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    size, mtime_ns, _, feature_version = entry.cache_key
+    return (
+        (size, mtime_ns, feature_version) == (stat.st_size, stat.st_mtime_ns, FEATURE_VERSION)
+        and entry.alert_count == len(alerts.get(entry.run_id, ()))
+    )
+
+
+def _entry_for(
+    run: TelemetryRun,
+    label: str,
+    duration: float,
+    alerts: Mapping[str, List[AlertSignal]],
+) -> Optional[ManifestEntry]:
+    key = cache_key(run)
+    if key is None:
+        return None
+    start, end = run.time_range()
+    return ManifestEntry(
+        run_id=run.run_id,
+        path=run.path.resolve(),
+        source=run.source,
+        label=label,
+        duration=float(duration),
+        sample_count=run.sample_count,
+        cache_key=key,
+        start=start,
+        end=end,
+        alert_count=len(alerts.get(run.run_id, ())),
+    )
+
+
+def _chunks(runs: Iterable[TelemetryRun], size: int) -> Iterator[List[TelemetryRun]]:
+    iterator = iter(runs)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+__all__ = ["DEFAULT_MANIFEST_PATH", "DatasetManifest", "ManifestEntry", "load_runs"]
@@ -0,0 +1,164 @@
+"""Telemetry sample schema shared by every JSONL reader.
+
+The Python monitor and the ``core_c`` sampler name the same metrics
+differently (``memory_rss`` vs ``rss_bytes``, ``open_files`` vs ``fds_open``).
+This module maps either dialect onto one canonical set of fields with fixed
+dtypes. Readers go through a :class:`SampleDecoder` instead of patching the
+names themselves, so mixed corpora decode the same way everywhere.
+
+The field map is versioned. Logs may carry ``"schema_version"`` in their
+``start`` event; anything without it is decoded as version 1. The C side
+mirrors version 1 in ``core_c/telemetry_schema.c``.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# Canonical sample fields and their dtype. Missing or malformed values decode
+# to the dtype's zero.
+SAMPLE_FIELDS: Dict[str, type] = {
+    "cpu_percent": float,
+    "memory_rss": float,
+    "memory_vms": float,
+    "threads": int,
+    "open_files": int,
+    "socket_count": int,
+    "read_bytes": int,
+    "write_bytes": int,
+}
+
+# Other names each canonical field has been written under, per schema version
+FIELD_ALIASES: Dict[int, Dict[str, Tuple[str, ...]]] = {
+    1: {
+        "memory_rss": ("rss_bytes",),
+        "memory_vms": ("vms_bytes",),
+        "open_files": ("fds_open",),
+        "memory_rss_max": ("rss_max",),
+    },
+}
+
+
+def schema_version_of(start_event: Optional[Mapping[str, object]]) -> int:
+    """Schema version declared by a run's ``start`` event (default 1)."""
+
+    if start_event:
+        try:
+            version = int(start_event.get("schema_version", SCHEMA_VERSION))  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return SCHEMA_VERSION
+        if version in FIELD_ALIASES:
+            return version
+    return SCHEMA_VERSION
+
+
+def _coerce(value: object, kind: type) -> object:
+    if value is None:
+        return kind(0)
+    try:
+        return float(value) if kind is float else int(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError, OverflowError):
+        return kind(0)
+
+
+@dataclass(frozen=True)
+class SampleDecoder:
+    """Field map for one schema version, compiled into lookup tables.
+
+    ``sources`` lists, per canonical field, the raw keys to try in order:
+    the canonical name first, then its aliases.
+    """
+
+    version: int
+    sources: Tuple[Tuple[str, Tuple[str, ...], type], ...]
+    renames: Mapping[str, str]
+
+    def decode(self, sample: MutableMapping[str, object]) -> MutableMapping[str, object]:
+        """Canonicalise one sample in place.
+
+        Aliased keys are renamed and every schema field is coerced to its
+        dtype. Unknown keys are left untouched.
+        """
+
+        for raw, canonical in self.renames.items():
+            if raw in sample:
+                value = sample.pop(raw)
+                if sample.get(canonical) is None:
+                    sample[canonical] = value
+        for name, _, kind in self.sources:
+            sample[name] = _coerce(sample.get(name), kind)
+        return sample
+
+    def lookup(self, sample: Mapping[str, object], name: str) -> object:
+        """Raw value of ``name`` under its canonical name or any alias."""
+
+        value = sample.get(name)
+        if value is None:
+            for alias in self.aliases(name):
+                value = sample.get(alias)
+                if value is not None:
+                    break
+        return value
+
+    def aliases(self, name: str) -> Tuple[str, ...]:
+        return FIELD_ALIASES[self.version].get(name, ())
+
+    def column(self, samples: Sequence[Mapping[str, object]], name: str, dtype: type = np.float64) -> np.ndarray:
+        """One field across ``samples`` as an array, resolving aliases."""
+
+        if self.aliases(name):
+            raw = [self.lookup(sample, name) for sample in samples]
+        else:
+            raw = [sample.get(name) for sample in samples]
+        if None not in raw:
+            try:
+                # Fast path: every value present and numeric
+                return np.array(raw, dtype=dtype)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return np.array([_coerce(value, float) for value in raw], dtype=dtype)
+
+    def columns(
+        self,
+        samples: Sequence[Mapping[str, object]],
+        names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Column-wise decode: one float64 array per requested field."""
+
+        wanted = list(names) if names is not None else [name for name, _, _ in self.sources]
+        return {name: self.column(samples, name) for name in wanted}
+
+
+@functools.lru_cache(maxsize=None)
+def get_decoder(version: int = SCHEMA_VERSION) -> SampleDecoder:
+    """Compiled decoder for ``version`` (cached)."""
+
+    if version not in FIELD_ALIASES:
+        raise ValueError(f"Unknown telemetry schema version {version}")
+    aliases = FIELD_ALIASES[version]
+    sources = tuple((name, aliases.get(name, ()), kind) for name, kind in SAMPLE_FIELDS.items())
+    renames = {alias: name for name, names in aliases.items() for alias in names}
+    return SampleDecoder(version=version, sources=sources, renames=renames)
+
+
+def decode_sample(sample: MutableMapping[str, object], version: int = SCHEMA_VERSION) -> MutableMapping[str, object]:
+    """Shorthand for ``get_decoder(version).decode(sample)``."""
+
+    return get_decoder(version).decode(sample)
+
+
+__all__ = [
+    "FIELD_ALIASES",
+    "SAMPLE_FIELDS",
+    "SCHEMA_VERSION",
+    "SampleDecoder",
+    "decode_sample",
+    "get_decoder",
+    "schema_version_of",
+]
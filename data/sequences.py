@@ -8,6 +8,8 @@ from typing import Iterable, List, Sequence, Tuple
 import numpy as np
 
 from .collector import TelemetryRun
+from .columns import RunColumns
+from .schema import get_decoder
 
 DEFAULT_KEYS = ("cpu_percent", "memory_rss", "open_files", "socket_count", "read_bytes", "write_bytes")
 
@@ -38,11 +40,16 @@ def extract_sequences(
 ) -> List[SequenceExample]:
     sequences: List[SequenceExample] = []
     for run in runs:
-        samples = run.samples
-        if len(samples) < window:
+        if run.sample_count < window:
             continue
-        cleaned = _normalise_samples(samples, keys)
-        ts = [sample.get("timestamp", "") for sample in samples]
+        columns = run.columns
+        if columns is not None and all(key in columns.fields for key in keys):
+            cleaned = _normalise_columns(columns, keys)
+            ts = columns.timestamp_strings()
+        else:
+            # A key outside the schema lives only in the sample dicts
+            cleaned = _normalise_samples(run.samples, keys)
+            ts = [sample.get("timestamp", "") for sample in run.samples]
         label = (run.label or "unknown").lower()
         for start in range(0, len(cleaned) - window + 1, stride):
             window_slice = cleaned[start : start + window]
@@ -60,21 +67,22 @@ def extract_sequences(
 
 
 def _normalise_samples(samples: Sequence[dict], keys: Sequence[str]) -> np.ndarray:
-    matrix = []
-    for sample in samples:
-        row = []
-        for key in keys:
-            value = sample.get(key, 0.0)
-            try:
-                raw = float(value)
-            except (TypeError, ValueError):
-                raw = 0.0
-            scale = SCALE_HINTS.get(key, 1.0)
-            if scale <= 0:
-                scale = 1.0
-            row.append(np.clip(raw / scale, 0.0, 1.0))
-        matrix.append(row)
-    return np.asarray(matrix, dtype=np.float32)
+    decoder = get_decoder()
+    return _scaled_matrix([decoder.column(samples, key) for key in keys], keys)
+
+
+def _normalise_columns(columns: RunColumns, keys: Sequence[str]) -> np.ndarray:
+    return _scaled_matrix([columns.column(key) for key in keys], keys)  # type: ignore[misc]
+
+
+def _scaled_matrix(columns: Sequence[np.ndarray], keys: Sequence[str]) -> np.ndarray:
+    matrix = np.empty((len(columns[0]) if columns else 0, len(keys)), dtype=np.float32)
+    for column, (key, values) in enumerate(zip(keys, columns)):
+        scale = SCALE_HINTS.get(key, 1.0)
+        if scale <= 0:
+            scale = 1.0
+        matrix[:, column] = np.clip(values / scale, 0.0, 1.0)
+    return matrix
 
 
 __all__ = ["SequenceExample", "extract_sequences", "DEFAULT_KEYS"]
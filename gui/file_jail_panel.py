@@ -20,6 +20,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from data.schema import get_decoder
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 SCRIPTS_DIR = ROOT_DIR / "scripts"
 MONITOR_DIR = ROOT_DIR / "monitor"
@@ -373,6 +375,7 @@ class FileJailPanel(QWidget):
             max_memory = 0
             exit_code = None
             duration = 0.0
+            decoder = get_decoder()
             
             with open(log_path, "r", encoding="utf-8") as handle:
                 for line in handle:
@@ -383,7 +386,7 @@ class FileJailPanel(QWidget):
                     if data.get("event") == "sample":
                         samples += 1
                         max_cpu = max(max_cpu, data.get("cpu_percent", 0))
-                        max_memory = max(max_memory, data.get("rss_bytes", 0))
+                        max_memory = max(max_memory, decoder.lookup(data, "memory_rss") or 0)
                     elif data.get("event") == "stop":
                         exit_code = data.get("exit_code")
                         duration = data.get("duration_seconds", 0.0)
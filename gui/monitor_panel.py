@@ -27,12 +27,14 @@ from PySide6.QtWidgets import (
 )
 
 from gui._mpl_canvas import MplCanvas
+from monitor.alert_dispatcher import AlertDispatcher
 from monitor.alert_manager import AlertManager, AlertRecord
+from monitor.instrumentation import PIPELINE, STAGE_CHART_REDRAW
 from monitor.log_rotate import KEEP_LAST_N, rotate_logs
+from monitor.native_inspector import create_inspector
 from monitor.prometheus_exporter import PrometheusExporter
 from monitor.resource_monitor import (
     MonitorError,
-    ProcessInspector,
     Sample,
     append_json_line,
     build_log_path,
@@ -89,7 +91,7 @@ class _MonitorWorker(QThread):
 
     def run(self) -> None:  # noqa: D401 - QThread entry point
         try:
-            inspector = ProcessInspector(self._pid)
+            inspector = create_inspector(self._pid)
         except MonitorError as exc:
             self.failed.emit(str(exc))
             return
@@ -216,7 +218,8 @@ class MonitoringPanel(QWidget):
         self._main_window = main_window
         self._worker: Optional[_MonitorWorker] = None
         self._log_dir = default_log_dir()
-        self._alert_manager = AlertManager(self._log_dir)
+        self._alert_dispatcher = AlertDispatcher.from_env()
+        self._alert_manager = AlertManager(self._log_dir, dispatcher=self._alert_dispatcher)
         self._prom_exporter = PrometheusExporter.from_env()
         self._prom_exporter.start()
 
@@ -422,6 +425,8 @@ class MonitoringPanel(QWidget):
 
     def shutdown(self) -> None:
         self._cleanup_worker()
+        if self._alert_dispatcher is not None:
+            self._alert_dispatcher.close()
 
     def _cleanup_worker(self) -> None:
         if self._worker is None:
@@ -595,6 +600,10 @@ class MonitoringPanel(QWidget):
     def _update_chart_visuals(self, force: bool = False) -> None:
         if not self._cpu_series and not force:
             return
+        with PIPELINE.timed(STAGE_CHART_REDRAW):
+            self._redraw_charts()
+
+    def _redraw_charts(self) -> None:
         self._update_chart(
             canvas=self.cpu_canvas,
             raw_line=self._cpu_raw_line,
@@ -3,7 +3,6 @@ from __future__ import annotations
 import os
 import shlex
 import sys
-import json
 from pathlib import Path
 from typing import Dict, List, Sequence, Optional
 
@@ -16,6 +15,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from data.collector import load_run_header
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 MONITOR_DIR = ROOT_DIR / "monitor"
 LOG_DIR = MONITOR_DIR / "logs"
@@ -215,23 +216,12 @@ class NetworkPanel(QWidget):
     
     def _parse_network_log(self, log_path: Path) -> Optional[Dict]:
         """Parse network wrapper log to extract blocking status"""
-        # Read JSONL format
-        events = []
-        try:
-            with open(log_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        events.append(json.loads(line))
-        except (OSError, json.JSONDecodeError):
+        # Only the start/stop events are needed; skip the samples in between
+        run = load_run_header(log_path)
+        if run is None:
             return None
-        
-        if not events:
-            return None
-        
-        # Look for start/stop events
-        start_event = next((e for e in events if e.get("event") == "start"), None)
-        stop_event = next((e for e in events if e.get("event") == "stop"), None)
+        start_event = run.start_event
+        stop_event = run.stop_event
         
         if not stop_event:
             return None  # Execution not finished yet
@@ -5,6 +5,7 @@ Exports a minimal inference engine used by the monitor guard and GUI.
 Contracts:
 - load_artifacts(artifact_dir) -> (model, scaler, meta, model_type)
 - MLInferenceEngine.predict_run(run: TelemetryRun|path) -> PredictionResult
+- MLInferenceEngine.predict_features(features, run_id) -> PredictionResult
 - predict_run(...) and predict_sequence(...) convenience wrappers returning dict
 
 The implementation is defensive: missing artifacts result in a harmless
@@ -142,10 +143,15 @@ class MLInferenceEngine:
 
         # compute features
         feat_vec = compute_features(tr)
-        x, order = self._prepare_vector(feat_vec.features)
+        return self.predict_features(feat_vec.features, run_id=tr.run_id)
+
+    def predict_features(self, features: Dict[str, float], run_id: str) -> PredictionResult:
+        """Classify an already computed feature dict (e.g. from ``IncrementalFeatures``)."""
+
+        x, order = self._prepare_vector(features)
 
         if self.model is None:
-            return PredictionResult(runId=tr.run_id, model="none", score=0.0, label="unknown", probabilities=None, explanation_top={}, meta=self.meta, info="no model artifacts")
+            return PredictionResult(runId=run_id, model="none", score=0.0, label="unknown", probabilities=None, explanation_top={}, meta=self.meta, info="no model artifacts")
 
         try:
             X = np.atleast_2d(x)
@@ -183,20 +189,20 @@ class MLInferenceEngine:
             elif hasattr(self.model, "coef_"):
                 coef = getattr(self.model, "coef_")
                 coef_vec = coef[0] if getattr(coef, "ndim", 1) > 1 else coef
-                contribs = {k: float(c) * float(feat_vec.features.get(k, 0.0)) for k, c in zip(order, np.ravel(coef_vec))}
+                contribs = {k: float(c) * float(features.get(k, 0.0)) for k, c in zip(order, np.ravel(coef_vec))}
                 sorted_contribs = sorted(contribs.items(), key=lambda x: -abs(x[1]))[:5]
                 explanation = {k: v for k, v in sorted_contribs}
             else:
-                values = np.array([feat_vec.features.get(k, 0.0) for k in order], dtype=float)
+                values = np.array([features.get(k, 0.0) for k in order], dtype=float)
                 if values.size:
                     var = np.abs(values)
                     top_idx = np.argsort(-var)[:5]
                     explanation = {order[int(i)]: float(var[int(i)]) for i in top_idx}
 
-            return PredictionResult(runId=tr.run_id, model=self.model_type or "sklearn", score=score, label=label, probabilities=probs, explanation_top=explanation, meta=self.meta, info=None)
+            return PredictionResult(runId=run_id, model=self.model_type or "sklearn", score=score, label=label, probabilities=probs, explanation_top=explanation, meta=self.meta, info=None)
         except Exception as exc:
             logger.exception("Inference failed: %s", exc)
-            return PredictionResult(runId=getattr(tr, "run_id", str(run)), model=self.model_type or "unknown", score=0.0, label="unknown", probabilities=None, explanation_top={}, meta=self.meta, info=str(exc))
+            return PredictionResult(runId=run_id, model=self.model_type or "unknown", score=0.0, label="unknown", probabilities=None, explanation_top={}, meta=self.meta, info=str(exc))
 
     def predict_sequence(self, seq: List[Dict[str, float]]) -> PredictionResult:
         if not seq:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import datetime as dt
 import json
 from pathlib import Path
 from typing import Dict, List, Sequence
@@ -10,29 +11,13 @@ import numpy as np
 import pandas as pd
 import torch
 
-from data.collector import FeatureVector, build_feature_table, collect_runs
+from data.collector import FEATURE_COLUMNS, FeatureVector, build_feature_table, iter_run_paths, run_paths, stack_features
+from data.feature_cache import DEFAULT_CACHE_PATH, FeatureCache
 from data.labeler import assign_labels, load_alert_index
+from data.manifest import DEFAULT_MANIFEST_PATH, DatasetManifest, load_runs
 from data.sequences import DEFAULT_KEYS, extract_sequences
 
 ARTIFACT_DIR = Path(__file__).resolve().parent / "artifacts"
-FEATURE_COLUMNS = [
-    "cpu_mean",
-    "cpu_max",
-    "cpu_std",
-    "cpu_slope",
-    "rss_mean",
-    "rss_max",
-    "rss_std",
-    "rss_slope",
-    "io_read_rate",
-    "io_write_rate",
-    "open_files_mean",
-    "socket_count_mean",
-    "time_above_cpu_50",
-    "violation_count",
-    "duration_seconds",
-    "threads_mean",
-]
 
 
 def main() -> None:
@@ -42,6 +27,17 @@ def main() -> None:
     parser.add_argument("--alerts", type=Path, default=Path(__file__).resolve().parent.parent / "monitor" / "logs" / "alerts.jsonl")
     parser.add_argument("--artifacts", type=Path, default=ARTIFACT_DIR)
     parser.add_argument("--use-lstm", action="store_true")
+    parser.add_argument("--workers", type=int, default=0, help="Parse logs in this many processes")
+    parser.add_argument("--feature-cache", type=Path, default=DEFAULT_CACHE_PATH, help="Feature cache file")
+    parser.add_argument("--no-feature-cache", action="store_true", help="Recompute every run's features")
+    parser.add_argument("--since", type=dt.datetime.fromisoformat, default=None, help="Only runs stamped at or after this ISO time")
+    parser.add_argument("--until", type=dt.datetime.fromisoformat, default=None, help="Only runs stamped at or before this ISO time")
+    parser.add_argument("--include-archives", action="store_true", help="Also evaluate rotated logs in <log-dir>/archive")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST_PATH, help="Dataset manifest file")
+    parser.add_argument("--no-manifest", action="store_true", help="Load and label every log without the manifest")
+    parser.add_argument("--label", action="append", default=None, help="Only evaluate runs with this label (repeatable)")
+    parser.add_argument("--per-label", type=int, default=None, help="Stratified sample of at most this many runs per label")
+    parser.add_argument("--seed", type=int, default=2025, help="Seed for --per-label sampling")
     args = parser.parse_args()
 
     model_path = args.artifacts / "model.pkl"
@@ -51,12 +47,32 @@ def main() -> None:
     if not model_path.exists() or not scaler_path.exists():
         raise FileNotFoundError("Baseline artifacts missing. Run models/train.py first.")
 
-    runs = collect_runs(args.log_dir, synthetic_dir=args.synth_dir)
-    feature_vectors = build_feature_table(runs)
+    paths = run_paths(
+        args.log_dir,
+        args.synth_dir,
+        since=args.since,
+        until=args.until,
+        include_archives=args.include_archives,
+    )
+    cache = None if args.no_feature_cache else FeatureCache(args.feature_cache)
     alerts = load_alert_index(args.alerts)
-    feature_vectors = assign_labels(feature_vectors, alerts)
+    if args.no_manifest:
+        if args.label or args.per_label is not None:
+            parser.error("--label and --per-label need the manifest")
+        runs = list(iter_run_paths(paths, workers=args.workers))
+    else:
+        manifest = DatasetManifest(args.manifest)
+        manifest.refresh(paths, alerts=alerts, cache=cache, workers=args.workers)
+        manifest.save()
+        selection = {"labels": args.label, "paths": [path for path, _ in paths]}
+        if args.per_label is not None:
+            entries = manifest.sample(args.per_label, seed=args.seed, **selection)
+        else:
+            entries = manifest.select(**selection)
+        runs = load_runs(entries, workers=args.workers)
+    feature_vectors = assign_labels(build_feature_table(runs, cache=cache), alerts)
 
-    df = pd.DataFrame([[vec.features[col] for col in FEATURE_COLUMNS] for vec in feature_vectors], columns=FEATURE_COLUMNS)
+    df = pd.DataFrame(stack_features(feature_vectors), columns=FEATURE_COLUMNS)
     labels = [vec.label for vec in feature_vectors]
 
     scaler = joblib.load(scaler_path)
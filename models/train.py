@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import datetime as dt
 import json
 import math
 import statistics
@@ -17,8 +18,10 @@ from sklearn.metrics import classification_report, f1_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
-from data.collector import FeatureVector, build_feature_table, collect_runs
+from data.collector import FEATURE_COLUMNS, FeatureVector, build_feature_table, iter_run_paths, run_paths, stack_features
+from data.feature_cache import DEFAULT_CACHE_PATH, FeatureCache
 from data.labeler import assign_labels, load_alert_index
+from data.manifest import DEFAULT_MANIFEST_PATH, DatasetManifest, load_runs
 from data.sample_generator import generate_dataset
 from data.sequences import DEFAULT_KEYS, SequenceExample, extract_sequences
 
@@ -28,25 +31,6 @@ SYNTH_DIR = LOG_DIR / "synth"
 ALERTS_PATH = LOG_DIR / "alerts.jsonl"
 ARTIFACT_DIR = Path(__file__).resolve().parent / "artifacts"
 
-FEATURE_COLUMNS = [
-    "cpu_mean",
-    "cpu_max",
-    "cpu_std",
-    "cpu_slope",
-    "rss_mean",
-    "rss_max",
-    "rss_std",
-    "rss_slope",
-    "io_read_rate",
-    "io_write_rate",
-    "open_files_mean",
-    "socket_count_mean",
-    "time_above_cpu_50",
-    "violation_count",
-    "duration_seconds",
-    "threads_mean",
-]
-
 TARGET_LABELS = ("benign", "malicious", "unknown")
 GB = 1024 * 1024 * 1024
 
@@ -86,6 +70,14 @@ def main() -> None:
     parser.add_argument("--regenerate", action="store_true")
     parser.add_argument("--no-lstm", action="store_true")
     parser.add_argument("--quick", action="store_true", help="Shorten training for tests")
+    parser.add_argument("--workers", type=int, default=0, help="Parse logs in this many processes")
+    parser.add_argument("--feature-cache", type=Path, default=DEFAULT_CACHE_PATH, help="Feature cache file")
+    parser.add_argument("--no-feature-cache", action="store_true", help="Recompute every run's features")
+    parser.add_argument("--since", type=dt.datetime.fromisoformat, default=None, help="Only runs stamped at or after this ISO time")
+    parser.add_argument("--until", type=dt.datetime.fromisoformat, default=None, help="Only runs stamped at or before this ISO time")
+    parser.add_argument("--include-archives", action="store_true", help="Also train on rotated logs in <log-dir>/archive")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST_PATH, help="Dataset manifest file")
+    parser.add_argument("--no-manifest", action="store_true", help="Load and label every log without the manifest")
     args = parser.parse_args()
 
     artifacts = args.artifacts.expanduser().resolve()
@@ -99,6 +91,12 @@ def main() -> None:
         max_attempts=args.max_attempts,
         force_regenerate=args.regenerate,
         quick=args.quick,
+        workers=args.workers,
+        since=args.since,
+        until=args.until,
+        include_archives=args.include_archives,
+        manifest=None if args.no_manifest else DatasetManifest(args.manifest),
+        cache=None if args.no_feature_cache else FeatureCache(args.feature_cache),
     )
 
     model_report, model, scaler = _train_baseline(feature_vectors, seed=args.seed, quick=args.quick)
@@ -138,6 +136,12 @@ def _prepare_dataset(
     max_attempts: int,
     force_regenerate: bool,
     quick: bool,
+    workers: int = 0,
+    since: Optional[dt.datetime] = None,
+    until: Optional[dt.datetime] = None,
+    cache: Optional[FeatureCache] = None,
+    include_archives: bool = False,
+    manifest: Optional[DatasetManifest] = None,
 ) -> Tuple[DatasetReport, List[FeatureVector]]:
     attempt = 0
     rng_seed = seed
@@ -152,10 +156,18 @@ def _prepare_dataset(
             if attempt > 0:
                 generate_dataset(synth_dir, seed=rng_seed, overwrite=True)
 
-        runs = collect_runs(log_dir, synthetic_dir=synth_dir)
-        feature_vectors = build_feature_table(runs)
+        paths = run_paths(log_dir, synth_dir, since=since, until=until, include_archives=include_archives)
         alerts = load_alert_index(alerts_path)
-        feature_vectors = assign_labels(feature_vectors, alerts)
+        if manifest is not None:
+            manifest.refresh(paths, alerts=alerts, cache=cache, workers=workers)
+            manifest.save()
+            entries = manifest.select(labels=TARGET_LABELS, paths=[path for path, _ in paths])
+            runs = load_runs(entries, workers=workers)
+            feature_vectors = assign_labels(build_feature_table(runs, cache=cache), alerts)
+        else:
+            runs = list(iter_run_paths(paths, workers=workers))
+            feature_vectors = assign_labels(build_feature_table(runs, cache=cache), alerts)
+            feature_vectors = [vector for vector in feature_vectors if vector.label in TARGET_LABELS]
         report = _score_dataset(feature_vectors, attempt + 1, quick=quick)
         if report.score >= 9.0:
             break
@@ -177,9 +189,7 @@ def _score_dataset(feature_vectors: Sequence[FeatureVector], attempts: int, quic
     if sample_count == 0:
         empty_metrics = {"variance_mean": 0.0, "balance_ratio": 0.0, "time_std": 0.0, "anomaly_ratio": 0.0, "rare_total": 0.0, "sample_count": 0.0}
         return DatasetReport(score=0.0, metrics=empty_metrics, class_counts=dict(class_counts), attempts=attempts)
-    feature_matrix = np.array([vector.features[c] for vector in feature_vectors for c in FEATURE_COLUMNS]).reshape(
-        sample_count, len(FEATURE_COLUMNS)
-    )
+    feature_matrix = stack_features(feature_vectors)
     variances = np.var(feature_matrix, axis=0)
     variance_score = min(variances.mean() / 500.0, 2.0)
 
@@ -228,15 +238,9 @@ def _score_dataset(feature_vectors: Sequence[FeatureVector], attempts: int, quic
 # ---------------------------------------------------------------------------
 
 def _train_baseline(feature_vectors: Sequence[FeatureVector], seed: int, quick: bool) -> Tuple[ModelReport, RandomForestClassifier, StandardScaler]:
-    records = []
-    labels = []
-    for vector in feature_vectors:
-        if vector.label not in TARGET_LABELS:
-            continue
-        records.append([vector.features[col] for col in FEATURE_COLUMNS])
-        labels.append(vector.label)
+    labels = [vector.label for vector in feature_vectors]
 
-    df = pd.DataFrame(records, columns=FEATURE_COLUMNS)
+    df = pd.DataFrame(stack_features(feature_vectors), columns=FEATURE_COLUMNS)
     scaler = StandardScaler()
     X = scaler.fit_transform(df.values)
     y = np.array(labels)
@@ -445,7 +449,7 @@ def _persist_artifacts(
         "model_f1_macro": model_report.f1_macro,
         "model_accuracy": model_report.accuracy,
         "lstm_score": model_report.lstm_score,
-        "feature_columns": FEATURE_COLUMNS,
+        "feature_columns": list(FEATURE_COLUMNS),
     }
     (artifacts / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
 
@@ -1,19 +1,34 @@
 """ZenCube monitoring utilities package."""
 
+from .alert_dispatcher import AlertDispatcher, AlertSink, ExecHookSink, UnixSocketSink, WebhookSink
 from .alert_manager import AlertManager, AlertRecord
-from .log_rotate import KEEP_LAST_N, RotationResult, rotate_logs
+from .instrumentation import PIPELINE, PipelineMetrics
+from .log_rotate import KEEP_LAST_N, RotationResult, rotate_logs, rotate_logs_native
+from .native_inspector import NativeInspector, create_inspector
 from .prometheus_exporter import PrometheusExporter
 from .resource_monitor import MonitorError, ProcessInspector, Sample, default_log_dir
+from .sample_buffer import SampleBuffer
 
 __all__ = [
+	"AlertDispatcher",
 	"AlertManager",
 	"AlertRecord",
+	"AlertSink",
+	"ExecHookSink",
 	"KEEP_LAST_N",
 	"MonitorError",
+	"NativeInspector",
+	"PIPELINE",
+	"PipelineMetrics",
 	"ProcessInspector",
 	"PrometheusExporter",
 	"RotationResult",
 	"Sample",
+	"SampleBuffer",
+	"UnixSocketSink",
+	"WebhookSink",
+	"create_inspector",
 	"default_log_dir",
 	"rotate_logs",
+	"rotate_logs_native",
 ]
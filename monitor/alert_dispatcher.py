@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import shlex
+import socket
+import subprocess
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from .alert_manager import AlertRecord
+from .instrumentation import PIPELINE
+
+_LOGGER = logging.getLogger(__name__)
+
+_DEFAULT_QUEUE_SIZE = 256
+_DEFAULT_BATCH_SIZE = 32
+_DEFAULT_BATCH_INTERVAL = 0.5
+_DEFAULT_MAX_RETRIES = 3
+_DEFAULT_BACKOFF = 0.5
+_MAX_BACKOFF = 8.0
+_SEND_TIMEOUT = 5.0
+
+
+class AlertSink(ABC):
+    """Destination for batches of alert records.
+
+    Subclasses implement :meth:`send` and raise on failure so the dispatcher
+    can retry with backoff.
+    """
+
+    name = "sink"
+
+    @abstractmethod
+    def send(self, batch: Sequence[AlertRecord]) -> None:
+        """Deliver ``batch``; raise to have the dispatcher retry it."""
+
+    def close(self) -> None:
+        return None
+
+
+def _encode_batch(batch: Sequence[AlertRecord]) -> bytes:
+    payload = {"event": "alert_batch", "alerts": [record.as_dict() for record in batch]}
+    return json.dumps(payload).encode("utf-8")
+
+
+class WebhookSink(AlertSink):
+    """POSTs each batch as JSON to an HTTP endpoint."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = _SEND_TIMEOUT) -> None:
+        if not url.startswith(("http://", "https://")):
+            raise ValueError(f"Unsupported webhook URL: {url}")
+        self._url = url
+        self._timeout = timeout
+
+    def send(self, batch: Sequence[AlertRecord]) -> None:
+        request = urllib.request.Request(
+            self._url,
+            data=_encode_batch(batch),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            status = getattr(response, "status", 200)
+            if status >= 300:
+                raise OSError(f"Webhook responded with HTTP {status}")
+
+
+class UnixSocketSink(AlertSink):
+    """Writes newline-delimited alert JSON to a Unix stream socket."""
+
+    name = "unix"
+
+    def __init__(self, path: str, timeout: float = _SEND_TIMEOUT) -> None:
+        self._path = path
+        self._timeout = timeout
+
+    def send(self, batch: Sequence[AlertRecord]) -> None:
+        lines = b"".join(json.dumps({"event": "alert", **record.as_dict()}).encode("utf-8") + b"\n" for record in batch)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self._timeout)
+            sock.connect(self._path)
+            sock.sendall(lines)
+
+
+class ExecHookSink(AlertSink):
+    """Runs a command with the batch JSON on stdin."""
+
+    name = "exec"
+
+    def __init__(self, command: Sequence[str], timeout: float = _SEND_TIMEOUT) -> None:
+        if not command:
+            raise ValueError("Exec hook command must not be empty")
+        self._command = list(command)
+        self._timeout = timeout
+
+    def send(self, batch: Sequence[AlertRecord]) -> None:
+        completed = subprocess.run(
+            self._command,
+            input=_encode_batch(batch),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=self._timeout,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise OSError(f"Exec hook exited with status {completed.returncode}")
+
+
+@dataclass
+class SinkStats:
+    queued: int = 0
+    sent: int = 0
+    batches: int = 0
+    retries: int = 0
+    dropped_full: int = 0
+    dropped_failed: int = 0
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped_full": self.dropped_full,
+            "dropped_failed": self.dropped_failed,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class _SinkWorker:
+    sink: AlertSink
+    queue: "queue.Queue[AlertRecord]"
+    stats: SinkStats = field(default_factory=SinkStats)
+    thread: Optional[threading.Thread] = None
+
+
+class AlertDispatcher:
+    """Fans alert records out to sinks on background threads.
+
+    Each sink owns a bounded queue and a worker thread, so a slow or dead
+    receiver only affects its own queue. :meth:`submit` never blocks: when a
+    queue is full the record is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[AlertSink],
+        *,
+        queue_size: int = _DEFAULT_QUEUE_SIZE,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        batch_interval: float = _DEFAULT_BATCH_INTERVAL,
+        max_retries: int = _DEFAULT_MAX_RETRIES,
+        backoff: float = _DEFAULT_BACKOFF,
+    ) -> None:
+        self._batch_size = max(batch_size, 1)
+        self._batch_interval = max(batch_interval, 0.0)
+        self._max_retries = max(max_retries, 0)
+        self._backoff = max(backoff, 0.0)
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._workers: List[_SinkWorker] = [
+            _SinkWorker(sink=sink, queue=queue.Queue(maxsize=max(queue_size, 1))) for sink in sinks
+        ]
+        for index, worker in enumerate(self._workers):
+            worker.thread = threading.Thread(
+                target=self._run_worker,
+                args=(worker,),
+                name=f"alert-dispatch-{worker.sink.name}-{index}",
+                daemon=True,
+            )
+            worker.thread.start()
+        PIPELINE.register_gauge("alert_dispatch_queue_depth", self.queue_depth)
+
+    # ------------------------------------------------------------------
+    # Construction helpers
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_env(cls) -> Optional["AlertDispatcher"]:
+        """Build a dispatcher from ``ALERT_*`` environment variables.
+
+        Returns ``None`` when no sink is configured so callers can skip
+        dispatch entirely.
+        """
+
+        sinks: List[AlertSink] = []
+        webhook = os.getenv("ALERT_WEBHOOK_URL")
+        if webhook:
+            sinks.append(WebhookSink(webhook))
+        unix_path = os.getenv("ALERT_UNIX_SOCKET")
+        if unix_path:
+            sinks.append(UnixSocketSink(unix_path))
+        hook = os.getenv("ALERT_EXEC_HOOK")
+        if hook:
+            sinks.append(ExecHookSink(shlex.split(hook)))
+        if not sinks:
+            return None
+        return cls(sinks)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, alerts: Sequence[AlertRecord]) -> None:
+        if not alerts or self._stop_event.is_set():
+            return
+        for worker in self._workers:
+            for record in alerts:
+                try:
+                    worker.queue.put_nowait(record)
+                except queue.Full:
+                    with self._lock:
+                        worker.stats.dropped_full += 1
+                else:
+                    with self._lock:
+                        worker.stats.queued += 1
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                f"{worker.sink.name}-{index}": {**worker.stats.as_dict(), "depth": worker.queue.qsize()}
+                for index, worker in enumerate(self._workers)
+            }
+
+    def queue_depth(self) -> int:
+        return sum(worker.queue.qsize() for worker in self._workers)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop workers after they drain what is already queued."""
+
+        self._stop_event.set()
+        deadline = time.monotonic() + max(timeout, 0.0)
+        for worker in self._workers:
+            if worker.thread is not None:
+                worker.thread.join(max(deadline - time.monotonic(), 0.0))
+            try:
+                worker.sink.close()
+            except Exception:  # pragma: no cover - defensive
+                pass
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _run_worker(self, worker: _SinkWorker) -> None:
+        while True:
+            batch = self._next_batch(worker)
+            if batch:
+                self._deliver(worker, batch)
+            elif self._stop_event.is_set():
+                return
+
+    def _next_batch(self, worker: _SinkWorker) -> List[AlertRecord]:
+        try:
+            first = worker.queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self._batch_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop_event.is_set():
+                break
+            try:
+                batch.append(worker.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Pick up whatever else is already waiting without further delay.
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(worker.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, worker: _SinkWorker, batch: List[AlertRecord]) -> None:
+        delay = self._backoff
+        for attempt in range(self._max_retries + 1):
+            try:
+                worker.sink.send(batch)
+            except Exception as exc:
+                with self._lock:
+                    worker.stats.last_error = str(exc)
+                if attempt >= self._max_retries:
+                    break
+                with self._lock:
+                    worker.stats.retries += 1
+                # Skip the wait once shutdown starts so close() stays bounded.
+                if not self._stop_event.is_set():
+                    self._stop_event.wait(delay)
+                delay = min(delay * 2, _MAX_BACKOFF)
+                continue
+            with self._lock:
+                worker.stats.sent += len(batch)
+                worker.stats.batches += 1
+            return
+        _LOGGER.warning("Dropping %d alert(s) for %s sink after retries", len(batch), worker.sink.name)
+        with self._lock:
+            worker.stats.dropped_failed += len(batch)
+
+
+__all__ = [
+    "AlertDispatcher",
+    "AlertSink",
+    "ExecHookSink",
+    "SinkStats",
+    "UnixSocketSink",
+    "WebhookSink",
+]
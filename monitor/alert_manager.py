@@ -5,10 +5,14 @@ import threading
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
+from .instrumentation import PIPELINE, STAGE_ALERT_EVALUATE
 from .resource_monitor import Sample, append_json_line, default_log_dir, iso_timestamp
 
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .alert_dispatcher import AlertDispatcher
+
 DEFAULT_CONFIG = {
     "cpu_pct_high": 90.0,
     "rss_mb_high": 500.0,
@@ -47,7 +51,12 @@ class AlertRecord:
 class AlertManager:
     """Evaluates monitoring samples against configurable thresholds."""
 
-    def __init__(self, log_dir: Optional[Path] = None, config_path: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        log_dir: Optional[Path] = None,
+        config_path: Optional[Path] = None,
+        dispatcher: Optional["AlertDispatcher"] = None,
+    ) -> None:
         self._log_dir = default_log_dir() if log_dir is None else log_dir
         self._log_dir.mkdir(parents=True, exist_ok=True)
         self._config_path = config_path or (self._log_dir.parent / "alerting.json")
@@ -61,6 +70,7 @@ class AlertManager:
             "rss_mb_high": 0.0,
         }
         self._current_run_id: Optional[str] = None
+        self._dispatcher = dispatcher
         self._load_existing_alerts()
 
     # ------------------------------------------------------------------
@@ -130,6 +140,13 @@ class AlertManager:
                 self._metric_counters[key] = 0.0
 
     def evaluate(self, sample: Sample, interval: float) -> List[AlertRecord]:
+        with PIPELINE.timed(STAGE_ALERT_EVALUATE):
+            alerts = self._evaluate(sample, interval)
+        if alerts:
+            PIPELINE.increment("alerts_raised", len(alerts))
+        return alerts
+
+    def _evaluate(self, sample: Sample, interval: float) -> List[AlertRecord]:
         alerts: List[AlertRecord] = []
         rss_mb = sample.memory_rss / (1024.0 * 1024.0)
         cpu_threshold = self._config["cpu_pct_high"]
@@ -165,6 +182,9 @@ class AlertManager:
             ):
                 alerts.append(self._create_alert("rss_mb_high", rss_mb, rss_threshold))
 
+        # Hand-off only enqueues; delivery happens on the dispatcher threads.
+        if alerts and self._dispatcher is not None:
+            self._dispatcher.submit(alerts)
         return alerts
 
     def active_alerts(self) -> List[AlertRecord]:
@@ -0,0 +1,240 @@
+"""Self-instrumentation for the monitoring pipeline.
+
+Stages wrap their work in ``PIPELINE.timed("<stage>")``. While instrumentation
+is disabled (the default) that call returns a shared no-op context manager, so
+the cost is one attribute check per stage invocation. Enable it with
+``ZENCUBE_INSTRUMENT=1`` or :meth:`PipelineMetrics.enable`.
+
+Collected stats are exported by :class:`monitor.prometheus_exporter.PrometheusExporter`
+as ``zencube_internal_*`` metrics and can be dumped as JSON, either from the
+CLI (``python -m monitor.instrumentation --pid <pid>``, see
+:mod:`monitor.instrumentation.__main__`) or at interpreter exit
+by setting ``ZENCUBE_INSTRUMENT_DUMP=<path>``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+_ENABLE_ENV = "ZENCUBE_INSTRUMENT"
+_DUMP_ENV = "ZENCUBE_INSTRUMENT_DUMP"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+STAGE_INSPECTOR_SAMPLE = "inspector_sample"
+STAGE_JSONL_WRITE = "jsonl_write"
+STAGE_ALERT_EVALUATE = "alert_evaluate"
+STAGE_ML_INFERENCE = "ml_inference"
+STAGE_CHART_REDRAW = "chart_redraw"
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def cumulative_buckets(self) -> List[tuple]:
+        rows = []
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            running += count
+            rows.append((repr(bound), running))
+        rows.append(("+Inf", running + self.buckets[-1]))
+        return rows
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "buckets": dict(self.cumulative_buckets()),
+        }
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: "PipelineMetrics", stage: str) -> None:
+        self._metrics = metrics
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+
+
+class PipelineMetrics:
+    """Thread-safe registry of stage latencies, counters and gauges."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, StageStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], Optional[Callable[[], float]]]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Switches
+    # ------------------------------------------------------------------
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def timed(self, stage: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.observe(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Register a callback read at export time (e.g. a queue depth).
+
+        Bound methods are held weakly so registering does not keep the owner
+        alive; the gauge disappears once the owner is collected.
+        """
+
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            ref: Callable[[], Optional[Callable[[], float]]] = weakref.WeakMethod(callback)  # type: ignore[arg-type]
+        else:
+            ref = lambda: callback  # noqa: E731 - tiny adapter
+        with self._lock:
+            self._gauges[name] = ref
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def stages(self) -> Dict[str, StageStats]:
+        with self._lock:
+            return {
+                name: StageStats(stats.count, stats.total_seconds, stats.max_seconds, list(stats.buckets))
+                for name, stats in self._stages.items()
+            }
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def gauges(self) -> Dict[str, float]:
+        with self._lock:
+            refs = list(self._gauges.items())
+        values: Dict[str, float] = {}
+        dead = []
+        for name, ref in refs:
+            callback = ref()
+            if callback is None:
+                dead.append((name, ref))
+                continue
+            try:
+                values[name] = float(callback())
+            except Exception:  # pragma: no cover - gauges must never break export
+                continue
+        if dead:
+            with self._lock:
+                for name, ref in dead:
+                    if self._gauges.get(name) is ref:
+                        del self._gauges[name]
+        return values
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "stages": {name: stats.as_dict() for name, stats in sorted(self.stages().items())},
+            "counters": dict(sorted(self.counters().items())),
+            "gauges": dict(sorted(self.gauges().items())),
+        }
+
+    def dump_json(self, path: Optional[Path] = None) -> str:
+        text = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            Path(path).write_text(text + "\n", encoding="utf-8")
+        return text
+
+
+def _enabled_from_env() -> bool:
+    return (os.getenv(_ENABLE_ENV) or "").lower() in {"1", "true", "yes", "on"}
+
+
+PIPELINE = PipelineMetrics(enabled=_enabled_from_env() or bool(os.getenv(_DUMP_ENV)))
+
+
+def _dump_at_exit() -> None:  # pragma: no cover - interpreter shutdown hook
+    target = os.getenv(_DUMP_ENV)
+    if target:
+        try:
+            PIPELINE.dump_json(Path(target))
+        except OSError:
+            pass
+
+
+atexit.register(_dump_at_exit)
+
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "PIPELINE",
+    "PipelineMetrics",
+    "STAGE_ALERT_EVALUATE",
+    "STAGE_CHART_REDRAW",
+    "STAGE_INSPECTOR_SAMPLE",
+    "STAGE_JSONL_WRITE",
+    "STAGE_ML_INFERENCE",
+    "StageStats",
+]
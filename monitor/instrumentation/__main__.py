@@ -0,0 +1,56 @@
+"""``python -m monitor.instrumentation``: profile the pipeline and dump its metrics as JSON.
+
+Samples a process through the regular sample/write/evaluate loop with
+instrumentation enabled, then prints :meth:`PipelineMetrics.dump_json`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from . import PIPELINE
+
+
+def _profile(pid: int, samples: int, interval: float, log_dir: Path) -> None:
+    from ..alert_manager import AlertManager
+    from ..native_inspector import create_inspector
+    from ..resource_monitor import append_json_line, build_log_path, ensure_log_dir
+
+    ensure_log_dir(log_dir)
+    inspector = create_inspector(pid)
+    manager = AlertManager(log_dir)
+    manager.reset_for_run(f"instrument-{pid}")
+    log_path = build_log_path(log_dir, "instrument_run", pid)
+    for _ in range(samples):
+        if not inspector.is_running():
+            break
+        time.sleep(interval)
+        sample = inspector.sample()
+        append_json_line(log_path, sample.to_dict())
+        manager.evaluate(sample, interval)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    from ..resource_monitor import default_log_dir
+
+    parser = argparse.ArgumentParser(description="Profile the monitoring pipeline and dump internal metrics as JSON")
+    parser.add_argument("--pid", type=int, default=os.getpid(), help="Process to sample (default: this process)")
+    parser.add_argument("--samples", type=int, default=20, help="Number of samples to collect")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between samples")
+    parser.add_argument("--log-dir", type=Path, default=None, help="Directory for the profiling JSONL log")
+    parser.add_argument("--out", type=Path, default=None, help="Write the JSON dump to this path as well")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    PIPELINE.enable()
+    PIPELINE.reset()
+    _profile(args.pid, max(args.samples, 0), max(args.interval, 0.0), args.log_dir or default_log_dir())
+    print(PIPELINE.dump_json(args.out))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
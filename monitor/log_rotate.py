@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import json
 import os
+import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Optional
@@ -11,6 +13,7 @@ from .resource_monitor import ensure_log_dir
 
 KEEP_LAST_N = 10
 _ARCHIVE_DIR_NAME = "archive"
+_NATIVE_BINARY = Path(__file__).resolve().parent.parent / "core_c" / "bin" / "logrotate_core"
 
 
 @dataclass
@@ -85,12 +88,59 @@ def rotate_logs(
     return RotationResult(kept=kept, archived=archived, skipped=skipped)
 
 
+def rotate_logs_native(
+    log_dir: Path,
+    *,
+    keep: int = KEEP_LAST_N,
+    dry_run: bool = False,
+    exclude: Optional[Iterable[Path]] = None,
+    threads: Optional[int] = None,
+    binary: Optional[Path] = None,
+) -> RotationResult:
+    """Same contract as :func:`rotate_logs`, delegated to ``core_c/bin/logrotate_core``.
+
+    The native rotator compresses several files at once (and splits very large
+    ones across threads), which matters once archives reach gigabytes.
+    """
+
+    binary = Path(binary) if binary else _NATIVE_BINARY
+    if not binary.is_file():
+        raise FileNotFoundError(f"logrotate_core not found at {binary}; run 'make -C core_c'")
+
+    ensure_log_dir(log_dir)
+    command = [
+        str(binary),
+        "--dir", str(log_dir),
+        "--keep", str(max(keep, 0)),
+        "--compress",
+        "--archive-dir", str(log_dir / _ARCHIVE_DIR_NAME),
+        "--json",
+    ]
+    if dry_run:
+        command.append("--dry-run")
+    if threads:
+        command.extend(["--threads", str(threads)])
+    for path in exclude or []:
+        command.extend(["--exclude", str(path)])
+
+    completed = subprocess.run(command, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise OSError(completed.stderr.strip() or f"logrotate_core exited with {completed.returncode}")
+    summary = json.loads(completed.stdout)
+    return RotationResult(
+        kept=int(summary["kept"]),
+        archived=int(summary["archived"]),
+        skipped=[Path(entry) for entry in summary["skipped"]],
+    )
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Rotate monitoring JSONL logs safely.")
     parser.add_argument("log_dir", nargs="?", default=None, help="Directory containing JSONL logs")
     parser.add_argument("--keep", type=int, default=KEEP_LAST_N, help="Number of recent logs to keep uncompressed")
     parser.add_argument("--dry-run", action="store_true", help="Preview actions without modifying files")
     parser.add_argument("--exclude", action="append", default=[], help="Paths to exclude from rotation")
+    parser.add_argument("--native", action="store_true", help="Delegate to core_c/bin/logrotate_core")
     return parser
 
 
@@ -101,7 +151,8 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
 
     log_dir = Path(args.log_dir) if args.log_dir else default_log_dir()
     exclude = [Path(entry) for entry in args.exclude]
-    result = rotate_logs(log_dir, keep=max(args.keep, 0), dry_run=args.dry_run, exclude=exclude)
+    rotate = rotate_logs_native if args.native else rotate_logs
+    result = rotate(log_dir, keep=max(args.keep, 0), dry_run=args.dry_run, exclude=exclude)
 
     print(f"Kept {result.kept} logs; archived {result.archived}; skipped {len(result.skipped)}")
     if result.skipped:
@@ -9,12 +9,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Optional, Sequence, Tuple
 
-from data.collector import TelemetryRun
+from data.collector import IncrementalFeatures
 from inference.ml_inference import DEFAULT_ARTIFACT_DIR, MLInferenceEngine, PredictionResult
-from monitor.resource_monitor import MonitorError, ProcessInspector, append_json_line, iso_timestamp
+from monitor.instrumentation import PIPELINE, STAGE_ML_INFERENCE
+from monitor.native_inspector import create_inspector
+from monitor.resource_monitor import MonitorError, append_json_line, iso_timestamp
 
 LOG_DIR = Path(__file__).resolve().parent / "logs"
 EVENT_LOG = LOG_DIR / "ml_guard_events.jsonl"
+SAMPLE_WINDOW = 240  # features cover the newest samples only
 
 
 @dataclass(slots=True)
@@ -45,6 +48,10 @@ class MLGuard:
         )
         self._threads[pid] = (thread, stop_event)
         thread.start()
+        PIPELINE.register_gauge("ml_guard_watchers", self.watcher_count)
+
+    def watcher_count(self) -> int:
+        return len(self._threads)
 
     def stop(self, pid: int) -> None:
         entry = self._threads.get(pid)
@@ -63,11 +70,10 @@ class MLGuard:
         run_id: str,
     ) -> None:
         try:
-            inspector = ProcessInspector(pid)
+            inspector = create_inspector(pid)
         except MonitorError:
             return
 
-        samples = []
         last_label: Optional[str] = None
         last_confidence: float = 0.0
         terminated = False
@@ -77,6 +83,7 @@ class MLGuard:
             "timestamp": iso_timestamp(),
             "interval": self._config.poll_interval,
         }
+        features = IncrementalFeatures(start_event, window=SAMPLE_WINDOW)
 
         result: Optional[PredictionResult] = None
 
@@ -98,25 +105,14 @@ class MLGuard:
                 "read_bytes": sample.read_bytes or 0,
                 "write_bytes": sample.write_bytes or 0,
             }
-            samples.append(sample_payload)
-            if len(samples) > 240:
-                samples.pop(0)
+            features.add(sample_payload)
 
-            if len(samples) < self._config.min_samples:
+            if features.sample_count < self._config.min_samples:
                 stop_event.wait(self._config.poll_interval)
                 continue
 
-            run = TelemetryRun(
-                run_id=run_id,
-                path=Path(f"live_{pid}.jsonl"),
-                source="live",
-                start_event=start_event,
-                samples=list(samples),
-                stop_event=None,
-                label=None,
-                summary=None,
-            )
-            result = self._engine.predict_run(run)
+            with PIPELINE.timed(STAGE_ML_INFERENCE):
+                result = self._engine.predict_features(features.features(), run_id=run_id)
 
             if result.label == "malicious" and result.confidence >= self._config.kill_threshold:
                 if not self._allow_terminate:
@@ -0,0 +1,174 @@
+"""Process sampling through the ``core_c`` shared library.
+
+``core_c/bin/libzencube_core.so`` exposes the same ``/proc`` reader the C
+``sampler`` daemon uses: descriptors are opened once per target and every
+sample is a handful of ``pread`` calls with no allocation. :class:`NativeInspector`
+drives it through :mod:`ctypes` with one preallocated ``ProcessSample`` and
+returns ordinary :class:`~monitor.resource_monitor.Sample` objects, so callers
+keep the :class:`~monitor.resource_monitor.ProcessInspector` API.
+
+Use :func:`create_inspector` to get the native inspector when the library is
+built and the pure-Python one otherwise. Set ``ZENCUBE_NATIVE=0`` to opt out,
+or ``ZENCUBE_CORE_LIB`` to load the library from another path.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import datetime as dt
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from .instrumentation import PIPELINE, STAGE_INSPECTOR_SAMPLE
+from .resource_monitor import MonitorError, ProcessInspector, Sample
+
+_LIB_ENV = "ZENCUBE_CORE_LIB"
+_NATIVE_ENV = "ZENCUBE_NATIVE"
+_DEFAULT_LIB = Path(__file__).resolve().parent.parent / "core_c" / "bin" / "libzencube_core.so"
+
+
+class _ProcessSample(ctypes.Structure):
+    """Mirror of ``ProcessSample`` in ``core_c/sampler.h``."""
+
+    _fields_ = [
+        ("timestamp", ctypes.c_char * 32),
+        ("run_id", ctypes.c_char * 128),
+        ("pid", ctypes.c_int),
+        ("cpu_percent", ctypes.c_double),
+        ("memory_rss", ctypes.c_uint64),
+        ("memory_vms", ctypes.c_uint64),
+        ("threads", ctypes.c_int),
+        ("open_files", ctypes.c_int),
+        ("read_bytes", ctypes.c_uint64),
+        ("write_bytes", ctypes.c_uint64),
+        ("cpu_max", ctypes.c_double),
+        ("memory_rss_max", ctypes.c_uint64),
+    ]
+
+
+_lib: Optional[ctypes.CDLL] = None
+_lib_error: Optional[str] = None
+
+
+def _library_path() -> Path:
+    return Path(os.environ.get(_LIB_ENV) or _DEFAULT_LIB)
+
+
+def load_library() -> ctypes.CDLL:
+    """Load and type the shared library once; raises :class:`MonitorError` if unusable."""
+
+    global _lib, _lib_error
+    if _lib is not None:
+        return _lib
+    if _lib_error is not None:
+        raise MonitorError(_lib_error)
+
+    path = _library_path()
+    try:
+        lib = ctypes.CDLL(str(path))
+        lib.sampler_context_new.argtypes = [ctypes.c_int]
+        lib.sampler_context_new.restype = ctypes.c_void_p
+        lib.sampler_context_free.argtypes = [ctypes.c_void_p]
+        lib.sampler_context_free.restype = None
+        lib.sampler_collect.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessSample)]
+        lib.sampler_collect.restype = ctypes.c_int
+        lib.sampler_sample_size.argtypes = []
+        lib.sampler_sample_size.restype = ctypes.c_size_t
+    except (OSError, AttributeError) as exc:
+        _lib_error = f"Cannot load {path}: {exc}"
+        raise MonitorError(_lib_error) from exc
+
+    size = lib.sampler_sample_size()
+    if size != ctypes.sizeof(_ProcessSample):
+        _lib_error = f"{path} has ProcessSample of {size} bytes, expected {ctypes.sizeof(_ProcessSample)}; rebuild core_c"
+        raise MonitorError(_lib_error)
+    _lib = lib
+    return lib
+
+
+def native_available() -> bool:
+    """True when the library is built, loadable and not disabled via ``ZENCUBE_NATIVE=0``."""
+
+    if os.environ.get(_NATIVE_ENV, "1") == "0":
+        return False
+    if not _library_path().is_file():
+        return False
+    try:
+        load_library()
+    except MonitorError:
+        return False
+    return True
+
+
+class NativeInspector:
+    """:class:`ProcessInspector` replacement backed by ``sampler_collect``.
+
+    Values match psutil's: CPU usage is percent of one core since the previous
+    sample, so a multi-threaded target can exceed 100, and ``open_files``
+    counts regular files only (not sockets, pipes or devices). The first sample
+    reports 0.0 CPU. The ``/proc`` fallback of :class:`ProcessInspector`
+    differs on both counts.
+    """
+
+    def __init__(self, pid: int) -> None:
+        self._pid = pid
+        self._lib = load_library()
+        self._ctx = self._lib.sampler_context_new(pid)
+        if not self._ctx:
+            raise MonitorError(f"Process {pid} is not running or /proc is unavailable.")
+        self._buffer = _ProcessSample()
+        self._buffer_ref = ctypes.byref(self._buffer)
+        # Prime the CPU baseline like ProcessInspector does
+        self._lib.sampler_collect(self._ctx, self._buffer_ref)
+
+    def __del__(self) -> None:  # pragma: no cover - depends on GC timing
+        self.close()
+
+    def __enter__(self) -> "NativeInspector":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def pid(self) -> int:
+        return self._pid
+
+    def close(self) -> None:
+        ctx = getattr(self, "_ctx", None)
+        if ctx:
+            self._lib.sampler_context_free(ctx)
+            self._ctx = None
+
+    def is_running(self) -> bool:
+        return self._ctx is not None and Path(f"/proc/{self._pid}").exists()
+
+    def sample(self) -> Sample:
+        with PIPELINE.timed(STAGE_INSPECTOR_SAMPLE):
+            if self._ctx is None:
+                raise MonitorError(f"Inspector for process {self._pid} is closed.")
+            if self._lib.sampler_collect(self._ctx, self._buffer_ref) != 0:
+                raise MonitorError(f"Process {self._pid} exited during sampling")
+            raw = self._buffer
+            return Sample(
+                timestamp=dt.datetime.now(dt.timezone.utc).isoformat(),
+                cpu_percent=raw.cpu_percent,
+                memory_rss=raw.memory_rss,
+                memory_vms=raw.memory_vms,
+                threads=raw.threads,
+                open_files=raw.open_files,
+                read_bytes=raw.read_bytes,
+                write_bytes=raw.write_bytes,
+            )
+
+
+Inspector = Union[NativeInspector, ProcessInspector]
+
+
+def create_inspector(pid: int, *, prefer_native: bool = True, prefer_psutil: bool = True) -> Inspector:
+    """Return a :class:`NativeInspector` when the library is available, else a :class:`ProcessInspector`."""
+
+    if prefer_native and native_available():
+        return NativeInspector(pid)
+    return ProcessInspector(pid, prefer_psutil=prefer_psutil)
@@ -1,22 +1,37 @@
 from __future__ import annotations
 
+import bisect
+import datetime as dt
 import logging
 import os
 import threading
-from dataclasses import dataclass
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
 
+from .instrumentation import PIPELINE, PipelineMetrics
 from .resource_monitor import Sample
+from .sample_buffer import BufferSnapshot, SampleBuffer
 
 try:  # pragma: no cover - optional dependency
-    from prometheus_client import CollectorRegistry, Gauge, start_http_server
+    from prometheus_client import CollectorRegistry, generate_latest, start_http_server
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
 except Exception:  # pragma: no cover - tolerate missing package
     CollectorRegistry = None  # type: ignore
-    Gauge = None  # type: ignore
+    generate_latest = None  # type: ignore
     start_http_server = None  # type: ignore
+    CounterMetricFamily = None  # type: ignore
+    GaugeMetricFamily = None  # type: ignore
+    HistogramMetricFamily = None  # type: ignore
 
 _LOGGER = logging.getLogger(__name__)
 _DEFAULT_PORT = 9109
+_MB_DIVISOR = 1024.0 * 1024.0
+_DEFAULT_MAX_RUNS = 16
+_DEFAULT_RUN_TTL = 300.0
+
+CPU_BUCKETS = (5.0, 10.0, 25.0, 50.0, 75.0, 90.0, 100.0)
+RSS_BUCKETS = tuple(float(mb * 1024 * 1024) for mb in (16, 64, 128, 256, 512, 1024, 2048, 4096))
 
 
 def _bool_from_env(value: str | None) -> bool:
@@ -25,41 +40,307 @@ def _bool_from_env(value: str | None) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+def _int_from_env(value: str | None, default: int) -> int:
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+def _timestamp_seconds(value: str) -> float:
+    try:
+        return dt.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+@dataclass
+class _Histogram:
+    bounds: Sequence[float]
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def buckets(self) -> List[tuple]:
+        cumulative = 0
+        rows = []
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            rows.append((repr(bound), cumulative))
+        rows.append(("+Inf", cumulative + self.counts[-1]))
+        return rows
+
+
+@dataclass
+class _RunHistograms:
+    cpu: _Histogram = field(default_factory=lambda: _Histogram(CPU_BUCKETS))
+    rss: _Histogram = field(default_factory=lambda: _Histogram(RSS_BUCKETS))
+    folded: int = 0
+
+
+class SampleBufferCollector:
+    """Prometheus collector that renders metrics from a :class:`SampleBuffer`.
+
+    Nothing is computed per sample: latest values, per-run window aggregates and
+    histograms are derived from the buffer when Prometheus scrapes. Histogram
+    state is folded incrementally so bucket counts stay monotonic even after
+    the ring buffer evicts old samples.
+
+    Each scrape first retires runs idle for longer than ``run_ttl`` seconds.
+    Samples from retired runs are folded into the unlabelled ``all_runs``
+    series before their per-run state is discarded, so cluster-wide counters
+    never go backwards when a run label disappears.
+    """
+
+    def __init__(self, buffer: SampleBuffer, run_ttl: float = _DEFAULT_RUN_TTL) -> None:
+        self._buffer = buffer
+        self._run_ttl = run_ttl
+        self._histograms: Dict[str, _RunHistograms] = {}
+        self._all_runs = _RunHistograms()
+        self._last_duration = 0.0
+        self._lock = threading.Lock()
+
+    def forget(self, run_id: str) -> None:
+        """Fold any unseen samples of a dropped run, then discard its state."""
+
+        with self._lock:
+            for snapshot in self._buffer.drain_retired():
+                self._retire(snapshot)
+            self._histograms.pop(run_id, None)
+
+    def collect(self) -> Iterator[object]:
+        started = time.perf_counter()
+        labels = ["run_id"]
+
+        cpu = GaugeMetricFamily("zencube_cpu_percent", "Process CPU utilisation percentage", labels=labels)
+        rss_mb = GaugeMetricFamily("zencube_memory_rss_megabytes", "Resident set size in megabytes", labels=labels)
+        rss = GaugeMetricFamily("zencube_memory_rss_bytes", "Resident set size in bytes", labels=labels)
+        vms = GaugeMetricFamily("zencube_memory_vms_bytes", "Virtual memory size in bytes", labels=labels)
+        threads = GaugeMetricFamily("zencube_threads", "Thread count", labels=labels)
+        fds = GaugeMetricFamily("zencube_fds_open", "Open file descriptors", labels=labels)
+        read_bytes = CounterMetricFamily("zencube_io_read_bytes", "Cumulative read bytes", labels=labels)
+        write_bytes = CounterMetricFamily("zencube_io_write_bytes", "Cumulative write bytes", labels=labels)
+        sample_ts = GaugeMetricFamily(
+            "zencube_last_sample_timestamp_seconds", "Unix time of the latest sample", labels=labels
+        )
+        samples_total = CounterMetricFamily("zencube_samples", "Samples recorded for the run", labels=labels)
+        cpu_mean = GaugeMetricFamily(
+            "zencube_cpu_window_mean_percent", "Mean CPU percentage over the buffered window", labels=labels
+        )
+        cpu_max = GaugeMetricFamily(
+            "zencube_cpu_max_percent", "Maximum CPU percentage over the buffered window", labels=labels
+        )
+        rss_max = GaugeMetricFamily(
+            "zencube_memory_rss_max_bytes", "Maximum RSS over the buffered window", labels=labels
+        )
+        cpu_hist = HistogramMetricFamily(
+            "zencube_cpu_percent_distribution", "Distribution of sampled CPU percentage", labels=labels
+        )
+        rss_hist = HistogramMetricFamily(
+            "zencube_memory_rss_bytes_distribution", "Distribution of sampled RSS bytes", labels=labels
+        )
+
+        cpu_sum = 0.0
+        rss_sum = 0.0
+        with self._lock:
+            # Snapshot live runs before draining retired ones: a run dropped in
+            # between shows up in both and is folded once, then discarded.
+            self._buffer.evict_stale(self._run_ttl)
+            snapshots = [snapshot for snapshot in self._buffer.snapshots() if snapshot.entries]
+            retired = self._buffer.drain_retired()
+
+            for snapshot in snapshots:
+                run_label = [snapshot.run_id]
+                latest = snapshot.latest
+                assert latest is not None
+                window = [sample for _, sample in snapshot.entries]
+
+                cpu.add_metric(run_label, latest.cpu_percent)
+                rss_mb.add_metric(run_label, latest.memory_rss / _MB_DIVISOR)
+                rss.add_metric(run_label, latest.memory_rss)
+                if latest.memory_vms is not None:
+                    vms.add_metric(run_label, latest.memory_vms)
+                threads.add_metric(run_label, latest.threads)
+                if latest.open_files is not None:
+                    fds.add_metric(run_label, latest.open_files)
+                if latest.read_bytes is not None:
+                    read_bytes.add_metric(run_label, latest.read_bytes)
+                if latest.write_bytes is not None:
+                    write_bytes.add_metric(run_label, latest.write_bytes)
+                sample_ts.add_metric(run_label, _timestamp_seconds(latest.timestamp))
+
+                samples_total.add_metric(run_label, snapshot.appended)
+                cpu_mean.add_metric(run_label, sum(sample.cpu_percent for sample in window) / len(window))
+                cpu_max.add_metric(run_label, max(sample.cpu_percent for sample in window))
+                rss_max.add_metric(run_label, max(sample.memory_rss for sample in window))
+                cpu_sum += latest.cpu_percent
+                rss_sum += latest.memory_rss
+
+                histograms = self._fold(snapshot)
+                cpu_hist.add_metric(run_label, histograms.cpu.buckets(), histograms.cpu.total)
+                rss_hist.add_metric(run_label, histograms.rss.buckets(), histograms.rss.total)
+
+            for snapshot in retired:
+                self._retire(snapshot)
+            # Drop state for runs that left the buffer without a retired
+            # snapshot (the retired queue is bounded).
+            live = {snapshot.run_id for snapshot in snapshots}
+            for run_id in [key for key in self._histograms if key not in live]:
+                self._histograms.pop(run_id, None)
+
+            all_cpu_hist = HistogramMetricFamily(
+                "zencube_all_runs_cpu_percent_distribution", "Distribution of sampled CPU percentage across runs"
+            )
+            all_cpu_hist.add_metric([], self._all_runs.cpu.buckets(), self._all_runs.cpu.total)
+            all_rss_hist = HistogramMetricFamily(
+                "zencube_all_runs_memory_rss_bytes_distribution", "Distribution of sampled RSS bytes across runs"
+            )
+            all_rss_hist.add_metric([], self._all_runs.rss.buckets(), self._all_runs.rss.total)
+            all_samples = CounterMetricFamily(
+                "zencube_all_runs_samples", "Samples recorded across all runs", value=self._all_runs.folded
+            )
+            last_duration = self._last_duration
+
+        all_cpu = GaugeMetricFamily(
+            "zencube_all_runs_cpu_percent", "Sum of latest CPU percentage across tracked runs", value=cpu_sum
+        )
+        all_rss = GaugeMetricFamily(
+            "zencube_all_runs_memory_rss_bytes", "Sum of latest RSS bytes across tracked runs", value=rss_sum
+        )
+
+        families = [
+            cpu,
+            rss_mb,
+            rss,
+            vms,
+            threads,
+            fds,
+            read_bytes,
+            write_bytes,
+            sample_ts,
+            samples_total,
+            cpu_mean,
+            cpu_max,
+            rss_max,
+            cpu_hist,
+            rss_hist,
+            all_cpu,
+            all_rss,
+            all_samples,
+            all_cpu_hist,
+            all_rss_hist,
+        ]
+
+        evictions = CounterMetricFamily(
+            "zencube_exporter_evictions", "Run label sets removed from the exporter", labels=["reason"]
+        )
+        for reason, count in sorted(self._buffer.eviction_counts().items()):
+            evictions.add_metric([reason], count)
+        runs = GaugeMetricFamily("zencube_exporter_runs", "Runs currently exported with a run_id label", value=len(snapshots))
+        budget = GaugeMetricFamily(
+            "zencube_exporter_max_runs", "Configured run label budget (0 = unbounded)", value=self._buffer.max_runs or 0
+        )
+        scrape_duration = GaugeMetricFamily(
+            "zencube_exporter_scrape_duration_seconds", "Time spent rendering the previous scrape", value=last_duration
+        )
+        self_families = [evictions, runs, budget, scrape_duration]
+        series = GaugeMetricFamily(
+            "zencube_exporter_series",
+            "Series emitted by this scrape",
+            value=sum(len(family.samples) for family in families + self_families) + 1,
+        )
+        self_families.append(series)
+
+        with self._lock:
+            self._last_duration = time.perf_counter() - started
+        yield from families
+        yield from self_families
+
+    def _fold(self, snapshot: BufferSnapshot) -> _RunHistograms:
+        state = self._histograms.setdefault(snapshot.run_id, _RunHistograms())
+        for sequence, sample in snapshot.entries:
+            if sequence <= state.folded:
+                continue
+            state.cpu.observe(sample.cpu_percent)
+            state.rss.observe(float(sample.memory_rss))
+            self._all_runs.cpu.observe(sample.cpu_percent)
+            self._all_runs.rss.observe(float(sample.memory_rss))
+            self._all_runs.folded += 1
+            state.folded = sequence
+        return state
+
+    def _retire(self, snapshot: BufferSnapshot) -> None:
+        self._fold(snapshot)
+        self._histograms.pop(snapshot.run_id, None)
+
+
+class InstrumentationCollector:
+    """Exposes :mod:`monitor.instrumentation` stats as ``zencube_internal_*``."""
+
+    def __init__(self, metrics: PipelineMetrics = PIPELINE) -> None:
+        self._metrics = metrics
+
+    def collect(self) -> Iterator[object]:
+        yield GaugeMetricFamily(
+            "zencube_internal_instrumentation_enabled",
+            "Whether pipeline self-instrumentation is recording",
+            value=1.0 if self._metrics.enabled else 0.0,
+        )
+        for stage, stats in sorted(self._metrics.stages().items()):
+            family = HistogramMetricFamily(
+                f"zencube_internal_{stage}_seconds", f"Latency of the {stage.replace('_', ' ')} stage"
+            )
+            family.add_metric([], stats.cumulative_buckets(), stats.total_seconds)
+            yield family
+        for counter, value in sorted(self._metrics.counters().items()):
+            yield CounterMetricFamily(f"zencube_internal_{counter}", f"Pipeline counter {counter}", value=value)
+        for gauge, value in sorted(self._metrics.gauges().items()):
+            yield GaugeMetricFamily(f"zencube_internal_{gauge}", f"Pipeline gauge {gauge}", value=value)
+
+
 @dataclass
 class ExporterState:
     registry: CollectorRegistry  # type: ignore[valid-type]
-    cpu_gauge: Gauge  # type: ignore[valid-type]
-    rss_gauge: Gauge  # type: ignore[valid-type]
+    collector: SampleBufferCollector
 
 
 class PrometheusExporter:
     """Optional Prometheus metrics bridge for monitoring samples."""
 
-    def __init__(self, enabled: bool = False, port: int = _DEFAULT_PORT) -> None:
-        dependency_ready = CollectorRegistry is not None and Gauge is not None and start_http_server is not None
+    def __init__(
+        self,
+        enabled: bool = False,
+        port: int = _DEFAULT_PORT,
+        buffer: Optional[SampleBuffer] = None,
+        max_runs: int = _DEFAULT_MAX_RUNS,
+        run_ttl: float = _DEFAULT_RUN_TTL,
+    ) -> None:
+        dependency_ready = (
+            CollectorRegistry is not None and GaugeMetricFamily is not None and start_http_server is not None
+        )
         self._enabled = enabled and dependency_ready
         self._port = port
+        self._buffer = buffer if buffer is not None else SampleBuffer(max_runs=max_runs if max_runs > 0 else None)
+        self._run_ttl = run_ttl
         self._state: Optional[ExporterState] = None
         self._server_started = False
-        self._lock = threading.Lock()
 
         if enabled and not dependency_ready:
             _LOGGER.warning("Prometheus exporter requested but prometheus_client is not installed.")
         if self._enabled:
             registry = CollectorRegistry()  # type: ignore[call-arg]
-            cpu_gauge = Gauge(  # type: ignore[call-arg]
-                "zencube_cpu_percent",
-                "Process CPU utilisation percentage",
-                labelnames=("run_id",),
-                registry=registry,
-            )
-            rss_gauge = Gauge(  # type: ignore[call-arg]
-                "zencube_memory_rss_megabytes",
-                "Resident set size in megabytes",
-                labelnames=("run_id",),
-                registry=registry,
-            )
-            self._state = ExporterState(registry=registry, cpu_gauge=cpu_gauge, rss_gauge=rss_gauge)
+            collector = SampleBufferCollector(self._buffer, run_ttl=self._run_ttl)
+            registry.register(collector)  # type: ignore[arg-type]
+            registry.register(InstrumentationCollector())  # type: ignore[arg-type]
+            PIPELINE.register_gauge("sample_buffer_depth", self._buffer.__len__)
+            self._state = ExporterState(registry=registry, collector=collector)
 
     # ------------------------------------------------------------------
     # Construction helpers
@@ -67,12 +348,13 @@ class PrometheusExporter:
     @classmethod
     def from_env(cls) -> "PrometheusExporter":
         enabled = _bool_from_env(os.getenv("PROMETHEUS_ENABLED"))
-        port_str = os.getenv("PROMETHEUS_PORT")
+        port = _int_from_env(os.getenv("PROMETHEUS_PORT"), _DEFAULT_PORT)
+        max_runs = _int_from_env(os.getenv("PROMETHEUS_MAX_RUNS"), _DEFAULT_MAX_RUNS)
         try:
-            port = int(port_str) if port_str else _DEFAULT_PORT
+            run_ttl = float(os.getenv("PROMETHEUS_RUN_TTL") or _DEFAULT_RUN_TTL)
         except ValueError:
-            port = _DEFAULT_PORT
-        return cls(enabled=enabled, port=port)
+            run_ttl = _DEFAULT_RUN_TTL
+        return cls(enabled=enabled, port=port, max_runs=max_runs, run_ttl=run_ttl)
 
     # ------------------------------------------------------------------
     # Operational API
@@ -80,6 +362,10 @@ class PrometheusExporter:
     def is_enabled(self) -> bool:
         return self._enabled
 
+    @property
+    def buffer(self) -> SampleBuffer:
+        return self._buffer
+
     def start(self) -> None:
         if not self._enabled or self._state is None or self._server_started:
             return
@@ -87,26 +373,23 @@ class PrometheusExporter:
         self._server_started = True
         _LOGGER.info("Prometheus exporter listening on 127.0.0.1:%s", self._port)
 
-    def record_sample(self, run_id: str, sample: Sample) -> None:
+    def render(self) -> str:
+        """Return the current exposition text without going through HTTP."""
+
         if not self._enabled or self._state is None:
+            return ""
+        return generate_latest(self._state.registry).decode("utf-8")  # type: ignore[misc]
+
+    def record_sample(self, run_id: str, sample: Sample) -> None:
+        if not self._enabled:
             return
-        rss_mb = sample.memory_rss / (1024.0 * 1024.0)
-        with self._lock:
-            self._state.cpu_gauge.labels(run_id=run_id).set(sample.cpu_percent)
-            self._state.rss_gauge.labels(run_id=run_id).set(rss_mb)
+        self._buffer.append(run_id, sample)
 
     def clear_run(self, run_id: str) -> None:
         if not self._enabled or self._state is None:
             return
-        with self._lock:
-            try:
-                self._state.cpu_gauge.remove(run_id)
-            except KeyError:
-                pass
-            try:
-                self._state.rss_gauge.remove(run_id)
-            except KeyError:
-                pass
+        self._buffer.drop(run_id)
+        self._state.collector.forget(run_id)
 
 
-__all__ = ["PrometheusExporter"]
+__all__ = ["CPU_BUCKETS", "InstrumentationCollector", "PrometheusExporter", "RSS_BUCKETS", "SampleBufferCollector"]
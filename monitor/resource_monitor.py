@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional, Sequence
 
+from .instrumentation import PIPELINE, STAGE_INSPECTOR_SAMPLE, STAGE_JSONL_WRITE
+
 try:
     import psutil  # type: ignore
 except Exception:  # pragma: no cover - psutil is optional
@@ -54,10 +56,11 @@ class ProcessInspector:
 
     The inspector prefers :mod:`psutil` when available and falls back to parsing
     ``/proc/<pid>`` on Linux hosts. Only the metrics required by the GUI
-    dashboard are exposed to keep the implementation straightforward.
+    dashboard are exposed to keep the implementation straightforward. Pass
+    ``prefer_psutil=False`` to force the ``/proc`` reader.
     """
 
-    def __init__(self, pid: int) -> None:
+    def __init__(self, pid: int, *, prefer_psutil: bool = True) -> None:
         self._pid = pid
         self._cpu_count = os.cpu_count() or 1
         self._psutil_proc = None
@@ -66,7 +69,7 @@ class ProcessInspector:
         self._clock_ticks: Optional[int] = None
         self._page_size: Optional[int] = None
 
-        if psutil is not None:
+        if psutil is not None and prefer_psutil:
             try:
                 proc = psutil.Process(pid)
                 proc.cpu_percent(None)
@@ -94,10 +97,11 @@ class ProcessInspector:
         return Path(f"/proc/{self._pid}").exists()
 
     def sample(self) -> Sample:
-        timestamp = dt.datetime.now(dt.timezone.utc).isoformat()
-        if self._psutil_proc is not None:
-            return self._sample_with_psutil(timestamp)
-        return self._sample_fallback(timestamp)
+        with PIPELINE.timed(STAGE_INSPECTOR_SAMPLE):
+            timestamp = dt.datetime.now(dt.timezone.utc).isoformat()
+            if self._psutil_proc is not None:
+                return self._sample_with_psutil(timestamp)
+            return self._sample_fallback(timestamp)
 
     def _sample_with_psutil(self, timestamp: str) -> Sample:
         assert self._psutil_proc is not None
@@ -224,10 +228,12 @@ def build_log_path(log_dir: Path, prefix: str, pid: int) -> Path:
 
 
 def append_json_line(path: Path, payload: Dict[str, Any]) -> None:
-    with path.open("a", encoding="utf-8") as handle:
-        json.dump(payload, handle)
-        handle.write("\n")
-        handle.flush()
+    with PIPELINE.timed(STAGE_JSONL_WRITE):
+        with path.open("a", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+            handle.write("\n")
+            handle.flush()
+    PIPELINE.increment("jsonl_lines_written")
 
 
 def ensure_log_dir(path: Path) -> Path:
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .resource_monitor import Sample
+
+_DEFAULT_CAPACITY = 1024
+_RETIRED_LIMIT = 256
+
+
+@dataclass
+class _RunBuffer:
+    samples: Deque[Tuple[int, Sample]]
+    appended: int = 0
+    last_update: float = 0.0
+
+
+@dataclass
+class BufferSnapshot:
+    """Point-in-time copy of one run's buffered samples.
+
+    ``entries`` holds ``(sequence, sample)`` pairs in arrival order; sequence
+    numbers start at 1 and keep increasing after older entries are evicted so
+    readers can tell which samples they have already seen.
+    """
+
+    run_id: str
+    entries: List[Tuple[int, Sample]] = field(default_factory=list)
+    appended: int = 0
+    reason: Optional[str] = None
+
+    @property
+    def latest(self) -> Sample | None:
+        return self.entries[-1][1] if self.entries else None
+
+
+class SampleBuffer:
+    """Bounded per-run ring buffer of monitoring samples.
+
+    Designed for a single writer (the sampling loop) and any number of readers.
+    :meth:`append` is the hot path and takes no lock once a run exists; readers
+    copy the underlying deque, which is atomic under the GIL.
+
+    When ``max_runs`` is set, creating a new run evicts the least recently
+    updated one. Runs removed by eviction or :meth:`drop` are kept as retired
+    snapshots until a reader calls :meth:`drain_retired`, so aggregates can
+    account for samples that were never scraped.
+    """
+
+    def __init__(self, capacity: int = _DEFAULT_CAPACITY, max_runs: Optional[int] = None) -> None:
+        self._capacity = max(capacity, 1)
+        self._max_runs = max_runs if max_runs is None else max(max_runs, 1)
+        self._runs: Dict[str, _RunBuffer] = {}
+        self._retired: Deque[BufferSnapshot] = collections.deque(maxlen=_RETIRED_LIMIT)
+        self._evictions: Dict[str, int] = {"lru": 0, "ttl": 0, "cleared": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_runs(self) -> Optional[int]:
+        return self._max_runs
+
+    def append(self, run_id: str, sample: Sample) -> None:
+        run = self._runs.get(run_id)
+        if run is None:
+            run = self._create(run_id)
+        run.appended += 1
+        run.last_update = time.monotonic()
+        run.samples.append((run.appended, sample))
+
+    def run_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._runs)
+
+    def snapshot(self, run_id: str) -> BufferSnapshot:
+        run = self._runs.get(run_id)
+        if run is None:
+            return BufferSnapshot(run_id=run_id)
+        return self._snapshot(run_id, run)
+
+    def snapshots(self) -> List[BufferSnapshot]:
+        return [self.snapshot(run_id) for run_id in self.run_ids()]
+
+    def latest(self, run_id: str) -> Sample | None:
+        run = self._runs.get(run_id)
+        if run is None or not run.samples:
+            return None
+        try:
+            return run.samples[-1][1]
+        except IndexError:  # pragma: no cover - raced with drop()
+            return None
+
+    def drop(self, run_id: str) -> bool:
+        with self._lock:
+            return self._retire_locked(run_id, "cleared")
+
+    def evict_stale(self, ttl: float, now: Optional[float] = None) -> List[str]:
+        """Retire runs that have not received a sample for ``ttl`` seconds."""
+
+        if ttl <= 0:
+            return []
+        cutoff = (time.monotonic() if now is None else now) - ttl
+        with self._lock:
+            stale = [run_id for run_id, run in self._runs.items() if run.last_update < cutoff]
+            for run_id in stale:
+                self._retire_locked(run_id, "ttl")
+        return stale
+
+    def drain_retired(self) -> List[BufferSnapshot]:
+        with self._lock:
+            retired = list(self._retired)
+            self._retired.clear()
+        return retired
+
+    def eviction_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._evictions)
+
+    def __len__(self) -> int:
+        return sum(len(run.samples) for run in list(self._runs.values()))
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _create(self, run_id: str) -> _RunBuffer:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                return run
+            if self._max_runs is not None:
+                while len(self._runs) >= self._max_runs:
+                    oldest = min(self._runs, key=lambda key: self._runs[key].last_update)
+                    self._retire_locked(oldest, "lru")
+            run = _RunBuffer(collections.deque(maxlen=self._capacity), last_update=time.monotonic())
+            self._runs[run_id] = run
+            return run
+
+    def _retire_locked(self, run_id: str, reason: str) -> bool:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return False
+        snapshot = self._snapshot(run_id, run)
+        snapshot.reason = reason
+        self._retired.append(snapshot)
+        self._evictions[reason] = self._evictions.get(reason, 0) + 1
+        return True
+
+    @staticmethod
+    def _snapshot(run_id: str, run: _RunBuffer) -> BufferSnapshot:
+        entries = list(run.samples.copy())
+        appended = entries[-1][0] if entries else 0
+        return BufferSnapshot(run_id=run_id, entries=entries, appended=appended)
+
+
+__all__ = ["BufferSnapshot", "SampleBuffer"]
@@ -0,0 +1,134 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+export MONITOR_LOG_DIR="$TMP_DIR"
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from monitor.alert_dispatcher import AlertDispatcher, AlertSink, WebhookSink
+from monitor.alert_manager import AlertManager
+from monitor.resource_monitor import Sample
+
+received = []
+delay = {"seconds": 0.0}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length))
+        time.sleep(delay["seconds"])
+        received.append(body)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/alerts"
+
+# A slow receiver must not stall evaluate().
+delay["seconds"] = 1.0
+dispatcher = AlertDispatcher([WebhookSink(url)], batch_interval=0.05)
+log_dir = Path(os.environ["MONITOR_LOG_DIR"])
+manager = AlertManager(log_dir, dispatcher=dispatcher)
+manager.reset_for_run("dispatch-run")
+sample = Sample(
+    timestamp="2025-11-13T00:00:00Z",
+    cpu_percent=95.0,
+    memory_rss=int(600 * 1024 * 1024),
+    memory_vms=None,
+    threads=4,
+    open_files=None,
+    read_bytes=None,
+    write_bytes=None,
+)
+started = time.monotonic()
+for _ in range(4):
+    manager.evaluate(sample, interval=1.0)
+elapsed = time.monotonic() - started
+assert elapsed < 0.5, f"evaluate blocked on the webhook for {elapsed:.2f}s"
+
+dispatcher.close(timeout=5.0)
+alerts = [alert for body in received for alert in body["alerts"]]
+assert {alert["metric"] for alert in alerts} == {"cpu_pct_high", "rss_mb_high"}, alerts
+assert len(received) == 1, f"Expected both alerts in one batch, got {len(received)} requests"
+stats = dispatcher.stats()["webhook-0"]
+assert stats["sent"] == 2 and stats["batches"] == 1, stats
+
+
+# Sinks must implement send().
+class IncompleteSink(AlertSink):
+    name = "incomplete"
+
+
+for sink_class in (AlertSink, IncompleteSink):
+    try:
+        sink_class()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError(f"{sink_class.__name__} without send() was instantiated")
+
+
+# Failing sinks retry with backoff, then drop and count.
+class FailingSink(AlertSink):
+    name = "failing"
+
+    def __init__(self):
+        self.calls = 0
+
+    def send(self, batch):
+        self.calls += 1
+        raise OSError("receiver down")
+
+
+failing = FailingSink()
+dispatcher = AlertDispatcher([failing], max_retries=2, backoff=0.01, batch_interval=0.0)
+dispatcher.submit(manager.active_alerts())
+dispatcher.close(timeout=5.0)
+stats = dispatcher.stats()["failing-0"]
+assert failing.calls == 3, failing.calls
+assert stats["retries"] == 2 and stats["dropped_failed"] == 2, stats
+
+
+# A full queue drops instead of blocking the caller.
+class BlockingSink(AlertSink):
+    name = "blocking"
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def send(self, batch):
+        self.release.wait(5.0)
+
+
+blocking = BlockingSink()
+dispatcher = AlertDispatcher([blocking], queue_size=2, batch_size=1, batch_interval=0.0)
+records = manager.active_alerts()
+for _ in range(5):
+    dispatcher.submit(records)
+stats = dispatcher.stats()["blocking-0"]
+assert stats["dropped_full"] > 0, stats
+blocking.release.set()
+dispatcher.close(timeout=5.0)
+server.shutdown()
+PY
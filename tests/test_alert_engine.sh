@@ -186,6 +186,214 @@ timeout 3s "${BIN_DIR}/alertd" \
 echo "PASS: Handles empty log gracefully"
 echo ""
 
+# Test 8: Repeated evaluation does not duplicate alerts
+echo "[Test 8] Checking alert IDs are stable and de-duplicated..."
+UNIQUE_IDS=$(python3 -c "import json,sys; print(len({json.loads(l)['alert_id'] for l in open(sys.argv[1])}))" "${ALERT_LOG}")
+
+if [[ ${UNIQUE_IDS} -ne ${ALERT_COUNT} ]]; then
+    echo "FAIL: Duplicate alert IDs (${ALERT_COUNT} alerts, ${UNIQUE_IDS} unique)"
+    exit 1
+fi
+
+# The 5 samples contain exactly one 2-sample CPU violation; ~6 evaluation
+# cycles must not re-emit it
+if [[ ${ALERT_COUNT} -ne 1 ]]; then
+    echo "FAIL: Expected 1 alert across repeated evaluations, got ${ALERT_COUNT}"
+    exit 1
+fi
+
+echo "PASS: Each violation alerted once with a stable ID"
+echo ""
+
+# Test 9: Follow mode tails several growing logs
+echo "[Test 9] Testing --follow with two growing logs..."
+FOLLOW_DIR="${TEST_DIR}/follow"
+mkdir -p "${FOLLOW_DIR}"
+FOLLOW_ALERTS="${FOLLOW_DIR}/alerts.jsonl"
+CHECKPOINT="${FOLLOW_DIR}/alerts.jsonl.checkpoint"
+
+sample() {
+    echo "{\"event\":\"sample\",\"cpu_percent\":$1,\"rss_bytes\":1000,\"fds_open\":5}" >> "$2"
+}
+
+start_follow() {
+    "${BIN_DIR}/alertd" --follow --config "${ALERT_CONFIG}" \
+        --log "${FOLLOW_DIR}/run_a.jsonl" --log "${FOLLOW_DIR}/run_b.jsonl" \
+        --out "${FOLLOW_ALERTS}" > /dev/null &
+    FOLLOW_PID=$!
+    sleep 0.5
+}
+
+stop_follow() {
+    kill ${FOLLOW_PID} 2>/dev/null || true
+    wait ${FOLLOW_PID} 2>/dev/null || true
+}
+
+start_follow
+sample 60 "${FOLLOW_DIR}/run_a.jsonl"
+sample 70 "${FOLLOW_DIR}/run_a.jsonl"
+sample 80 "${FOLLOW_DIR}/run_b.jsonl"
+sample 90 "${FOLLOW_DIR}/run_b.jsonl"
+sample 75 "${FOLLOW_DIR}/run_a.jsonl"    # run_a: first of the next violation
+sleep 1
+stop_follow
+
+if [[ $(grep -c '"run_id":"run_a"' "${FOLLOW_ALERTS}") -ne 1 || \
+      $(grep -c '"run_id":"run_b"' "${FOLLOW_ALERTS}") -ne 1 ]]; then
+    echo "FAIL: Expected one alert per run"
+    cat "${FOLLOW_ALERTS}"
+    exit 1
+fi
+
+if ! python3 -c "import json,sys; c=json.load(open(sys.argv[1])); assert {s['run_id']: s['violation_counts'] for s in c['streams']} == {'run_a': [1, 0, 0], 'run_b': [0, 0, 0]}" "${CHECKPOINT}"; then
+    echo "FAIL: Checkpoint does not record offsets and counters"
+    cat "${CHECKPOINT}"
+    exit 1
+fi
+
+echo "PASS: Both logs followed, checkpoint written on shutdown"
+echo ""
+
+# Test 10: Restart resumes counters from the checkpoint
+echo "[Test 10] Testing restart from checkpoint..."
+sample 85 "${FOLLOW_DIR}/run_a.jsonl"    # completes run_a's violation while stopped
+start_follow
+stop_follow
+
+if [[ $(wc -l < "${FOLLOW_ALERTS}") -ne 3 ]]; then
+    echo "FAIL: Expected 3 alerts after resuming (counter carried across restart)"
+    cat "${FOLLOW_ALERTS}"
+    exit 1
+fi
+
+# Without a checkpoint every line is replayed, but IDs already logged are skipped
+rm -f "${CHECKPOINT}"
+start_follow
+stop_follow
+
+if [[ $(wc -l < "${FOLLOW_ALERTS}") -ne 3 ]]; then
+    echo "FAIL: Replay without checkpoint duplicated alerts"
+    cat "${FOLLOW_ALERTS}"
+    exit 1
+fi
+
+echo "PASS: Restart resumed exactly, replay emitted no duplicates"
+echo ""
+
+# Test 11: Single-pass field extraction handles real-world line shapes
+echo "[Test 11] Testing field extraction edge cases..."
+EDGE_LOG="${TEST_DIR}/edge.jsonl"
+EDGE_ALERTS="${TEST_DIR}/edge_alerts.jsonl"
+cat > "${EDGE_LOG}" <<'EOF'
+{"event":"sample","cpu_percent":60,"rss_bytes":1}
+{"event": "sample", "meta": {"cpu_percent": 10, "tags": ["a", "}"]}, "note": "say \"hi\" {", "cpu_percent": 1.5e2, "rss_bytes": 1}
+{"cpu_percent":-3,"event":"sample","rss_bytes":200000000}
+{"event":"stop","cpu_percent":99.0,"rss_bytes":300000000}
+{"event":"sample","cpu_percent":"high","rss_bytes":1}
+{"event":"sample","cpu_percent":75.25,"rss_bytes":
+{"event":"sample","cpu_percent":80,"rss_bytes":1,"ok":true,"missing":null}
+EOF
+
+"${BIN_DIR}/alertd" --follow --config "${ALERT_CONFIG}" --log "${EDGE_LOG}" \
+    --out "${EDGE_ALERTS}" --checkpoint "${TEST_DIR}/edge.checkpoint" > /dev/null &
+EDGE_PID=$!
+sleep 0.5
+kill ${EDGE_PID} 2>/dev/null || true
+wait ${EDGE_PID} 2>/dev/null || true
+
+# Lines 1-2: second consecutive cpu violation uses the top-level 150, not the
+# nested 10; line 3: rss alert, cpu resets; stop, string-typed and truncated
+# lines are skipped; last line: cpu 80 is only the first of a new violation
+EDGE_SUMMARY=$(python3 -c "import json,sys; print(' '.join('%s=%g' % (a['metric'], a['value']) for a in map(json.loads, open(sys.argv[1]))))" "${EDGE_ALERTS}")
+if [[ "${EDGE_SUMMARY}" != "cpu_percent=150 rss_bytes=2e+08" ]]; then
+    echo "FAIL: Unexpected alerts from edge-case log: ${EDGE_SUMMARY}"
+    exit 1
+fi
+
+echo "PASS: Nested values, escapes, exponents and malformed lines handled"
+echo ""
+
+# Test 12: Throughput benchmark runs and reports
+echo "[Test 12] Running alert evaluation benchmark (small log)..."
+BENCH_OUTPUT=$("${BIN_DIR}/alert_bench" --size-mb 4 --path "${TEST_DIR}/bench.jsonl" --compare 2>/dev/null)
+echo "  ${BENCH_OUTPUT}"
+
+if ! echo "${BENCH_OUTPUT}" | python3 -c "import json,sys; r=json.load(sys.stdin); assert r['lines'] > 10000 and r['compiled_mb_per_sec'] > 0 and r['reference_mb_per_sec'] > 0"; then
+    echo "FAIL: Benchmark did not report throughput"
+    exit 1
+fi
+
+echo "PASS: Benchmark reported compiled and reference throughput"
+echo ""
+
+# Test 13: Rules match both sampler dialects through the telemetry schema
+echo "[Test 13] Evaluating rss_bytes rules against a Python monitor log..."
+PY_LOG="${TEST_DIR}/python_dialect.jsonl"
+PY_ALERTS="${TEST_DIR}/python_dialect_alerts.jsonl"
+cat > "${PY_LOG}" <<'EOF'
+{"event":"sample","cpu_percent":1.0,"memory_rss":50000000,"open_files":3}
+{"event":"sample","cpu_percent":1.0,"memory_rss":250000000,"open_files":3}
+EOF
+
+"${BIN_DIR}/alertd" --follow --config "${ALERT_CONFIG}" --log "${PY_LOG}" \
+    --out "${PY_ALERTS}" --checkpoint "${TEST_DIR}/python_dialect.checkpoint" > /dev/null &
+PY_PID=$!
+sleep 0.5
+kill ${PY_PID} 2>/dev/null || true
+wait ${PY_PID} 2>/dev/null || true
+
+PY_SUMMARY=$(python3 -c "import json,sys; print(' '.join('%s=%g' % (a['metric'], a['value']) for a in map(json.loads, open(sys.argv[1]))))" "${PY_ALERTS}")
+if [[ "${PY_SUMMARY}" != "rss_bytes=2.5e+08" ]]; then
+    echo "FAIL: memory_rss not matched by the rss_bytes rule: ${PY_SUMMARY}"
+    exit 1
+fi
+
+echo "PASS: Aliased field names evaluated"
+echo ""
+
+# Test 14: A line longer than the read buffer is skipped whole, even across polls
+echo "[Test 14] Skipping a line longer than 64 KiB in follow mode..."
+LONG_LOG="${TEST_DIR}/long_line.jsonl"
+LONG_ALERTS="${TEST_DIR}/long_line_alerts.jsonl"
+: > "${LONG_LOG}"
+
+"${BIN_DIR}/alertd" --follow --config "${ALERT_CONFIG}" --log "${LONG_LOG}" \
+    --out "${LONG_ALERTS}" --checkpoint "${TEST_DIR}/long_line.checkpoint" > /dev/null &
+LONG_PID=$!
+sleep 0.5
+
+# The bytes after the first 64 KiB of the long line read as a violating
+# sample on their own; the line arrives in two writes so a poll lands inside it
+python3 - "${LONG_LOG}" <<'PY'
+import sys
+import time
+
+head = b'{"event":"sample","pad":['
+tail = b'{"event":"sample","cpu_percent":1,"rss_bytes":900000000,"fds_open":1}'
+pad = b"0," * ((64 * 1024 - len(head)) // 2)
+line = head + pad + b"0" * (64 * 1024 - len(head) - len(pad)) + b"," + tail
+line = line[: 64 * 1024] + line[64 * 1024 + 1 :]  # the tail object starts at 64 KiB
+assert line.index(tail) == 64 * 1024
+with open(sys.argv[1], "ab") as log:
+    log.write(line[:70000])
+    log.flush()
+    time.sleep(1.5)
+    log.write(line[70000:] + b"]}\n")
+    log.write(b'{"event":"sample","cpu_percent":1,"rss_bytes":300000000,"fds_open":1}\n')
+PY
+sleep 1.5
+kill ${LONG_PID} 2>/dev/null || true
+wait ${LONG_PID} 2>/dev/null || true
+
+LONG_SUMMARY=$(python3 -c "import json,sys; print(' '.join('%s=%g' % (a['metric'], a['value']) for a in map(json.loads, open(sys.argv[1]))))" "${LONG_ALERTS}")
+if [[ "${LONG_SUMMARY}" != "rss_bytes=3e+08" ]]; then
+    echo "FAIL: Over-long line was partly evaluated: ${LONG_SUMMARY}"
+    exit 1
+fi
+
+echo "PASS: Over-long line discarded up to its newline, next line evaluated"
+echo ""
+
 # Summary
 echo "==================================="
 echo "All alert engine tests PASSED ✓"
@@ -0,0 +1,53 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+
+# Smoke run only: timings are not asserted, just the report shape.
+"${PYTHON_BIN}" -m benchmarks --quick --repeat 1 --out "$TMP_DIR/report.json" 2>/dev/null
+
+export REPORT_PATH="$TMP_DIR/report.json"
+"${PYTHON_BIN}" - <<'PY'
+import json
+import os
+from pathlib import Path
+
+from benchmarks.cases import CASES
+from benchmarks.runner import compare
+
+report = json.loads(Path(os.environ["REPORT_PATH"]).read_text(encoding="utf-8"))
+assert report["schema"] == 1 and report["quick"] is True
+assert set(report["results"]) == set(CASES), report["results"].keys()
+for name, result in report["results"].items():
+    if "skipped" in result:
+        continue
+    assert result["unit"] == "seconds_per_op", name
+    assert 0 < result["min"] <= result["median"] <= result["max"], (name, result)
+
+baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}
+current = {"a": {"median": 1.1}, "b": {"median": 2.0}, "c": {"median": 0.5}, "d": {"median": 1.0}}
+statuses = {name: info["status"] for name, info in compare(current, baseline, tolerance=0.25).items()}
+assert statuses == {"a": "ok", "b": "regressed", "c": "improved", "d": "untracked"}, statuses
+PY
+
+# Regression gate: an impossibly fast baseline must fail the run.
+"${PYTHON_BIN}" - "$TMP_DIR/fast_baseline.json" <<'PY'
+import json
+import sys
+
+json.dump({"schema": 1, "results": {"append_json_line": {"median": 1e-12}}}, open(sys.argv[1], "w"))
+PY
+if "${PYTHON_BIN}" -m benchmarks --quick --repeat 1 --only append_json_line \
+    --baseline "$TMP_DIR/fast_baseline.json" --fail-on-regression >/dev/null 2>&1; then
+    echo "expected --fail-on-regression to fail" >&2
+    exit 1
+fi
@@ -0,0 +1,255 @@
+#!/usr/bin/env bash
+# Streaming and parallel corpus loading in data.collector
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+export TMP_DIR
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import datetime as dt
+import inspect
+import json
+import os
+from pathlib import Path
+
+from data.collector import _to_epoch, collect_runs, compute_features, iter_features, iter_runs, parse_timestamps, run_timestamp
+from data.sample_generator import generate_dataset
+
+root = Path(os.environ["TMP_DIR"])
+log_dir = root / "logs"
+synth_dir = root / "synth"
+log_dir.mkdir()
+generate_dataset(synth_dir, seed=7)
+stamps = ["20250101T000000Z", "20250601T120000Z", "20251231T235959Z"]
+for index, stamp in enumerate(stamps):
+    with (log_dir / f"monitor_run_{stamp}_{100 + index}.jsonl").open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"event": "start", "interval": 1.0}) + "\n")
+        for i in range(5):
+            handle.write(json.dumps({"event": "sample", "cpu_percent": 10.0 * (index + 1), "memory_rss": 1000 + i}) + "\n")
+(log_dir / "other_run.jsonl").write_text(json.dumps({"event": "sample"}) + "\n", encoding="utf-8")
+
+serial = collect_runs(log_dir, synth_dir)
+parallel = collect_runs(log_dir, synth_dir, workers=2)
+assert [run.run_id for run in serial] == [run.run_id for run in parallel]
+assert [len(run.samples) for run in serial] == [len(run.samples) for run in parallel]
+print(f"PASS: {len(serial)} runs, parallel load matches serial order")
+
+assert inspect.isgenerator(iter_runs(log_dir, synth_dir))
+streamed = [run.run_id for run in iter_runs(log_dir, synth_dir, workers=2, batch_size=3)]
+assert streamed == [run.run_id for run in serial]
+print("PASS: iter_runs streams the same runs")
+
+assert run_timestamp(Path("monitor_run_20250601T120000Z_101.jsonl")) == dt.datetime(2025, 6, 1, 12, tzinfo=dt.timezone.utc).timestamp()
+window = collect_runs(log_dir, synth_dir, since=dt.datetime(2025, 3, 1), until=dt.datetime(2025, 12, 1))
+real = [run.run_id for run in window if run.source == "real"]
+assert real == ["monitor_run_20250601T120000Z_101"], real
+assert len(window) == len(serial) - 2, "unstamped synthetic runs are never pruned"
+print("PASS: time window prunes by file-name stamp")
+
+globbed = collect_runs(log_dir, pattern="*_run*.jsonl")
+assert len(globbed) == 4, [run.run_id for run in globbed]
+print("PASS: custom glob pattern")
+
+vectors = list(iter_features(log_dir, synth_dir, workers=2, batch_size=4))
+assert [vector.run.run_id for vector in vectors] == [run.run_id for run in serial]
+assert all(not vector.run.samples for vector in vectors)
+for vector, run in zip(vectors, serial):
+    assert vector.features == compute_features(run).features, run.run_id
+print("PASS: iter_features computes features in workers and drops samples")
+
+stamps = [
+    "2025-01-01T00:00:00.250000+00:00",
+    "2025-01-01T00:00:01Z",
+    None,
+    "2025-01-01T08:00:02+08:00",
+    "not a timestamp",
+]
+expected = [_to_epoch(ts) if isinstance(ts, str) else float(index) for index, ts in enumerate(stamps)]
+assert parse_timestamps(stamps).tolist() == expected
+utc = [f"2025-01-01T00:00:{second:02d}.{second * 1000:06d}+00:00" for second in range(60)]
+assert parse_timestamps(utc).tolist() == [_to_epoch(ts) for ts in utc]
+run = serial[-1]
+assert run.timestamp_array() is run.timestamp_array(), "parsed once per run"
+print("PASS: parse_timestamps matches the per-sample parser")
+
+from data.collector import TelemetryRun, _read_jsonl, compute_feature_matrix
+from data.schema import get_decoder
+
+odd = synth_dir / "odd_columns.jsonl"
+with odd.open("w", encoding="utf-8") as handle:
+    handle.write(json.dumps({"event": "start"}) + "\n")
+    for i in range(6):
+        event = {"event": "sample", "cpu_percent": i, "rss_bytes": 100 * i, "pid": i % 2}
+        if i % 2:
+            event["timestamp"] = f"2025-01-01T00:00:0{i}Z"
+        handle.write(json.dumps(event) + "\n")
+for run in collect_runs(log_dir, synth_dir):
+    assert run.columns is not None, run.run_id
+    expected = [get_decoder().decode(event) for event in _read_jsonl(run.path) if event.get("event") == "sample"]
+    columnar = compute_features(run).features
+    assert run.sample_count == len(expected)
+    assert run.samples == expected, run.run_id
+    as_dicts = TelemetryRun(run.run_id, run.path, run.source, run.start_event, expected, run.stop_event, run.label)
+    assert compute_features(as_dicts).features == columnar, run.run_id
+run.samples = run.samples[:2]
+assert run.columns is None and run.sample_count == 2
+
+edited = next(run for run in collect_runs(log_dir, synth_dir) if run.sample_count > 3)
+reference = [dict(sample) for sample in edited.samples]
+assert edited.columns is None, "handing out the dicts drops the columns"
+edited.samples.append(dict(reference[-1]))
+edited.samples.pop(0)
+edited.samples[0]["cpu_percent"] = 12345.0
+reference = reference[1:] + [dict(reference[-1])]
+reference[0]["cpu_percent"] = 12345.0
+as_dicts = TelemetryRun(edited.run_id, edited.path, edited.source, edited.start_event, reference, edited.stop_event, edited.label)
+assert edited.sample_count == len(reference)
+assert compute_feature_matrix([edited])[0].tolist() == compute_feature_matrix([as_dicts])[0].tolist()
+assert compute_features(edited).features["cpu_max"] == 12345.0
+print("PASS: column store round-trips samples and matches dict-based features")
+
+from data.collector import FEATURE_COLUMNS, compute_feature_matrix
+
+runs = collect_runs(log_dir, synth_dir)
+(synth_dir / "empty_run.jsonl").write_text(json.dumps({"event": "start"}) + "\n", encoding="utf-8")
+runs.append(TelemetryRun("empty", synth_dir / "empty_run.jsonl", "synthetic", {"event": "start"}, []))
+matrix, run_ids = compute_feature_matrix(runs)
+assert matrix.shape == (len(runs), len(FEATURE_COLUMNS))
+assert run_ids == [run.run_id for run in runs]
+for row, run in zip(matrix.tolist(), runs):
+    assert row == list(compute_features(run).features.values()), run.run_id
+assert not matrix[-1].any()
+print("PASS: compute_feature_matrix is identical to per-run compute_features")
+
+from data.collector import load_run_header
+
+eager = collect_runs(log_dir, synth_dir)
+lazy = collect_runs(log_dir, synth_dir, lazy=True)
+for full, header in zip(eager, lazy):
+    assert (header.run_id, header.start_event, header.stop_event, header.label, header.summary) == (
+        full.run_id, full.start_event, full.stop_event, full.label, full.summary
+    ), full.run_id
+    assert not header.loaded or header.run_id == "other_run", header.run_id  # no start line: loaded eagerly
+for full, header in zip(eager, lazy):
+    assert compute_features(header).features == compute_features(full).features, full.run_id
+    assert header.loaded
+
+noisy = log_dir / "monitor_run_20250701T000000Z_999.jsonl"
+with noisy.open("w", encoding="utf-8") as handle:
+    handle.write(json.dumps({"event": "start", "interval": 0.5}) + "\n")
+    handle.write(json.dumps({"event": "stop", "label": "early"}) + "\n")
+    for i in range(4000):
+        handle.write(json.dumps({"event": "sample", "cpu_percent": 1.0, "note": "stop"}) + "\n")
+    handle.write(json.dumps({"event": "stop", "label": "benign", "summary": "done"}) + "\n")
+    handle.write('{"event": "sample", "cpu_perc')  # torn final line
+header = load_run_header(noisy)
+assert header.stop_event == {"event": "stop", "label": "benign", "summary": "done"}
+assert (header.label, header.summary) == ("benign", "done") and not header.loaded
+assert header.sample_count == 4000 and header.loaded
+assert header.samples[0]["note"] == "stop"
+# Lazy runs load their samples with the reader they were created with
+lazy_dir = root / "lazy_reader"
+lazy_dir.mkdir()
+tagged = lazy_dir / "monitor_run_20250701T000000Z_1.jsonl"
+tagged.write_text("".join(json.dumps(event) + "\n" for event in [{"event": "start"}] + [
+    {"event": "sample", "timestamp": f"2025-07-01T00:00:{i:02d}Z", "cpu_percent": 1.0, "note": "x"} for i in range(5)
+]), encoding="utf-8")
+scanned_header = load_run_header(tagged, reader="mmap")
+assert not scanned_header.loaded and scanned_header.sample_count == 5
+assert "note" not in scanned_header.samples[0]  # the mmap reader keeps schema fields only
+assert "note" in load_run_header(tagged).samples[0]
+lazy_scanned = collect_runs(log_dir, synth_dir, lazy=True, reader="mmap")
+eager_scanned = collect_runs(log_dir, synth_dir, reader="mmap")
+for full, header in zip(eager_scanned, lazy_scanned):
+    assert [dict(sample) for sample in header.samples] == [dict(sample) for sample in full.samples], full.run_id
+print("PASS: header-only runs read start/stop cheaply and load samples on demand")
+
+import gzip
+
+from data.jsonl_scan import scan_log
+from data.schema import SAMPLE_FIELDS
+
+def schema_view(run):
+    return [[sample.get(key) for key in ("timestamp", *SAMPLE_FIELDS)] for sample in run.samples]
+
+archive = synth_dir / "archived_run.jsonl.gz"
+archive.write_bytes(gzip.compress((synth_dir / "odd_columns.jsonl").read_bytes()))
+lines = collect_runs(log_dir, synth_dir, synthetic_pattern="*.jsonl*")
+scanned = collect_runs(log_dir, synth_dir, synthetic_pattern="*.jsonl*", reader="mmap")
+assert [run.run_id for run in scanned] == [run.run_id for run in lines]
+assert "archived_run" in [run.run_id for run in scanned]
+assert compute_feature_matrix(scanned)[0].tolist() == compute_feature_matrix(lines)[0].tolist()
+for full, fast in zip(lines, scanned):
+    assert (fast.start_event, fast.stop_event, fast.label) == (full.start_event, full.stop_event, full.label), full.run_id
+    assert schema_view(fast) == schema_view(full), full.run_id
+assert scan_log(synth_dir / sorted(p.name for p in synth_dir.glob("*.jsonl"))[0]).fields is not None
+
+irregular = synth_dir / "irregular.jsonl"
+samples = [
+    {"event": "sample", "timestamp": f"2025-01-01T00:00:0{i}Z", "cpu_percent": i, "threads": 2, "rss_bytes": 10 * i}
+    for i in range(6)
+]
+samples[3] = {"threads": 2.5, **samples[3]}  # other key order and a float in an int field
+body = "\n".join(json.dumps(event) for event in [{"event": "start"}, *samples]) + "\nnot json\n{\"event\": \"sto"
+irregular.write_text(body, encoding="utf-8")
+fast = next(run for run in collect_runs(log_dir, synth_dir, reader="mmap") if run.run_id == "irregular")
+full = next(run for run in collect_runs(log_dir, synth_dir) if run.run_id == "irregular")
+assert scan_log(irregular).fields is None
+assert schema_view(fast) == schema_view(full) and fast.samples[3]["threads"] == 2
+assert compute_features(fast).features == compute_features(full).features
+import data.jsonl_scan as jsonl_scan
+
+whole = {path: scan_log(path) for path in (*sorted(synth_dir.glob("*.jsonl*")), noisy)}
+jsonl_scan._CHUNK_BYTES = 1000  # many line-aligned chunks per log
+for path, expected in whole.items():
+    chunked = scan_log(path)
+    assert chunked.events == expected.events and chunked.samples == expected.samples, path
+    assert chunked.timestamps == expected.timestamps, path
+    assert (chunked.fields is None) == (expected.fields is None), path
+    for field, column in (expected.fields or {}).items():
+        assert column.tolist() == chunked.fields[field].tolist(), (path, field)
+assert any(scanned.fields is not None and scanned.sample_count > 100 for scanned in whole.values())
+jsonl_scan._CHUNK_BYTES = 8 << 20
+try:
+    collect_runs(log_dir, synth_dir, reader="bogus")
+except ValueError:
+    pass
+else:
+    raise AssertionError("unknown reader accepted")
+print("PASS: mmap reader matches the line reader on plain, gzip and irregular logs, in any chunk size")
+
+import shutil
+
+from data.collector import log_size
+from monitor.log_rotate import rotate_logs
+
+history = root / "history"
+history.mkdir()
+for index, source in enumerate(sorted(log_dir.glob("monitor_run_2025*_10?.jsonl"))):
+    path = history / source.name
+    shutil.copy(source, path)
+    os.utime(path, (1_700_000_000 + index, 1_700_000_000 + index))
+before = collect_runs(history)
+rotate_logs(history, keep=1)
+archived = sorted((history / "archive").glob("*.gz"))
+assert len(archived) == 2 and log_size(archived[0]) == len(gzip.decompress(archived[0].read_bytes()))
+assert [run.run_id for run in collect_runs(history)] == [before[-1].run_id]
+twin = history / archived[0].name[: -len(".gz")]
+shutil.copy(log_dir / twin.name, twin)  # rotation interrupted before the unlink
+for kwargs in ({}, {"workers": 2, "batch_size": 1, "max_resident_bytes": 1}, {"reader": "mmap"}):
+    full = list(iter_runs(history, include_archives=True, **kwargs))
+    assert [run.run_id for run in full] == [run.run_id for run in before], kwargs
+    assert [compute_features(run).features for run in full] == [compute_features(run).features for run in before]
+assert collect_runs(history, include_archives=True)[0].path.parent == history
+window = collect_runs(history, include_archives=True, until=dt.datetime(2025, 3, 1))
+assert [run.run_id for run in window] == [before[0].run_id]
+print("PASS: include_archives reads rotated gzip logs under a resident-byte cap")
+PY
@@ -0,0 +1,211 @@
+#!/usr/bin/env bash
+# Test script for the core_c append-only JSONL writer
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+CORE_DIR="${SCRIPT_DIR}/../core_c"
+BIN_DIR="${CORE_DIR}/bin"
+
+echo "=== ZenCube Core C - JSONL Writer Test ==="
+echo ""
+
+if [[ ! -f "${BIN_DIR}/sampler" || ! -f "${BIN_DIR}/logrotate_core" ]]; then
+    echo "Error: core_c binaries not found. Run 'make' first."
+    exit 1
+fi
+
+TEST_DIR=$(mktemp -d)
+trap "rm -rf ${TEST_DIR}" EXIT
+
+check_jsonl() {
+    python3 - "$1" <<'PY'
+import json
+import sys
+
+with open(sys.argv[1], "rb") as handle:
+    data = handle.read()
+assert data.endswith(b"\n"), "file does not end with a newline"
+for line in data.decode("utf-8").splitlines():
+    json.loads(line)
+PY
+}
+
+# Test 1: torn final line is truncated before appending
+echo "[Test 1] Recovering a torn final line..."
+LOG="${TEST_DIR}/torn.jsonl"
+printf '{"event":"start","n":1}\n{"event":"sample","n":2}\n{"event":"sample","cpu' > "${LOG}"
+
+sleep 3 &
+TARGET_PID=$!
+"${BIN_DIR}/sampler" --pid ${TARGET_PID} --interval 0.2 --run-id torn --out "${LOG}" --fsync every:1 > /dev/null 2>&1 &
+SAMPLER_PID=$!
+sleep 1
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+kill ${TARGET_PID} 2>/dev/null || true
+wait ${TARGET_PID} 2>/dev/null || true
+
+check_jsonl "${LOG}"
+if [[ "$(head -n 2 "${LOG}")" != $'{"event":"start","n":1}\n{"event":"sample","n":2}' ]]; then
+    echo "FAIL: intact lines were not preserved"
+    exit 1
+fi
+if [[ $(grep -c '"event":"sample","run_id":"torn"' "${LOG}") -lt 2 ]]; then
+    echo "FAIL: sampler did not append after recovery"
+    exit 1
+fi
+echo "PASS: torn line removed, intact lines kept"
+echo ""
+
+# Test 2: invalid fsync policies are rejected
+echo "[Test 2] Rejecting invalid --fsync policies..."
+for policy in bogus interval:0 every:0 every:abc; do
+    if "${BIN_DIR}/sampler" --pid $$ --run-id bad --out "${TEST_DIR}/bad.jsonl" --fsync "${policy}" > /dev/null 2>&1; then
+        echo "FAIL: accepted --fsync ${policy}"
+        exit 1
+    fi
+done
+echo "PASS: invalid policies rejected"
+echo ""
+
+# Test 3: writer follows rotation and reopens the path
+echo "[Test 3] Following log rotation..."
+LOG="${TEST_DIR}/rotating.jsonl"
+sleep 6 &
+TARGET_PID=$!
+"${BIN_DIR}/sampler" --pid ${TARGET_PID} --interval 0.2 --run-id rot --out "${LOG}" --fsync never > /dev/null 2>&1 &
+SAMPLER_PID=$!
+sleep 1
+mv "${LOG}" "${TEST_DIR}/rotated.jsonl.1"
+sleep 2
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+kill ${TARGET_PID} 2>/dev/null || true
+wait ${TARGET_PID} 2>/dev/null || true
+
+if [[ ! -f "${LOG}" ]]; then
+    echo "FAIL: writer did not reopen ${LOG} after rotation"
+    exit 1
+fi
+check_jsonl "${LOG}"
+check_jsonl "${TEST_DIR}/rotated.jsonl.1"
+if ! grep -q '"event":"stop"' "${LOG}"; then
+    echo "FAIL: summary not written to the reopened log"
+    exit 1
+fi
+echo "PASS: writer reopened the rotated path"
+echo ""
+
+# Test 4: rotation archives every byte, including a final line without a newline
+echo "[Test 4] Archiving a log without a trailing newline..."
+ARCHIVE_DIR="${TEST_DIR}/archive"
+mkdir -p "${ARCHIVE_DIR}"
+printf '{"event":"sample","n":1}\n{"event":"stop","label":"benign"}' > "${ARCHIVE_DIR}/monitor_run_a.jsonl"
+cp "${ARCHIVE_DIR}/monitor_run_a.jsonl" "${TEST_DIR}/run_a_original.jsonl"
+touch -d "-1 hour" "${ARCHIVE_DIR}/monitor_run_a.jsonl"
+printf '{"n":3}\n' > "${ARCHIVE_DIR}/monitor_run_b.jsonl"
+"${BIN_DIR}/logrotate_core" --dir "${ARCHIVE_DIR}" --keep 1 --compress > /dev/null
+
+if ! gzip -dc "${ARCHIVE_DIR}/monitor_run_a.jsonl.gz" | cmp -s - "${TEST_DIR}/run_a_original.jsonl"; then
+    echo "FAIL: archive lost the unterminated stop line"
+    exit 1
+fi
+if [[ -e "${ARCHIVE_DIR}/monitor_run_a.jsonl" ]]; then
+    echo "FAIL: archived log was not removed"
+    exit 1
+fi
+
+# A failed archive leaves the original untouched, torn tail included
+printf '{"n":4}\n{"n":5' > "${ARCHIVE_DIR}/monitor_run_c.jsonl"
+touch -d "-1 hour" "${ARCHIVE_DIR}/monitor_run_c.jsonl"
+cp "${ARCHIVE_DIR}/monitor_run_c.jsonl" "${TEST_DIR}/run_c_original.jsonl"
+mkdir "${ARCHIVE_DIR}/monitor_run_c.jsonl.gz.tmp"    # the temp archive cannot be created
+"${BIN_DIR}/logrotate_core" --dir "${ARCHIVE_DIR}" --keep 1 --compress > /dev/null 2>&1 || true
+if ! cmp -s "${ARCHIVE_DIR}/monitor_run_c.jsonl" "${TEST_DIR}/run_c_original.jsonl"; then
+    echo "FAIL: failed archive modified the original log"
+    exit 1
+fi
+rmdir "${ARCHIVE_DIR}/monitor_run_c.jsonl.gz.tmp"
+echo "PASS: archive holds the whole log, failed archives leave it untouched"
+echo ""
+
+# Test 5: chunked parallel deflate produces one valid gzip member
+echo "[Test 5] Compressing a large log in parallel chunks..."
+BIG_DIR="${TEST_DIR}/big"
+mkdir -p "${BIG_DIR}"
+for i in $(seq 1 60000); do
+    printf '{"event":"sample","seq":%d,"cpu_percent":%d.5,"rss_bytes":%d}\n' "$i" "$((i % 97))" "$((i * 4096))"
+done > "${BIG_DIR}/monitor_big.jsonl"
+printf '{"event":"stop","samples":60000}' >> "${BIG_DIR}/monitor_big.jsonl"    # no trailing newline
+cp "${BIG_DIR}/monitor_big.jsonl" "${TEST_DIR}/big_original.jsonl"
+touch -d "-1 hour" "${BIG_DIR}/monitor_big.jsonl"
+printf '{"n":1}\n' > "${BIG_DIR}/monitor_new.jsonl"
+"${BIN_DIR}/logrotate_core" --dir "${BIG_DIR}" --keep 1 --compress --threads 4 --split-mb 1 > /dev/null
+
+if ! gzip -t "${BIG_DIR}/monitor_big.jsonl.gz"; then
+    echo "FAIL: chunked archive does not pass gzip -t"
+    exit 1
+fi
+if ! gzip -dc "${BIG_DIR}/monitor_big.jsonl.gz" | cmp -s - "${TEST_DIR}/big_original.jsonl"; then
+    echo "FAIL: chunked archive does not round-trip"
+    exit 1
+fi
+if [[ -e "${BIG_DIR}/monitor_big.jsonl" || ! -e "${BIG_DIR}/monitor_new.jsonl" ]]; then
+    echo "FAIL: wrong files rotated"
+    exit 1
+fi
+echo "PASS: parallel archive round-trips"
+echo ""
+
+# Test 6: age and size budgets
+echo "[Test 6] Rotating by --max-age and --max-bytes..."
+POLICY_DIR="${TEST_DIR}/policy"
+mkdir -p "${POLICY_DIR}"
+for day in 1 3 5 7; do
+    head -c 2048 /dev/zero | tr '\0' 'x' | sed 's/.*/{"pad":"&"}/' > "${POLICY_DIR}/run_${day}d.jsonl"
+    touch -d "-${day} days" "${POLICY_DIR}/run_${day}d.jsonl"
+done
+"${BIN_DIR}/logrotate_core" --dir "${POLICY_DIR}" --keep 100 --max-age 4d > /dev/null
+if [[ -e "${POLICY_DIR}/run_5d.jsonl" || -e "${POLICY_DIR}/run_7d.jsonl" || ! -e "${POLICY_DIR}/run_3d.jsonl" ]]; then
+    echo "FAIL: --max-age rotated the wrong files"
+    exit 1
+fi
+"${BIN_DIR}/logrotate_core" --dir "${POLICY_DIR}" --keep 100 --max-bytes 3K > /dev/null
+if [[ -e "${POLICY_DIR}/run_3d.jsonl" || ! -e "${POLICY_DIR}/run_1d.jsonl" ]]; then
+    echo "FAIL: --max-bytes rotated the wrong files"
+    exit 1
+fi
+echo "PASS: age and size budgets applied"
+echo ""
+
+# Test 7: JSON summary mirrors monitor.log_rotate.RotationResult
+echo "[Test 7] JSON summary..."
+SUMMARY_DIR="${TEST_DIR}/summary"
+mkdir -p "${SUMMARY_DIR}"
+for n in 1 2 3; do
+    printf '{"n":%d}\n' "$n" > "${SUMMARY_DIR}/run_${n}.jsonl"
+    touch -d "-${n} hours" "${SUMMARY_DIR}/run_${n}.jsonl"
+done
+SUMMARY=$("${BIN_DIR}/logrotate_core" --dir "${SUMMARY_DIR}" --keep 1 --compress --dry-run --json \
+    --exclude "${SUMMARY_DIR}/run_3.jsonl")
+if ! python3 - "${SUMMARY}" <<'PYEOF'
+import json
+import sys
+
+summary = json.loads(sys.argv[1])
+assert (summary["kept"], summary["archived"], summary["skipped"]) == (2, 1, []), summary
+PYEOF
+then
+    echo "FAIL: unexpected summary: ${SUMMARY}"
+    exit 1
+fi
+if [[ ! -e "${SUMMARY_DIR}/run_2.jsonl" ]]; then
+    echo "FAIL: --dry-run modified the directory"
+    exit 1
+fi
+echo "PASS: summary is {kept, archived, skipped}"
+echo ""
+
+echo "==================================="
+echo "All JSONL writer tests PASSED ✓"
+echo "==================================="
@@ -178,10 +178,129 @@ fi
 echo "PASS: Returns 503 when sample log not found"
 echo ""
 
+# Test 9: Keep-alive - two scrapes share one connection
+echo "[Test 9] Testing keep-alive connection reuse..."
+CONNECTS=$(curl -s -o /dev/null -o /dev/null -w "%{num_connects}\n" \
+    http://127.0.0.1:${PORT}/metrics http://127.0.0.1:${PORT}/metrics | tr '\n' ' ')
+
+if [[ "${CONNECTS}" != "1 0 " ]]; then
+    echo "FAIL: Expected second request to reuse the connection (connects: ${CONNECTS})"
+    kill ${EXPORTER_PID} 2>/dev/null || true
+    exit 1
+fi
+
+echo "PASS: Second scrape reused the connection"
+echo ""
+
+# Test 10: Appended samples are picked up by the tail reader
+echo "[Test 10] Testing refresh after append..."
+cat >> "${SAMPLE_LOG}" <<EOF
+{"event":"sample","run_id":"test_prom","timestamp":"2024-01-01T00:00:01Z","pid":1234,"cpu_percent":12.25,"rss_bytes":223456789,"vms_bytes":234567890,"threads":8,"fds_open":42,"read_bytes":1048576,"write_bytes":2097152,"cpu_max":67.2,"rss_max":223456789}
+{"event":"stop","run_id":"test_prom","timestamp":"2024-01-01T00:00:02Z","samples":2,"duration_seconds":2.0}
+EOF
+sleep 1
+
+CPU_VALUE=$(curl -s http://127.0.0.1:${PORT}/metrics | grep "^zencube_cpu_percent " | awk '{print $2}')
+if [[ "${CPU_VALUE}" != "12.25" ]]; then
+    echo "FAIL: Expected latest sample after append (cpu 12.25, got ${CPU_VALUE})"
+    kill ${EXPORTER_PID} 2>/dev/null || true
+    exit 1
+fi
+
+echo "PASS: Latest sample exported, trailing stop record ignored"
+echo ""
+
+# Test 11: Concurrent scrapers
+echo "[Test 11] Testing 50 concurrent scrapes..."
+CURL_PIDS=()
+for i in $(seq 1 50); do
+    curl -s -o "${TEST_DIR}/concurrent_${i}.txt" -w "%{http_code}" \
+        http://127.0.0.1:${PORT}/metrics > "${TEST_DIR}/concurrent_${i}.code" &
+    CURL_PIDS+=($!)
+done
+wait "${CURL_PIDS[@]}"
+
+FAILED=0
+for i in $(seq 1 50); do
+    if [[ "$(cat "${TEST_DIR}/concurrent_${i}.code")" != "200" ]] || \
+       ! grep -q "^zencube_cpu_percent 12.25" "${TEST_DIR}/concurrent_${i}.txt"; then
+        FAILED=$((FAILED + 1))
+    fi
+done
+
+if [[ ${FAILED} -gt 0 ]]; then
+    echo "FAIL: ${FAILED} of 50 concurrent scrapes failed"
+    kill ${EXPORTER_PID} 2>/dev/null || true
+    exit 1
+fi
+
+echo "PASS: All concurrent scrapes returned complete metrics"
+echo ""
+
+# Test 12: HEAD and unsupported methods
+echo "[Test 12] Testing HEAD and POST..."
+HEAD_CODE=$(curl -s -I -o /dev/null -w "%{http_code}" http://127.0.0.1:${PORT}/metrics)
+POST_CODE=$(curl -s -X POST -o /dev/null -w "%{http_code}" http://127.0.0.1:${PORT}/metrics)
+
+if [[ "${HEAD_CODE}" != "200" || "${POST_CODE}" != "405" ]]; then
+    echo "FAIL: Expected HEAD 200 and POST 405 (got ${HEAD_CODE} / ${POST_CODE})"
+    kill ${EXPORTER_PID} 2>/dev/null || true
+    exit 1
+fi
+
+echo "PASS: HEAD served, POST rejected with 405"
+echo ""
+
 # Cleanup
 kill ${EXPORTER_PID} 2>/dev/null || true
 wait ${EXPORTER_PID} 2>/dev/null || true
 
+# Test 13: Multiple runs from one exporter (--log-dir)
+echo "[Test 13] Testing multi-run export from --log-dir..."
+RUN_DIR="${TEST_DIR}/runs"
+mkdir -p "${RUN_DIR}"
+echo '{"event":"sample","run_id":"run_a","cpu_percent":10.0,"rss_bytes":1000}' > "${RUN_DIR}/run_a.jsonl"
+echo '{"event":"sample","timestamp":"2024-01-01T00:00:00Z","cpu_percent":20.0,"memory_rss":2000,"open_files":7}' > "${RUN_DIR}/monitor_run_b.jsonl"
+echo '{"event":"alert","run_id":"run_a","metric":"cpu_pct"}' > "${RUN_DIR}/alerts.jsonl"
+
+"${BIN_DIR}/prom_exporter" --log-dir "${RUN_DIR}" --port 19092 --refresh 0.2 > /dev/null &
+EXPORTER3_PID=$!
+sleep 1
+
+MULTI_OUTPUT="${TEST_DIR}/multi.txt"
+curl -s http://127.0.0.1:19092/metrics > "${MULTI_OUTPUT}"
+
+# A run added while the exporter is up appears on a later scrape
+echo '{"event":"sample","run_id":"run_c","cpu_percent":30.0}' > "${RUN_DIR}/run_c.jsonl"
+sleep 1.5
+LATE_OUTPUT="${TEST_DIR}/multi_late.txt"
+curl -s http://127.0.0.1:19092/metrics > "${LATE_OUTPUT}"
+
+kill ${EXPORTER3_PID} 2>/dev/null || true
+wait ${EXPORTER3_PID} 2>/dev/null || true
+
+if ! grep -q '^zencube_cpu_percent{run_id="run_a"} 10.00' "${MULTI_OUTPUT}" || \
+   ! grep -q '^zencube_memory_rss_bytes{run_id="monitor_run_b"} 2000' "${MULTI_OUTPUT}" || \
+   ! grep -q '^zencube_fds_open{run_id="monitor_run_b"} 7' "${MULTI_OUTPUT}"; then
+    echo "FAIL: Expected labelled series for both runs"
+    cat "${MULTI_OUTPUT}"
+    exit 1
+fi
+
+if [[ $(grep -c "^# TYPE zencube_cpu_percent " "${MULTI_OUTPUT}") -ne 1 ]]; then
+    echo "FAIL: Metric family metadata should appear once"
+    exit 1
+fi
+
+if grep -q 'cpu_pct' "${MULTI_OUTPUT}" || ! grep -q '^zencube_cpu_percent{run_id="run_c"} 30.00' "${LATE_OUTPUT}"; then
+    echo "FAIL: alerts.jsonl exported or new run not discovered"
+    cat "${LATE_OUTPUT}"
+    exit 1
+fi
+
+echo "PASS: Runs labelled by run_id, new logs discovered, alerts skipped"
+echo ""
+
 # Summary
 echo "==================================="
 echo "All Prometheus exporter tests PASSED ✓"
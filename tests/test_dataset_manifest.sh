@@ -0,0 +1,114 @@
+#!/usr/bin/env bash
+# Dataset manifest: incremental refresh, persistence and subset queries
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+export TMP_DIR
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import datetime as dt
+import json
+import math
+import os
+from pathlib import Path
+
+from data import collector
+from data.collector import build_feature_table, collect_runs, run_paths
+from data.feature_cache import FeatureCache, cache_key
+from data.labeler import assign_labels, load_alert_index
+from data.manifest import DatasetManifest, load_runs
+from data.sample_generator import generate_dataset
+
+root = Path(os.environ["TMP_DIR"])
+log_dir = root / "logs"
+synth_dir = root / "synth"
+log_dir.mkdir()
+generate_dataset(synth_dir, seed=5)
+for index, day in enumerate((1, 15)):
+    with (log_dir / f"monitor_run_202503{day:02d}T000000Z_{200 + index}.jsonl").open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"event": "start", "interval": 1.0}) + "\n")
+        for second in range(4):
+            stamp = f"2025-03-{day:02d}T00:00:0{second}Z"
+            handle.write(json.dumps({"event": "sample", "timestamp": stamp, "cpu_percent": 99.0 * index}) + "\n")
+        handle.write(json.dumps({"event": "stop", "label": "benign" if index == 0 else None}) + "\n")
+alerts_path = root / "alerts.jsonl"
+alerts_path.write_text("", encoding="utf-8")
+
+paths = run_paths(log_dir, synth_dir)
+manifest_path = root / "cache" / "manifest.npz"
+cache = FeatureCache(root / "cache" / "features.npz")
+manifest = DatasetManifest(manifest_path)
+assert manifest.refresh(paths, alerts=load_alert_index(alerts_path), cache=cache) == len(paths)
+manifest.save()
+
+expected = assign_labels(build_feature_table(collect_runs(log_dir, synth_dir)), {})
+assert len(manifest) == len(expected)
+for vector in expected:
+    entry = manifest.get(vector.run.path)
+    assert entry is not None, vector.run.run_id
+    assert (entry.run_id, entry.source, entry.label, entry.sample_count) == (
+        vector.run.run_id, vector.run.source, vector.label, vector.run.sample_count
+    )
+    assert entry.duration == vector.features["duration_seconds"]
+    assert entry.cache_key == cache_key(vector.run)
+first_real = manifest.get(paths[0][0])
+assert (first_real.start, first_real.end) == (collector._to_epoch("2025-03-01T00:00:00Z"), collector._to_epoch("2025-03-01T00:00:03Z"))
+print(f"PASS: refresh indexes {len(manifest)} runs with labels, sizes and time ranges")
+
+reloaded = DatasetManifest(manifest_path)
+assert list(reloaded) == list(manifest)
+assert reloaded.refresh(paths, alerts={}, cache=cache) == 0
+
+changed = synth_dir / sorted(path.name for path in synth_dir.glob("*.jsonl"))[0]
+changed.write_text(changed.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+gone = synth_dir / sorted(path.name for path in synth_dir.glob("*.jsonl"))[1]
+gone.unlink()
+paths = run_paths(log_dir, synth_dir)
+alert_run = paths[1][0].stem
+with alerts_path.open("w", encoding="utf-8") as handle:
+    handle.write(json.dumps({"event": "alert", "run_id": alert_run, "metric": "cpu_pct_high", "value": 99, "threshold": 90}) + "\n")
+assert reloaded.refresh(paths, alerts=load_alert_index(alerts_path), cache=cache) == 2
+assert reloaded.get(gone) is None and len(reloaded) == len(paths)
+assert reloaded.get(paths[1][0]).alert_count == 1
+reloaded.save()
+assert DatasetManifest(manifest_path).refresh(paths, alerts=load_alert_index(alerts_path)) == 0
+print("PASS: refresh rebuilds only changed, alerted and deleted logs")
+
+manifest = DatasetManifest(manifest_path)
+counts = manifest.label_counts()
+assert sum(counts.values()) == len(paths)
+malicious = manifest.select(labels=["malicious"])
+assert malicious and all(entry.label == "malicious" for entry in malicious)
+assert {entry.run_id for entry in manifest.select(sources=["real"])} == {path.stem for path, _ in paths[:2]}
+window = manifest.select(sources=["real"], since=dt.datetime(2025, 3, 10), until=dt.datetime(2025, 3, 20))
+assert [entry.run_id for entry in window] == [paths[1][0].stem]
+synthetic = manifest.select(sources=["synthetic"], paths=[path for path, _ in reversed(paths)])
+assert [entry.path for entry in synthetic] == [path.resolve() for path, source in reversed(paths) if source == "synthetic"]
+assert not any(math.isnan(entry.start) for entry in synthetic), "synthetic samples carry timestamps"
+
+sample = manifest.sample(2, seed=3)
+assert sample == manifest.sample(2, seed=3)
+assert {label: min(count, 2) for label, count in counts.items()} == {
+    label: sum(1 for entry in sample if entry.label == label) for label in counts
+}
+print("PASS: select filters by label, source, time window and path; sample is stratified")
+
+loaded = []
+original = collector._load_run
+collector._load_run = lambda path, *args, **kwargs: loaded.append(path) or original(path, *args, **kwargs)
+try:
+    runs = load_runs(malicious)
+finally:
+    collector._load_run = original
+assert loaded == [entry.path for entry in malicious]
+assert [run.run_id for run in runs] == [entry.run_id for entry in malicious]
+print("PASS: load_runs reads only the selected logs")
+PY
@@ -0,0 +1,73 @@
+#!/usr/bin/env bash
+# Feature cache: hits for unchanged logs, recompute for changed ones
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+export TMP_DIR
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import json
+import os
+from pathlib import Path
+
+from data import collector
+from data.collector import build_feature_table, collect_runs
+from data.feature_cache import FeatureCache
+from data.sample_generator import generate_dataset
+
+root = Path(os.environ["TMP_DIR"])
+synth_dir = root / "synth"
+generate_dataset(synth_dir, seed=11)
+cache_path = root / "cache" / "features.npz"
+
+runs = collect_runs(root / "none", synth_dir)
+expected = build_feature_table(runs)
+
+cache = FeatureCache(cache_path)
+first = build_feature_table(runs, cache=cache)
+assert (cache.hits, cache.misses) == (0, len(runs))
+assert cache_path.exists()
+
+cache = FeatureCache(cache_path)
+assert len(cache) == len(runs)
+second = build_feature_table(collect_runs(root / "none", synth_dir), cache=cache)
+assert (cache.hits, cache.misses) == (len(runs), 0), (cache.hits, cache.misses)
+for a, b, c in zip(expected, first, second):
+    assert a.features == b.features == c.features, a.run.run_id
+    assert a.label == b.label == c.label
+print(f"PASS: {len(runs)} runs served from the cache unchanged")
+
+# Appending to one log invalidates only that entry
+changed = runs[0].path
+with changed.open("a", encoding="utf-8") as handle:
+    handle.write(json.dumps({"event": "sample", "cpu_percent": 99.0, "memory_rss": 1}) + "\n")
+cache = FeatureCache(cache_path)
+vectors = build_feature_table(collect_runs(root / "none", synth_dir), cache=cache)
+assert (cache.hits, cache.misses) == (len(runs) - 1, 1), (cache.hits, cache.misses)
+assert vectors[0].features != expected[0].features
+print("PASS: changed log recomputed")
+
+# A new feature version discards every entry; deleted logs are pruned
+collector.FEATURE_VERSION += 1
+import data.feature_cache as feature_cache
+feature_cache.FEATURE_VERSION = collector.FEATURE_VERSION
+runs[1].path.unlink()
+cache = FeatureCache(cache_path)
+assert len(cache) == 0
+build_feature_table(collect_runs(root / "none", synth_dir), cache=cache)
+assert cache.misses == len(runs) - 1
+assert len(FeatureCache(cache_path)) == len(runs) - 1
+print("PASS: feature version bump and deleted logs handled")
+
+cache_path.write_bytes(b"not a zip")
+assert len(FeatureCache(cache_path)) == 0
+print("PASS: corrupt cache ignored")
+PY
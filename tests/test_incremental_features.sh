@@ -0,0 +1,70 @@
+#!/usr/bin/env bash
+# IncrementalFeatures must track compute_features on the same samples
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import datetime as dt
+import random
+from pathlib import Path
+
+from data.collector import FEATURE_COLUMNS, IncrementalFeatures, TelemetryRun, compute_features
+
+rng = random.Random(46)
+base = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+samples = []
+rss = 1e8
+for index in range(3000):
+    rss += rng.uniform(-1e5, 3e5)
+    samples.append(
+        {
+            "event": "sample",
+            "timestamp": (base + dt.timedelta(seconds=0.4 * index + rng.uniform(0, 0.05))).isoformat(),
+            # Constant stretches exercise the flat-slope and zero-variance paths
+            "cpu_percent": rng.uniform(0, 100) if index % 300 < 200 else 42.0,
+            "memory_rss": int(rss),
+            "threads": rng.randint(1, 9) if index % 17 else "n/a",
+            "open_files": rng.randint(0, 50),
+            "socket_count": rng.randint(0, 5),
+            "read_bytes": index * 1000,
+            "write_bytes": index * 77,
+        }
+    )
+
+
+def check(start_event, window, every):
+    features = IncrementalFeatures(start_event, window=window)
+    worst = 0.0
+    for index, sample in enumerate(samples):
+        features.add(sample)
+        if index % every:
+            continue
+        window_samples = samples[max(0, index + 1 - window) : index + 1] if window else samples[: index + 1]
+        expected = compute_features(TelemetryRun("live", Path("live.jsonl"), "live", start_event, window_samples)).features
+        actual = features.features()
+        assert list(actual) == list(FEATURE_COLUMNS)
+        for name in FEATURE_COLUMNS:
+            scale = max(abs(expected[name]), 1.0)
+            if name.endswith("_slope"):
+                # A near-zero slope of a large series is all cancellation; judge it on the series' scale
+                scale = max(scale, expected[name.replace("_slope", "_max")] / expected["duration_seconds"])
+            worst = max(worst, abs(actual[name] - expected[name]) / scale)
+    assert worst < 1e-9, (start_event, window, worst)
+    return worst
+
+
+for start_event in ({"event": "start"}, {"event": "start", "interval": 0.4}):
+    print(f"PASS: growing run matches compute_features (max error {check(start_event, None, 97):.1e})")
+    for window in (1, 7, 240):
+        print(f"PASS: {window}-sample window matches compute_features (max error {check(start_event, window, 1 if window < 10 else 13):.1e})")
+
+empty = IncrementalFeatures(window=10)
+assert empty.sample_count == 0 and not any(empty.features().values())
+print("PASS: empty accumulator yields the empty feature vector")
+PY
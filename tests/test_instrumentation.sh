@@ -0,0 +1,50 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+export MONITOR_LOG_DIR="$TMP_DIR"
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+
+# CLI dump: profile this shell's python for a handful of samples.
+# -W error: the CLI must not trip runpy's "found in sys.modules" warning.
+"${PYTHON_BIN}" -W error::RuntimeWarning -m monitor.instrumentation --samples 5 --interval 0.01 --out "$TMP_DIR/dump.json" >/dev/null
+
+"${PYTHON_BIN}" - <<'PY'
+import json
+import os
+from pathlib import Path
+
+from monitor.instrumentation import PIPELINE
+from monitor.prometheus_exporter import PrometheusExporter
+from monitor.resource_monitor import Sample, append_json_line
+
+dump = json.loads((Path(os.environ["MONITOR_LOG_DIR"]) / "dump.json").read_text(encoding="utf-8"))
+assert dump["enabled"] is True
+for stage in ("inspector_sample", "jsonl_write", "alert_evaluate"):
+    assert dump["stages"][stage]["count"] == 5, (stage, dump["stages"].get(stage))
+assert dump["counters"]["jsonl_lines_written"] == 5
+
+# Disabled by default: nothing is recorded.
+assert not PIPELINE.enabled
+append_json_line(Path(os.environ["MONITOR_LOG_DIR"]) / "noop.jsonl", {"event": "sample"})
+assert PIPELINE.stages() == {} and PIPELINE.counters() == {}
+
+PIPELINE.enable()
+exporter = PrometheusExporter(enabled=True)
+sample = Sample("2025-11-13T00:00:00Z", 1.0, 1024, None, 1, None, None, None)
+exporter.record_sample("run", sample)
+append_json_line(Path(os.environ["MONITOR_LOG_DIR"]) / "timed.jsonl", sample.to_dict())
+text = exporter.render()
+assert "zencube_internal_instrumentation_enabled 1.0" in text
+assert 'zencube_internal_jsonl_write_seconds_bucket{le="+Inf"} 1.0' in text
+assert "zencube_internal_jsonl_lines_written_total 1.0" in text
+assert "zencube_internal_sample_buffer_depth 1.0" in text
+PY
@@ -41,3 +41,34 @@ assert len(remaining) == 10, f"Expected 10 jsonl files remaining, got {len(remai
 archive_files = list((log_dir / "archive").glob("*.gz"))
 assert len(archive_files) == 5, f"Expected 5 archived files, got {len(archive_files)}"
 PY
+
+# Native rotator reports the same RotationResult
+NATIVE_BIN="${ROOT_DIR}/core_c/bin/logrotate_core"
+if [[ -x "${NATIVE_BIN}" ]]; then
+    NATIVE_DIR="$TMP_DIR/native"
+    mkdir -p "$NATIVE_DIR"
+    for i in $(seq 1 15); do
+        printf '{"event":"sample","index":%d}\n' "$i" >"$NATIVE_DIR/run_$i.jsonl"
+        touch -d "-$((16 - i)) minutes" "$NATIVE_DIR/run_$i.jsonl"
+    done
+    export NATIVE_DIR
+    "${PYTHON_BIN}" - <<'PY'
+import os
+from pathlib import Path
+
+from monitor.log_rotate import rotate_logs, rotate_logs_native
+
+log_dir = Path(os.environ["NATIVE_DIR"])
+excluded = log_dir / "run_1.jsonl"
+preview = rotate_logs(log_dir, keep=10, dry_run=True, exclude=[excluded])
+native_preview = rotate_logs_native(log_dir, keep=10, dry_run=True, exclude=[excluded])
+assert native_preview == preview, f"{native_preview} != {preview}"
+
+result = rotate_logs_native(log_dir, keep=10, exclude=[excluded])
+assert (result.kept, result.archived) == (11, 4), result
+assert sorted(p.name for p in (log_dir / "archive").glob("*.gz")) == [
+    f"run_{i}.jsonl.gz" for i in (2, 3, 4, 5)
+]
+assert excluded.exists(), "Excluded log must not be rotated"
+PY
+fi
@@ -0,0 +1,120 @@
+#!/usr/bin/env bash
+# Test the ctypes bridge to core_c/bin/libzencube_core.so
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ROOT_DIR="$(cd "${SCRIPT_DIR}/.." && pwd)"
+LIB="${ROOT_DIR}/core_c/bin/libzencube_core.so"
+
+echo "=== ZenCube Core C - Native Inspector Test ==="
+echo ""
+
+if [[ ! -f "${LIB}" ]]; then
+    echo "Error: libzencube_core.so not found. Run 'make' first."
+    exit 1
+fi
+
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import os
+import subprocess
+import sys
+import time
+
+from monitor.native_inspector import NativeInspector, create_inspector, native_available
+from monitor.resource_monitor import MonitorError, ProcessInspector, Sample
+
+assert native_available(), "library should load"
+
+print("[Test 1] create_inspector picks the native backend...")
+inspector = create_inspector(os.getpid())
+assert isinstance(inspector, NativeInspector), type(inspector)
+print("PASS: NativeInspector selected")
+
+print("[Test 2] samples match the /proc reader...")
+busy = subprocess.Popen([sys.executable, "-c", "import time\nend = time.time() + 3\nwhile time.time() < end: pass"])
+try:
+    native = NativeInspector(busy.pid)
+    reference = ProcessInspector(busy.pid, prefer_psutil=False)
+    time.sleep(0.5)
+    sample = native.sample()
+    expected = reference.sample()
+    assert isinstance(sample, Sample)
+    assert sample.cpu_percent > 50, sample
+    assert abs(sample.memory_rss - expected.memory_rss) < 4 * 1024 * 1024, (sample, expected)
+    assert sample.threads == expected.threads, (sample, expected)
+    assert "cpu_percent" in sample.to_dict()
+finally:
+    busy.kill()
+    busy.wait()
+print("PASS: native sample agrees with ProcessInspector")
+
+print("[Test 3] open_files and cpu_percent match psutil...")
+HOLDER = """
+import hashlib, os, socket, sys, tempfile, threading, time
+handles = [tempfile.NamedTemporaryFile() for _ in range(3)]
+pipe = os.pipe()
+pair = socket.socketpair()
+data = b"x" * (1 << 20)
+def spin():
+    while True:
+        hashlib.sha256(data).digest()
+for _ in range(int(sys.argv[1])):
+    threading.Thread(target=spin, daemon=True).start()
+print("ready", flush=True)
+time.sleep(30)
+"""
+spinners = 2 if (os.cpu_count() or 1) > 1 else 1
+holder = subprocess.Popen([sys.executable, "-c", HOLDER, str(spinners)], stdout=subprocess.PIPE, text=True)
+try:
+    assert holder.stdout.readline().strip() == "ready"
+    parity = NativeInspector(holder.pid)
+    reference = ProcessInspector(holder.pid, prefer_psutil=True)
+    parity.sample()
+    reference.sample()
+    time.sleep(1.0)
+    sample = parity.sample()
+    expected = reference.sample()
+    # Regular files only: stdio pipes, the pipe pair and sockets are skipped
+    assert sample.open_files == expected.open_files, (sample, expected)
+    assert sample.open_files >= 3, sample
+    assert abs(sample.cpu_percent - expected.cpu_percent) < 40, (sample, expected)
+    if spinners > 1:
+        assert sample.cpu_percent > 110, sample  # not clamped to one core
+    parity.close()
+finally:
+    holder.kill()
+    holder.wait()
+print("PASS: native sample agrees with psutil")
+
+print("[Test 4] exited targets raise MonitorError...")
+try:
+    native.sample()
+except MonitorError:
+    pass
+else:
+    raise AssertionError("sampling a reaped process should fail")
+try:
+    NativeInspector(busy.pid)
+except MonitorError:
+    pass
+else:
+    raise AssertionError("opening a reaped process should fail")
+native.close()
+print("PASS: MonitorError raised")
+
+print("[Test 5] ZENCUBE_NATIVE=0 falls back to ProcessInspector...")
+os.environ["ZENCUBE_NATIVE"] = "0"
+assert isinstance(create_inspector(os.getpid()), ProcessInspector)
+print("PASS: fallback honoured")
+PY
+
+echo ""
+echo "==================================="
+echo "All native inspector tests PASSED ✓"
+echo "==================================="
@@ -0,0 +1,73 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import re
+import time
+
+from monitor.prometheus_exporter import PrometheusExporter
+from monitor.resource_monitor import Sample
+
+
+def make_sample(cpu: float) -> Sample:
+    return Sample(
+        timestamp="2025-11-13T00:00:00Z",
+        cpu_percent=cpu,
+        memory_rss=int(64 * 1024 * 1024),
+        memory_vms=None,
+        threads=2,
+        open_files=3,
+        read_bytes=0,
+        write_bytes=0,
+    )
+
+
+def value(text: str, name: str) -> float:
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name} missing from scrape"
+    return float(match.group(1))
+
+
+exporter = PrometheusExporter(enabled=True, max_runs=3, run_ttl=0.5)
+assert exporter.is_enabled()
+
+# LRU: a fourth run evicts the least recently updated label set.
+for index in range(4):
+    exporter.record_sample(f"run-{index}", make_sample(10.0 * (index + 1)))
+exporter.record_sample("run-1", make_sample(20.0))
+text = exporter.render()
+assert 'run_id="run-0"' not in text, "oldest run should have been evicted"
+for run_id in ("run-1", "run-2", "run-3"):
+    assert f'run_id="{run_id}"' in text
+assert value(text, "zencube_exporter_runs") == 3.0
+assert value(text, 'zencube_exporter_evictions_total{reason="lru"}') == 1.0
+# Samples of the evicted run still count towards the all-runs aggregates.
+assert value(text, "zencube_all_runs_samples_total") == 5.0
+assert value(text, "zencube_all_runs_cpu_percent_distribution_count") == 5.0
+assert value(text, "zencube_all_runs_cpu_percent") == 20.0 + 30.0 + 40.0
+assert value(text, "zencube_exporter_series") > 0
+
+# TTL: idle runs disappear on the next scrape; aggregates keep their history.
+time.sleep(0.6)
+exporter.record_sample("run-3", make_sample(40.0))
+text = exporter.render()
+assert 'run_id="run-1"' not in text and 'run_id="run-2"' not in text
+assert value(text, "zencube_exporter_runs") == 1.0
+assert value(text, 'zencube_exporter_evictions_total{reason="ttl"}') == 2.0
+assert value(text, "zencube_all_runs_samples_total") == 6.0
+
+# Explicit clear_run still works and is counted separately.
+exporter.clear_run("run-3")
+text = exporter.render()
+assert 'run_id="run-3"' not in text
+assert value(text, 'zencube_exporter_evictions_total{reason="cleared"}') == 1.0
+assert value(text, "zencube_all_runs_samples_total") == 6.0
+assert value(text, "zencube_exporter_scrape_duration_seconds") >= 0.0
+PY
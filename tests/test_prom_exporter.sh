@@ -40,11 +40,29 @@ exporter.record_sample("test-run", sample)
 
 time.sleep(0.2)
 port = int(os.environ.get("PROMETHEUS_PORT", "9209"))
-with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
-    metrics = response.read().decode("utf-8")
 
+
+def scrape() -> str:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        return response.read().decode("utf-8")
+
+
+metrics = scrape()
 assert "zencube_cpu_percent" in metrics
 assert "test-run" in metrics
+assert 'zencube_memory_rss_megabytes{run_id="test-run"} 256.0' in metrics
+assert 'zencube_samples_total{run_id="test-run"} 1.0' in metrics
+assert 'zencube_cpu_percent_distribution_bucket{le="50.0",run_id="test-run"} 1.0' in metrics
+
+# Histograms are folded incrementally, so earlier observations survive eviction.
+for _ in range(exporter.buffer.capacity - 1):
+    exporter.record_sample("test-run", sample)
+metrics = scrape()
+expected = float(exporter.buffer.capacity)
+assert f'zencube_cpu_percent_distribution_count{{run_id="test-run"}} {expected}' in metrics
+assert f'zencube_samples_total{{run_id="test-run"}} {expected}' in metrics
+assert 'zencube_cpu_window_mean_percent{run_id="test-run"} 42.0' in metrics
 
 exporter.clear_run("test-run")
+assert 'run_id="test-run"' not in scrape()
 PY
@@ -178,6 +178,173 @@ echo "PASS: Timestamp is valid ISO 8601 UTC"
 echo "  ${TIMESTAMP}"
 echo ""
 
+# Test 7: Multiple PIDs from one daemon, one log per target
+echo "[Test 7] Sampling several PIDs into per-target logs..."
+MULTI_DIR="${TEST_DIR}/multi"
+mkdir -p "${MULTI_DIR}"
+sleep 2 &
+PID_A=$!
+sleep 30 &
+PID_B=$!
+
+"${BIN_DIR}/sampler" --pid ${PID_A} --pid ${PID_B} --interval 0.25 \
+    --run-id multi --out-dir "${MULTI_DIR}" > /dev/null &
+SAMPLER_PID=$!
+sleep 3
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+kill ${PID_B} 2>/dev/null || true
+wait ${PID_A} ${PID_B} 2>/dev/null || true
+
+for target in ${PID_A} ${PID_B}; do
+    TARGET_LOG="${MULTI_DIR}/multi_${target}.jsonl"
+    if [[ ! -f "${TARGET_LOG}" ]]; then
+        echo "FAIL: missing per-target log ${TARGET_LOG}"
+        exit 1
+    fi
+    if [[ $(grep -c "\"pid\":${target}" "${TARGET_LOG}") -lt 3 ]]; then
+        echo "FAIL: too few samples for PID ${target}"
+        exit 1
+    fi
+    if [[ $(grep -c '"event":"stop"' "${TARGET_LOG}") -ne 1 ]]; then
+        echo "FAIL: expected exactly one summary for PID ${target}"
+        exit 1
+    fi
+done
+
+# PID_A exited after ~2s and must not keep accumulating samples
+if [[ $(grep -c '"event":"sample"' "${MULTI_DIR}/multi_${PID_A}.jsonl") -ge $(grep -c '"event":"sample"' "${MULTI_DIR}/multi_${PID_B}.jsonl") ]]; then
+    echo "FAIL: exited target kept being sampled"
+    exit 1
+fi
+
+echo "PASS: per-target logs written from one daemon"
+echo ""
+
+# Test 8: Parent PID with descendant discovery
+echo "[Test 8] Discovering descendants of a parent PID..."
+TREE_DIR="${TEST_DIR}/tree"
+mkdir -p "${TREE_DIR}"
+bash -c 'sleep 1; sleep 4 & wait' &
+PARENT_PID=$!
+
+"${BIN_DIR}/sampler" --parent ${PARENT_PID} --interval 0.25 \
+    --run-id tree --out-dir "${TREE_DIR}" > /dev/null &
+SAMPLER_PID=$!
+sleep 3
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+wait ${PARENT_PID} 2>/dev/null || true
+
+TREE_LOGS=$(ls "${TREE_DIR}" | wc -l)
+if [[ ! -f "${TREE_DIR}/tree_${PARENT_PID}.jsonl" || ${TREE_LOGS} -lt 2 ]]; then
+    echo "FAIL: expected parent plus at least one descendant log, got: $(ls "${TREE_DIR}")"
+    exit 1
+fi
+
+echo "PASS: ${TREE_LOGS} targets sampled under parent ${PARENT_PID}"
+echo ""
+
+# Test 8b: an exited descendant's slot is freed, so a reused PID is sampled again
+echo "[Test 8b] Re-sampling a descendant PID reused after exit..."
+if [[ -w /proc/sys/kernel/ns_last_pid ]]; then
+    REUSE_DIR="${TEST_DIR}/reuse"
+    mkdir -p "${REUSE_DIR}"
+    bash -c 'sleep 1.5 & child=$!; echo ${child} > "$1/child.pid"; wait; sleep 2
+             echo $((child - 1)) > /proc/sys/kernel/ns_last_pid; sleep 2.5 & wait' _ "${REUSE_DIR}" &
+    PARENT_PID=$!
+
+    "${BIN_DIR}/sampler" --parent ${PARENT_PID} --interval 0.25 \
+        --run-id reuse --out-dir "${REUSE_DIR}" > /dev/null &
+    SAMPLER_PID=$!
+    wait ${PARENT_PID} 2>/dev/null || true
+    wait ${SAMPLER_PID} 2>/dev/null || true
+
+    CHILD_LOG="${REUSE_DIR}/reuse_$(cat "${REUSE_DIR}/child.pid").jsonl"
+    if [[ $(grep -c '"event":"stop"' "${CHILD_LOG}") -ne 2 ]]; then
+        echo "FAIL: expected one summary per process that held the PID"
+        cat "${CHILD_LOG}"
+        exit 1
+    fi
+    if grep -q '"exit_code"' "${CHILD_LOG}"; then
+        echo "FAIL: summary reported an exit status the sampler cannot see"
+        exit 1
+    fi
+    echo "PASS: reused PID sampled again, summaries omit exit_code"
+else
+    echo "SKIP: /proc/sys/kernel/ns_last_pid is not writable"
+fi
+echo ""
+
+# Test 9: comm fields containing spaces and parentheses
+echo "[Test 9] Parsing /proc/<pid>/stat for an awkward process name..."
+WEIRD_BIN="${TEST_DIR}/odd) name (x"
+cp "$(command -v sleep)" "${WEIRD_BIN}"
+"${WEIRD_BIN}" 5 3< "${WEIRD_BIN}" &
+WEIRD_PID=$!
+WEIRD_LOG="${TEST_DIR}/weird.jsonl"
+
+"${BIN_DIR}/sampler" --pid ${WEIRD_PID} --interval 0.2 --run-id weird --out "${WEIRD_LOG}" > /dev/null &
+SAMPLER_PID=$!
+sleep 1
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+kill ${WEIRD_PID} 2>/dev/null || true
+wait ${WEIRD_PID} 2>/dev/null || true
+
+python3 - "${WEIRD_LOG}" <<'PY'
+import json
+import sys
+
+samples = [json.loads(line) for line in open(sys.argv[1]) if '"event":"sample"' in line]
+assert len(samples) >= 3, len(samples)
+for sample in samples:
+    assert sample["threads"] == 1, sample
+    assert sample["rss_bytes"] > 0 and sample["vms_bytes"] >= sample["rss_bytes"], sample
+    assert sample["fds_open"] >= 1, sample  # fd 3: the only regular file
+    assert 0 <= sample["cpu_percent"] <= 100, sample
+PY
+echo "PASS: stat parsed past the last ')' of the comm field"
+echo ""
+
+# Test 10: emitter escapes strings and keeps records parseable
+echo "[Test 10] Emitting records for a run_id that needs escaping..."
+ESCAPE_LOG="${TEST_DIR}/escape.jsonl"
+ESCAPE_RUN_ID=$'quote"back\\slash\ttab'
+sleep 3 &
+TARGET_PID=$!
+"${BIN_DIR}/sampler" --pid ${TARGET_PID} --interval 0.2 --run-id "${ESCAPE_RUN_ID}" --out "${ESCAPE_LOG}" > /dev/null &
+SAMPLER_PID=$!
+sleep 1
+kill -INT ${SAMPLER_PID} 2>/dev/null || true
+wait ${SAMPLER_PID} 2>/dev/null || true
+kill ${TARGET_PID} 2>/dev/null || true
+wait ${TARGET_PID} 2>/dev/null || true
+
+ESCAPE_RUN_ID="${ESCAPE_RUN_ID}" python3 - "${ESCAPE_LOG}" <<'PY'
+import json
+import os
+import sys
+
+records = [json.loads(line) for line in open(sys.argv[1])]
+samples = [r for r in records if r["event"] == "sample"]
+assert samples and records[-1]["event"] == "stop", records[-1]
+for sample in samples:
+    assert sample["run_id"] == os.environ["ESCAPE_RUN_ID"], sample["run_id"]
+    assert round(sample["cpu_percent"], 2) == sample["cpu_percent"], sample
+    assert isinstance(sample["rss_bytes"], int) and isinstance(sample["fds_open"], int), sample
+assert records[-1]["samples"] == len(samples), records[-1]
+PY
+echo "PASS: escaped run_id round-trips through JSON"
+echo ""
+
+# Test 11: microbenchmark reports ns per sample
+echo "[Test 11] Running sampler_bench..."
+BENCH_OUT=$("${BIN_DIR}/sampler_bench" --iterations 500)
+echo "${BENCH_OUT}" | python3 -c "import json, sys; doc = json.load(sys.stdin); assert doc['collect_ns_per_sample'] > 0 and doc['collect_emit_ns_per_sample'] > 0, doc"
+echo "PASS: ${BENCH_OUT}"
+echo ""
+
 # Summary
 echo "==================================="
 echo "All sampler tests PASSED ✓"
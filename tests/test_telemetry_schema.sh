@@ -0,0 +1,81 @@
+#!/usr/bin/env bash
+# Mixed core_c / Python monitor logs decode to the same canonical samples
+set -euo pipefail
+
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+export TMP_DIR
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+PYTHON_BIN="${ROOT_DIR}/.venv/bin/python"
+if [[ ! -x "${PYTHON_BIN}" ]]; then
+    PYTHON_BIN="$(command -v python3)"
+fi
+
+cd "${ROOT_DIR}"
+"${PYTHON_BIN}" - <<'PY'
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from data.collector import collect_runs, compute_features
+from data.schema import FIELD_ALIASES, SCHEMA_VERSION, get_decoder
+from data.sequences import extract_sequences
+
+log_dir = Path(os.environ["TMP_DIR"])
+python_dialect = []
+c_dialect = []
+for i in range(30):
+    ts = f"2025-01-01T00:00:{i:02d}+00:00"
+    rss, vms, fds = 100_000_000 + i * 1_000_000, 400_000_000, 5 + i % 3
+    python_dialect.append({"event": "sample", "timestamp": ts, "cpu_percent": 10.0 + i,
+                           "memory_rss": rss, "memory_vms": vms, "threads": 2, "open_files": fds,
+                           "read_bytes": i * 4096, "write_bytes": i * 1024})
+    c_dialect.append({"event": "sample", "run_id": "c", "timestamp": ts.replace("+00:00", "Z"), "pid": 1,
+                      "cpu_percent": 10.0 + i, "rss_bytes": rss, "vms_bytes": vms, "threads": 2, "fds_open": fds,
+                      "read_bytes": i * 4096, "write_bytes": i * 1024, "cpu_max": 40.0, "rss_max": rss})
+
+for name, samples in (("monitor_run_py.jsonl", python_dialect), ("monitor_run_c.jsonl", c_dialect)):
+    with (log_dir / name).open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"event": "start", "interval": 1.0}) + "\n")
+        for sample in samples:
+            handle.write(json.dumps(sample) + "\n")
+
+runs = {run.run_id: run for run in collect_runs(log_dir)}
+py_features = compute_features(runs["monitor_run_py"]).features
+c_features = compute_features(runs["monitor_run_c"]).features
+assert c_features["rss_mean"] > 0, "core_c logs must not yield zero RSS features"
+for key, value in py_features.items():
+    assert np.isclose(value, c_features[key]), (key, value, c_features[key])
+assert "rss_bytes" not in runs["monitor_run_c"].samples[0]
+assert runs["monitor_run_c"].samples[0]["memory_rss_max"] == 100_000_000
+print("PASS: core_c and Python logs yield identical features")
+
+seq_py = extract_sequences([runs["monitor_run_py"]], window=10, stride=10)
+seq_c = extract_sequences([runs["monitor_run_c"]], window=10, stride=10)
+assert all(np.array_equal(a.features, b.features) for a, b in zip(seq_py, seq_c))
+# A key outside the schema reads the sample dicts; the C log's pid is there
+extra = extract_sequences(collect_runs(log_dir), window=10, stride=10, keys=("cpu_percent", "pid"))
+assert len(extra) == 6, len(extra)
+assert [example.features[0, 1] for example in extra if example.run_id == "monitor_run_c"] == [1.0] * 3
+assert all(example.timestamps[0].startswith("2025-01-01T00:00:") for example in extra)
+print("PASS: sequences agree across dialects, keys outside the schema included")
+
+decoder = get_decoder()
+column = decoder.column([{"rss_bytes": 5}, {"memory_rss": None}, {"memory_rss": "bad"}, {}], "memory_rss")
+assert column.tolist() == [5.0, 0.0, 0.0, 0.0], column
+print("PASS: column decode resolves aliases and coerces")
+
+# core_c/telemetry_schema.c mirrors the current version's aliases
+source = Path("core_c/telemetry_schema.c").read_text(encoding="utf-8")
+c_aliases = {
+    name: tuple(re.findall(r'"(\w+)"', rest))
+    for name, rest in re.findall(r'\{ "(\w+)",\s*\{([^}]*)\} \}', source)
+}
+expected = {name: aliases for name, aliases in FIELD_ALIASES[SCHEMA_VERSION].items()}
+assert {k: v for k, v in c_aliases.items() if v} == expected, (c_aliases, expected)
+print("PASS: C field map matches data.schema")
+PY